@@ -0,0 +1,283 @@
+# app/common/cache.py
+"""
+🗄️ CACHÉ EN MEMORIA DEL PROCESO
+TTL por entrada + stale-while-revalidate + tamaño máximo con desalojo LRU.
+- Fresca: se devuelve sin tocar el REST API.
+- Vencida pero dentro de la ventana stale: se devuelve al instante y se
+  refresca en segundo plano (una sola recarga por clave).
+- Ausente o demasiado vieja: se carga esperando (cargas concurrentes de la
+  misma clave comparten la misma descarga).
+El TTL puede depender del valor cargado (ej: TTL corto para resultados negativos).
+Con `codec` y un backend L2 configurado (app/common/shared_cache.py) la caché es
+el L1 de un nivel compartido entre réplicas: antes de cargar se busca en L2,
+lo cargado se escribe ahí y las invalidaciones se propagan a las demás réplicas.
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Union
+import asyncio
+import contextvars
+import logging
+import time
+import uuid
+
+import orjson
+
+from app import config
+from app.common import shared_cache
+from app.common.shared_cache import CacheCodec, SharedEntry
+
+logger = logging.getLogger(__name__)
+
+# TTL fijo o función valor -> segundos
+TTL = Union[float, Callable[[Any], float]]
+
+
+class CacheEntry:
+    __slots__ = ("value", "stored_at", "ttl", "stale_ttl")
+
+    def __init__(self, value: Any, ttl: float, stale_ttl: float, age: float = 0.0):
+        self.value = value
+        # age > 0: la entrada se cargó antes (en otra réplica) y vence cuando vencía allá
+        self.stored_at = time.monotonic() - age
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+    def is_fresh(self) -> bool:
+        return self.age() < self.ttl
+
+    def is_servable(self) -> bool:
+        return self.age() < self.ttl + self.stale_ttl
+
+
+class TTLCache:
+    """Caché asíncrona con TTL, stale-while-revalidate y LRU"""
+
+    def __init__(self, max_entries: int = 128, name: str = "cache", codec: Optional[CacheCodec] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        # Generación por clave: una invalidación descarta cargas que estaban en vuelo
+        self._generation: Dict[Hashable, int] = {}
+        self.stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0, "evictions": 0,
+            "shared_hits": 0, "remote_invalidations": 0,
+        }
+        # Solo las cachés con codec usan el nivel compartido (sus valores pasan a JSON)
+        self.codec = codec
+        # Origen de los mensajes de invalidación de esta instancia (no se aplican a sí misma)
+        self._origin = uuid.uuid4().hex
+        if codec is not None:
+            shared_cache.subscribe(name, self._on_shared_message)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: TTL,
+        stale_ttl: float = 0.0,
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry.is_fresh():
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry.value
+
+        if entry is not None and entry.is_servable():
+            self._entries.move_to_end(key)
+            self.stats["stale_hits"] += 1
+            self._refresh_in_background(key, loader, ttl, stale_ttl)
+            return entry.value
+
+        self.stats["misses"] += 1
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, loader, ttl, stale_ttl))
+            self._loading[key] = future
+            future.add_done_callback(lambda _: self._loading.pop(key, None))
+        return await asyncio.shield(future)
+
+    def get_fresh(self, key: Hashable, default: Any = None) -> Any:
+        """Valor si está fresco; `default` si falta o venció (no dispara cargas)"""
+        entry = self._entries.get(key)
+        if entry is None or not entry.is_fresh():
+            return default
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Valor guardado (aunque esté vencido) sin disparar cargas"""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        """Guarda en L1 (el nivel compartido solo recibe lo que cargan los loaders)"""
+        self._store(key, CacheEntry(value, ttl, stale_ttl))
+
+    def _store(self, key: Hashable, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+            logger.debug(f"🗄️ [{self.name}] LRU desaloja {evicted}")
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Elimina una clave (también de L2 y del L1 de las demás réplicas); las cargas en vuelo no se guardarán"""
+        removed = self._forget(key)
+        if self._backend() is not None:
+            shared_cache.in_background(self._propagate(key))
+        return removed
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Elimina las claves que cumplen `predicate`. Las demás réplicas no pueden
+        evaluar el predicado: con nivel compartido se descarta la caché completa
+        en todas (nueva generación en L2).
+        """
+        removed = self._forget_where(predicate)
+        if self._backend() is not None:
+            shared_cache.in_background(self._propagate(None))
+        return removed
+
+    def clear(self) -> None:
+        self.invalidate_where(lambda _: True)
+
+    def _forget(self, key: Hashable) -> bool:
+        self._generation[key] = self._generation.get(key, 0) + 1
+        task = self._refreshing.pop(key, None)
+        if task is not None:
+            task.cancel()
+        return self._entries.pop(key, None) is not None
+
+    def _forget_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        keys = [key for key in list(self._entries) + list(self._loading) if predicate(key)]
+        return sum(1 for key in dict.fromkeys(keys) if self._forget(key))
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: TTL, stale_ttl: float) -> Any:
+        generation = self._generation.get(key, 0)
+        backend = self._backend()
+        shared_generation = None
+        if backend is not None:
+            # Otra réplica pudo cargarla (o refrescarla) hace poco
+            shared, shared_generation = await self._read_shared(backend, key)
+            if shared is not None:
+                self.stats["shared_hits"] += 1
+                if self._generation.get(key, 0) == generation:
+                    self._store(key, CacheEntry(shared.value, shared.ttl, shared.stale_ttl, age=shared.age))
+                return shared.value
+
+        value = await loader()
+        entry_ttl = ttl(value) if callable(ttl) else ttl
+        if self._generation.get(key, 0) == generation:
+            self.set(key, value, entry_ttl, stale_ttl)
+            if backend is not None and shared_generation is not None:
+                await self._write_shared(backend, key, value, entry_ttl, stale_ttl, shared_generation)
+        return value
+
+    # ------------------------------------------------------------ nivel compartido (L2)
+
+    def _backend(self) -> Optional[shared_cache.CacheBackend]:
+        return shared_cache.get_backend() if self.codec is not None else None
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{config.CACHE_L2_PREFIX}:{self.name}:{key!r}"
+
+    def _generation_key(self) -> str:
+        return f"{config.CACHE_L2_PREFIX}:{self.name}:#generation"
+
+    async def _read_shared(self, backend, key: Hashable):
+        """
+        (entrada fresca de L2 o None, generación vigente de la caché). La
+        generación es None si L2 no respondió: lo cargado tampoco se escribe.
+        """
+        values = await shared_cache.call(backend.mget([self._generation_key(), self._shared_key(key)]))
+        if values is None:
+            return None, None
+        generation = int(values[0] or 0)
+        if values[1] is None:
+            shared_cache.stats["misses"] += 1
+            return None, generation
+        try:
+            envelope = shared_cache.unpack(values[1])
+            if envelope["gen"] != generation:
+                shared_cache.stats["misses"] += 1
+                return None, generation
+            age = max(time.time() - envelope["at"], 0.0)
+            if age >= envelope["ttl"]:
+                # Vencida también allá: la réplica que la sirve stale la está refrescando
+                shared_cache.stats["misses"] += 1
+                return None, generation
+            value = self.codec.decode(key, envelope["v"])
+        except (KeyError, TypeError, ValueError, orjson.JSONDecodeError) as e:
+            shared_cache.stats["errors"] += 1
+            logger.warning(f"⚠️ [{self.name}] Entrada L2 ilegible para {key}: {e!r}")
+            return None, generation
+        shared_cache.stats["hits"] += 1
+        return SharedEntry(value, age, envelope["ttl"], envelope["stale"]), generation
+
+    async def _write_shared(self, backend, key: Hashable, value: Any, ttl: float, stale_ttl: float, generation: int) -> None:
+        try:
+            data = shared_cache.pack(self.codec.encode(value), time.time(), ttl, stale_ttl, generation)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ [{self.name}] No se pudo serializar {key} para L2: {e!r}")
+            return
+        # En L2 solo vive mientras está fresca: el resto de la ventana stale la cubre cada L1
+        if ttl > 0 and await shared_cache.call(backend.set(self._shared_key(key), data, ttl), default=False) is not False:
+            shared_cache.stats["writes"] += 1
+
+    async def _propagate(self, key: Optional[Hashable]) -> None:
+        """Invalida en L2 y avisa a las demás réplicas (key None = caché completa)"""
+        backend = self._backend()
+        if backend is None:
+            return
+        if key is None:
+            await backend.incr(self._generation_key())
+        else:
+            await backend.delete(self._shared_key(key))
+        message = {"cache": self.name, "origin": self._origin}
+        message.update({"clear": True} if key is None else {"key": repr(key)})
+        await backend.publish(shared_cache.CHANNEL, orjson.dumps(message))
+        shared_cache.stats["invalidations_sent"] += 1
+
+    def _on_shared_message(self, message: dict) -> None:
+        """Invalidación publicada por otra réplica: solo se descarta el L1"""
+        if message.get("origin") == self._origin:
+            return
+        self.stats["remote_invalidations"] += 1
+        shared_cache.stats["invalidations_received"] += 1
+        if message.get("clear"):
+            self._forget_where(lambda _: True)
+        else:
+            # Las claves viajan como repr (invalidaciones puntuales: recorrer las claves basta)
+            target = message.get("key")
+            self._forget_where(lambda key: repr(key) == target)
+
+    def _refresh_in_background(self, key: Hashable, loader, ttl: TTL, stale_ttl: float) -> None:
+        if key in self._refreshing or key in self._loading:
+            return
+
+        async def refresh():
+            try:
+                await self._load(key, loader, ttl, stale_ttl)
+                self.stats["refreshes"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Se sigue sirviendo el valor viejo hasta que salga de la ventana stale
+                self.stats["refresh_errors"] += 1
+                logger.warning(f"⚠️ [{self.name}] No se pudo refrescar {key}: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        # Contexto vacío: la recarga no pertenece al request que la disparó
+        task = asyncio.get_running_loop().create_task(refresh(), context=contextvars.Context())
+        self._refreshing[key] = task
@@ -0,0 +1,255 @@
+# app/common/dataloaders.py
+"""
+🔗 DATALOADERS POR REQUEST
+Agrupan las relaciones de los tipos GraphQL: todas las claves pedidas en el mismo
+tick de ejecución se resuelven con UNA descarga del listado de la entidad, en lugar
+de un GET por cada objeto padre (problema N+1).
+Con el lookahead del campo raíz, `prefetch` adelanta la descarga de los listados
+de las relaciones pedidas.
+"""
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+
+from strawberry.dataloader import DataLoader
+
+from app.common.http_client import get_upstream_client
+from app.common.datasource import load_rows
+from app.common.decoding import describe_error, record_batch
+from app.common.lookahead import SelectionTree
+from app.common.rows import is_row
+from app.common.entities.carts.service import parse_cart
+from app.common.entities.categories.service import parse_category
+from app.common.entities.clients.service import parse_client
+from app.common.entities.deliveries.service import parse_delivery
+from app.common.entities.inventories.service import parse_inventory
+from app.common.entities.orders.service import parse_order
+from app.common.entities.payment_methods.service import parse_payment_method
+from app.common.entities.product_carts.service import parse_product_cart
+from app.common.entities.product_orders.service import parse_product_order
+from app.common.entities.products.service import parse_product
+from app.common.entities.sellers.service import parse_seller
+from app.common.entities.subcategories.service import parse_subcategory
+from app.common.entities.subcategory_products.service import parse_subcategory_product
+
+logger = logging.getLogger(__name__)
+
+
+class EntitySpec(NamedTuple):
+    """Cómo descargar y convertir una entidad del REST API"""
+    name: str
+    path: str
+    key: str
+    parse: Callable[[dict], Any]
+    params: Optional[Dict[str, Any]] = None
+
+
+CARTS = EntitySpec("carts", "/carts", "id_cart", parse_cart)
+CATEGORIES = EntitySpec("categories", "/categories", "id_category", parse_category)
+CLIENTS = EntitySpec("clients", "/clients", "id_client", parse_client)
+DELIVERIES = EntitySpec("deliveries", "/deliveries", "id_delivery", parse_delivery)
+INVENTORIES = EntitySpec("inventories", "/inventories", "id_inventory", parse_inventory)
+ORDERS = EntitySpec("orders", "/orders", "id_order", parse_order)
+PAYMENT_METHODS = EntitySpec("payment_methods", "/payment-methods", "id_payment_method", parse_payment_method)
+PRODUCT_CARTS = EntitySpec("product_carts", "/product-carts", "id_product_cart", parse_product_cart)
+PRODUCT_ORDERS = EntitySpec("product_orders", "/product-orders", "id_product_order", parse_product_order)
+PRODUCTS = EntitySpec("products", "/products", "id_product", parse_product)
+SELLERS = EntitySpec("sellers", "/sellers", "id_seller", parse_seller)
+SUBCATEGORIES = EntitySpec("subcategories", "/subcategories", "id_sub_category", parse_subcategory)
+SUBCATEGORY_PRODUCTS = EntitySpec("subcategory_products", "/subcategory-products", "id_sub_category_product", parse_subcategory_product)
+
+# Relaciones de cada type: campo -> (listado que descarga su DataLoader, type del campo)
+RELATIONS: Dict[str, Dict[str, Tuple[EntitySpec, str]]] = {
+    "CartType": {
+        "client": (CLIENTS, "ClientType"),
+        "orders": (ORDERS, "OrderType"),
+        "product_carts": (PRODUCT_CARTS, "ProductCartType"),
+    },
+    "CategoryType": {"subcategories": (SUBCATEGORIES, "SubCategoryType")},
+    "ClientType": {"carts": (CARTS, "CartType")},
+    "DeliveryType": {"orders": (ORDERS, "OrderType")},
+    "InventoryType": {
+        "seller": (SELLERS, "SellerType"),
+        "products": (PRODUCTS, "ProductType"),
+    },
+    "OrderType": {
+        "client": (CLIENTS, "ClientType"),
+        "payment_method": (PAYMENT_METHODS, "PaymentMethodType"),
+        "cart": (CARTS, "CartType"),
+        "delivery": (DELIVERIES, "DeliveryType"),
+        "product_orders": (PRODUCT_ORDERS, "ProductOrderType"),
+    },
+    "PaymentMethodType": {"orders": (ORDERS, "OrderType")},
+    "ProductCartType": {
+        "product": (PRODUCTS, "ProductType"),
+        "cart": (CARTS, "CartType"),
+    },
+    "ProductOrderType": {
+        "product": (PRODUCTS, "ProductType"),
+        "order": (ORDERS, "OrderType"),
+    },
+    "ProductType": {
+        "seller": (SELLERS, "SellerType"),
+        "category": (CATEGORIES, "CategoryType"),
+        "inventory": (INVENTORIES, "InventoryType"),
+        "subcategory_products": (SUBCATEGORY_PRODUCTS, "SubCategoryProductType"),
+        "product_orders": (PRODUCT_ORDERS, "ProductOrderType"),
+        "product_carts": (PRODUCT_CARTS, "ProductCartType"),
+    },
+    "SellerType": {"inventories": (INVENTORIES, "InventoryType")},
+    "SubCategoryType": {
+        "category": (CATEGORIES, "CategoryType"),
+        "subcategory_products": (SUBCATEGORY_PRODUCTS, "SubCategoryProductType"),
+    },
+    "SubCategoryProductType": {
+        "sub_category": (SUBCATEGORIES, "SubCategoryType"),
+        "product": (PRODUCTS, "ProductType"),
+    },
+}
+
+
+class EntityLoaders:
+    """
+    Conjunto de DataLoaders de una operación GraphQL.
+    - Cada listado se descarga como mucho una vez por request.
+    - Identity map: el mismo registro produce siempre el mismo objeto Strawberry.
+    """
+
+    def __init__(self):
+        self._rows: Dict[str, asyncio.Future] = {}
+        self._indexes: Dict[str, Dict[Hashable, dict]] = {}
+        self._identity: Dict[tuple, Any] = {}
+
+        # Relaciones a-uno (por id)
+        self.carts = self._by_id(CARTS)
+        self.categories = self._by_id(CATEGORIES)
+        self.clients = self._by_id(CLIENTS)
+        self.deliveries = self._by_id(DELIVERIES)
+        self.inventories = self._by_id(INVENTORIES)
+        self.orders = self._by_id(ORDERS)
+        self.payment_methods = self._by_id(PAYMENT_METHODS)
+        self.products = self._by_id(PRODUCTS)
+        self.sellers = self._by_id(SELLERS)
+        self.subcategories = self._by_id(SUBCATEGORIES)
+
+        # Relaciones a-muchos (agrupadas por clave foránea)
+        self.carts_by_client = self._grouped(CARTS, "id_client")
+        self.inventories_by_seller = self._grouped(INVENTORIES, "id_seller")
+        self.orders_by_cart = self._grouped(ORDERS, "id_cart")
+        self.orders_by_delivery = self._grouped(ORDERS, "id_delivery")
+        self.orders_by_payment_method = self._grouped(ORDERS, "id_payment_method")
+        self.product_carts_by_cart = self._grouped(PRODUCT_CARTS, "id_cart")
+        self.product_carts_by_product = self._grouped(PRODUCT_CARTS, "id_product")
+        self.product_orders_by_order = self._grouped(PRODUCT_ORDERS, "id_order")
+        self.product_orders_by_product = self._grouped(PRODUCT_ORDERS, "id_product")
+        self.products_by_inventory = self._grouped(PRODUCTS, "id_inventory")
+        self.subcategories_by_category = self._grouped(SUBCATEGORIES, "id_category")
+        self.subcategory_products_by_product = self._grouped(SUBCATEGORY_PRODUCTS, "id_product")
+        self.subcategory_products_by_sub_category = self._grouped(SUBCATEGORY_PRODUCTS, "id_sub_category")
+
+    # ---------------------------------------------------------------- datos
+
+    async def _download(self, spec: EntitySpec) -> List[dict]:
+        try:
+            return await load_rows(spec.path, spec.params, data_keys=[spec.name, "data"])
+        except Exception as e:
+            logger.error(f"❌ Error obteniendo listado {spec.path}: {e}")
+            return []
+
+    def _start(self, spec: EntitySpec) -> asyncio.Future:
+        future = self._rows.get(spec.path)
+        if future is None:
+            future = asyncio.ensure_future(self._download(spec))
+            self._rows[spec.path] = future
+        return future
+
+    async def rows(self, spec: EntitySpec) -> List[dict]:
+        """Listado completo de la entidad (una sola descarga por request)"""
+        return await self._start(spec)
+
+    def prefetch(self, type_name: str, selection: SelectionTree) -> None:
+        """
+        Lanza ya, sin esperarlas, las descargas de los listados de las relaciones
+        pedidas en `selection` (en todos los niveles). Así corren en paralelo con
+        el listado raíz en lugar de empezar cuando se resuelve el primer objeto.
+        """
+        relations = RELATIONS.get(type_name, {})
+        for field, subselection in selection.items():
+            relation = relations.get(field)
+            if relation is None:
+                continue
+            spec, child_type = relation
+            self._start(spec)
+            self.prefetch(child_type, subselection)
+
+    async def _index(self, spec: EntitySpec) -> Dict[Hashable, dict]:
+        index = self._indexes.get(spec.name)
+        if index is None:
+            index = {}
+            for row in await self.rows(spec):
+                if is_row(row) and spec.key in row:
+                    index[row[spec.key]] = row
+            self._indexes[spec.name] = index
+        return index
+
+    def entities(self, spec: EntitySpec, rows: List[dict]) -> List[Any]:
+        """
+        Convierte registros pasando por el identity map del request (None si el
+        registro es inválido). Los inválidos del lote se cuentan en
+        decode_metrics con un solo log, como los de un listado.
+        """
+        results = []
+        decoded = rejected = 0
+        error: Optional[str] = None
+        for row in rows:
+            identity = (spec.name, row.get(spec.key))
+            if identity not in self._identity:
+                try:
+                    self._identity[identity] = spec.parse(row)
+                    decoded += 1
+                except (KeyError, TypeError, ValueError) as e:
+                    self._identity[identity] = None
+                    rejected += 1
+                    error = error or describe_error(e)
+            results.append(self._identity[identity])
+        if decoded or rejected:
+            record_batch(spec.name, decoded + rejected, decoded, rejected, error)
+        return results
+
+    async def _fetch_one(self, spec: EntitySpec, key: Hashable) -> Optional[dict]:
+        try:
+            data = await get_upstream_client().get_json(f"{spec.path}/{key}")
+            return data if isinstance(data, dict) else None
+        except Exception:
+            return None
+
+    # ---------------------------------------------------------------- loaders
+
+    def _by_id(self, spec: EntitySpec) -> DataLoader:
+        async def load(keys: List[Hashable]) -> List[Any]:
+            index = await self._index(spec)
+            # Claves ausentes del listado (p.ej. creadas tras la descarga): GET individual concurrente
+            missing = [key for key in dict.fromkeys(keys) if key is not None and key not in index]
+            if missing:
+                fetched = await asyncio.gather(*(self._fetch_one(spec, key) for key in missing))
+                for key, row in zip(missing, fetched):
+                    if row is not None:
+                        index[key] = row
+            found = iter(self.entities(spec, [index[key] for key in keys if key in index]))
+            return [next(found) if key in index else None for key in keys]
+
+        return DataLoader(load_fn=load)
+
+    def _grouped(self, spec: EntitySpec, foreign_key: str) -> DataLoader:
+        async def load(keys: List[Hashable]) -> List[List[Any]]:
+            groups: Dict[Hashable, List[dict]] = defaultdict(list)
+            for row in await self.rows(spec):
+                if is_row(row):
+                    groups[row.get(foreign_key)].append(row)
+            selected = [groups.get(key, []) for key in keys]
+            # Todas las filas del lote en una sola conversión (un log y un conteo por lote)
+            items = iter(self.entities(spec, [row for rows in selected for row in rows]))
+            return [[item for item in (next(items) for _ in rows) if item is not None] for rows in selected]
+
+        return DataLoader(load_fn=load)
@@ -0,0 +1,98 @@
+# app/common/datasource.py
+"""
+🗂️ ORIGEN DE DATOS DE LOS LISTADOS
+Punto único por el que reportes, servicios de entidades y DataLoaders piden
+listados al REST API. Dentro de una operación GraphQL se usa un snapshot por
+request: el mismo endpoint + params se descarga una sola vez y todos los
+resolvers comparten las filas decodificadas (no deben mutarlas).
+Los datasets de referencia (categorías, vendedores, ...) además salen de la
+caché del proceso (app/common/reference_data.py), los de órdenes y
+product-orders de la réplica local (app/common/replica.py) y, en los workers
+que no publican, del snapshot mapeado (app/common/snapshots.py).
+"""
+from collections import Counter
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Hashable, List, Optional
+import asyncio
+import logging
+
+from app.common.http_client import request_key
+from app.common.pagination import fetch_all_pages
+from app.common.reference_data import load_reference, reference_spec_for_path
+from app.common.replica import replica_rows
+from app.common.snapshots import snapshot_rows
+
+logger = logging.getLogger(__name__)
+
+
+async def _fetch_rows(path: str, params: Optional[Dict[str, Any]], data_keys: Optional[list]) -> List[dict]:
+    replicated = replica_rows(path, params)
+    if replicated is not None:
+        return replicated
+    mapped = snapshot_rows(path, params)
+    if mapped is not None:
+        return mapped
+    spec = reference_spec_for_path(path)
+    if spec is not None:
+        return (await load_reference(spec.name, params, data_keys)).rows
+    return await fetch_all_pages(path, params, data_keys=data_keys)
+
+
+class DatasetSnapshot:
+    """
+    Listados ya descargados durante una operación GraphQL, por (endpoint, params).
+    Si varias resoluciones piden lo mismo a la vez, esperan la misma descarga.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.by_path: Counter = Counter()
+
+    async def rows(self, path: str, params: Optional[Dict[str, Any]] = None, data_keys: Optional[list] = None) -> List[dict]:
+        key = request_key(path, params)
+        future = self._entries.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        self.by_path[path] += 1
+        future = asyncio.ensure_future(_fetch_rows(path, params, data_keys))
+        self._entries[key] = future
+        try:
+            return await asyncio.shield(future)
+        except BaseException:
+            # Un error no queda en el snapshot: otra resolución puede reintentar
+            if self._entries.get(key) is future and future.done():
+                del self._entries[key]
+            raise
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "fetched": dict(self.by_path)}
+
+
+# Snapshot de la operación GraphQL en curso (lo activa la extensión de deps.py)
+_current_snapshot: ContextVar[Optional[DatasetSnapshot]] = ContextVar("dataset_snapshot", default=None)
+
+
+def use_snapshot(snapshot: DatasetSnapshot) -> Token:
+    """Asocia un snapshot al contexto actual; devuelve el token para restaurarlo"""
+    return _current_snapshot.set(snapshot)
+
+
+def release_snapshot(token: Token) -> None:
+    _current_snapshot.reset(token)
+
+
+async def load_rows(path: str, params: Optional[Dict[str, Any]] = None, *, data_keys: Optional[list] = None) -> List[dict]:
+    """
+    Listado completo de un endpoint. Usa el snapshot del request si hay uno activo;
+    fuera de GraphQL (scripts, consola) descarga directamente.
+    Lanza httpx.HTTPError igual que fetch_all_pages.
+    """
+    snapshot = _current_snapshot.get()
+    if snapshot is None:
+        return await _fetch_rows(path, params, data_keys)
+    return await snapshot.rows(path, params, data_keys)
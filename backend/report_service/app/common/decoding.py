@@ -0,0 +1,213 @@
+# app/common/decoding.py
+"""
+🧬 DECODIFICACIÓN MASIVA DE RESPUESTAS DEL REST API
+- loads(): bytes de la respuesta -> objetos Python con orjson (json estándar si
+  no está instalado).
+- RowDecoder: valida un listado completo en una sola llamada a pydantic-core
+  (validador compilado) y construye los types Strawberry sin pasar por Python
+  fila a fila. Las restricciones y los defaults salen de los modelos de
+  `entities/*/models.py`; los tipos de salida, del type Strawberry (p.ej. Decimal
+  del modelo -> float de GraphQL). Las fechas se parsean dentro del validador.
+- Las filas inválidas se descartan y se cuentan en `decode_metrics` (un único
+  log por listado, no uno por fila). Los DataLoaders, que convierten registros
+  sueltos, cuentan y loguean igual por lote (record_batch).
+- Proyecciones: con los campos pedidos en el query solo se validan esos (más los
+  ids); el resto ni se parsea ni se copia.
+"""
+from collections import Counter, OrderedDict
+from typing import Annotated, Any, Dict, Generic, Iterable, List, Optional, Tuple, Type, TypeVar
+import json
+import logging
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import CoreConfig, SchemaValidator, core_schema
+
+from app.common.rows import CompactRow
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Validadores proyectados (por combinación de campos pedidos) que se guardan por entidad
+_PROJECTION_CACHE_SIZE = 16
+
+
+def loads(content: bytes) -> Any:
+    """Decodifica el cuerpo JSON de una respuesta"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class DecodeMetrics:
+    """Filas decodificadas / descartadas por entidad (acumulado del proceso)"""
+
+    def __init__(self):
+        self.decoded: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.last_error: Dict[str, str] = {}
+
+    def record(self, name: str, decoded: int, rejected: int, error: Optional[str] = None) -> None:
+        self.decoded[name] += decoded
+        if rejected:
+            self.rejected[name] += rejected
+        if error:
+            self.last_error[name] = error
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "decoded": dict(self.decoded),
+            "rejected": dict(self.rejected),
+            "last_error": dict(self.last_error),
+        }
+
+
+decode_metrics = DecodeMetrics()
+
+
+def _describe(error: dict) -> str:
+    location = ".".join(str(part) for part in error.get("loc", ())[1:]) or "fila"
+    return f"{location}: {error.get('msg')}"
+
+
+def describe_error(error: Exception) -> str:
+    """Resumen de una línea del error de un registro suelto (sin el detalle multilínea de pydantic)"""
+    if isinstance(error, ValidationError):
+        details = error.errors(include_url=False)
+        if details:
+            location = ".".join(str(part) for part in details[0].get("loc", ())) or "fila"
+            return f"{location}: {details[0].get('msg')}"
+    return f"{type(error).__name__}: {error}"
+
+
+def record_batch(name: str, total: int, decoded: int, rejected: int, error: Optional[str] = None) -> None:
+    """Cuenta un lote decodificado; los descartes se loguean una sola vez por lote"""
+    decode_metrics.record(name, decoded, rejected, error)
+    if rejected:
+        logger.warning(f"⚠️ {rejected} de {total} registros de {name} descartados (p.ej. {error})")
+
+
+class RowDecoder(Generic[T]):
+    """
+    Validador compilado de un listado de la entidad `model` que construye
+    directamente instancias de `target` (el type Strawberry es un dataclass).
+    Solo se validan los campos que expone el type: las contraseñas del modelo
+    no llegan nunca al servicio de reportes.
+    Con `fields` (lookahead del selection set) se valida solo lo pedido y los
+    objetos tienen solo esos atributos: Strawberry no lee los campos que no se
+    pidieron. Los `id_*` se validan siempre porque las relaciones los usan para
+    cargar sus objetos (los resolvers de relaciones solo deben leer `id_*`).
+    """
+
+    def __init__(self, model: Type[BaseModel], target: Type[T], name: str):
+        self.name = name
+        self.target = target
+        self._schemas: Dict[str, dict] = {}
+        for field_name, annotation in target.__annotations__.items():
+            source = model.model_fields.get(field_name)
+            if source is None:
+                continue
+            # Tipo del type GraphQL (p.ej. float) + restricciones y default del modelo
+            schema = TypeAdapter(Annotated[(annotation, *source.metadata)] if source.metadata else annotation).core_schema
+            if not source.is_required():
+                schema = core_schema.with_default_schema(schema, default=source.default)
+            self._schemas[field_name] = schema
+        # Campos que se validan aunque no se pidan
+        self._always = frozenset(name for name in self._schemas if name.startswith("id_"))
+        row_schema = core_schema.dataclass_schema(
+            target,
+            core_schema.dataclass_args_schema(
+                target.__name__,
+                [core_schema.dataclass_field(field_name, schema) for field_name, schema in self._schemas.items()],
+            ),
+            list(self._schemas),
+        )
+        config = CoreConfig(coerce_numbers_to_str=True)
+        self._row = SchemaValidator(row_schema, config)
+        self._rows = SchemaValidator(core_schema.list_schema(row_schema), config)
+        self._projections: "OrderedDict[frozenset, SchemaValidator]" = OrderedDict()
+
+    def _projection(self, validated: frozenset) -> SchemaValidator:
+        """Validador de listado que devuelve dicts solo con los campos `validated`"""
+        fields = {
+            field_name: core_schema.typed_dict_field(schema, required=schema["type"] != "default")
+            for field_name, schema in self._schemas.items()
+            if field_name in validated
+        }
+        return SchemaValidator(
+            core_schema.list_schema(core_schema.typed_dict_schema(fields)),
+            CoreConfig(coerce_numbers_to_str=True),
+        )
+
+    def _validator(self, fields: Optional[Iterable[str]]) -> Optional[SchemaValidator]:
+        """Validador proyectado para los campos pedidos (None = listado completo)"""
+        if fields is None:
+            return None
+        validated = frozenset(fields).intersection(self._schemas) | self._always
+        if len(validated) == len(self._schemas):
+            return None
+        projection = self._projections.get(validated)
+        if projection is None:
+            projection = self._projection(validated)
+            self._projections[validated] = projection
+            while len(self._projections) > _PROJECTION_CACHE_SIZE:
+                self._projections.popitem(last=False)
+        else:
+            self._projections.move_to_end(validated)
+        return projection
+
+    def _instances(self, values: List[dict]) -> List[T]:
+        # Objetos del type con solo los atributos validados (sin pasar por __init__)
+        new, target = object.__new__, self.target
+        instances = []
+        for value in values:
+            instance = new(target)
+            instance.__dict__ = value
+            instances.append(instance)
+        return instances
+
+    def decode(self, rows: Any, fields: Optional[Iterable[str]] = None) -> List[T]:
+        """Valida el listado completo; las filas inválidas se descartan y se cuentan"""
+        return self._validate(rows, fields)[0]
+
+    def decode_indexed(self, rows: Any, fields: Optional[Iterable[str]] = None) -> List[Tuple[int, T]]:
+        """Igual que decode() pero con la posición de cada fila válida en `rows`"""
+        validated, kept = self._validate(rows, fields)
+        return list(zip(kept, validated)) if kept is not None else list(enumerate(validated))
+
+    def _validate(self, rows: Any, fields: Optional[Iterable[str]]) -> Tuple[List[T], Optional[List[int]]]:
+        """(filas validadas, posiciones conservadas o None si no se descartó ninguna)"""
+        projection = self._validator(fields)
+        validator = projection or self._rows
+        if not isinstance(rows, list):
+            rows = list(rows or [])
+        if rows and isinstance(rows[0], CompactRow):
+            # Listado en caché como filas compactas: el validador espera mappings
+            rows = [row.to_dict() if isinstance(row, CompactRow) else row for row in rows]
+        try:
+            validated = validator.validate_python(rows)
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+            bad = {error["loc"][0] for error in errors if error.get("loc")}
+            kept = [position for position in range(len(rows)) if position not in bad]
+            # Las filas restantes ya pasaron la validación: la segunda llamada no falla
+            validated = validator.validate_python([rows[position] for position in kept])
+            if projection is not None:
+                validated = self._instances(validated)
+            record_batch(self.name, len(rows), len(validated), len(bad), _describe(errors[0]))
+            return validated, kept
+        decode_metrics.record(self.name, len(validated), 0)
+        if projection is not None:
+            validated = self._instances(validated)
+        return validated, None
+
+    def decode_one(self, row: dict) -> T:
+        """Valida un registro suelto (lanza ValidationError, subclase de ValueError)"""
+        if isinstance(row, CompactRow):
+            row = row.to_dict()
+        return self._row.validate_python(row)
@@ -1,14 +1,18 @@
 # app/common/entities/admins/resolvers.py
 import strawberry
 from typing import List
+from strawberry.types import Info
 from app.common.entities.admins.schema import AdminType
 from app.common.entities.admins.service import get_all_admins
+from app.common.lookahead import selection_tree
 
 @strawberry.type
 class AdminQueries:
 
     @strawberry.field
-    async def all_admins(self) -> List[AdminType]:
+    async def all_admins(self, info: Info) -> List[AdminType]:
         """Devuelve la lista de todos los administradores"""
-        admins = await get_all_admins()
+        selection = selection_tree(info)
+        info.context.loaders.prefetch("AdminType", selection)
+        admins = await get_all_admins(fields=selection)
         return admins
@@ -1,14 +1,18 @@
 # app/common/entities/carts/resolvers.py
 import strawberry
 from typing import List
+from strawberry.types import Info
 from app.common.entities.carts.schema import CartType
 from app.common.entities.carts.service import get_all_carts
+from app.common.lookahead import selection_tree
 
 @strawberry.type
 class CartQueries:
 
     @strawberry.field
-    async def all_carts(self) -> List[CartType]:
+    async def all_carts(self, info: Info) -> List[CartType]:
         """Devuelve la lista de todos los carritos"""
-        carts = await get_all_carts()
+        selection = selection_tree(info)
+        info.context.loaders.prefetch("CartType", selection)
+        carts = await get_all_carts(fields=selection)
         return carts
@@ -1,20 +1,26 @@
 # app/common/entities/carts/service.py
 import httpx
-from typing import List
+from typing import Iterable, List, Optional
+from app.common.entities.carts.models import CartModel
 from app.common.entities.carts.schema import CartType
-from app.common.utils import safe_int
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_carts() -> List[CartType]:
-    """Obtiene todos los carritos desde el REST API"""
+_decoder = RowDecoder(CartModel, CartType, name="carts")
+
+
+def parse_cart(cart: dict) -> CartType:
+    """Convierte un registro del REST API en CartType (lanza ValidationError si no cumple CartModel)"""
+    return _decoder.decode_one(cart)
+
+
+async def get_all_carts(fields: Optional[Iterable[str]] = None) -> List[CartType]:
+    """Obtiene todos los carritos desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/carts")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/carts")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo carritos: {e}")
         return []
@@ -22,19 +28,4 @@ async def get_all_carts() -> List[CartType]:
         logger.error(f"❌ Error inesperado obteniendo carritos: {e}")
         return []
 
-    carts = []
-    for cart in data:
-        try:
-            carts.append(CartType(
-                id_cart=cart["id_cart"],
-                id_client=cart["id_client"],
-                status=cart["status"],
-                id_product=cart["id_product"],
-                quantity=safe_int(cart.get("quantity"))
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en carrito: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando carrito {cart.get('id_cart')}: {e}")
-    
-    return carts
+    return _decoder.decode(data, fields)
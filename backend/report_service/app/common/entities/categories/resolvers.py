@@ -1,14 +1,18 @@
 # app/common/entities/categories/resolvers.py
 import strawberry
 from typing import List
+from strawberry.types import Info
 from app.common.entities.categories.schema import CategoryType
 from app.common.entities.categories.service import get_all_categories
+from app.common.lookahead import selection_tree
 
 @strawberry.type
 class CategoryQueries:
 
     @strawberry.field
-    async def all_categories(self) -> List[CategoryType]:
+    async def all_categories(self, info: Info) -> List[CategoryType]:
         """Devuelve la lista de todas las categorías"""
-        categories = await get_all_categories()
+        selection = selection_tree(info)
+        info.context.loaders.prefetch("CategoryType", selection)
+        categories = await get_all_categories(fields=selection)
         return categories
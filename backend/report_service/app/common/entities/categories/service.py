@@ -1,19 +1,26 @@
 # app/common/entities/categories/service.py
 import httpx
-from typing import List
+from typing import Iterable, List, Optional
+from app.common.entities.categories.models import CategoryModel
 from app.common.entities.categories.schema import CategoryType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_categories() -> List[CategoryType]:
-    """Obtiene todas las categorías desde el REST API"""
+_decoder = RowDecoder(CategoryModel, CategoryType, name="categories")
+
+
+def parse_category(category: dict) -> CategoryType:
+    """Convierte un registro del REST API en CategoryType (lanza ValidationError si no cumple CategoryModel)"""
+    return _decoder.decode_one(category)
+
+
+async def get_all_categories(fields: Optional[Iterable[str]] = None) -> List[CategoryType]:
+    """Obtiene todas las categorías desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/categories")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/categories")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo categorías: {e}")
         return []
@@ -21,18 +28,4 @@ async def get_all_categories() -> List[CategoryType]:
         logger.error(f"❌ Error inesperado obteniendo categorías: {e}")
         return []
 
-    categories = []
-    for category in data:
-        try:
-            categories.append(CategoryType(
-                id_category=category["id_category"],
-                category_name=category["category_name"],
-                description=category.get("description"),
-                photo=category.get("photo")
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en categoría: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando categoría {category.get('id_category')}: {e}")
-    
-    return categories
+    return _decoder.decode(data, fields)
@@ -1,14 +1,45 @@
 # app/common/entities/clients/resolvers.py
 import strawberry
-from typing import List
-from app.common.entities.clients.schema import ClientType
-from app.common.entities.clients.service import get_all_clients
+from typing import List, Optional
+from strawberry.types import Info
+from app import config
+from app.common.entities.clients.schema import ClientFilter, ClientSort, ClientType
+from app.common.entities.clients.service import get_all_clients, query_clients
+from app.common.listing import Connection
+from app.common.lookahead import selection_tree
+from app.common.topk import page_offset
 
 @strawberry.type
 class ClientQueries:
 
     @strawberry.field
-    async def all_clients(self) -> List[ClientType]:
-        """Devuelve la lista de todos los clientes"""
-        clients = await get_all_clients()
-        return clients
+    async def all_clients(
+        self,
+        info: Info,
+        filter: Optional[ClientFilter] = None,
+        sort: Optional[ClientSort] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[ClientType]:
+        """Devuelve la lista de todos los clientes (opcionalmente filtrada, ordenada y paginada)"""
+        selection = selection_tree(info)
+        # Relaciones pedidas: sus listados se descargan en paralelo con este
+        info.context.loaders.prefetch("ClientType", selection)
+        if filter is None and sort is None and limit is None and not offset:
+            return await get_all_clients(fields=selection)
+        return (await query_clients(filter, sort, offset, limit, fields=selection)).nodes
+
+    @strawberry.field
+    async def clients_connection(
+        self,
+        info: Info,
+        filter: Optional[ClientFilter] = None,
+        sort: Optional[ClientSort] = None,
+        first: int = config.LIST_PAGE_SIZE,
+        after: Optional[str] = None
+    ) -> Connection[ClientType]:
+        """Clientes paginados con cursor (usar page_info.end_cursor como `after`)"""
+        offset = page_offset(0, after)
+        selection = selection_tree(info, "edges", "node")
+        info.context.loaders.prefetch("ClientType", selection)
+        return (await query_clients(filter, sort, offset, first, fields=selection)).connection()
@@ -1,9 +1,9 @@
 import strawberry
 from datetime import datetime, date
+from enum import Enum
 from typing import Optional, List
-import httpx
-
-BASE_URL = "http://127.0.0.1:3000/api"
+from strawberry.types import Info
+from app.common.listing import SortDirection
 
 @strawberry.type
 class ClientType:
@@ -21,21 +21,26 @@ class ClientType:
     
     # Relaciones
     @strawberry.field
-    async def carts(self) -> List[strawberry.LazyType["CartType", "app.common.entities.carts.schema"]]:
+    async def carts(self, info: Info) -> List[strawberry.LazyType["CartType", "app.common.entities.carts.schema"]]:
         """Obtiene los carritos del cliente"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/carts?id_client={self.id_client}")
-                response.raise_for_status()
-                data = response.json()
-                
-                from app.common.entities.carts.schema import CartType
-                return [CartType(
-                    id_cart=cart["id_cart"],
-                    id_client=cart["id_client"],
-                    status=cart["status"],
-                    id_product=cart["id_product"],
-                    quantity=cart["quantity"]
-                ) for cart in data]
-        except:
-            return []
+        return await info.context.loaders.carts_by_client.load(self.id_client)
+
+
+@strawberry.input
+class ClientFilter:
+    """Filtros de all_clients / clients_connection (se combinan con AND)"""
+    search: Optional[str] = None  # en nombre, email o documento
+    document_type: Optional[str] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+
+@strawberry.enum
+class ClientSortField(Enum):
+    ID_CLIENT = "id_client"
+    CLIENT_NAME = "client_name"
+    CREATED_AT = "created_at"
+
+@strawberry.input
+class ClientSort:
+    field: ClientSortField
+    direction: SortDirection = SortDirection.ASC
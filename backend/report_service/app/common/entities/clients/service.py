@@ -1,20 +1,31 @@
 # app/common/entities/clients/service.py
 import httpx
-from typing import List
-from app.common.entities.clients.schema import ClientType
-from app.common.utils import parse_iso_datetime, parse_iso_date
+from typing import Iterable, List, Optional
+from app.common.entities.clients.models import ClientModel
+from app.common.entities.clients.schema import ClientFilter, ClientSort, ClientType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
+from app.common.listing import (
+    ListingPage, ListingQuery, as_datetime, as_id, day_end, day_start, paginate_rows, text_search,
+)
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_clients() -> List[ClientType]:
-    """Obtiene todos los clientes desde el REST API"""
+_decoder = RowDecoder(ClientModel, ClientType, name="clients")
+
+_SORT_PARSERS = {"id_client": as_id, "created_at": as_datetime}
+
+
+def parse_client(client_data: dict) -> ClientType:
+    """Convierte un registro del REST API en ClientType (lanza ValidationError si no cumple ClientModel)"""
+    return _decoder.decode_one(client_data)
+
+
+async def get_all_clients(fields: Optional[Iterable[str]] = None) -> List[ClientType]:
+    """Obtiene todos los clientes desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/clients")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/clients")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo clientes: {e}")
         return []
@@ -22,25 +33,34 @@ async def get_all_clients() -> List[ClientType]:
         logger.error(f"❌ Error inesperado obteniendo clientes: {e}")
         return []
 
-    clients = []
-    for client_data in data:
-        try:
-            clients.append(ClientType(
-                id_client=client_data["id_client"],
-                client_name=client_data["client_name"],
-                client_email=client_data["client_email"],
-                address=client_data["address"],
-                phone=client_data.get("phone"),
-                document_type=client_data.get("document_type"),
-                document_number=client_data.get("document_number"),
-                birth_date=parse_iso_date(client_data.get("birth_date")),
-                avatar_url=client_data.get("avatar_url"),
-                additional_addresses=client_data.get("additional_addresses"),
-                created_at=parse_iso_datetime(client_data.get("created_at"))
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en cliente: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando cliente {client_data.get('id_client')}: {e}")
-    
-    return clients
+    return _decoder.decode(data, fields)
+
+
+def _filter_clients(rows: list, filter: ClientFilter) -> Optional[List[int]]:
+    query = ListingQuery(rows)
+    query.equals("document_type", filter.document_type)
+    query.between("created_at", day_start(filter.created_from), day_end(filter.created_to), as_datetime)
+    if filter.search:
+        query.where(text_search(("client_name", "client_email", "document_number"), filter.search))
+    return query.positions()
+
+
+async def query_clients(
+    filter: Optional[ClientFilter] = None,
+    sort: Optional[ClientSort] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ListingPage[ClientType]:
+    """Página de clientes filtrados y ordenados (solo se decodifican las filas de la página)"""
+    try:
+        data = await load_rows("/clients")
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Error HTTP obteniendo clientes: {e}")
+        return ListingPage.empty(offset)
+    except Exception as e:
+        logger.error(f"❌ Error inesperado obteniendo clientes: {e}")
+        return ListingPage.empty(offset)
+
+    selected = _filter_clients(data, filter) if filter is not None else None
+    return paginate_rows(_decoder, data, selected, offset, limit, sort, _SORT_PARSERS, fields)
@@ -1,14 +1,45 @@
 # app/common/entities/deliveries/resolvers.py
 import strawberry
-from typing import List
-from app.common.entities.deliveries.schema import DeliveryType
-from app.common.entities.deliveries.service import get_all_deliveries
+from typing import List, Optional
+from strawberry.types import Info
+from app import config
+from app.common.entities.deliveries.schema import DeliveryFilter, DeliverySort, DeliveryType
+from app.common.entities.deliveries.service import get_all_deliveries, query_deliveries
+from app.common.listing import Connection
+from app.common.lookahead import selection_tree
+from app.common.topk import page_offset
 
 @strawberry.type
 class DeliveryQueries:
 
     @strawberry.field
-    async def all_deliveries(self) -> List[DeliveryType]:
-        """Devuelve la lista de todos los envíos"""
-        deliveries = await get_all_deliveries()
-        return deliveries
+    async def all_deliveries(
+        self,
+        info: Info,
+        filter: Optional[DeliveryFilter] = None,
+        sort: Optional[DeliverySort] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[DeliveryType]:
+        """Devuelve la lista de todos los envíos (opcionalmente filtrada, ordenada y paginada)"""
+        selection = selection_tree(info)
+        # Relaciones pedidas: sus listados se descargan en paralelo con este
+        info.context.loaders.prefetch("DeliveryType", selection)
+        if filter is None and sort is None and limit is None and not offset:
+            return await get_all_deliveries(fields=selection)
+        return (await query_deliveries(filter, sort, offset, limit, fields=selection)).nodes
+
+    @strawberry.field
+    async def deliveries_connection(
+        self,
+        info: Info,
+        filter: Optional[DeliveryFilter] = None,
+        sort: Optional[DeliverySort] = None,
+        first: int = config.LIST_PAGE_SIZE,
+        after: Optional[str] = None
+    ) -> Connection[DeliveryType]:
+        """Entregas paginadas con cursor (usar page_info.end_cursor como `after`)"""
+        offset = page_offset(0, after)
+        selection = selection_tree(info, "edges", "node")
+        info.context.loaders.prefetch("DeliveryType", selection)
+        return (await query_deliveries(filter, sort, offset, first, fields=selection)).connection()
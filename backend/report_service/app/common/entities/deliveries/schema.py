@@ -1,9 +1,9 @@
 import strawberry
-from datetime import datetime
-from typing import List
-import httpx
-
-BASE_URL = "http://127.0.0.1:3000/api"
+from datetime import date, datetime
+from enum import Enum
+from typing import List, Optional
+from strawberry.types import Info
+from app.common.listing import SortDirection
 
 @strawberry.type
 class DeliveryType:
@@ -19,25 +19,28 @@ class DeliveryType:
     
     # Relaciones
     @strawberry.field
-    async def orders(self) -> List[strawberry.LazyType["OrderType", "app.common.entities.orders.schema"]]:
+    async def orders(self, info: Info) -> List[strawberry.LazyType["OrderType", "app.common.entities.orders.schema"]]:
         """Obtiene las órdenes con este delivery"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/orders?id_delivery={self.id_delivery}")
-                response.raise_for_status()
-                data = response.json()
-                
-                from app.common.entities.orders.schema import OrderType
-                return [OrderType(
-                    id_order=order["id_order"],
-                    order_date=datetime.fromisoformat(order["order_date"].replace("Z", "")),
-                    status=order["status"],
-                    total_amount=float(order["total_amount"]),
-                    delivery_type=order["delivery_type"],
-                    id_client=order["id_client"],
-                    id_cart=order["id_cart"],
-                    id_payment_method=order["id_payment_method"],
-                    id_delivery=order.get("id_delivery")
-                ) for order in data]
-        except:
-            return []
+        return await info.context.loaders.orders_by_delivery.load(self.id_delivery)
+
+
+@strawberry.input
+class DeliveryFilter:
+    """Filtros de all_deliveries / deliveries_connection (se combinan con AND)"""
+    status: Optional[List[str]] = None  # cualquiera de los estados (sin distinguir mayúsculas)
+    city: Optional[str] = None
+    id_product: Optional[int] = None
+    estimated_from: Optional[date] = None
+    estimated_to: Optional[date] = None
+
+@strawberry.enum
+class DeliverySortField(Enum):
+    ID_DELIVERY = "id_delivery"
+    ESTIMATED_TIME = "estimated_time"
+    DELIVERY_COST = "delivery_cost"
+    CITY = "city"
+
+@strawberry.input
+class DeliverySort:
+    field: DeliverySortField
+    direction: SortDirection = SortDirection.ASC
@@ -1,20 +1,31 @@
 # app/common/entities/deliveries/service.py
 import httpx
-from typing import List
-from app.common.entities.deliveries.schema import DeliveryType
-from app.common.utils import parse_iso_datetime, safe_float
+from typing import Iterable, List, Optional
+from app.common.entities.deliveries.models import DeliveryModel
+from app.common.entities.deliveries.schema import DeliveryFilter, DeliverySort, DeliveryType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
+from app.common.listing import (
+    ListingPage, ListingQuery, as_datetime, as_id, as_number, day_end, day_start, paginate_rows,
+)
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_deliveries() -> List[DeliveryType]:
-    """Obtiene todas las entregas desde el REST API"""
+_decoder = RowDecoder(DeliveryModel, DeliveryType, name="deliveries")
+
+_SORT_PARSERS = {"id_delivery": as_id, "estimated_time": as_datetime, "delivery_cost": as_number}
+
+
+def parse_delivery(delivery: dict) -> DeliveryType:
+    """Convierte un registro del REST API en DeliveryType (lanza ValidationError si no cumple DeliveryModel)"""
+    return _decoder.decode_one(delivery)
+
+
+async def get_all_deliveries(fields: Optional[Iterable[str]] = None) -> List[DeliveryType]:
+    """Obtiene todas las entregas desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/deliveries")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/deliveries")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo entregas: {e}")
         return []
@@ -22,23 +33,34 @@ async def get_all_deliveries() -> List[DeliveryType]:
         logger.error(f"❌ Error inesperado obteniendo entregas: {e}")
         return []
 
-    deliveries = []
-    for delivery in data:
-        try:
-            deliveries.append(DeliveryType(
-                id_delivery=delivery["id_delivery"],
-                id_product=delivery["id_product"],
-                delivery_address=delivery["delivery_address"],
-                city=delivery["city"],
-                status=delivery["status"],
-                estimated_time=parse_iso_datetime(delivery.get("estimated_time")),
-                delivery_person=delivery["delivery_person"],
-                delivery_cost=safe_float(delivery.get("delivery_cost")),
-                phone=str(delivery.get("phone", ""))  # Convertir a string
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en entrega: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando entrega {delivery.get('id_delivery')}: {e}")
-    
-    return deliveries
+    return _decoder.decode(data, fields)
+
+
+def _filter_deliveries(rows: list, filter: DeliveryFilter) -> Optional[List[int]]:
+    query = ListingQuery(rows)
+    query.equals("status", filter.status)
+    query.equals("city", filter.city)
+    query.equals("id_product", filter.id_product)
+    query.between("estimated_time", day_start(filter.estimated_from), day_end(filter.estimated_to), as_datetime)
+    return query.positions()
+
+
+async def query_deliveries(
+    filter: Optional[DeliveryFilter] = None,
+    sort: Optional[DeliverySort] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ListingPage[DeliveryType]:
+    """Página de entregas filtradas y ordenadas (solo se decodifican las filas de la página)"""
+    try:
+        data = await load_rows("/deliveries")
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Error HTTP obteniendo entregas: {e}")
+        return ListingPage.empty(offset)
+    except Exception as e:
+        logger.error(f"❌ Error inesperado obteniendo entregas: {e}")
+        return ListingPage.empty(offset)
+
+    selected = _filter_deliveries(data, filter) if filter is not None else None
+    return paginate_rows(_decoder, data, selected, offset, limit, sort, _SORT_PARSERS, fields)
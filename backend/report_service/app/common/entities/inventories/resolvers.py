@@ -1,14 +1,18 @@
 # app/common/entities/inventories/resolvers.py
 import strawberry
 from typing import List
+from strawberry.types import Info
 from app.common.entities.inventories.schema import InventoryType
 from app.common.entities.inventories.service import get_all_inventories
+from app.common.lookahead import selection_tree
 
 @strawberry.type
 class InventoryQueries:
 
     @strawberry.field
-    async def all_inventories(self) -> List[InventoryType]:
+    async def all_inventories(self, info: Info) -> List[InventoryType]:
         """Devuelve la lista de todos los inventarios"""
-        inventories = await get_all_inventories()
+        selection = selection_tree(info)
+        info.context.loaders.prefetch("InventoryType", selection)
+        inventories = await get_all_inventories(fields=selection)
         return inventories
@@ -1,20 +1,26 @@
 # app/common/entities/inventories/service.py
 import httpx
-from typing import List
+from typing import Iterable, List, Optional
+from app.common.entities.inventories.models import InventoryModel
 from app.common.entities.inventories.schema import InventoryType
-from app.common.utils import parse_iso_datetime
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_inventories() -> List[InventoryType]:
-    """Obtiene todos los inventarios desde el REST API"""
+_decoder = RowDecoder(InventoryModel, InventoryType, name="inventories")
+
+
+def parse_inventory(inventory: dict) -> InventoryType:
+    """Convierte un registro del REST API en InventoryType (lanza ValidationError si no cumple InventoryModel)"""
+    return _decoder.decode_one(inventory)
+
+
+async def get_all_inventories(fields: Optional[Iterable[str]] = None) -> List[InventoryType]:
+    """Obtiene todos los inventarios desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/inventories")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/inventories")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo inventarios: {e}")
         return []
@@ -22,17 +28,4 @@ async def get_all_inventories() -> List[InventoryType]:
         logger.error(f"❌ Error inesperado obteniendo inventarios: {e}")
         return []
 
-    inventories = []
-    for inventory in data:
-        try:
-            inventories.append(InventoryType(
-                id_inventory=inventory["id_inventory"],
-                id_seller=inventory["id_seller"],
-                updated_at=parse_iso_datetime(inventory.get("updated_at"))
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en inventario: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando inventario {inventory.get('id_inventory')}: {e}")
-    
-    return inventories
+    return _decoder.decode(data, fields)
@@ -1,14 +1,45 @@
 # app/common/entities/orders/resolvers.py
 import strawberry
-from typing import List
-from app.common.entities.orders.schema import OrderType
-from app.common.entities.orders.service import get_all_orders
+from typing import List, Optional
+from strawberry.types import Info
+from app import config
+from app.common.entities.orders.schema import OrderFilter, OrderSort, OrderType
+from app.common.entities.orders.service import get_all_orders, query_orders
+from app.common.listing import Connection
+from app.common.lookahead import selection_tree
+from app.common.topk import page_offset
 
 @strawberry.type
 class OrderQueries:
 
     @strawberry.field
-    async def all_orders(self) -> List[OrderType]:
-        """Devuelve la lista de todas las órdenes"""
-        orders = await get_all_orders()
-        return orders
+    async def all_orders(
+        self,
+        info: Info,
+        filter: Optional[OrderFilter] = None,
+        sort: Optional[OrderSort] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[OrderType]:
+        """Devuelve la lista de todas las órdenes (opcionalmente filtrada, ordenada y paginada)"""
+        selection = selection_tree(info)
+        # Relaciones pedidas: sus listados se descargan en paralelo con este
+        info.context.loaders.prefetch("OrderType", selection)
+        if filter is None and sort is None and limit is None and not offset:
+            return await get_all_orders(fields=selection)
+        return (await query_orders(filter, sort, offset, limit, fields=selection)).nodes
+
+    @strawberry.field
+    async def orders_connection(
+        self,
+        info: Info,
+        filter: Optional[OrderFilter] = None,
+        sort: Optional[OrderSort] = None,
+        first: int = config.LIST_PAGE_SIZE,
+        after: Optional[str] = None
+    ) -> Connection[OrderType]:
+        """Órdenes paginadas con cursor (usar page_info.end_cursor como `after`)"""
+        offset = page_offset(0, after)
+        selection = selection_tree(info, "edges", "node")
+        info.context.loaders.prefetch("OrderType", selection)
+        return (await query_orders(filter, sort, offset, first, fields=selection)).connection()
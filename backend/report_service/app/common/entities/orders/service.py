@@ -1,24 +1,33 @@
 # app/common/entities/orders/service.py
 import httpx
-from typing import List
-from app.common.entities.orders.schema import OrderType
-from app.common.utils import parse_iso_datetime, safe_float, extract_data_from_response
+from datetime import date
+from typing import Iterable, List, Optional
+from app.common.entities.orders.models import OrderModel
+from app.common.entities.orders.schema import OrderFilter, OrderSort, OrderType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
+from app.common.listing import (
+    ListingPage, ListingQuery, as_datetime, as_id, as_number, paginate_rows,
+)
+from app.reports.order_store import order_store_for
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_orders() -> List[OrderType]:
-    """Obtiene todas las órdenes desde el REST API"""
+_decoder = RowDecoder(OrderModel, OrderType, name="orders")
+
+_SORT_PARSERS = {"id_order": as_id, "order_date": as_datetime, "total_amount": as_number}
+
+
+def parse_order(order: dict) -> OrderType:
+    """Convierte un registro del REST API en OrderType (lanza ValidationError si no cumple OrderModel)"""
+    return _decoder.decode_one(order)
+
+
+async def get_all_orders(fields: Optional[Iterable[str]] = None) -> List[OrderType]:
+    """Obtiene todas las órdenes desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/orders?limit=1000")
-            response.raise_for_status()
-            response_data = response.json()
-            
-            # Extraer datos (maneja paginación o array directo)
-            data = extract_data_from_response(response_data, ['orders', 'data'])
-                
+        data = await load_rows("/orders")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo órdenes: {e}")
         return []
@@ -26,25 +35,53 @@ async def get_all_orders() -> List[OrderType]:
         logger.error(f"❌ Error inesperado obteniendo órdenes: {e}")
         return []
 
-    orders = []
-    for order in data:
-        try:
-            orders.append(OrderType(
-                id_order=order["id_order"],
-                order_date=parse_iso_datetime(order.get("order_date")),
-                status=order["status"],
-                total_amount=safe_float(order.get("total_amount")),
-                delivery_type=order["delivery_type"],
-                id_client=order["id_client"],
-                id_cart=order["id_cart"],
-                id_payment_method=order["id_payment_method"],
-                id_delivery=order.get("id_delivery"),
-                payment_receipt_url=order.get("payment_receipt_url"),
-                payment_verified_at=parse_iso_datetime(order.get("payment_verified_at")) if order.get("payment_verified_at") else None
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en orden: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando orden {order.get('id_order')}: {e}")
-    
-    return orders
+    return _decoder.decode(data, fields)
+
+
+def _order_day(value) -> Optional[date]:
+    moment = as_datetime(value)
+    return moment.date() if moment is not None else None
+
+
+def _filter_orders(rows: list, filter: OrderFilter) -> Optional[List[int]]:
+    query = ListingQuery(rows)
+    if filter.date_from or filter.date_to:
+        # Rango de fechas con el índice por fecha del almacén columnar, el mismo
+        # que usan los reportes sobre este listado. El estado se compara con el
+        # de la fila: el almacén guarda el de los reportes (pagadas como "paid")
+        store = order_store_for(rows)
+        if len(store) == len(rows):
+            query.within(store.by_date.positions(filter.date_from, filter.date_to).tolist())
+            if filter.status:
+                statuses = {status.lower() for status in filter.status}
+                query.where(lambda row: str(row.get("status") or "").lower() in statuses)
+        else:
+            query.equals("status", filter.status)
+            query.between("order_date", filter.date_from, filter.date_to, _order_day)
+    else:
+        query.equals("status", filter.status)
+    query.equals("id_client", filter.id_client)
+    query.equals("id_payment_method", filter.id_payment_method)
+    query.between("total_amount", filter.min_total, filter.max_total, as_number)
+    return query.positions()
+
+
+async def query_orders(
+    filter: Optional[OrderFilter] = None,
+    sort: Optional[OrderSort] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ListingPage[OrderType]:
+    """Página de órdenes filtradas y ordenadas (solo se decodifican las filas de la página)"""
+    try:
+        data = await load_rows("/orders")
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Error HTTP obteniendo órdenes: {e}")
+        return ListingPage.empty(offset)
+    except Exception as e:
+        logger.error(f"❌ Error inesperado obteniendo órdenes: {e}")
+        return ListingPage.empty(offset)
+
+    selected = _filter_orders(data, filter) if filter is not None else None
+    return paginate_rows(_decoder, data, selected, offset, limit, sort, _SORT_PARSERS, fields)
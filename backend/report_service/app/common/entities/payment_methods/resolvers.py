@@ -1,14 +1,18 @@
 # app/common/entities/payment-methods/resolvers.py
 import strawberry
 from typing import List
+from strawberry.types import Info
 from app.common.entities.payment_methods.schema import PaymentMethodType
 from app.common.entities.payment_methods.service import get_all_payment_methods
+from app.common.lookahead import selection_tree
 
 @strawberry.type
 class PaymentMethodQueries:
 
     @strawberry.field
-    async def all_payment_methods(self) -> List[PaymentMethodType]:
+    async def all_payment_methods(self, info: Info) -> List[PaymentMethodType]:
         """Devuelve la lista de todos los métodos de pago"""
-        payment_methods = await get_all_payment_methods()
+        selection = selection_tree(info)
+        info.context.loaders.prefetch("PaymentMethodType", selection)
+        payment_methods = await get_all_payment_methods(fields=selection)
         return payment_methods
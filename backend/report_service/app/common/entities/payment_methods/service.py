@@ -1,19 +1,26 @@
 # app/common/entities/payment-methods/service.py
 import httpx
-from typing import List
+from typing import Iterable, List, Optional
+from app.common.entities.payment_methods.models import PaymentMethodModel
 from app.common.entities.payment_methods.schema import PaymentMethodType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_payment_methods() -> List[PaymentMethodType]:
-    """Obtiene todos los métodos de pago desde el REST API"""
+_decoder = RowDecoder(PaymentMethodModel, PaymentMethodType, name="payment_methods")
+
+
+def parse_payment_method(payment_method: dict) -> PaymentMethodType:
+    """Convierte un registro del REST API en PaymentMethodType (lanza ValidationError si no cumple PaymentMethodModel)"""
+    return _decoder.decode_one(payment_method)
+
+
+async def get_all_payment_methods(fields: Optional[Iterable[str]] = None) -> List[PaymentMethodType]:
+    """Obtiene todos los métodos de pago desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/payment_methods")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/payment-methods")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo métodos de pago: {e}")
         return []
@@ -21,17 +28,4 @@ async def get_all_payment_methods() -> List[PaymentMethodType]:
         logger.error(f"❌ Error inesperado obteniendo métodos de pago: {e}")
         return []
 
-    payment_methods = []
-    for payment_method in data:
-        try:
-            payment_methods.append(PaymentMethodType(
-                id_payment_method=payment_method["id_payment_method"],
-                method_name=payment_method["method_name"],
-                details_payment=payment_method.get("details_payment")
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en método de pago: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando método de pago {payment_method.get('id_payment_method')}: {e}")
-    
-    return payment_methods
+    return _decoder.decode(data, fields)
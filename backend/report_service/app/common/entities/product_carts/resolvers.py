@@ -1,14 +1,18 @@
 # app/common/entities/product-carts/resolvers.py
 import strawberry
 from typing import List
+from strawberry.types import Info
 from app.common.entities.product_carts.schema import ProductCartType
 from app.common.entities.product_carts.service import get_all_product_carts
+from app.common.lookahead import selection_tree
 
 @strawberry.type
 class ProductCartQueries:
 
     @strawberry.field
-    async def all_product_carts(self) -> List[ProductCartType]:
+    async def all_product_carts(self, info: Info) -> List[ProductCartType]:
         """Devuelve la lista de todos los productos en carritos"""
-        product_carts = await get_all_product_carts()
+        selection = selection_tree(info)
+        info.context.loaders.prefetch("ProductCartType", selection)
+        product_carts = await get_all_product_carts(fields=selection)
         return product_carts
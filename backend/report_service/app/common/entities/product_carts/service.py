@@ -1,20 +1,26 @@
 # app/common/entities/product-carts/service.py
 import httpx
-from typing import List
+from typing import Iterable, List, Optional
+from app.common.entities.product_carts.models import ProductCartModel
 from app.common.entities.product_carts.schema import ProductCartType
-from app.common.utils import parse_iso_datetime, safe_int
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_product_carts() -> List[ProductCartType]:
-    """Obtiene todas las relaciones producto-carrito desde el REST API"""
+_decoder = RowDecoder(ProductCartModel, ProductCartType, name="product_carts")
+
+
+def parse_product_cart(pc: dict) -> ProductCartType:
+    """Convierte un registro del REST API en ProductCartType (lanza ValidationError si no cumple ProductCartModel)"""
+    return _decoder.decode_one(pc)
+
+
+async def get_all_product_carts(fields: Optional[Iterable[str]] = None) -> List[ProductCartType]:
+    """Obtiene todas las relaciones producto-carrito desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/product-carts")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/product-carts")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo producto-carritos: {e}")
         return []
@@ -22,20 +28,4 @@ async def get_all_product_carts() -> List[ProductCartType]:
         logger.error(f"❌ Error inesperado obteniendo producto-carritos: {e}")
         return []
 
-    product_carts = []
-    for pc in data:
-        try:
-            product_carts.append(ProductCartType(
-                id_product_cart=pc["id_product_cart"],
-                id_product=pc["id_product"],
-                id_cart=pc["id_cart"],
-                quantity=safe_int(pc.get("quantity")),
-                added_at=parse_iso_datetime(pc.get("added_at")),
-                updated_at=parse_iso_datetime(pc.get("updated_at"))
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en producto-carrito: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando producto-carrito {pc.get('id_product_cart')}: {e}")
-    
-    return product_carts
+    return _decoder.decode(data, fields)
@@ -1,14 +1,45 @@
 # app/common/entities/product-orders/resolvers.py
 import strawberry
-from typing import List
-from app.common.entities.product_orders.schema import ProductOrderType
-from app.common.entities.product_orders.service import get_all_product_orders
+from typing import List, Optional
+from strawberry.types import Info
+from app import config
+from app.common.entities.product_orders.schema import ProductOrderFilter, ProductOrderSort, ProductOrderType
+from app.common.entities.product_orders.service import get_all_product_orders, query_product_orders
+from app.common.listing import Connection
+from app.common.lookahead import selection_tree
+from app.common.topk import page_offset
 
 @strawberry.type
 class ProductOrderQueries:
 
     @strawberry.field
-    async def all_product_orders(self) -> List[ProductOrderType]:
-        """Devuelve la lista de todos los productos en órdenes"""
-        product_orders = await get_all_product_orders()
-        return product_orders
+    async def all_product_orders(
+        self,
+        info: Info,
+        filter: Optional[ProductOrderFilter] = None,
+        sort: Optional[ProductOrderSort] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[ProductOrderType]:
+        """Devuelve la lista de todos los productos en órdenes (opcionalmente filtrada, ordenada y paginada)"""
+        selection = selection_tree(info)
+        # Relaciones pedidas: sus listados se descargan en paralelo con este
+        info.context.loaders.prefetch("ProductOrderType", selection)
+        if filter is None and sort is None and limit is None and not offset:
+            return await get_all_product_orders(fields=selection)
+        return (await query_product_orders(filter, sort, offset, limit, fields=selection)).nodes
+
+    @strawberry.field
+    async def product_orders_connection(
+        self,
+        info: Info,
+        filter: Optional[ProductOrderFilter] = None,
+        sort: Optional[ProductOrderSort] = None,
+        first: int = config.LIST_PAGE_SIZE,
+        after: Optional[str] = None
+    ) -> Connection[ProductOrderType]:
+        """Productos en órdenes paginados con cursor (usar page_info.end_cursor como `after`)"""
+        offset = page_offset(0, after)
+        selection = selection_tree(info, "edges", "node")
+        info.context.loaders.prefetch("ProductOrderType", selection)
+        return (await query_product_orders(filter, sort, offset, first, fields=selection)).connection()
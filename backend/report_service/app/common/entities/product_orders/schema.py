@@ -1,9 +1,9 @@
 import strawberry
-from datetime import datetime
+from datetime import date, datetime
+from enum import Enum
 from typing import Optional
-import httpx
-
-BASE_URL = "http://127.0.0.1:3000/api"
+from strawberry.types import Info
+from app.common.listing import SortDirection
 
 @strawberry.type
 class ProductOrderType:
@@ -19,54 +19,33 @@ class ProductOrderType:
     
     # Relaciones
     @strawberry.field
-    async def product(self) -> Optional[strawberry.LazyType["ProductType", "app.common.entities.products.schema"]]:
+    async def product(self, info: Info) -> Optional[strawberry.LazyType["ProductType", "app.common.entities.products.schema"]]:
         """Obtiene el producto"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/products/{self.id_product}")
-                response.raise_for_status()
-                p = response.json()
-                
-                from app.common.entities.products.schema import ProductType
-                return ProductType(
-                    id_product=p["id_product"],
-                    id_seller=p["id_seller"],
-                    id_inventory=p["id_inventory"],
-                    id_category=p["id_category"],
-                    id_sub_category=p["id_sub_category"],
-                    product_name=p["product_name"],
-                    description=p.get("description"),
-                    price=float(p["price"]),
-                    stock=p["stock"],
-                    image_url=p.get("image_url"),
-                    status=p.get("status", "pending"),
-                    created_at=datetime.fromisoformat(p["created_at"].replace("Z", ""))
-                )
-        except:
-            return None
+        return await info.context.loaders.products.load(self.id_product)
     
     @strawberry.field
-    async def order(self) -> Optional[strawberry.LazyType["OrderType", "app.common.entities.orders.schema"]]:
+    async def order(self, info: Info) -> Optional[strawberry.LazyType["OrderType", "app.common.entities.orders.schema"]]:
         """Obtiene la orden"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/orders/{self.id_order}")
-                response.raise_for_status()
-                order = response.json()
-                
-                from app.common.entities.orders.schema import OrderType
-                return OrderType(
-                    id_order=order["id_order"],
-                    order_date=datetime.fromisoformat(order["order_date"].replace("Z", "")),
-                    status=order["status"],
-                    total_amount=float(order["total_amount"]),
-                    delivery_type=order["delivery_type"],
-                    id_client=order["id_client"],
-                    id_cart=order["id_cart"],
-                    id_payment_method=order["id_payment_method"],
-                    id_delivery=order.get("id_delivery"),
-                    payment_receipt_url=order.get("payment_receipt_url"),
-                    payment_verified_at=datetime.fromisoformat(order["payment_verified_at"].replace("Z", "")) if order.get("payment_verified_at") else None
-                )
-        except:
-            return None
+        return await info.context.loaders.orders.load(self.id_order)
+
+
+@strawberry.input
+class ProductOrderFilter:
+    """Filtros de all_product_orders / product_orders_connection (se combinan con AND)"""
+    id_order: Optional[int] = None
+    id_product: Optional[int] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+    min_rating: Optional[int] = None
+
+@strawberry.enum
+class ProductOrderSortField(Enum):
+    ID_PRODUCT_ORDER = "id_product_order"
+    CREATED_AT = "created_at"
+    SUBTOTAL = "subtotal"
+    RATING = "rating"
+
+@strawberry.input
+class ProductOrderSort:
+    field: ProductOrderSortField
+    direction: SortDirection = SortDirection.ASC
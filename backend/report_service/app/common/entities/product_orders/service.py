@@ -1,20 +1,31 @@
 # app/common/entities/product-orders/service.py
 import httpx
-from typing import List
-from app.common.entities.product_orders.schema import ProductOrderType
-from app.common.utils import parse_iso_datetime, safe_float
+from typing import Iterable, List, Optional
+from app.common.entities.product_orders.models import ProductOrderModel
+from app.common.entities.product_orders.schema import ProductOrderFilter, ProductOrderSort, ProductOrderType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
+from app.common.listing import (
+    ListingPage, ListingQuery, as_datetime, as_id, as_number, day_end, day_start, paginate_rows,
+)
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_product_orders() -> List[ProductOrderType]:
-    """Obtiene todas las relaciones producto-orden desde el REST API"""
+_decoder = RowDecoder(ProductOrderModel, ProductOrderType, name="product_orders")
+
+_SORT_PARSERS = {"id_product_order": as_id, "created_at": as_datetime, "subtotal": as_number, "rating": as_number}
+
+
+def parse_product_order(po: dict) -> ProductOrderType:
+    """Convierte un registro del REST API en ProductOrderType (lanza ValidationError si no cumple ProductOrderModel)"""
+    return _decoder.decode_one(po)
+
+
+async def get_all_product_orders(fields: Optional[Iterable[str]] = None) -> List[ProductOrderType]:
+    """Obtiene todas las relaciones producto-orden desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/product-orders")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/product-orders")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo producto-órdenes: {e}")
         return []
@@ -22,23 +33,34 @@ async def get_all_product_orders() -> List[ProductOrderType]:
         logger.error(f"❌ Error inesperado obteniendo producto-órdenes: {e}")
         return []
 
-    product_orders = []
-    for po in data:
-        try:
-            product_orders.append(ProductOrderType(
-                id_product_order=po["id_product_order"],
-                id_order=po["id_order"],
-                id_product=po["id_product"],
-                price_unit=safe_float(po.get("price_unit")),
-                subtotal=safe_float(po.get("subtotal")),
-                created_at=parse_iso_datetime(po.get("created_at")),
-                rating=po.get("rating"),
-                review_comment=po.get("review_comment"),
-                reviewed_at=parse_iso_datetime(po.get("reviewed_at")) if po.get("reviewed_at") else None
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en producto-orden: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando producto-orden {po.get('id_product_order')}: {e}")
-    
-    return product_orders
+    return _decoder.decode(data, fields)
+
+
+def _filter_product_orders(rows: list, filter: ProductOrderFilter) -> Optional[List[int]]:
+    query = ListingQuery(rows)
+    query.equals("id_order", filter.id_order)
+    query.equals("id_product", filter.id_product)
+    query.between("created_at", day_start(filter.created_from), day_end(filter.created_to), as_datetime)
+    query.between("rating", filter.min_rating, None, as_number)
+    return query.positions()
+
+
+async def query_product_orders(
+    filter: Optional[ProductOrderFilter] = None,
+    sort: Optional[ProductOrderSort] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ListingPage[ProductOrderType]:
+    """Página de producto-órdenes filtradas y ordenadas (solo se decodifican las filas de la página)"""
+    try:
+        data = await load_rows("/product-orders")
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Error HTTP obteniendo producto-órdenes: {e}")
+        return ListingPage.empty(offset)
+    except Exception as e:
+        logger.error(f"❌ Error inesperado obteniendo producto-órdenes: {e}")
+        return ListingPage.empty(offset)
+
+    selected = _filter_product_orders(data, filter) if filter is not None else None
+    return paginate_rows(_decoder, data, selected, offset, limit, sort, _SORT_PARSERS, fields)
@@ -1,14 +1,45 @@
 # app/common/entities/products/resolvers.py
 import strawberry
-from typing import List
-from app.common.entities.products.schema import ProductType
-from app.common.entities.products.service import get_all_products
+from typing import List, Optional
+from strawberry.types import Info
+from app import config
+from app.common.entities.products.schema import ProductFilter, ProductSort, ProductType
+from app.common.entities.products.service import get_all_products, query_products
+from app.common.listing import Connection
+from app.common.lookahead import selection_tree
+from app.common.topk import page_offset
 
 @strawberry.type
 class ProductQueries:
 
     @strawberry.field
-    async def all_products(self) -> List[ProductType]:
-        """Devuelve la lista de todos los productos"""
-        products = await get_all_products()
-        return products
+    async def all_products(
+        self,
+        info: Info,
+        filter: Optional[ProductFilter] = None,
+        sort: Optional[ProductSort] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[ProductType]:
+        """Devuelve la lista de todos los productos (opcionalmente filtrada, ordenada y paginada)"""
+        selection = selection_tree(info)
+        # Relaciones pedidas: sus listados se descargan en paralelo con este
+        info.context.loaders.prefetch("ProductType", selection)
+        if filter is None and sort is None and limit is None and not offset:
+            return await get_all_products(fields=selection)
+        return (await query_products(filter, sort, offset, limit, fields=selection)).nodes
+
+    @strawberry.field
+    async def products_connection(
+        self,
+        info: Info,
+        filter: Optional[ProductFilter] = None,
+        sort: Optional[ProductSort] = None,
+        first: int = config.LIST_PAGE_SIZE,
+        after: Optional[str] = None
+    ) -> Connection[ProductType]:
+        """Productos paginados con cursor (usar page_info.end_cursor como `after`)"""
+        offset = page_offset(0, after)
+        selection = selection_tree(info, "edges", "node")
+        info.context.loaders.prefetch("ProductType", selection)
+        return (await query_products(filter, sort, offset, first, fields=selection)).connection()
@@ -1,9 +1,9 @@
 import strawberry
-from datetime import datetime
+from datetime import date, datetime
+from enum import Enum
 from typing import Optional, List
-import httpx
-
-BASE_URL = "http://127.0.0.1:3000/api"
+from strawberry.types import Info
+from app.common.listing import SortDirection
 
 @strawberry.type
 class ProductType:
@@ -22,120 +22,58 @@ class ProductType:
     
     # Relaciones
     @strawberry.field
-    async def seller(self) -> Optional[strawberry.LazyType["SellerType", "app.common.entities.sellers.schema"]]:
+    async def seller(self, info: Info) -> Optional[strawberry.LazyType["SellerType", "app.common.entities.sellers.schema"]]:
         """Obtiene el vendedor del producto"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/sellers/{self.id_seller}")
-                response.raise_for_status()
-                seller_data = response.json()
-                
-                from app.common.entities.sellers.schema import SellerType
-                return SellerType(
-                    id_seller=seller_data["id_seller"],
-                    seller_name=seller_data["seller_name"],
-                    seller_email=seller_data["seller_email"],
-                    phone=seller_data["phone"],
-                    bussines_name=seller_data["bussines_name"],
-                    location=seller_data["location"],
-                    created_at=datetime.fromisoformat(seller_data["created_at"].replace("Z", ""))
-                )
-        except:
-            return None
+        return await info.context.loaders.sellers.load(self.id_seller)
     
     @strawberry.field
-    async def category(self) -> Optional[strawberry.LazyType["CategoryType", "app.common.entities.categories.schema"]]:
+    async def category(self, info: Info) -> Optional[strawberry.LazyType["CategoryType", "app.common.entities.categories.schema"]]:
         """Obtiene la categoría del producto"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/categories/{self.id_category}")
-                response.raise_for_status()
-                cat_data = response.json()
-                
-                from app.common.entities.categories.schema import CategoryType
-                return CategoryType(
-                    id_category=cat_data["id_category"],
-                    category_name=cat_data["category_name"],
-                    description=cat_data.get("description"),
-                    photo=cat_data.get("photo")
-                )
-        except:
-            return None
+        return await info.context.loaders.categories.load(self.id_category)
     
     @strawberry.field
-    async def inventory(self) -> Optional[strawberry.LazyType["InventoryType", "app.common.entities.inventories.schema"]]:
+    async def inventory(self, info: Info) -> Optional[strawberry.LazyType["InventoryType", "app.common.entities.inventories.schema"]]:
         """Obtiene el inventario del producto"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/inventories/{self.id_inventory}")
-                response.raise_for_status()
-                inv_data = response.json()
-                
-                from app.common.entities.inventories.schema import InventoryType
-                return InventoryType(
-                    id_inventory=inv_data["id_inventory"],
-                    id_seller=inv_data["id_seller"],
-                    updated_at=datetime.fromisoformat(inv_data["updated_at"].replace("Z", ""))
-                )
-        except:
-            return None
+        return await info.context.loaders.inventories.load(self.id_inventory)
     
     @strawberry.field
-    async def subcategory_products(self) -> List[strawberry.LazyType["SubCategoryProductType", "app.common.entities.subcategory_products.schema"]]:
+    async def subcategory_products(self, info: Info) -> List[strawberry.LazyType["SubCategoryProductType", "app.common.entities.subcategory_products.schema"]]:
         """Obtiene las relaciones subcategoría-producto"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/subcategory-products?id_product={self.id_product}")
-                response.raise_for_status()
-                data = response.json()
-                
-                from app.common.entities.subcategory_products.schema import SubCategoryProductType
-                return [SubCategoryProductType(
-                    id_sub_category_product=scp["id_sub_category_product"],
-                    id_sub_category=scp["id_sub_category"],
-                    id_product=scp["id_product"]
-                ) for scp in data]
-        except:
-            return []
+        return await info.context.loaders.subcategory_products_by_product.load(self.id_product)
     
     @strawberry.field
-    async def product_orders(self) -> List[strawberry.LazyType["ProductOrderType", "app.common.entities.product_orders.schema"]]:
+    async def product_orders(self, info: Info) -> List[strawberry.LazyType["ProductOrderType", "app.common.entities.product_orders.schema"]]:
         """Obtiene las órdenes que contienen este producto"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/product-orders?id_product={self.id_product}")
-                response.raise_for_status()
-                data = response.json()
-                
-                from app.common.entities.product_orders.schema import ProductOrderType
-                return [ProductOrderType(
-                    id_product_order=po["id_product_order"],
-                    id_order=po["id_order"],
-                    id_product=po["id_product"],
-                    price_unit=float(po["price_unit"]),
-                    subtotal=float(po["subtotal"]),
-                    created_at=datetime.fromisoformat(po["created_at"].replace("Z", ""))
-                ) for po in data]
-        except:
-            return []
+        return await info.context.loaders.product_orders_by_product.load(self.id_product)
     
     @strawberry.field
-    async def product_carts(self) -> List[strawberry.LazyType["ProductCartType", "app.common.entities.product_carts.schema"]]:
+    async def product_carts(self, info: Info) -> List[strawberry.LazyType["ProductCartType", "app.common.entities.product_carts.schema"]]:
         """Obtiene los carritos que contienen este producto"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/product-carts?id_product={self.id_product}")
-                response.raise_for_status()
-                data = response.json()
-                
-                from app.common.entities.product_carts.schema import ProductCartType
-                return [ProductCartType(
-                    id_product_cart=pc["id_product_cart"],
-                    id_product=pc["id_product"],
-                    id_cart=pc["id_cart"],
-                    quantity=pc["quantity"],
-                    added_at=datetime.fromisoformat(pc["added_at"].replace("Z", "")),
-                    updated_at=datetime.fromisoformat(pc["updated_at"].replace("Z", ""))
-                ) for pc in data]
-        except:
-            return []
+        return await info.context.loaders.product_carts_by_product.load(self.id_product)
+
+
+@strawberry.input
+class ProductFilter:
+    """Filtros de all_products / products_connection (se combinan con AND)"""
+    status: Optional[List[str]] = None  # cualquiera de los estados (sin distinguir mayúsculas)
+    id_seller: Optional[int] = None
+    id_category: Optional[int] = None
+    id_sub_category: Optional[int] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    search: Optional[str] = None  # en nombre o descripción
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+
+@strawberry.enum
+class ProductSortField(Enum):
+    ID_PRODUCT = "id_product"
+    PRODUCT_NAME = "product_name"
+    PRICE = "price"
+    STOCK = "stock"
+    CREATED_AT = "created_at"
+
+@strawberry.input
+class ProductSort:
+    field: ProductSortField
+    direction: SortDirection = SortDirection.ASC
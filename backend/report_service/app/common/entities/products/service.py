@@ -1,24 +1,32 @@
 # app/common/entities/products/service.py
 import httpx
-from typing import List
-from app.common.entities.products.schema import ProductType
-from app.common.utils import parse_iso_datetime, safe_float, safe_int, extract_data_from_response
+from typing import Iterable, List, Optional
+from app.common.entities.products.models import ProductModel
+from app.common.entities.products.schema import ProductFilter, ProductSort, ProductType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
+from app.common.listing import (
+    ListingPage, ListingQuery, as_datetime, as_id, as_number, day_end, day_start, paginate_rows,
+    text_search, upstream_params,
+)
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_products() -> List[ProductType]:
-    """Obtiene todos los productos desde el REST API"""
+_decoder = RowDecoder(ProductModel, ProductType, name="products")
+
+_SORT_PARSERS = {"id_product": as_id, "price": as_number, "stock": as_number, "created_at": as_datetime}
+
+
+def parse_product(product: dict) -> ProductType:
+    """Convierte un registro del REST API en ProductType (lanza ValidationError si no cumple ProductModel)"""
+    return _decoder.decode_one(product)
+
+
+async def get_all_products(fields: Optional[Iterable[str]] = None) -> List[ProductType]:
+    """Obtiene todos los productos desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/products?limit=1000")
-            response.raise_for_status()
-            response_data = response.json()
-            
-            # Extraer datos (maneja paginación o array directo)
-            data = extract_data_from_response(response_data, ['products', 'data'])
-                
+        data = await load_rows("/products")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo productos: {e}")
         return []
@@ -26,26 +34,47 @@ async def get_all_products() -> List[ProductType]:
         logger.error(f"❌ Error inesperado obteniendo productos: {e}")
         return []
 
-    products = []
-    for product in data:
-        try:
-            products.append(ProductType(
-                id_product=product["id_product"],
-                id_seller=product["id_seller"],
-                id_inventory=product["id_inventory"],
-                id_category=product["id_category"],
-                id_sub_category=product["id_sub_category"],
-                product_name=product["product_name"],
-                description=product.get("description"),
-                price=safe_float(product.get("price")),
-                stock=safe_int(product.get("stock")),
-                image_url=product.get("image_url"),
-                status=product.get("status", "pending"),  # pending, active, rejected, inactive
-                created_at=parse_iso_datetime(product.get("created_at"))
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en producto: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando producto {product.get('id_product')}: {e}")
-    
-    return products
+    return _decoder.decode(data, fields)
+
+
+def _filter_products(rows: list, filter: ProductFilter) -> Optional[List[int]]:
+    query = ListingQuery(rows)
+    query.equals("status", filter.status)
+    query.equals("id_seller", filter.id_seller)
+    query.equals("id_category", filter.id_category)
+    query.equals("id_sub_category", filter.id_sub_category)
+    query.between("price", filter.min_price, filter.max_price, as_number)
+    query.between("created_at", day_start(filter.created_from), day_end(filter.created_to), as_datetime)
+    if filter.search:
+        query.where(text_search(("product_name", "description"), filter.search))
+    return query.positions()
+
+
+async def query_products(
+    filter: Optional[ProductFilter] = None,
+    sort: Optional[ProductSort] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ListingPage[ProductType]:
+    """Página de productos filtrados y ordenados (solo se decodifican las filas de la página)"""
+    filters = {} if filter is None else {
+        "id_category": filter.id_category,
+        "id_sub_category": filter.id_sub_category,
+        "id_seller": filter.id_seller,
+        "min_price": filter.min_price,
+        "max_price": filter.max_price,
+        "search": filter.search,
+    }
+    try:
+        # Lo que /products sabe filtrar viaja como query param; el resto se filtra aquí
+        data = await load_rows("/products", upstream_params("/products", filters))
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Error HTTP obteniendo productos: {e}")
+        return ListingPage.empty(offset)
+    except Exception as e:
+        logger.error(f"❌ Error inesperado obteniendo productos: {e}")
+        return ListingPage.empty(offset)
+
+    selected = _filter_products(data, filter) if filter is not None else None
+    return paginate_rows(_decoder, data, selected, offset, limit, sort, _SORT_PARSERS, fields)
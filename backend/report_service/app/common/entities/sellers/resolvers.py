@@ -1,14 +1,45 @@
 # app/common/entities/sellers/resolvers.py
 import strawberry
-from typing import List
-from app.common.entities.sellers.schema import SellerType
-from app.common.entities.sellers.service import get_all_sellers
+from typing import List, Optional
+from strawberry.types import Info
+from app import config
+from app.common.entities.sellers.schema import SellerFilter, SellerSort, SellerType
+from app.common.entities.sellers.service import get_all_sellers, query_sellers
+from app.common.listing import Connection
+from app.common.lookahead import selection_tree
+from app.common.topk import page_offset
 
 @strawberry.type
 class SellerQueries:
 
     @strawberry.field
-    async def all_sellers(self) -> List[SellerType]:
-        """Devuelve la lista de todos los vendedores"""
-        sellers = await get_all_sellers()
-        return sellers
+    async def all_sellers(
+        self,
+        info: Info,
+        filter: Optional[SellerFilter] = None,
+        sort: Optional[SellerSort] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[SellerType]:
+        """Devuelve la lista de todos los vendedores (opcionalmente filtrada, ordenada y paginada)"""
+        selection = selection_tree(info)
+        # Relaciones pedidas: sus listados se descargan en paralelo con este
+        info.context.loaders.prefetch("SellerType", selection)
+        if filter is None and sort is None and limit is None and not offset:
+            return await get_all_sellers(fields=selection)
+        return (await query_sellers(filter, sort, offset, limit, fields=selection)).nodes
+
+    @strawberry.field
+    async def sellers_connection(
+        self,
+        info: Info,
+        filter: Optional[SellerFilter] = None,
+        sort: Optional[SellerSort] = None,
+        first: int = config.LIST_PAGE_SIZE,
+        after: Optional[str] = None
+    ) -> Connection[SellerType]:
+        """Vendedores paginados con cursor (usar page_info.end_cursor como `after`)"""
+        offset = page_offset(0, after)
+        selection = selection_tree(info, "edges", "node")
+        info.context.loaders.prefetch("SellerType", selection)
+        return (await query_sellers(filter, sort, offset, first, fields=selection)).connection()
@@ -1,9 +1,9 @@
 import strawberry
-from datetime import datetime
-from typing import List
-import httpx
-
-BASE_URL = "http://127.0.0.1:3000/api"
+from datetime import date, datetime
+from enum import Enum
+from typing import List, Optional
+from strawberry.types import Info
+from app.common.listing import SortDirection
 
 @strawberry.type
 class SellerType:
@@ -17,19 +17,27 @@ class SellerType:
     
     # Relaciones
     @strawberry.field
-    async def inventories(self) -> List[strawberry.LazyType["InventoryType", "app.common.entities.inventories.schema"]]:
+    async def inventories(self, info: Info) -> List[strawberry.LazyType["InventoryType", "app.common.entities.inventories.schema"]]:
         """Obtiene los inventarios del vendedor"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/inventories?id_seller={self.id_seller}")
-                response.raise_for_status()
-                data = response.json()
-                
-                from app.common.entities.inventories.schema import InventoryType
-                return [InventoryType(
-                    id_inventory=inv["id_inventory"],
-                    id_seller=inv["id_seller"],
-                    updated_at=datetime.fromisoformat(inv["updated_at"].replace("Z", ""))
-                ) for inv in data]
-        except:
-            return []
+        return await info.context.loaders.inventories_by_seller.load(self.id_seller)
+
+
+@strawberry.input
+class SellerFilter:
+    """Filtros de all_sellers / sellers_connection (se combinan con AND)"""
+    search: Optional[str] = None  # en nombre, negocio o email
+    location: Optional[str] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+
+@strawberry.enum
+class SellerSortField(Enum):
+    ID_SELLER = "id_seller"
+    SELLER_NAME = "seller_name"
+    BUSSINES_NAME = "bussines_name"
+    CREATED_AT = "created_at"
+
+@strawberry.input
+class SellerSort:
+    field: SellerSortField
+    direction: SortDirection = SortDirection.ASC
@@ -1,20 +1,31 @@
 # app/common/entities/sellers/service.py
 import httpx
-from typing import List
-from app.common.entities.sellers.schema import SellerType
-from app.common.utils import parse_iso_datetime, safe_int
+from typing import Iterable, List, Optional
+from app.common.entities.sellers.models import SellerModel
+from app.common.entities.sellers.schema import SellerFilter, SellerSort, SellerType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
+from app.common.listing import (
+    ListingPage, ListingQuery, as_datetime, as_id, day_end, day_start, paginate_rows, text_search,
+)
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_sellers() -> List[SellerType]:
-    """Obtiene todos los vendedores desde el REST API"""
+_decoder = RowDecoder(SellerModel, SellerType, name="sellers")
+
+_SORT_PARSERS = {"id_seller": as_id, "created_at": as_datetime}
+
+
+def parse_seller(seller: dict) -> SellerType:
+    """Convierte un registro del REST API en SellerType (lanza ValidationError si no cumple SellerModel)"""
+    return _decoder.decode_one(seller)
+
+
+async def get_all_sellers(fields: Optional[Iterable[str]] = None) -> List[SellerType]:
+    """Obtiene todos los vendedores desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/sellers")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/sellers")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo vendedores: {e}")
         return []
@@ -22,21 +33,34 @@ async def get_all_sellers() -> List[SellerType]:
         logger.error(f"❌ Error inesperado obteniendo vendedores: {e}")
         return []
 
-    sellers = []
-    for seller in data:
-        try:
-            sellers.append(SellerType(
-                id_seller=seller["id_seller"],
-                seller_name=seller["seller_name"],
-                seller_email=seller["seller_email"],
-                phone=str(seller.get("phone", "")),  # Convertir a string
-                bussines_name=seller["bussines_name"],
-                location=seller["location"],
-                created_at=parse_iso_datetime(seller.get("created_at"))
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en vendedor: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando vendedor {seller.get('id_seller')}: {e}")
-    
-    return sellers
+    return _decoder.decode(data, fields)
+
+
+def _filter_sellers(rows: list, filter: SellerFilter) -> Optional[List[int]]:
+    query = ListingQuery(rows)
+    query.equals("location", filter.location)
+    query.between("created_at", day_start(filter.created_from), day_end(filter.created_to), as_datetime)
+    if filter.search:
+        query.where(text_search(("seller_name", "bussines_name", "seller_email"), filter.search))
+    return query.positions()
+
+
+async def query_sellers(
+    filter: Optional[SellerFilter] = None,
+    sort: Optional[SellerSort] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ListingPage[SellerType]:
+    """Página de vendedores filtrados y ordenados (solo se decodifican las filas de la página)"""
+    try:
+        data = await load_rows("/sellers")
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Error HTTP obteniendo vendedores: {e}")
+        return ListingPage.empty(offset)
+    except Exception as e:
+        logger.error(f"❌ Error inesperado obteniendo vendedores: {e}")
+        return ListingPage.empty(offset)
+
+    selected = _filter_sellers(data, filter) if filter is not None else None
+    return paginate_rows(_decoder, data, selected, offset, limit, sort, _SORT_PARSERS, fields)
@@ -1,14 +1,18 @@
 # app/common/entities/subcategories/resolvers.py
 import strawberry
 from typing import List
+from strawberry.types import Info
 from app.common.entities.subcategories.schema import SubCategoryType
 from app.common.entities.subcategories.service import get_all_subcategories
+from app.common.lookahead import selection_tree
 
 @strawberry.type
 class SubCategoryQueries:
 
     @strawberry.field
-    async def all_subcategories(self) -> List[SubCategoryType]:
+    async def all_subcategories(self, info: Info) -> List[SubCategoryType]:
         """Devuelve la lista de todas las subcategorías"""
-        subcategories = await get_all_subcategories()
+        selection = selection_tree(info)
+        info.context.loaders.prefetch("SubCategoryType", selection)
+        subcategories = await get_all_subcategories(fields=selection)
         return subcategories
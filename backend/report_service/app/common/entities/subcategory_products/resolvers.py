@@ -1,14 +1,18 @@
 # app/common/entities/subcategory-products/resolvers.py
 import strawberry
 from typing import List
+from strawberry.types import Info
 from app.common.entities.subcategory_products.schema import SubCategoryProductType
 from app.common.entities.subcategory_products.service import get_all_subcategory_products
+from app.common.lookahead import selection_tree
 
 @strawberry.type
 class SubCategoryProductQueries:
 
     @strawberry.field
-    async def all_subcategory_products(self) -> List[SubCategoryProductType]:
+    async def all_subcategory_products(self, info: Info) -> List[SubCategoryProductType]:
         """Devuelve la lista de todas las relaciones subcategoría-producto"""
-        subcategory_products = await get_all_subcategory_products()
+        selection = selection_tree(info)
+        info.context.loaders.prefetch("SubCategoryProductType", selection)
+        subcategory_products = await get_all_subcategory_products(fields=selection)
         return subcategory_products
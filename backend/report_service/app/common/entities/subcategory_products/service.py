@@ -1,19 +1,26 @@
 # app/common/entities/subcategory-products/service.py
 import httpx
-from typing import List
+from typing import Iterable, List, Optional
+from app.common.entities.subcategory_products.models import SubCategoryProductModel
 from app.common.entities.subcategory_products.schema import SubCategoryProductType
+from app.common.decoding import RowDecoder
+from app.common.datasource import load_rows
 import logging
 
 logger = logging.getLogger(__name__)
-BASE_URL = "http://127.0.0.1:3000/api"
 
-async def get_all_subcategory_products() -> List[SubCategoryProductType]:
-    """Obtiene todas las relaciones subcategoría-producto desde el REST API"""
+_decoder = RowDecoder(SubCategoryProductModel, SubCategoryProductType, name="subcategory_products")
+
+
+def parse_subcategory_product(scp: dict) -> SubCategoryProductType:
+    """Convierte un registro del REST API en SubCategoryProductType (lanza ValidationError si no cumple SubCategoryProductModel)"""
+    return _decoder.decode_one(scp)
+
+
+async def get_all_subcategory_products(fields: Optional[Iterable[str]] = None) -> List[SubCategoryProductType]:
+    """Obtiene todas las relaciones subcategoría-producto desde el REST API (con `fields` solo se validan los campos pedidos)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{BASE_URL}/subcategory-products")
-            response.raise_for_status()
-            data = response.json()
+        data = await load_rows("/subcategory-products")
     except httpx.HTTPError as e:
         logger.error(f"❌ Error HTTP obteniendo subcategoría-productos: {e}")
         return []
@@ -21,17 +28,4 @@ async def get_all_subcategory_products() -> List[SubCategoryProductType]:
         logger.error(f"❌ Error inesperado obteniendo subcategoría-productos: {e}")
         return []
 
-    subcategory_products = []
-    for scp in data:
-        try:
-            subcategory_products.append(SubCategoryProductType(
-                id_sub_category_product=scp["id_sub_category_product"],
-                id_sub_category=scp["id_sub_category"],
-                id_product=scp["id_product"]
-            ))
-        except KeyError as e:
-            logger.warning(f"⚠️ Campo faltante en subcategoría-producto: {e}")
-        except Exception as e:
-            logger.error(f"❌ Error procesando subcategoría-producto {scp.get('id_sub_category_product')}: {e}")
-    
-    return subcategory_products
+    return _decoder.decode(data, fields)
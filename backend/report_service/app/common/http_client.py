@@ -0,0 +1,220 @@
+# app/common/http_client.py
+"""
+🌐 CLIENTE HTTP COMPARTIDO HACIA EL REST API
+Un único httpx.AsyncClient por proceso (pool acotado + keep-alive), creado en el
+lifespan de FastAPI. Centraliza timeouts por endpoint y headers del token de servicio.
+Los GET JSON idénticos que coinciden en el tiempo se agrupan (singleflight).
+"""
+from collections import Counter
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Hashable, Optional
+import logging
+import re
+import httpx
+
+from app import config
+from app.common.decoding import loads
+from app.common.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+_ID_SEGMENT = re.compile(r"/(\d+|[0-9a-fA-F-]{32,36})(?=/|$)")
+
+
+def request_key(path: str, params: Optional[Dict[str, Any]] = None) -> Hashable:
+    """Clave estable de una petición GET (ruta + params ordenados)"""
+    return path, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+
+class UpstreamCallCounter:
+    """
+    Cuenta las llamadas HTTP realmente emitidas hacia el REST API y las que se
+    resolvieron uniéndose a una llamada idéntica ya en vuelo (coalesced).
+    Las rutas se normalizan (/clients/5 -> /clients/:id) para agrupar.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.coalesced = 0
+        self.by_path: Counter = Counter()
+
+    def record(self, path: str) -> None:
+        self.total += 1
+        self.by_path[_ID_SEGMENT.sub("/:id", path.split("?", 1)[0])] += 1
+
+    def record_coalesced(self, path: str) -> None:
+        self.coalesced += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"total": self.total, "coalesced": self.coalesced, "by_path": dict(self.by_path)}
+
+
+# Contador de la operación GraphQL en curso (lo activa la extensión de deps.py)
+_request_counter: ContextVar[Optional[UpstreamCallCounter]] = ContextVar("upstream_call_counter", default=None)
+
+
+def track_upstream_calls(counter: UpstreamCallCounter) -> Token:
+    """Asocia un contador a la tarea/contexto actual; devuelve el token para restaurarlo"""
+    return _request_counter.set(counter)
+
+
+def untrack_upstream_calls(token: Token) -> None:
+    _request_counter.reset(token)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class UpstreamClient:
+    """
+    Envoltorio sobre httpx.AsyncClient con la configuración del REST API.
+    Las rutas se pasan relativas al BASE_URL (ej: "/orders", "/clients/5").
+    """
+
+    def __init__(
+        self,
+        base_url: str = config.REST_API_URL,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        endpoint_timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = config.UPSTREAM_DEFAULT_TIMEOUT,
+        connect_timeout: float = config.UPSTREAM_CONNECT_TIMEOUT,
+        pool_timeout: float = config.UPSTREAM_POOL_TIMEOUT,
+        max_connections: int = config.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = config.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = config.UPSTREAM_KEEPALIVE_EXPIRY,
+        http2: bool = config.UPSTREAM_HTTP2,
+        singleflight: bool = config.UPSTREAM_SINGLEFLIGHT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if http2 and not _http2_available():
+            logger.warning("⚠️ UPSTREAM_HTTP2 activo pero el paquete 'h2' no está instalado; usando HTTP/1.1")
+            http2 = False
+
+        self.base_url = base_url.rstrip("/")
+        # Contador acumulado de todo el proceso
+        self.calls = UpstreamCallCounter()
+        self.flights: Optional[SingleFlight] = SingleFlight("upstream") if singleflight else None
+        self.default_timeout = default_timeout
+        self.connect_timeout = connect_timeout
+        self.pool_timeout = pool_timeout
+        # Prefijos ordenados del más largo al más corto para que gane el más específico
+        self._endpoint_timeouts = sorted(
+            (endpoint_timeouts if endpoint_timeouts is not None else config.UPSTREAM_ENDPOINT_TIMEOUTS).items(),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+        default_headers = {
+            "X-Service-Token": config.SERVICE_TOKEN,
+            "X-Internal-Service": config.SERVICE_NAME,
+            "Accept": "application/json",
+        }
+        if headers:
+            default_headers.update(headers)
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=default_headers,
+            timeout=self._build_timeout(default_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            transport=transport,
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    def _build_timeout(self, read_timeout: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            read_timeout,
+            connect=self.connect_timeout,
+            pool=self.pool_timeout,
+        )
+
+    def timeout_for(self, path: str) -> httpx.Timeout:
+        """Timeout configurado para una ruta (prefijo más largo que coincida)"""
+        clean_path = path.split("?", 1)[0]
+        for prefix, seconds in self._endpoint_timeouts:
+            if clean_path.startswith(prefix):
+                return self._build_timeout(seconds)
+        return self._build_timeout(self.default_timeout)
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> httpx.Response:
+        """GET sobre el pool compartido. No lanza por status; usar raise_for_status()"""
+        kwargs.setdefault("timeout", self.timeout_for(path))
+        self.calls.record(path)
+        request_counter = _request_counter.get()
+        if request_counter is not None:
+            request_counter.record(path)
+        return await self._client.get(path, params=params, **kwargs)
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        """
+        GET que valida el status y devuelve el JSON decodificado.
+        Si ya hay una petición idéntica en vuelo se espera esa misma: el JSON
+        devuelto se comparte entre los solicitantes y no debe mutarse.
+        """
+        if self.flights is None or kwargs:
+            return await self._get_json(path, params, **kwargs)
+
+        data, coalesced = await self.flights.do(request_key(path, params), lambda: self._get_json(path, params))
+        if coalesced:
+            self.calls.record_coalesced(path)
+            request_counter = _request_counter.get()
+            if request_counter is not None:
+                request_counter.record_coalesced(path)
+        return data
+
+    async def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        response = await self.get(path, params=params, **kwargs)
+        response.raise_for_status()
+        # orjson sobre los bytes crudos: evita el decode a str y el json estándar
+        return loads(response.content)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: Optional[UpstreamClient] = None
+
+
+async def start_upstream_client(**overrides) -> UpstreamClient:
+    """Crea el cliente compartido (llamado desde el lifespan de FastAPI)"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = UpstreamClient(**overrides)
+    logger.info(f"🌐 Cliente upstream iniciado contra {_client.base_url}")
+    return _client
+
+
+async def close_upstream_client() -> None:
+    """Cierra el pool de conexiones (llamado al apagar la app)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("🌐 Cliente upstream cerrado")
+
+
+def get_upstream_client() -> UpstreamClient:
+    """
+    Devuelve el cliente compartido. Si la app no pasó por el lifespan
+    (scripts, consola) se crea de forma perezosa con la configuración por defecto.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = UpstreamClient()
+    return _client
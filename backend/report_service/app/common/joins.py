@@ -0,0 +1,185 @@
+# app/common/joins.py
+"""
+🔗 JOINS INDEXADOS ENTRE LISTADOS
+Índices hash clave -> posición de la fila, construidos una sola vez por listado.
+Dentro de una operación GraphQL el snapshot entrega siempre la misma lista para
+el mismo endpoint, así que todos los reportes del request comparten el índice.
+Reemplaza los "for a in A: for b in B: if a[k] == b[k]" (O(n·m)) por búsquedas O(1).
+- hash_index: clave -> fila (joins)
+- group_index: clave -> posiciones (filtros por igualdad de los listados all_*)
+- sorted_index: posiciones ordenadas por valor (rangos de fechas/montos y orden)
+"""
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HashIndex:
+    """Clave -> posición de la primera fila con esa clave"""
+
+    def __init__(self, rows: List[dict], key: str):
+        self.rows = rows
+        self.key = key
+        self._positions = {}
+        for position, row in enumerate(rows):
+            try:
+                value = row[key]
+            except (KeyError, TypeError):
+                continue
+            if value is not None:
+                self._positions.setdefault(value, position)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, value: Hashable) -> bool:
+        return value in self._positions
+
+    def position(self, value: Hashable) -> Optional[int]:
+        return self._positions.get(value)
+
+    def get(self, value: Hashable, default: Any = None) -> Any:
+        position = self._positions.get(value)
+        return self.rows[position] if position is not None else default
+
+    def join(self, values: Iterable[Hashable]) -> Iterator[Tuple[Hashable, int, dict]]:
+        """(clave, posición, fila) de cada clave que existe en el índice, sin repetir"""
+        seen = set()
+        for value in values:
+            if value in seen:
+                continue
+            seen.add(value)
+            position = self._positions.get(value)
+            if position is not None:
+                yield value, position, self.rows[position]
+
+
+class GroupIndex:
+    """
+    Clave -> posiciones de todas las filas con esa clave (en orden del listado).
+    Los textos se comparan sin distinguir mayúsculas ("Completed" == "completed").
+    """
+
+    def __init__(self, rows: List[dict], key: str):
+        self.rows = rows
+        self.key = key
+        self._positions: Dict[Hashable, List[int]] = {}
+        for position, row in enumerate(rows):
+            try:
+                value = row[key]
+            except (KeyError, TypeError):
+                continue
+            if value is not None:
+                self._positions.setdefault(fold(value), []).append(position)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def positions(self, values: Iterable[Hashable]) -> List[int]:
+        """Posiciones (ascendentes) de las filas cuya clave está en `values`"""
+        found = [self._positions.get(fold(value), ()) for value in set(values)]
+        if len(found) == 1:
+            return list(found[0])
+        return sorted(position for group in found for position in group)
+
+
+class SortedIndex:
+    """
+    Posiciones ordenadas por el valor de `key` ya convertido con `parse` (fecha,
+    monto, texto): rangos con búsqueda binaria (O(log n + k)) y orden para
+    paginar sin volver a ordenar. A igual valor se conserva el orden del listado;
+    las filas sin valor (parse -> None) quedan siempre al final.
+    """
+
+    def __init__(self, rows: List[dict], key: str, parse: Callable[[Any], Any]):
+        self.rows = rows
+        self.key = key
+        pairs = []
+        self._missing: List[int] = []
+        for position, row in enumerate(rows):
+            try:
+                value = parse(row[key])
+            except (KeyError, TypeError, ValueError):
+                value = None
+            if value is None:
+                self._missing.append(position)
+            else:
+                pairs.append((value, position))
+        # sort es estable: los empates quedan en orden de posición
+        pairs.sort(key=itemgetter(0))
+        self._values = [value for value, _ in pairs]
+        self._sorted = [position for _, position in pairs]
+        self._orders: Dict[bool, List[int]] = {}
+        self._ranks: Dict[bool, List[int]] = {}
+
+    def between(self, low: Any = None, high: Any = None) -> List[int]:
+        """Posiciones (ascendentes) con low <= valor <= high (None = sin límite)"""
+        lo = 0 if low is None else bisect_left(self._values, low)
+        hi = len(self._values) if high is None else bisect_right(self._values, high)
+        return sorted(self._sorted[lo:hi]) if lo < hi else []
+
+    def order(self, descending: bool = False) -> List[int]:
+        """Todas las posiciones en el orden pedido (sin valor al final)"""
+        order = self._orders.get(descending)
+        if order is None:
+            if descending:
+                # reverse=True también es estable: los empates siguen en orden de posición
+                pairs = sorted(zip(self._values, self._sorted), key=itemgetter(0), reverse=True)
+                order = [position for _, position in pairs] + self._missing
+            else:
+                order = self._sorted + self._missing
+            self._orders[descending] = order
+        return order
+
+    def rank(self, descending: bool = False) -> List[int]:
+        """rank[posición] = lugar de la fila en order(descending)"""
+        ranks = self._ranks.get(descending)
+        if ranks is None:
+            ranks = [0] * len(self.rows)
+            for place, position in enumerate(self.order(descending)):
+                ranks[position] = place
+            self._ranks[descending] = ranks
+        return ranks
+
+
+def fold(value: Any) -> Any:
+    """Normaliza textos para comparar sin distinguir mayúsculas"""
+    return value.casefold() if isinstance(value, str) else value
+
+
+# Memo de los últimos índices construidos: (id del listado, tipo, clave) -> (listado, índice)
+_INDEX_MEMO_SIZE = 32
+_indexes: "OrderedDict[Tuple[Hashable, ...], Tuple[list, Any]]" = OrderedDict()
+
+
+def _memoized(rows: List[dict], memo_key: Tuple[Hashable, ...], build: Callable[[], Any]) -> Any:
+    memo_key = (id(rows),) + memo_key
+    cached = _indexes.get(memo_key)
+    # Se guarda la lista junto al índice para que id(rows) no pueda reutilizarse
+    if cached is not None and cached[0] is rows:
+        _indexes.move_to_end(memo_key)
+        return cached[1]
+    index = build()
+    _indexes[memo_key] = (rows, index)
+    while len(_indexes) > _INDEX_MEMO_SIZE:
+        _indexes.popitem(last=False)
+    return index
+
+
+def hash_index(rows: List[dict], key: str) -> HashIndex:
+    """Índice hash de un listado por `key`, construido una sola vez por listado"""
+    return _memoized(rows, ("hash", key), lambda: HashIndex(rows, key))
+
+
+def group_index(rows: List[dict], key: str) -> GroupIndex:
+    """Índice clave -> posiciones de un listado, construido una sola vez por listado"""
+    return _memoized(rows, ("group", key), lambda: GroupIndex(rows, key))
+
+
+def sorted_index(rows: List[dict], key: str, parse: Callable[[Any], Any]) -> SortedIndex:
+    """Índice ordenado de un listado por `key` (convertido con `parse`), una vez por listado"""
+    return _memoized(rows, ("sorted", key, parse), lambda: SortedIndex(rows, key, parse))
@@ -0,0 +1,280 @@
+# app/common/listing.py
+"""
+📋 FILTROS, ORDEN Y CONEXIONES DE LOS LISTADOS all_*
+- Los filtros que el REST API entiende (config.UPSTREAM_FILTER_PARAMS) viajan
+  como query params: solo se descarga lo filtrado.
+- El resto se resuelve con índices construidos una vez por listado
+  (app/common/joins.py): igualdad con group_index, rangos y orden con
+  sorted_index. Los filtros enviados al API se vuelven a aplicar localmente.
+- Solo las filas de la página se validan y se convierten a types Strawberry:
+  el costo del resolver y el tamaño de la respuesta dependen de la página.
+- Conexiones estilo Relay (edges / page_info / total_count) con los mismos
+  cursores opacos de offset que los rankings (app/common/topk.py).
+"""
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+import heapq
+import logging
+
+import strawberry
+
+from app import config
+from app.common.decoding import RowDecoder
+from app.common.joins import fold, group_index, sorted_index
+from app.common.topk import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@strawberry.enum
+class SortDirection(Enum):
+    """Dirección del orden de un listado"""
+    ASC = "asc"
+    DESC = "desc"
+
+
+@strawberry.type
+class PageInfo:
+    """Paginación de una conexión (usar end_cursor como `after` de la siguiente página)"""
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str] = None
+    end_cursor: Optional[str] = None
+
+
+@strawberry.type
+class Edge(Generic[T]):
+    """Fila de una conexión; `cursor` como `after` continúa desde la fila siguiente"""
+    cursor: str
+    node: T
+
+
+@strawberry.type
+class Connection(Generic[T]):
+    """Página de un listado: filas, paginación y total de filas que cumplen el filtro"""
+    edges: List[Edge[T]]
+    page_info: PageInfo
+    total_count: int
+
+
+# ======================= Conversión de valores para filtros y orden =======================
+
+def as_number(value: Any) -> Optional[float]:
+    """Montos y cantidades (el API manda los DECIMAL como string)"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def as_datetime(value: Any) -> Optional[datetime]:
+    """ISO-8601 -> datetime sin zona (hora local del string, igual que OrderStore)"""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def as_text(value: Any) -> Optional[str]:
+    """Textos sin distinguir mayúsculas"""
+    return fold(value) if isinstance(value, str) else None
+
+
+def as_id(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def day_start(day: Optional[date]) -> Optional[datetime]:
+    return None if day is None else datetime.combine(day, time.min)
+
+
+def day_end(day: Optional[date]) -> Optional[datetime]:
+    return None if day is None else datetime.combine(day, time.max)
+
+
+def text_search(keys: Iterable[str], text: str) -> Callable[[Any], bool]:
+    """Predicado: `text` aparece (sin distinguir mayúsculas) en alguno de los campos"""
+    keys = tuple(keys)
+    needle = fold(text)
+
+    def matches(row: Any) -> bool:
+        for key in keys:
+            value = row.get(key)
+            if isinstance(value, str) and needle in fold(value):
+                return True
+        return False
+
+    return matches
+
+
+def upstream_params(path: str, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Query params con los filtros que el endpoint aplica por su cuenta (solo valores simples)"""
+    if not config.UPSTREAM_FILTER_PUSHDOWN:
+        return None
+    supported = config.UPSTREAM_FILTER_PARAMS.get(path, ())
+    params = {
+        name: value
+        for name, value in filters.items()
+        if name in supported and value is not None and value != "" and not isinstance(value, (list, tuple, set))
+    }
+    return params or None
+
+
+# ======================= Selección =======================
+
+class ListingQuery:
+    """
+    Filtros de un listado combinados con AND. Los filtros indexados aportan
+    posiciones candidatas; los predicados por fila se evalúan solo sobre la
+    intersección.
+    """
+
+    def __init__(self, rows: List[Any]):
+        self.rows = rows
+        self._candidates: List[List[int]] = []
+        self._predicates: List[Callable[[Any], bool]] = []
+
+    def equals(self, key: str, values: Any) -> "ListingQuery":
+        """Filas cuyo `key` es alguno de `values` (None o lista vacía = sin filtro)"""
+        if values is None:
+            return self
+        if isinstance(values, (str, int, float)):
+            values = [values]
+        values = list(values)
+        if values:
+            self._candidates.append(group_index(self.rows, key).positions(values))
+        return self
+
+    def between(self, key: str, low: Any, high: Any, parse: Callable[[Any], Any]) -> "ListingQuery":
+        """Filas con low <= parse(row[key]) <= high (None = sin límite)"""
+        if low is not None or high is not None:
+            self._candidates.append(sorted_index(self.rows, key, parse).between(low, high))
+        return self
+
+    def within(self, positions: Iterable[int]) -> "ListingQuery":
+        """Posiciones resueltas por otro índice (p.ej. OrderStore.by_date)"""
+        self._candidates.append(sorted(positions))
+        return self
+
+    def where(self, predicate: Callable[[Any], bool]) -> "ListingQuery":
+        self._predicates.append(predicate)
+        return self
+
+    def positions(self) -> Optional[List[int]]:
+        """Posiciones ascendentes que cumplen todos los filtros (None = sin filtros)"""
+        if not self._candidates and not self._predicates:
+            return None
+        if self._candidates:
+            candidates = sorted(self._candidates, key=len)
+            selected = candidates[0]
+            for other in candidates[1:]:
+                if not selected:
+                    break
+                keep = set(other)
+                selected = [position for position in selected if position in keep]
+        else:
+            selected = range(len(self.rows))
+        rows = self.rows
+        for predicate in self._predicates:
+            selected = [position for position in selected if predicate(rows[position])]
+        return list(selected)
+
+
+# ======================= Páginas =======================
+
+class ListingPage(Generic[T]):
+    """Filas decodificadas de una página + datos para la conexión"""
+
+    def __init__(self, items: List[Tuple[int, T]], total: int, offset: int, size: int):
+        # (lugar en el resultado completo, type Strawberry)
+        self.items = items
+        self.total = total
+        self.offset = offset
+        # Filas de la ventana antes de decodificar (las inválidas no llegan a items)
+        self.size = size
+
+    @classmethod
+    def empty(cls, offset: int = 0) -> "ListingPage[T]":
+        return cls([], total=0, offset=offset, size=0)
+
+    @property
+    def nodes(self) -> List[T]:
+        return [node for _, node in self.items]
+
+    def connection(self) -> Connection[T]:
+        # El cursor de un edge apunta a la fila siguiente: `after` continúa desde ahí
+        edges = [Edge(cursor=encode_cursor(place + 1), node=node) for place, node in self.items]
+        end = self.offset + self.size
+        return Connection(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=end < self.total,
+                has_previous_page=self.offset > 0,
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=encode_cursor(end) if self.size else None,
+            ),
+            total_count=self.total,
+        )
+
+
+def page_size(limit: Optional[int]) -> Optional[int]:
+    """Tamaño de página acotado a LIST_MAX_PAGE_SIZE (None = sin límite)"""
+    if limit is None:
+        return None
+    if limit < 0:
+        raise ValueError("El tamaño de página no puede ser negativo")
+    return min(limit, config.LIST_MAX_PAGE_SIZE)
+
+
+def paginate_rows(
+    decoder: RowDecoder[T],
+    rows: List[Any],
+    selected: Optional[List[int]],
+    offset: int = 0,
+    limit: Optional[int] = None,
+    sort: Any = None,
+    parsers: Optional[Dict[str, Callable[[Any], Any]]] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ListingPage[T]:
+    """
+    Página [offset, offset + limit) de las filas seleccionadas (None = todas), en
+    el orden del API o según `sort` (input con `field` y `direction`). El orden
+    sale del índice ordenado del listado; con pocos candidatos basta un heap de
+    offset + limit elementos. `fields`: campos pedidos (ver RowDecoder).
+    """
+    if offset < 0:
+        raise ValueError("offset no puede ser negativo")
+    limit = page_size(limit)
+    total = len(rows) if selected is None else len(selected)
+    stop = None if limit is None else offset + limit
+
+    if sort is None:
+        window = (range(len(rows)) if selected is None else selected)[offset:stop]
+    else:
+        key = sort.field.value
+        index = sorted_index(rows, key, (parsers or {}).get(key, as_text))
+        descending = sort.direction == SortDirection.DESC
+        if selected is None:
+            window = index.order(descending)[offset:stop]
+        elif stop is not None and stop < len(selected):
+            window = heapq.nsmallest(stop, selected, key=index.rank(descending).__getitem__)[offset:]
+        else:
+            window = sorted(selected, key=index.rank(descending).__getitem__)[offset:stop]
+
+    window = list(window)
+    decoded = decoder.decode_indexed([rows[position] for position in window], fields)
+    return ListingPage([(offset + place, node) for place, node in decoded], total, offset, len(window))
@@ -0,0 +1,70 @@
+# app/common/lookahead.py
+"""
+🔭 LOOKAHEAD DEL SELECTION SET
+Permite a un resolver saber qué subcampos pidió el cliente antes de calcularlos,
+siguiendo fragments e inline fragments y respetando @skip / @include.
+- selected_field_names: nombres del primer nivel
+- selection_tree: árbol completo {campo: {subcampos}} (los alias del mismo campo se unen)
+"""
+from typing import Dict, Iterable, List, Set
+
+from strawberry.types import Info
+from strawberry.types.nodes import FragmentSpread, InlineFragment, SelectedField
+
+
+def _is_included(selection) -> bool:
+    directives = getattr(selection, "directives", None) or {}
+    if directives.get("skip", {}).get("if") is True:
+        return False
+    if directives.get("include", {}).get("if") is False:
+        return False
+    return True
+
+
+def _field_names(selections: Iterable) -> List[str]:
+    names: List[str] = []
+    for selection in selections:
+        if not _is_included(selection):
+            continue
+        if isinstance(selection, SelectedField):
+            names.append(selection.name)
+        elif isinstance(selection, (FragmentSpread, InlineFragment)):
+            names.extend(_field_names(selection.selections))
+    return names
+
+
+def selected_field_names(info: Info) -> Set[str]:
+    """Nombres de los subcampos pedidos en el campo que se está resolviendo"""
+    names: Set[str] = set()
+    for field in info.selected_fields:
+        if _is_included(field):
+            names.update(_field_names(field.selections))
+    return names
+
+
+SelectionTree = Dict[str, "SelectionTree"]
+
+
+def _merge_tree(tree: SelectionTree, selections: Iterable) -> SelectionTree:
+    for selection in selections:
+        if not _is_included(selection):
+            continue
+        if isinstance(selection, SelectedField):
+            _merge_tree(tree.setdefault(selection.name, {}), selection.selections)
+        elif isinstance(selection, (FragmentSpread, InlineFragment)):
+            _merge_tree(tree, selection.selections)
+    return tree
+
+
+def selection_tree(info: Info, *path: str) -> SelectionTree:
+    """
+    Subcampos pedidos en el campo que se está resolviendo, como árbol.
+    `path` baja por el árbol: selection_tree(info, "edges", "node") en una conexión.
+    """
+    tree: SelectionTree = {}
+    for field in info.selected_fields:
+        if _is_included(field):
+            _merge_tree(tree, field.selections)
+    for name in path:
+        tree = tree.get(name, {})
+    return tree
@@ -0,0 +1,229 @@
+# app/common/offload.py
+"""
+🧵 KERNELS EN UN POOL DE PROCESOS
+Las agregaciones pesadas (rollup completo, actividad de clientes, ventas por
+producto) son kernels NumPy puros (app/reports/kernels.py). Corridos en el
+event loop bloquean a todos los requests del worker mientras duran; con
+run_kernel corren en un pool de procesos y el loop sigue atendiendo.
+- Las columnas no viajan pickleadas: se copian a un bloque de
+  multiprocessing.shared_memory y el worker recibe solo el nombre del bloque y
+  el layout (dtype, forma, offset) y arma vistas sin copia.
+- Las columnas de un store se publican una vez por store (se liberan cuando el
+  store deja de usarse); los arreglos propios de la llamada van en un bloque
+  temporal que se libera al terminar.
+- Modo automático por tamaño: con menos de REPORT_OFFLOAD_MIN_ROWS filas el
+  kernel corre en el loop (copiar y despachar cuesta más que calcular).
+  REPORT_OFFLOAD_MODE=inline|process fuerza un modo.
+- Si el pool o la memoria compartida fallan, el kernel corre en el loop.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+import weakref
+
+import numpy as np
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+# Alineación de cada arreglo dentro del bloque compartido
+_ALIGN = 64
+
+# (nombre del bloque, ((nombre, dtype, forma, offset), ...))
+Descriptor = Tuple[str, Tuple[Tuple[str, str, Tuple[int, ...], int], ...]]
+
+
+def _release(block: SharedMemory) -> None:
+    block.close()
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class SharedArrays:
+    """Arreglos copiados a un bloque de memoria compartida (se libera con close() o al recolectarse)"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        layout = []
+        offset = 0
+        for name, array in arrays.items():
+            offset = -(-offset // _ALIGN) * _ALIGN
+            layout.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        self._block = SharedMemory(create=True, size=max(offset, 1))
+        for (name, dtype, shape, start), array in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=self._block.buf, offset=start)[...] = array
+        self.nbytes = offset
+        self.descriptor: Descriptor = (self._block.name, tuple(layout))
+        self._finalizer = weakref.finalize(self, _release, self._block)
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+# Columnas ya publicadas por dueño (store): se liberan junto con el dueño
+_published: "weakref.WeakKeyDictionary[Any, Dict[Tuple[str, ...], SharedArrays]]" = weakref.WeakKeyDictionary()
+
+
+def publish(owner: Any, arrays: Dict[str, np.ndarray]) -> SharedArrays:
+    """Bloque compartido con las columnas de `owner` (se crea una vez por dueño y juego de columnas)"""
+    blocks = _published.setdefault(owner, {})
+    key = tuple(arrays)
+    shared = blocks.get(key)
+    if shared is None:
+        shared = blocks[key] = SharedArrays(arrays)
+        weakref.finalize(owner, shared.close)
+    return shared
+
+
+class KernelCall(NamedTuple):
+    """Un kernel con sus entradas: columnas de stores, arreglos propios y parámetros simples"""
+    kernel: Callable[..., Any]
+    # (dueño, columnas): se publican una vez por dueño y se reutilizan entre llamadas
+    columns: Tuple[Tuple[Any, Dict[str, np.ndarray]], ...] = ()
+    # Arreglos de esta llamada (posiciones seleccionadas, mapeos chicos)
+    arrays: Optional[Dict[str, np.ndarray]] = None
+    params: Optional[Dict[str, Any]] = None
+
+    def inline(self) -> Any:
+        """Corre el kernel en este proceso"""
+        inputs: Dict[str, Any] = {}
+        for _, columns in self.columns:
+            inputs.update(columns)
+        inputs.update(self.arrays or {})
+        return self.kernel(**inputs, **(self.params or {}))
+
+
+# ======================= Lado del worker =======================
+
+def _detach(value: Any) -> Any:
+    """Copia los arreglos del resultado que sean vistas (del bloque compartido o de otro arreglo)"""
+    if isinstance(value, np.ndarray):
+        return value.copy() if value.base is not None else value
+    if isinstance(value, dict):
+        return {key: _detach(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_detach(item) for item in value)
+    return value
+
+
+def _execute(kernel: Callable[..., Any], descriptors: List[Descriptor], params: Dict[str, Any]) -> Any:
+    """Corre en el worker: arma vistas sobre los bloques, ejecuta y suelta los bloques"""
+    blocks = [SharedMemory(name=name) for name, _ in descriptors]
+    try:
+        inputs = {
+            name: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+            for block, (_, layout) in zip(blocks, descriptors)
+            for name, dtype, shape, offset in layout
+        }
+        result = _detach(kernel(**inputs, **params))
+        # Las vistas tienen que desaparecer antes de cerrar los bloques
+        del inputs
+        return result
+    finally:
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # El traceback de un kernel que falló todavía referencia vistas: se suelta al recolectarse
+                pass
+
+
+def _warm_up() -> None:
+    """Importa los kernels y corre uno mínimo: el primer kernel real del worker no paga esa carga"""
+    from app.reports import kernels
+
+    kernels.group_rows(np.zeros(2, dtype=np.int64))
+
+
+# ======================= Pool =======================
+
+_pool: Optional[ProcessPoolExecutor] = None
+stats = {"inline": 0, "process": 0, "fallbacks": 0, "shared_bytes": 0}
+
+
+def offload_mode(size: int) -> str:
+    """'process' o 'inline' para un kernel que recorre `size` filas"""
+    mode = config.REPORT_OFFLOAD_MODE
+    if config.REPORT_OFFLOAD_WORKERS <= 0 or mode == "inline":
+        return "inline"
+    if mode == "process":
+        return "process"
+    return "process" if size >= config.REPORT_OFFLOAD_MIN_ROWS else "inline"
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: un fork del proceso con el loop y los hilos de httpx no es seguro
+        _pool = ProcessPoolExecutor(max_workers=config.REPORT_OFFLOAD_WORKERS, mp_context=get_context("spawn"))
+    return _pool
+
+
+async def run_kernel(call: KernelCall, size: int) -> Any:
+    """Resultado del kernel: en el pool de procesos o en el loop según offload_mode(size)"""
+    if offload_mode(size) == "inline":
+        stats["inline"] += 1
+        return call.inline()
+
+    temporary: Optional[SharedArrays] = None
+    try:
+        shared = [publish(owner, columns) for owner, columns in call.columns]
+        if call.arrays:
+            temporary = SharedArrays(call.arrays)
+            shared.append(temporary)
+        stats["shared_bytes"] = sum(block.nbytes for blocks in _published.values() for block in blocks.values())
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            _get_pool(), _execute, call.kernel, [block.descriptor for block in shared], call.params or {}
+        )
+        stats["process"] += 1
+        return result
+    except (OSError, BrokenProcessPool) as e:
+        logger.warning(f"⚠️ Pool de procesos no disponible ({e!r}): {call.kernel.__name__} corre en el loop")
+        stats["fallbacks"] += 1
+        _discard_pool()
+        return call.inline()
+    finally:
+        if temporary is not None:
+            temporary.close()
+
+
+def _discard_pool() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def start_offload() -> None:
+    """Levanta los workers de antemano (lifespan de la app) si algún modo puede usarlos"""
+    if config.REPORT_OFFLOAD_WORKERS <= 0 or config.REPORT_OFFLOAD_MODE == "inline":
+        return
+    pool = _get_pool()
+    for _ in range(config.REPORT_OFFLOAD_WORKERS):
+        pool.submit(_warm_up)
+    logger.info(
+        f"🧵 Pool de {config.REPORT_OFFLOAD_WORKERS} procesos para kernels "
+        f"(modo {config.REPORT_OFFLOAD_MODE}, desde {config.REPORT_OFFLOAD_MIN_ROWS} filas)"
+    )
+
+
+async def stop_offload() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+    for blocks in list(_published.values()):
+        for block in blocks.values():
+            block.close()
+
+
+def offload_stats() -> Dict[str, Any]:
+    return {"mode": config.REPORT_OFFLOAD_MODE, "workers": config.REPORT_OFFLOAD_WORKERS, **stats}
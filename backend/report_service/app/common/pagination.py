@@ -0,0 +1,154 @@
+# app/common/pagination.py
+"""
+📄 DESCARGA PAGINADA DEL REST API
+La primera página revela el total (extract_pagination_info); el resto de páginas
+se piden en paralelo con un tope de concurrencia. Dos modos:
+- fetch_all_pages: lista completa, en el orden del API
+- iter_pages: generador asíncrono que entrega cada página en cuanto llega (la
+  sincronización incremental de la réplica corta la descarga en la primera
+  página que no respeta la marca de agua)
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import math
+
+from app import config
+from app.common.http_client import get_upstream_client
+from app.common.utils import extract_data_from_response, extract_pagination_info
+
+logger = logging.getLogger(__name__)
+
+
+async def _get_page(path: str, params: Dict[str, Any], data_keys: Optional[list]) -> Tuple[List[dict], Optional[dict]]:
+    data = await get_upstream_client().get_json(path, params=params or None)
+    return extract_data_from_response(data, data_keys), extract_pagination_info(data)
+
+
+def _first_page_params(path: str, params: Optional[Dict[str, Any]], page_size: int) -> Dict[str, Any]:
+    first = dict(params or {})
+    # Solo los endpoints que sabemos paginados reciben limit en la primera llamada
+    if path in config.UPSTREAM_PAGINATED_ENDPOINTS:
+        first.setdefault("limit", page_size)
+    return first
+
+
+def _plan_remaining_pages(info: Optional[dict], first_rows: List[dict], page_size: int) -> Tuple[int, int]:
+    """
+    Devuelve (tamaño de página efectivo, número total de páginas).
+    total_pages = 0 significa "desconocido": se sigue página a página.
+    """
+    if info is None:
+        return page_size, 1
+    # El API puede recortar el limit pedido (ej: máximo 100 en /products)
+    effective_size = info["limit"] or len(first_rows) or page_size
+    if info["total_pages"] is not None:
+        return effective_size, max(info["total_pages"], 1)
+    if info["total"] is not None:
+        return effective_size, max(math.ceil(info["total"] / effective_size), 1)
+    return effective_size, 0
+
+
+def _page_params(params: Optional[Dict[str, Any]], page: int, size: int) -> Dict[str, Any]:
+    page_params = dict(params or {})
+    page_params["page"] = page
+    page_params["limit"] = size
+    return page_params
+
+
+async def iter_pages(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    *,
+    page_size: int = config.UPSTREAM_PAGE_SIZE,
+    max_concurrency: int = config.UPSTREAM_PAGE_CONCURRENCY,
+    data_keys: Optional[list] = None,
+) -> AsyncIterator[List[dict]]:
+    """
+    Entrega las filas página por página a medida que llegan (sin garantizar el orden
+    entre páginas). Como mucho `max_concurrency` páginas en vuelo a la vez, así la
+    memoria queda acotada aunque el consumidor sea más lento que el API.
+    """
+    first_rows, info = await _get_page(path, _first_page_params(path, params, page_size), data_keys)
+    yield first_rows
+
+    size, total_pages = _plan_remaining_pages(info, first_rows, page_size)
+    first_page = (info or {}).get("page") or 1
+
+    if total_pages == 0:
+        async for page_rows in _sequential_tail(path, params, info, first_rows, size, data_keys):
+            yield page_rows
+        return
+
+    pending_pages = iter(range(first_page + 1, first_page + total_pages))
+    in_flight: set = set()
+
+    def schedule_next() -> bool:
+        page = next(pending_pages, None)
+        if page is None:
+            return False
+        in_flight.add(asyncio.ensure_future(_get_page(path, _page_params(params, page, size), data_keys)))
+        return True
+
+    try:
+        for _ in range(max(max_concurrency, 1)):
+            if not schedule_next():
+                break
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                in_flight.discard(task)
+                rows, _ = task.result()
+                schedule_next()
+                yield rows
+    finally:
+        # Si el consumidor abandona el generador, no dejar peticiones colgadas
+        for task in in_flight:
+            task.cancel()
+
+
+async def fetch_all_pages(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    *,
+    page_size: int = config.UPSTREAM_PAGE_SIZE,
+    max_concurrency: int = config.UPSTREAM_PAGE_CONCURRENCY,
+    data_keys: Optional[list] = None,
+) -> List[dict]:
+    """Descarga todas las páginas (en paralelo, acotado) y las concatena en el orden del API"""
+    first_rows, info = await _get_page(path, _first_page_params(path, params, page_size), data_keys)
+    size, total_pages = _plan_remaining_pages(info, first_rows, page_size)
+    if total_pages == 1:
+        return first_rows
+
+    if total_pages == 0:
+        rows = list(first_rows)
+        async for page_rows in _sequential_tail(path, params, info, first_rows, size, data_keys):
+            rows.extend(page_rows)
+        return rows
+
+    first_page = info.get("page") or 1
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def bounded(page: int) -> List[dict]:
+        async with semaphore:
+            rows, _ = await _get_page(path, _page_params(params, page, size), data_keys)
+            return rows
+
+    pages = await asyncio.gather(*(bounded(page) for page in range(first_page + 1, first_page + total_pages)))
+    rows = list(first_rows)
+    for page_rows in pages:
+        rows.extend(page_rows)
+    logger.debug(f"📄 {path}: {len(rows)} filas en {total_pages} páginas")
+    return rows
+
+
+async def _sequential_tail(path, params, info, first_rows, size, data_keys) -> AsyncIterator[List[dict]]:
+    """Sin total conocido: seguir página a página hasta una incompleta"""
+    page, rows = (info or {}).get("page") or 1, first_rows
+    start = page
+    while len(rows) >= size > 0 and page - start < config.UPSTREAM_MAX_PAGES:
+        page += 1
+        rows, _ = await _get_page(path, _page_params(params, page, size), data_keys)
+        if rows:
+            yield rows
@@ -0,0 +1,115 @@
+# app/common/reference_data.py
+"""
+📚 DATASETS DE REFERENCIA
+Categorías, métodos de pago, vendedores y subcategorías cambian poco: se guardan
+en la caché del proceso (TTL + stale-while-revalidate) junto con su índice por id,
+así los reportes reciben el dict ya construido en lugar de la lista cruda.
+Con caché L2 configurada las filas se comparten entre réplicas: el índice se
+reconstruye al leerlas.
+"""
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional
+import logging
+
+from app import config
+from app.common.cache import TTLCache
+from app.common.http_client import request_key
+from app.common.pagination import fetch_all_pages
+from app.common.rows import compact_rows, is_row
+from app.common.shared_cache import CacheCodec, decode_rows, encode_rows
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceSpec(NamedTuple):
+    name: str
+    path: str
+    key: str
+
+
+REFERENCE_DATASETS: Dict[str, ReferenceSpec] = {
+    spec.name: spec
+    for spec in (
+        ReferenceSpec("categories", "/categories", "id_category"),
+        ReferenceSpec("payment_methods", "/payment-methods", "id_payment_method"),
+        ReferenceSpec("sellers", "/sellers", "id_seller"),
+        ReferenceSpec("subcategories", "/subcategories", "id_sub_category"),
+    )
+}
+_BY_PATH = {spec.path: spec for spec in REFERENCE_DATASETS.values()}
+
+
+class ReferenceDataset:
+    """Filas del dataset (compactas si COMPACT_ROWS) y su índice por clave primaria (no mutar: se comparten)"""
+    __slots__ = ("rows", "by_id")
+
+    def __init__(self, rows: List[dict], key: str):
+        self.rows = rows
+        self.by_id: Dict[Hashable, dict] = {
+            row[key]: row for row in rows if is_row(row) and key in row
+        }
+
+
+def _decode_dataset(key: Hashable, data: Dict[str, list]) -> ReferenceDataset:
+    """Dataset leído de L2 (key = request_key(name, params))"""
+    spec = REFERENCE_DATASETS[key[0]]
+    rows = decode_rows(data)
+    if config.COMPACT_ROWS:
+        rows = compact_rows(spec.name, rows)
+    return ReferenceDataset(rows, spec.key)
+
+
+_cache = TTLCache(
+    max_entries=config.REFERENCE_CACHE_MAX_ENTRIES,
+    name="reference",
+    codec=CacheCodec(lambda dataset: encode_rows(dataset.rows), _decode_dataset),
+)
+
+
+def reference_spec_for_path(path: str) -> Optional[ReferenceSpec]:
+    """Spec del dataset de referencia servido por `path` (None si no es cacheable)"""
+    if not config.REFERENCE_CACHE_ENABLED:
+        return None
+    return _BY_PATH.get(path)
+
+
+async def load_reference(
+    name: str,
+    params: Optional[Dict[str, Any]] = None,
+    data_keys: Optional[list] = None,
+) -> ReferenceDataset:
+    """Dataset de referencia desde la caché (lo descarga si no está o ya expiró)"""
+    spec = REFERENCE_DATASETS[name]
+
+    async def download() -> ReferenceDataset:
+        rows = await fetch_all_pages(spec.path, params, data_keys=data_keys or [spec.name, "data"])
+        if config.COMPACT_ROWS:
+            rows = compact_rows(spec.name, rows)
+        logger.info(f"📚 Dataset de referencia '{name}' cargado ({len(rows)} registros)")
+        return ReferenceDataset(rows, spec.key)
+
+    key = request_key(name, params)
+    return await _cache.get_or_load(
+        key,
+        download,
+        ttl=config.REFERENCE_CACHE_TTLS.get(name, 60.0),
+        stale_ttl=config.REFERENCE_CACHE_STALE_TTL,
+    )
+
+
+async def reference_index(name: str) -> Dict[Hashable, dict]:
+    """Índice id -> registro de un dataset de referencia"""
+    return (await load_reference(name)).by_id
+
+
+def invalidate_reference(name: Optional[str] = None) -> int:
+    """
+    Descarta un dataset de referencia (o todos si name es None).
+    Usar cuando se sabe que cambió en el REST API.
+    """
+    removed = _cache.invalidate_where(lambda key: name is None or key[0] == name)
+    logger.info(f"🧹 Caché de referencia invalidada: {name or 'todos'} ({removed} entradas)")
+    return removed
+
+
+def reference_cache_stats() -> Dict[str, Any]:
+    return {"entries": len(_cache), **_cache.stats}
@@ -0,0 +1,421 @@
+# app/common/replica.py
+"""
+🔁 RÉPLICA LOCAL DE ÓRDENES Y PRODUCT-ORDERS
+/orders y /product-orders crecen sin límite y antes se descargaban completos en
+cada reporte. Una tarea en segundo plano los carga una vez y después los
+mantiene al día; load_rows sirve la réplica en lugar de descargar.
+- Marca de agua: el mayor id conocido (las tablas no tienen updated_at). Cada
+  SYNC_INTERVAL_SECONDS se piden solo las filas con id mayor
+  (query param SYNC_WATERMARK_PARAM) y se aplican como upserts.
+- Si la respuesta no es coherente con la marca de agua (ids ya conocidos, filas
+  sin id: el API ignoró el parámetro) se hace un resync completo y desde ahí
+  cada sincronización es completa, pero solo cada SYNC_FULL_ONLY_SECONDS (bajar
+  el listado entero cada SYNC_INTERVAL_SECONDS sería más carga que sin réplica);
+  en ese modo la réplica se sirve con un atraso de hasta ese intervalo más
+  SYNC_MAX_LAG_SECONDS. La respuesta se revisa página por página (iter_pages):
+  la primera página incoherente corta la descarga.
+- El id solo revela altas: cada SYNC_FULL_RESYNC_SECONDS un resync completo
+  absorbe cambios de estado y bajas.
+- Los cambios se publican copiando la lista (copy-on-write): quien ya tiene las
+  filas no las ve cambiar y los índices por listado (joins, OrderStore, rollup)
+  se reconstruyen solo cuando algo cambió.
+- Cada sincronización que cambia filas avisa a los listeners (on_replica_change)
+  con las posiciones cambiadas: app/events.py lleva el rollup y los rankings al
+  listado nuevo igual que con los eventos (un cambio de estado en un día sellado
+  se refleja sin esperar el rebuild completo).
+- Si la réplica no está lista o se atrasó más de SYNC_MAX_LAG_SECONDS, se
+  vuelve a descargar como antes.
+- Con caché L2 (app/common/shared_cache.py) los listados completos se comparten
+  entre contenedores por SYNC_INTERVAL_SECONDS: con varios contenedores el
+  REST API recibe una descarga completa por intervalo en total, no una por
+  contenedor, y uno recién levantado arranca con lo que otro ya descargó. Se
+  leen directo de L2 (sin L1): la réplica ya es la copia local.
+Las filas se guardan tal como llegan (las órdenes traen productOrders anidados).
+"""
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+import asyncio
+import contextvars
+import logging
+import time
+
+import httpx
+
+from app import config
+from app.common import shared_cache
+from app.common.pagination import fetch_all_pages, iter_pages
+from app.common.rows import is_row
+from app.common.shared_cache import decode_rows, encode_rows
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSpec(NamedTuple):
+    name: str
+    path: str
+    key: str
+
+
+REPLICATED_DATASETS: Dict[str, ReplicaSpec] = {
+    spec.name: spec
+    for spec in (
+        ReplicaSpec("orders", "/orders", "id_order"),
+        ReplicaSpec("product_orders", "/product-orders", "id_product_order"),
+    )
+}
+
+
+def _row_id(row: Any, key: str) -> Optional[int]:
+    if not is_row(row):
+        return None
+    value = row.get(key)
+    return value if type(value) is int else None
+
+
+class Replica:
+    """Copia local de un listado (no mutar `rows`: se comparte con los reportes)"""
+
+    def __init__(self, spec: ReplicaSpec):
+        self.spec = spec
+        self.rows: List[dict] = []
+        # id -> posición en rows
+        self._positions: Dict[Hashable, int] = {}
+        self.watermark: Optional[int] = None
+        self.synced_at: Optional[float] = None
+        self.full_synced_at: Optional[float] = None
+        # False después de una respuesta incoherente con la marca de agua
+        self.delta_supported = True
+        self.last_error: Optional[str] = None
+        self.stats = {"full_syncs": 0, "delta_syncs": 0, "resyncs": 0, "upserts": 0, "deletes": 0, "errors": 0, "reads": 0, "shared_loads": 0}
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.synced_at is not None
+
+    def lag(self) -> Optional[float]:
+        """Segundos desde la última sincronización exitosa (None si nunca sincronizó)"""
+        return None if self.synced_at is None else time.monotonic() - self.synced_at
+
+    def max_lag(self) -> float:
+        """Atraso con el que todavía se sirve la réplica (más largo si solo hay sincronizaciones completas)"""
+        if self.delta_supported:
+            return config.SYNC_MAX_LAG_SECONDS
+        return config.SYNC_FULL_ONLY_SECONDS + config.SYNC_MAX_LAG_SECONDS
+
+    def sync_due(self) -> bool:
+        """Sin marca de agua confiable se sincroniza solo cada SYNC_FULL_ONLY_SECONDS"""
+        if self.delta_supported or not self.ready:
+            return True
+        return time.monotonic() - self.full_synced_at >= config.SYNC_FULL_ONLY_SECONDS
+
+    def needs_full_sync(self) -> bool:
+        return (
+            not self.ready
+            or not self.delta_supported
+            or self.watermark is None
+            or (
+                config.SYNC_FULL_RESYNC_SECONDS > 0
+                and time.monotonic() - self.full_synced_at >= config.SYNC_FULL_RESYNC_SECONDS
+            )
+        )
+
+    # ------------------------------------------------------------ aplicar cambios
+
+    def replace_all(self, rows: List[dict]) -> List[int]:
+        """
+        Toma un listado completo como nuevo estado. Las filas iguales conservan el
+        objeto anterior; si no cambió nada se mantiene la misma lista.
+        Devuelve las posiciones del listado nuevo cuya fila no es la misma que
+        tenía esa posición (altas, modificaciones y filas corridas por una baja).
+        """
+        key, old_rows, old_positions = self.spec.key, self.rows, self._positions
+        merged: List[dict] = []
+        positions: Dict[Hashable, int] = {}
+        changed = 0
+        for row in rows:
+            row_id = _row_id(row, key)
+            if row_id is not None:
+                if row_id in positions:
+                    continue
+                previous = old_positions.get(row_id)
+                if previous is not None and old_rows[previous] == row:
+                    row = old_rows[previous]
+                else:
+                    changed += 1
+                positions[row_id] = len(merged)
+            # Las filas sin id se conservan: el decoder las descarta y las cuenta
+            merged.append(row)
+        deleted = sum(1 for row_id in old_positions if row_id not in positions)
+
+        moved = [
+            position for position, row in enumerate(merged)
+            if position >= len(old_rows) or row is not old_rows[position]
+        ]
+        if moved or len(merged) != len(old_rows):
+            self.rows, self._positions = merged, positions
+        self.watermark = max(positions, default=None)
+        self.stats["upserts"] += changed
+        self.stats["deletes"] += deleted
+        return moved
+
+    def upsert(self, rows: List[dict]) -> List[int]:
+        """Inserta o reemplaza filas por id; devuelve las posiciones que cambiaron"""
+        key = self.spec.key
+        merged: Optional[List[dict]] = None
+        positions = self._positions
+        changed: Dict[int, None] = {}
+        for row in rows:
+            row_id = _row_id(row, key)
+            if row_id is None:
+                continue
+            position = positions.get(row_id)
+            current = self.rows if merged is None else merged
+            if position is not None and current[position] == row:
+                continue
+            if merged is None:
+                merged, positions = list(self.rows), dict(self._positions)
+            if position is None:
+                position = positions[row_id] = len(merged)
+                merged.append(row)
+            else:
+                merged[position] = row
+            changed[position] = None
+            if self.watermark is None or row_id > self.watermark:
+                self.watermark = row_id
+        if merged is not None:
+            self.rows, self._positions = merged, positions
+        self.stats["upserts"] += len(changed)
+        return list(changed)
+
+    def position(self, row_id: Hashable) -> Optional[int]:
+        return self._positions.get(row_id)
+
+    def get(self, row_id: Hashable) -> Optional[dict]:
+        position = self._positions.get(row_id)
+        return None if position is None else self.rows[position]
+
+    def _delta_problem(self, rows: List[dict]) -> Optional[str]:
+        """Motivo por el que una respuesta incremental no es confiable (None = coherente)"""
+        for row in rows:
+            row_id = _row_id(row, self.spec.key)
+            if row_id is None:
+                return f"fila sin {self.spec.key}"
+            if row_id <= self.watermark:
+                return f"id {row_id} <= marca de agua {self.watermark}"
+        return None
+
+    # ------------------------------------------------------------ sincronización
+
+    async def _download(self) -> List[dict]:
+        return await fetch_all_pages(self.spec.path, data_keys=[self.spec.name, "data"])
+
+    async def _download_delta(self) -> Tuple[List[dict], Optional[str]]:
+        """
+        Filas posteriores a la marca de agua y el motivo si la respuesta no es
+        confiable. Se revisa cada página al llegar: la primera incoherente corta
+        la descarga (y cancela las páginas en vuelo) en vez de bajar el resto.
+        """
+        params = {config.SYNC_WATERMARK_PARAM: self.watermark}
+        rows: List[dict] = []
+        pages = iter_pages(self.spec.path, params, data_keys=[self.spec.name, "data"])
+        try:
+            async for page in pages:
+                problem = self._delta_problem(page)
+                if problem is not None:
+                    return rows, problem
+                rows.extend(page)
+        finally:
+            await pages.aclose()
+        # Las páginas llegan en cualquier orden: las altas quedan en el orden de sus ids
+        rows.sort(key=lambda row: row[self.spec.key])
+        return rows, None
+
+    async def _download_full(self) -> Tuple[List[dict], float]:
+        """Listado completo y su antigüedad en segundos (> 0 si lo descargó otro contenedor)"""
+        backend = shared_cache.get_backend()
+        if backend is None:
+            return await self._download(), 0.0
+        key = f"{config.CACHE_L2_PREFIX}:replica:{self.spec.name}"
+        values = await shared_cache.call(backend.mget([key]))
+        if values is not None and values[0] is not None:
+            try:
+                envelope = shared_cache.unpack(values[0])
+                age = max(time.time() - envelope["at"], 0.0)
+                if age < envelope["ttl"]:
+                    rows = decode_rows(envelope["v"])
+                    shared_cache.stats["hits"] += 1
+                    self.stats["shared_loads"] += 1
+                    return rows, age
+            except (KeyError, TypeError, ValueError) as e:
+                shared_cache.stats["errors"] += 1
+                logger.warning(f"⚠️ Réplica {self.spec.name}: listado L2 ilegible: {e!r}")
+        shared_cache.stats["misses"] += 1
+
+        rows = await self._download()
+        interval = config.SYNC_INTERVAL_SECONDS if self.delta_supported else config.SYNC_FULL_ONLY_SECONDS
+        ttl = max(interval, 0.1)
+        data = shared_cache.pack(encode_rows(rows), time.time(), ttl, 0.0, 0)
+        if await shared_cache.call(backend.set(key, data, ttl), default=False) is not False:
+            shared_cache.stats["writes"] += 1
+        return rows, 0.0
+
+    def _notify(self, previous: List[dict], positions: List[int]) -> None:
+        if self.rows is previous:
+            return
+        for listener in _listeners:
+            listener(self.spec.name, previous, self.rows, positions)
+
+    async def _full_sync(self) -> None:
+        started = time.perf_counter()
+        rows, age = await self._download_full()
+        previous = self.rows
+        positions = self.replace_all(rows)
+        # Leído de L2: los datos tienen la antigüedad de la descarga original
+        self.synced_at = self.full_synced_at = time.monotonic() - age
+        self.stats["full_syncs"] += 1
+        if self.rows is not previous:
+            logger.info(
+                f"🔁 Réplica {self.spec.name}: sincronización completa, {len(positions)} posiciones cambiadas "
+                f"({len(previous)} -> {len(self.rows)} filas, {(time.perf_counter() - started) * 1000:.1f} ms)"
+            )
+        self._notify(previous, positions)
+
+    async def _delta_sync(self) -> None:
+        rows, problem = await self._download_delta()
+        if problem is not None:
+            logger.warning(
+                f"⚠️ Réplica {self.spec.name}: respuesta incremental incoherente ({problem}); "
+                f"resync completo, en adelante solo sincronizaciones completas cada {config.SYNC_FULL_ONLY_SECONDS}s"
+            )
+            self.delta_supported = False
+            self.stats["resyncs"] += 1
+            await self._full_sync()
+            return
+        previous = self.rows
+        positions = self.upsert(rows)
+        self.synced_at = time.monotonic()
+        self.stats["delta_syncs"] += 1
+        if positions:
+            logger.info(f"🔁 Réplica {self.spec.name}: {len(positions)} filas nuevas (marca de agua {self.watermark})")
+        self._notify(previous, positions)
+
+    async def sync(self, force: bool = False) -> None:
+        """
+        Una sincronización (completa o incremental) si toca o si `force`; los
+        errores quedan en last_error
+        """
+        async with self._lock:
+            if not force and not self.sync_due():
+                return
+            try:
+                if self.needs_full_sync():
+                    await self._full_sync()
+                else:
+                    await self._delta_sync()
+                self.last_error = None
+            except (httpx.HTTPError, ValueError) as e:
+                self.stats["errors"] += 1
+                self.last_error = str(e)
+                logger.error(f"❌ Error sincronizando réplica {self.spec.name}: {e}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        lag = self.lag()
+        return {
+            "ready": self.ready,
+            "rows": len(self.rows),
+            "watermark": self.watermark,
+            "lag_seconds": None if lag is None else round(lag, 3),
+            "incremental": self.delta_supported,
+            "last_error": self.last_error,
+            **self.stats,
+        }
+
+
+# (dataset, filas anteriores, filas nuevas, posiciones cambiadas) tras cada sincronización con cambios
+ReplicaListener = Callable[[str, List[dict], List[dict], List[int]], None]
+_listeners: List[ReplicaListener] = []
+
+_replicas: Dict[str, Replica] = {name: Replica(spec) for name, spec in REPLICATED_DATASETS.items()}
+_BY_PATH = {replica.spec.path: replica for replica in _replicas.values()}
+_task: Optional[asyncio.Task] = None
+_wake: Optional[asyncio.Event] = None
+# request_sync pidió sincronizar aunque no toque (solo sincronizaciones completas)
+_forced = False
+
+
+def get_replica(name: str) -> Replica:
+    return _replicas[name]
+
+
+def on_replica_change(listener: ReplicaListener) -> None:
+    """Registra quien mantiene agregados sobre las réplicas (se llama sin await, en el loop)"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def replica_rows(path: str, params: Optional[Dict[str, Any]] = None) -> Optional[List[dict]]:
+    """Filas de la réplica de `path` si está lista y al día (None = descargar)"""
+    if not config.SYNC_ENABLED or params:
+        return None
+    replica = _BY_PATH.get(path)
+    if replica is None or not replica.ready or replica.lag() > replica.max_lag():
+        return None
+    replica.stats["reads"] += 1
+    return replica.rows
+
+
+async def sync_all(force: bool = False) -> None:
+    await asyncio.gather(*(replica.sync(force) for replica in _replicas.values()))
+
+
+async def _run() -> None:
+    global _wake, _forced
+    _wake = asyncio.Event()
+    while True:
+        _wake.clear()
+        force, _forced = _forced, False
+        try:
+            await sync_all(force)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Un error inesperado (filas con otra forma, un listener) no detiene la tarea
+            logger.error(f"❌ Error en la sincronización de réplicas: {e!r}")
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=max(config.SYNC_INTERVAL_SECONDS, 0.1))
+        except asyncio.TimeoutError:
+            pass
+
+
+def request_sync() -> None:
+    """Adelanta la próxima sincronización (p.ej. llegó un evento de una orden desconocida)"""
+    global _forced
+    _forced = True
+    if _wake is not None:
+        _wake.set()
+
+
+def start_sync() -> None:
+    """Arranca la tarea de sincronización (lifespan de la app)"""
+    global _task
+    if not config.SYNC_ENABLED or (_task is not None and not _task.done()):
+        return
+    # Contexto vacío: la tarea no pertenece a ningún request
+    _task = asyncio.get_running_loop().create_task(_run(), context=contextvars.Context())
+    logger.info(f"🔁 Sincronización de réplicas cada {config.SYNC_INTERVAL_SECONDS}s: {', '.join(_replicas)}")
+
+
+async def stop_sync() -> None:
+    global _task
+    task, _task = _task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def replica_stats() -> Dict[str, Any]:
+    return {name: replica.as_dict() for name, replica in _replicas.items()}
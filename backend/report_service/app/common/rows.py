@@ -0,0 +1,157 @@
+# app/common/rows.py
+"""
+🧱 FILAS COMPACTAS PARA LISTADOS EN CACHÉ
+Un dict por fila repite la tabla hash completa (~650 bytes para 14 claves) en
+cada registro. Las filas compactas guardan los valores en `__slots__` (sin
+__dict__) e internan los textos repetidos (estado, tipo de entrega, ciudad, ...),
+así el mismo string se comparte entre todas las filas.
+Exponen la interfaz de lectura de dict que usan reportes, índices y DataLoaders
+(`row["k"]`, `row.get("k")`, `"k" in row`): cualquier caché puede guardar
+filas compactas en lugar de dicts sin cambiar a sus consumidores.
+Las claves que no figuran en `__slots__` se descartan.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+import sys
+
+
+class CompactRow:
+    """
+    Registro de solo lectura. Un slot sin asignar equivale a una clave ausente
+    en el dict original (KeyError, get() -> default, `in` -> False).
+    """
+    __slots__ = ()
+    # Campos cuyos valores se repiten mucho entre filas: se internan
+    interned: frozenset = frozenset()
+
+    @classmethod
+    def from_dict(cls, row: dict) -> "CompactRow":
+        obj = object.__new__(cls)
+        plain, interned = cls._plain_setters, cls._interned_setters
+        for key, value in row.items():
+            setter = plain.get(key)
+            if setter is not None:
+                setter(obj, value)
+                continue
+            setter = interned.get(key)
+            if setter is not None:
+                setter(obj, sys.intern(value) if type(value) is str else value)
+        return obj
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Descriptores de los slots, resueltos una vez por clase
+        setters = {name: getattr(cls, name).__set__ for name in cls.__slots__}
+        cls._plain_setters = {name: setter for name, setter in setters.items() if name not in cls.interned}
+        cls._interned_setters = {name: setter for name, setter in setters.items() if name in cls.interned}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key in self.__slots__ and hasattr(self, key)
+
+    def keys(self) -> Iterator[str]:
+        return (name for name in self.__slots__ if hasattr(self, name))
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.keys()}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class OrderRow(CompactRow):
+    __slots__ = (
+        "id_order", "order_date", "status", "total_amount", "delivery_type", "id_client",
+        "id_cart", "id_payment_method", "id_delivery", "payment_receipt_url",
+        "payment_verified_at", "transaction_id", "payment_status", "payment_error",
+    )
+    interned = frozenset({"status", "delivery_type", "payment_status"})
+
+
+class ProductRow(CompactRow):
+    __slots__ = (
+        "id_product", "id_seller", "id_inventory", "id_category", "id_sub_category",
+        "product_name", "description", "price", "stock", "image_url", "status", "created_at",
+    )
+    interned = frozenset({"status"})
+
+
+class ClientRow(CompactRow):
+    __slots__ = (
+        "id_client", "client_name", "client_email", "address", "phone", "document_type",
+        "document_number", "birth_date", "avatar_url", "additional_addresses", "created_at",
+    )
+    interned = frozenset({"document_type"})
+
+
+class DeliveryRow(CompactRow):
+    __slots__ = (
+        "id_delivery", "id_product", "delivery_address", "city", "status",
+        "estimated_time", "delivery_person", "delivery_cost", "phone",
+    )
+    interned = frozenset({"city", "status", "delivery_person"})
+
+
+class ProductOrderRow(CompactRow):
+    __slots__ = (
+        "id_product_order", "id_order", "id_product", "price_unit", "subtotal",
+        "created_at", "rating", "review_comment", "reviewed_at",
+    )
+
+
+class SellerRow(CompactRow):
+    __slots__ = (
+        "id_seller", "seller_name", "seller_email", "phone", "bussines_name",
+        "location", "created_at", "user_id",
+    )
+    interned = frozenset({"location"})
+
+
+class CategoryRow(CompactRow):
+    __slots__ = ("id_category", "category_name", "description", "photo")
+
+
+class SubCategoryRow(CompactRow):
+    __slots__ = ("id_sub_category", "id_category", "sub_category_name", "description")
+
+
+class PaymentMethodRow(CompactRow):
+    __slots__ = ("id_payment_method", "method_name", "details_payment")
+
+
+# Nombre del dataset -> tipo de fila compacta
+ROW_TYPES: Dict[str, Type[CompactRow]] = {
+    "orders": OrderRow,
+    "products": ProductRow,
+    "clients": ClientRow,
+    "deliveries": DeliveryRow,
+    "product_orders": ProductOrderRow,
+    "sellers": SellerRow,
+    "categories": CategoryRow,
+    "subcategories": SubCategoryRow,
+    "payment_methods": PaymentMethodRow,
+}
+
+
+def is_row(value: Any) -> bool:
+    """True para un registro del REST API (dict o fila compacta)"""
+    return isinstance(value, (dict, CompactRow))
+
+
+def compact_rows(dataset: str, rows: Iterable[Any]) -> List[Any]:
+    """Convierte un listado a filas compactas (sin cambios si el dataset no tiene tipo)"""
+    row_type: Optional[Type[CompactRow]] = ROW_TYPES.get(dataset)
+    if row_type is None:
+        return list(rows)
+    from_dict = row_type.from_dict
+    return [from_dict(row) if isinstance(row, dict) else row for row in rows]
@@ -0,0 +1,122 @@
+# app/common/seller_ids.py
+"""
+🪪 RESOLUCIÓN UUID (user_id) -> id_seller
+La relación entre el usuario de auth y su vendedor no cambia, así que se guarda
+en una caché LRU de larga duración. Los 404 también se recuerdan (poco tiempo)
+para no repetir búsquedas de UUID inexistentes.
+Para muchos UUID a la vez, una sola descarga de /sellers resuelve todos.
+Las búsquedas individuales se comparten entre réplicas por la caché L2.
+"""
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import logging
+
+import httpx
+
+from app import config
+from app.common.cache import TTLCache
+from app.common.http_client import get_upstream_client
+from app.common.reference_data import load_reference
+from app.common.shared_cache import CacheCodec
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+_cache = TTLCache(
+    max_entries=config.SELLER_ID_CACHE_MAX_ENTRIES,
+    name="seller_ids",
+    codec=CacheCodec(lambda seller_id: seller_id, lambda user_id, seller_id: seller_id),
+)
+
+
+def _ttl(seller_id: Optional[int]) -> float:
+    return config.SELLER_ID_CACHE_TTL if seller_id is not None else config.SELLER_ID_NEGATIVE_TTL
+
+
+async def _fetch_seller_id(user_id: str) -> Optional[int]:
+    try:
+        data = await get_upstream_client().get_json(f"/sellers/by-user/{user_id}")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return None
+        raise
+    if isinstance(data, dict) and "id_seller" in data:
+        return int(data["id_seller"])
+    raise ValueError(f"Invalid response format from /sellers/by-user: {data}")
+
+
+async def lookup_seller_id(user_id: str) -> Optional[int]:
+    """id_seller de un UUID de usuario, o None si no tiene vendedor asociado"""
+    return await _cache.get_or_load(user_id, lambda: _fetch_seller_id(user_id), ttl=_ttl)
+
+
+def remember_sellers(sellers: Iterable[dict]) -> int:
+    """Guarda en caché los pares user_id -> id_seller de un listado de vendedores"""
+    stored = 0
+    for seller in sellers:
+        try:
+            user_id, seller_id = seller.get("user_id"), int(seller["id_seller"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+        if user_id:
+            _cache.set(str(user_id), seller_id, ttl=config.SELLER_ID_CACHE_TTL)
+            stored += 1
+    return stored
+
+
+async def lookup_seller_ids(user_ids: Iterable[str]) -> Dict[str, Optional[int]]:
+    """
+    Resuelve varios UUID. Los que no están en caché se buscan con una sola
+    descarga de /sellers si son muchos, o con llamadas individuales acotadas si son pocos.
+    Un UUID cuya búsqueda falla (error HTTP) queda como None sin guardarse en caché.
+    """
+    result: Dict[str, Optional[int]] = {}
+    missing: List[str] = []
+    for user_id in dict.fromkeys(user_ids):
+        cached = _cache.get_fresh(user_id, _MISSING)
+        if cached is _MISSING:
+            missing.append(user_id)
+        else:
+            result[user_id] = cached
+
+    if len(missing) >= config.SELLER_ID_BATCH_THRESHOLD:
+        try:
+            remember_sellers((await load_reference("sellers")).rows)
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ No se pudo descargar /sellers para resolver UUIDs: {e}")
+        still_missing = []
+        for user_id in missing:
+            cached = _cache.get_fresh(user_id, _MISSING)
+            if cached is _MISSING:
+                still_missing.append(user_id)
+            else:
+                result[user_id] = cached
+        # El listado puede venir de caché: los que no aparecen se confirman uno a uno
+        missing = still_missing
+
+    semaphore = asyncio.Semaphore(max(config.SELLER_ID_LOOKUP_CONCURRENCY, 1))
+
+    async def bounded(user_id: str) -> Optional[int]:
+        async with semaphore:
+            try:
+                return await lookup_seller_id(user_id)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning(f"⚠️ No se pudo resolver el vendedor de {user_id}: {e}")
+                return None
+
+    for user_id, seller_id in zip(missing, await asyncio.gather(*(bounded(user_id) for user_id in missing))):
+        result[user_id] = seller_id
+    return result
+
+
+def forget_seller_id(user_id: Optional[str] = None) -> None:
+    """Invalida un UUID (o toda la caché si es None)"""
+    if user_id is None:
+        _cache.clear()
+    else:
+        _cache.invalidate(user_id)
+
+
+def seller_id_cache_stats() -> Dict[str, int]:
+    return {"entries": len(_cache), **_cache.stats}
@@ -0,0 +1,295 @@
+# app/common/shared_cache.py
+"""
+🧊 CACHÉ COMPARTIDA (L2) ENTRE RÉPLICAS DEL SERVICIO
+Con varios contenedores detrás del balanceador cada uno calentaba su propia
+copia de los datasets. Las TTLCache con `codec` (app/common/cache.py) usan este
+nivel compartido detrás de su L1 en memoria; la réplica de órdenes
+(app/common/replica.py) comparte por acá sus listados completos:
+- Backend opcional: Redis (el mismo que usa realtime_service) o uno en
+  memoria para pruebas (CACHE_L2_BACKEND).
+- Entradas serializadas con orjson (filas como tuplas de valores + claves una
+  sola vez) y comprimidas con zlib si superan CACHE_L2_COMPRESS_MIN_BYTES.
+- Cada entrada guarda cuándo se cargó y sus TTL: una réplica que la lee de L2
+  la considera fresca o vencida en el mismo momento que la que la cargó.
+- Las invalidaciones se publican por pub/sub y cada réplica descarta su L1;
+  un clear() sube la generación de la caché y las entradas viejas se ignoran.
+Un error del backend nunca falla una consulta: se sigue solo con L1.
+"""
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+import asyncio
+import contextvars
+import logging
+import time
+import zlib
+
+import orjson
+
+from app import config
+from app.common.rows import is_row
+
+logger = logging.getLogger(__name__)
+
+# Canal de invalidaciones entre réplicas
+CHANNEL = f"{config.CACHE_L2_PREFIX}:invalidate"
+
+
+class CacheCodec(NamedTuple):
+    """Cómo pasa un valor de la caché a JSON y de vuelta (decode recibe también la clave)"""
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any, Any], Any]
+
+
+class SharedEntry(NamedTuple):
+    value: Any
+    # Segundos desde que se cargó (según el reloj de la réplica que la cargó)
+    age: float
+    ttl: float
+    stale_ttl: float
+
+
+# ======================= Serialización =======================
+
+_RAW, _ZLIB = b"j", b"z"
+
+
+def pack(value: Any, stored_at: float, ttl: float, stale_ttl: float, generation: int) -> bytes:
+    payload = orjson.dumps({"v": value, "at": stored_at, "ttl": ttl, "stale": stale_ttl, "gen": generation})
+    if len(payload) >= config.CACHE_L2_COMPRESS_MIN_BYTES:
+        return _ZLIB + zlib.compress(payload, 1)
+    return _RAW + payload
+
+
+def unpack(data: bytes) -> dict:
+    header, payload = data[:1], data[1:]
+    return orjson.loads(zlib.decompress(payload) if header == _ZLIB else payload)
+
+
+def encode_rows(rows: List[Any]) -> Dict[str, list]:
+    """Filas (dicts o compactas) como tuplas de valores; cada juego de claves va una sola vez"""
+    layouts: Dict[tuple, int] = {}
+    encoded = []
+    for row in rows:
+        if not is_row(row):
+            # Se conservan tal cual (el decoder las descarta y las cuenta)
+            encoded.append([-1, row])
+            continue
+        keys = tuple(row.keys())
+        layout = layouts.setdefault(keys, len(layouts))
+        encoded.append([layout, *(row[key] for key in keys)])
+    return {"keys": [list(keys) for keys in layouts], "rows": encoded}
+
+
+def decode_rows(data: Dict[str, list]) -> List[dict]:
+    layouts = data["keys"]
+    return [row[1] if row[0] < 0 else dict(zip(layouts[row[0]], row[1:])) for row in data["rows"]]
+
+
+# ======================= Backends =======================
+
+class CacheBackend:
+    """Operaciones que necesita el nivel compartido (todas asíncronas)"""
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        raise NotImplementedError
+
+    async def listen(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        """Entrega cada mensaje del canal a `callback` hasta que se cancele"""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Backend en memoria (pruebas): varias TTLCache del mismo proceso lo comparten como si fueran réplicas"""
+
+    def __init__(self):
+        self._values: Dict[str, tuple] = {}
+        self._listeners: Dict[str, List[Callable[[bytes], None]]] = defaultdict(list)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        result = []
+        for key in keys:
+            value, expires_at = self._values.get(key, (None, None))
+            if expires_at is not None and expires_at <= now:
+                self._values.pop(key, None)
+                value = None
+            result.append(value)
+        return result
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._values[key] = (value, time.monotonic() + ttl)
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._values.get(key, (b"0", None))[0]) + 1
+        self._values[key] = (str(value).encode(), None)
+        return value
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for callback in list(self._listeners[channel]):
+            callback(message)
+
+    async def listen(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        self._listeners[channel].append(callback)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self._listeners[channel].remove(callback)
+
+
+class RedisBackend(CacheBackend):
+    """Redis vía redis.asyncio (paquete opcional `redis`)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url, password=config.CACHE_L2_PASSWORD or None)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._client.publish(channel, message)
+
+    async def listen(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    callback(message["data"])
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def _redis_available() -> bool:
+    try:
+        import redis.asyncio  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_backend(kind: str = config.CACHE_L2_BACKEND) -> Optional[CacheBackend]:
+    kind = (kind or "").strip().lower()
+    if kind in ("", "none", "off"):
+        return None
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "redis":
+        if not _redis_available():
+            logger.warning("⚠️ CACHE_L2_BACKEND=redis pero el paquete 'redis' no está instalado; solo caché L1")
+            return None
+        return RedisBackend(config.CACHE_L2_URL)
+    logger.warning(f"⚠️ CACHE_L2_BACKEND desconocido: {kind!r}; solo caché L1")
+    return None
+
+
+# ======================= Nivel compartido del proceso =======================
+
+_backend: Optional[CacheBackend] = None
+_listener: Optional[asyncio.Task] = None
+# Nombre de caché -> callbacks de invalidación (una TTLCache por nombre y proceso)
+_subscribers: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0, "invalidations_sent": 0, "invalidations_received": 0}
+
+
+def get_backend() -> Optional[CacheBackend]:
+    return _backend
+
+
+def subscribe(name: str, callback: Callable[[dict], None]) -> None:
+    """Registra la invalidación remota de una caché (mensajes {cache, key | clear})"""
+    _subscribers[name].append(callback)
+
+
+def _dispatch(data: bytes) -> None:
+    try:
+        message = orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return
+    # Cada TTLCache ignora los mensajes que publicó ella misma (campo origin)
+    for callback in _subscribers.get(message.get("cache"), ()):
+        callback(message)
+
+
+async def call(operation: Awaitable[Any], default: Any = None) -> Any:
+    """Ejecuta una operación del backend con timeout; un error se registra y devuelve `default`"""
+    try:
+        return await asyncio.wait_for(operation, timeout=config.CACHE_L2_TIMEOUT)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        stats["errors"] += 1
+        logger.warning(f"⚠️ Caché L2 no disponible: {e!r}")
+        return default
+
+
+def in_background(operation: Awaitable[Any]) -> None:
+    """Operación del backend sin esperar (escrituras e invalidaciones desde código síncrono)"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        operation.close()
+        return
+    loop.create_task(call(operation), context=contextvars.Context())
+
+
+async def start_shared_cache(backend: Optional[CacheBackend] = None) -> None:
+    """Conecta el nivel L2 (lifespan de la app); sin backend configurado no hace nada"""
+    global _backend, _listener
+    _backend = backend if backend is not None else create_backend()
+    if _backend is None:
+        return
+    _listener = asyncio.get_running_loop().create_task(
+        _backend.listen(CHANNEL, _dispatch), context=contextvars.Context()
+    )
+    logger.info(f"🧊 Caché L2 activa ({type(_backend).__name__})")
+
+
+async def stop_shared_cache() -> None:
+    global _backend, _listener
+    backend, listener = _backend, _listener
+    _backend, _listener = None, None
+    if listener is not None:
+        listener.cancel()
+        try:
+            await listener
+        except (asyncio.CancelledError, Exception):
+            pass
+    if backend is not None:
+        await call(backend.close())
+
+
+def shared_cache_stats() -> Dict[str, Any]:
+    return {"backend": type(_backend).__name__ if _backend is not None else None, **stats}
@@ -0,0 +1,69 @@
+# app/common/singleflight.py
+"""
+🛫 SINGLEFLIGHT: COALESCENCIA DE LLAMADAS IDÉNTICAS EN VUELO
+Si varias corrutinas piden la misma clave mientras la primera llamada sigue en
+curso, todas esperan ese mismo resultado (o error) en lugar de repetir la
+petición. No guarda nada: al terminar la llamada, la clave se libera.
+- Si un solicitante se cancela, los demás siguen esperando la misma llamada.
+- Si se cancelan todos, la llamada compartida también se cancela.
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Agrupa llamadas asíncronas concurrentes con la misma clave"""
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.stats = {"issued": 0, "coalesced": 0, "cancelled": 0}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Ejecuta fn() o se une a la llamada en vuelo con la misma clave.
+        Devuelve (resultado, coalesced) donde coalesced indica si se reutilizó otra llamada.
+        """
+        flight = self._flights.get(key)
+        coalesced = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._release(key, flight))
+            self.stats["issued"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            # shield: cancelar a un solicitante no cancela la llamada de los demás
+            return await asyncio.shield(flight.task), coalesced
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+                self.stats["cancelled"] += 1
+                logger.debug(f"🛫 [{self.name}] Llamada cancelada sin solicitantes: {key}")
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _release(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Evita "exception was never retrieved" si nadie quedó esperando
+        if not flight.task.cancelled():
+            flight.task.exception()
@@ -0,0 +1,396 @@
+# app/common/snapshots.py
+"""
+🗺️ SNAPSHOTS MAPEADOS EN MEMORIA ENTRE WORKERS
+Con varios workers de uvicorn cada proceso tenía su propia réplica de órdenes,
+sus propios almacenes columnares y calentaba todo por separado. Con
+SNAPSHOT_DIR configurado un solo proceso (el que toma el lock del directorio)
+sincroniza y publica generaciones de archivos; los demás las mapean de solo
+lectura y comparten las mismas páginas del page cache:
+- Una generación es un directorio gen-NNNNNNNN/ con un subdirectorio por
+  dataset: columnas .npy (almacenes columnares, np.load con mmap_mode="r"), las
+  filas serializadas con orjson en rows.bin + offsets.npy y meta.json.
+- Se escribe en un directorio temporal y se publica reemplazando CURRENT con
+  os.replace (atómico): un lector ve la generación anterior o la nueva, nunca
+  una a medias. Las generaciones viejas se borran; quien todavía las tiene
+  mapeadas las sigue leyendo (el archivo vive mientras esté mapeado).
+- SnapshotRows decodifica cada fila al leerla y no la guarda: los reportes que
+  trabajan sobre columnas no tocan las filas.
+- Un worker que arranca mapea la generación actual y sirve en caliente.
+Este módulo solo maneja archivos; qué se publica y cuándo lo decide
+app/snapshot_publisher.py.
+"""
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+import json
+import logging
+import mmap
+import os
+import shutil
+import time
+
+import numpy as np
+import orjson
+
+from app import config
+from app.common.rows import is_row
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock no hay forma segura de elegir un solo publicador
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CURRENT = "CURRENT"
+_LOCK = "publisher.lock"
+_INBOX = "inbox"
+_ROWS, _OFFSETS, _META, _COLUMNS = "rows.bin", "offsets.npy", "meta.json", "columns"
+
+
+class SnapshotSpec(NamedTuple):
+    name: str
+    path: str
+
+
+SNAPSHOT_DATASETS: Dict[str, SnapshotSpec] = {
+    spec.name: spec
+    for spec in (
+        SnapshotSpec("orders", "/orders"),
+        SnapshotSpec("product_orders", "/product-orders"),
+        SnapshotSpec("products", "/products"),
+        SnapshotSpec("clients", "/clients"),
+    )
+}
+_BY_PATH = {spec.path: spec for spec in SNAPSHOT_DATASETS.values()}
+
+
+class SnapshotDataset(NamedTuple):
+    """Lo que se publica de un dataset: filas, columnas de su almacén y metadatos (JSON)"""
+    rows: List[Any]
+    columns: Dict[str, np.ndarray]
+    meta: Dict[str, Any]
+
+
+def enabled() -> bool:
+    return bool(config.SNAPSHOT_DIR) and fcntl is not None
+
+
+# ======================= Lectura =======================
+
+class SnapshotRows(Sequence):
+    """
+    Filas de un dataset de la generación mapeada (no mutar). Cada acceso
+    decodifica la fila con orjson desde el archivo mapeado.
+    `columns` y `meta` traen el almacén columnar ya construido (ver order_store).
+    """
+
+    def __init__(self, name: str, directory: str, meta: Dict[str, Any]):
+        self.name = name
+        self.meta = meta
+        self.offsets = _load_array(os.path.join(directory, _OFFSETS))
+        self.columns: Dict[str, np.ndarray] = {
+            column: _load_array(os.path.join(directory, _COLUMNS, f"{column}.npy"))
+            for column in meta.get("columns", ())
+        }
+        with open(os.path.join(directory, _ROWS), "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            # mmap no acepta archivos vacíos
+            self._blob = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._view = memoryview(self._blob)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = self.offsets[index:index + 2].tolist()
+        return orjson.loads(self._view[start:end])
+
+    def __iter__(self) -> Iterator[Any]:
+        view, loads = self._view, orjson.loads
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield loads(view[start:end])
+
+    def __repr__(self) -> str:
+        return f"<SnapshotRows {self.name} ({len(self)} filas)>"
+
+
+def _load_array(path: str) -> np.ndarray:
+    # Vista ndarray sobre el memmap: los consumidores ven arreglos comunes de solo lectura
+    return np.load(path, mmap_mode="r", allow_pickle=False).view(np.ndarray)
+
+
+class Generation:
+    """Una generación publicada; los datasets se mapean la primera vez que se piden"""
+
+    def __init__(self, name: str, state: Dict[str, Any]):
+        self.name = name
+        self.directory = os.path.join(config.SNAPSHOT_DIR, name)
+        # dataset -> epoch (time.time()) de la última sincronización de sus datos
+        self.synced_at: Dict[str, float] = state.get("synced_at", {})
+        # dataset -> atraso máximo con el que se sirve (el de la réplica del publicador)
+        self.max_lag: Dict[str, float] = state.get("max_lag", {})
+        self._rows: Dict[str, Optional[SnapshotRows]] = {}
+
+    def rows(self, name: str) -> Optional[SnapshotRows]:
+        if name not in self._rows:
+            directory = os.path.join(self.directory, name)
+            try:
+                with open(os.path.join(directory, _META), "rb") as file:
+                    meta = json.load(file)
+                self._rows[name] = SnapshotRows(name, directory, meta)
+            except FileNotFoundError:
+                self._rows[name] = None
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ Snapshot {self.name}/{name} ilegible: {e}")
+                self._rows[name] = None
+        return self._rows[name]
+
+    def age(self, name: str) -> Optional[float]:
+        synced_at = self.synced_at.get(name)
+        return None if synced_at is None else time.time() - synced_at
+
+
+_current: Optional[Generation] = None
+_current_state: Optional[bytes] = None
+stats = {"generations_mapped": 0, "generations_published": 0, "reads": 0, "events_forwarded": 0}
+
+
+def _read_state() -> Optional[Dict[str, Any]]:
+    """Contenido de CURRENT ({generation, synced_at, max_lag}); None si no se publicó nada o no cambió"""
+    global _current_state
+    try:
+        with open(os.path.join(config.SNAPSHOT_DIR, CURRENT), "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    if data == _current_state:
+        return None
+    try:
+        state = json.loads(data)
+    except ValueError:
+        return None
+    _current_state = data
+    return state
+
+
+def refresh_current() -> Optional[Generation]:
+    """Relee CURRENT y cambia de generación si se publicó una nueva (barato si no cambió)"""
+    global _current
+    state = _read_state()
+    if state is None:
+        return _current
+    name = state.get("generation")
+    if _current is not None and _current.name == name:
+        _current.synced_at = state.get("synced_at", {})
+        _current.max_lag = state.get("max_lag", {})
+        return _current
+    if name and os.path.isdir(os.path.join(config.SNAPSHOT_DIR, name)):
+        _current = Generation(name, state)
+        stats["generations_mapped"] += 1
+        logger.info(f"🗺️ Snapshot {name} mapeado")
+    return _current
+
+
+def current_generation() -> Optional[Generation]:
+    return _current
+
+
+def snapshot_rows(path: str, params: Optional[Dict[str, Any]] = None) -> Optional[SnapshotRows]:
+    """Filas del snapshot de `path` si hay uno publicado y al día (None = seguir como antes)"""
+    if params or _current is None:
+        return None
+    spec = _BY_PATH.get(path)
+    if spec is None:
+        return None
+    age = _current.age(spec.name)
+    if age is None or age > _current.max_lag.get(spec.name, config.SYNC_MAX_LAG_SECONDS):
+        return None
+    rows = _current.rows(spec.name)
+    if rows is not None:
+        stats["reads"] += 1
+    return rows
+
+
+# ======================= Escritura (solo el publicador) =======================
+
+def _row_default(value: Any) -> Any:
+    # Filas compactas: orjson solo serializa dicts
+    if is_row(value):
+        return {key: value[key] for key in value.keys()}
+    raise TypeError(f"{type(value).__name__} no es serializable")
+
+
+def _write_dataset(directory: str, dataset: SnapshotDataset) -> None:
+    os.makedirs(os.path.join(directory, _COLUMNS))
+    offsets = np.zeros(len(dataset.rows) + 1, dtype=np.int64)
+    with open(os.path.join(directory, _ROWS), "wb") as file:
+        position = 0
+        for i, row in enumerate(dataset.rows, 1):
+            data = orjson.dumps(row, default=_row_default)
+            file.write(data)
+            position += len(data)
+            offsets[i] = position
+    np.save(os.path.join(directory, _OFFSETS), offsets)
+    for column, values in dataset.columns.items():
+        np.save(os.path.join(directory, _COLUMNS, f"{column}.npy"), np.ascontiguousarray(values))
+    meta = {**dataset.meta, "rows": len(dataset.rows), "columns": list(dataset.columns)}
+    with open(os.path.join(directory, _META), "w") as file:
+        json.dump(meta, file)
+
+
+def _link_dataset(source: str, directory: str) -> None:
+    """Dataset sin cambios: hardlinks a los archivos de la generación anterior (sin reescribir)"""
+    shutil.copytree(source, directory, copy_function=os.link)
+
+
+def write_generation(
+    datasets: Dict[str, Optional[SnapshotDataset]],
+    synced_at: Dict[str, float],
+    max_lag: Optional[Dict[str, float]] = None,
+) -> str:
+    """
+    Escribe una generación nueva y la publica en CURRENT. Un dataset en None se
+    toma sin cambios de la generación actual. Corre en un hilo (I/O + orjson).
+    """
+    root = config.SNAPSHOT_DIR
+    previous = _published_generation()
+    number = int(previous.split("-")[1]) + 1 if previous else 1
+    name = f"gen-{number:08d}"
+    temporary = os.path.join(root, f".{name}.{os.getpid()}.tmp")
+    os.makedirs(temporary)
+    try:
+        for dataset_name, dataset in datasets.items():
+            directory = os.path.join(temporary, dataset_name)
+            if dataset is None:
+                _link_dataset(os.path.join(root, previous, dataset_name), directory)
+            else:
+                _write_dataset(directory, dataset)
+        os.rename(temporary, os.path.join(root, name))
+    except BaseException:
+        shutil.rmtree(temporary, ignore_errors=True)
+        raise
+    write_state(name, synced_at, max_lag)
+    stats["generations_published"] += 1
+    _remove_old_generations()
+    return name
+
+
+def write_state(generation: str, synced_at: Dict[str, float], max_lag: Optional[Dict[str, float]] = None) -> None:
+    """Reemplaza CURRENT de forma atómica (también para avisar que los datos siguen al día)"""
+    path = os.path.join(config.SNAPSHOT_DIR, CURRENT)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    state = {"generation": generation, "synced_at": synced_at, "max_lag": max_lag or {}, "publisher": os.getpid()}
+    with open(temporary, "w") as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+
+
+def _published_generation() -> Optional[str]:
+    try:
+        with open(os.path.join(config.SNAPSHOT_DIR, CURRENT), "rb") as file:
+            return json.load(file).get("generation")
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _remove_old_generations() -> None:
+    # Los nombres ordenan por número: se conservan las últimas SNAPSHOT_KEEP_GENERATIONS
+    generations = sorted(name for name in os.listdir(config.SNAPSHOT_DIR) if name.startswith("gen-"))
+    for name in generations[:-max(config.SNAPSHOT_KEEP_GENERATIONS, 1)]:
+        shutil.rmtree(os.path.join(config.SNAPSHOT_DIR, name), ignore_errors=True)
+
+
+def remove_temporary() -> None:
+    """Restos de escrituras interrumpidas (un publicador que murió a mitad de una generación)"""
+    for name in os.listdir(config.SNAPSHOT_DIR):
+        if name.endswith(".tmp"):
+            path = os.path.join(config.SNAPSHOT_DIR, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+
+# ======================= Rol de publicador =======================
+
+_lock_file = None
+
+
+def try_become_publisher() -> bool:
+    """Toma el lock del directorio sin esperar; el sistema lo suelta si el proceso muere"""
+    global _lock_file
+    if _lock_file is not None:
+        return True
+    os.makedirs(os.path.join(config.SNAPSHOT_DIR, _INBOX), exist_ok=True)
+    file = open(os.path.join(config.SNAPSHOT_DIR, _LOCK), "a+")
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        file.close()
+        return False
+    _lock_file = file
+    return True
+
+
+def is_publisher() -> bool:
+    return _lock_file is not None
+
+
+def release_publisher() -> None:
+    global _lock_file
+    file, _lock_file = _lock_file, None
+    if file is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        file.close()
+
+
+# ======================= Eventos reenviados al publicador =======================
+
+def forward_events(envelopes: List[Any]) -> None:
+    """Deja un lote de eventos en el inbox del publicador (escritura atómica)"""
+    inbox = os.path.join(config.SNAPSHOT_DIR, _INBOX)
+    name = f"{time.time_ns():020d}-{os.getpid()}.json"
+    temporary = os.path.join(inbox, f".{name}.tmp")
+    with open(temporary, "wb") as file:
+        file.write(orjson.dumps(envelopes))
+    os.replace(temporary, os.path.join(inbox, name))
+    stats["events_forwarded"] += len(envelopes)
+
+
+def take_forwarded_events() -> List[List[Any]]:
+    """Lotes del inbox en orden de llegada (se borran al leerlos)"""
+    inbox = os.path.join(config.SNAPSHOT_DIR, _INBOX)
+    batches = []
+    for name in sorted(name for name in os.listdir(inbox) if name.endswith(".json")):
+        path = os.path.join(inbox, name)
+        try:
+            with open(path, "rb") as file:
+                batches.append(orjson.loads(file.read()))
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.error(f"❌ Lote de eventos ilegible en el inbox ({name}): {e}")
+        os.remove(path)
+    return batches
+
+
+def snapshot_stats() -> Dict[str, Any]:
+    if not enabled():
+        return {"enabled": False}
+    generation = _current
+    return {
+        "enabled": True,
+        "role": "publisher" if is_publisher() else "reader",
+        "generation": generation.name if generation else None,
+        "age_seconds": {
+            name: round(age, 3)
+            for name in SNAPSHOT_DATASETS
+            if generation is not None and (age := generation.age(name)) is not None
+        },
+        **stats,
+    }
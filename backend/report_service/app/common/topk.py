@@ -0,0 +1,119 @@
+# app/common/topk.py
+"""
+🏆 TOP-K EN STREAMING Y PAGINACIÓN DE RANKINGS
+- top_k(): los k mayores con un heap acotado a k (O(n log k) tiempo, O(k) memoria).
+  A igual clave conserva el orden de llegada, igual que sorted(..., reverse=True)[:k].
+- ranked_page(): página [offset, offset + limit) de un ranking. La primera página
+  sale de top_k sin ordenar todo; para las siguientes se ordena una vez el ranking
+  completo (solo entradas livianas, nunca objetos Strawberry) y se guarda en caché.
+- Cursores opacos: codifican el offset de la siguiente página.
+"""
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+import base64
+import binascii
+import heapq
+import logging
+
+from app import config
+from app.common.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_CURSOR_PREFIX = "offset:"
+
+
+def top_k(items: Iterable[T], k: int, key: Callable[[T], Any]) -> List[T]:
+    """Los k mayores según `key`, en orden descendente y con desempate estable"""
+    if k <= 0:
+        return []
+    # nlargest mantiene un heap de tamaño k y desempata por orden de llegada
+    return heapq.nlargest(k, items, key=key)
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{_CURSOR_PREFIX}{offset}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if not raw.startswith(_CURSOR_PREFIX):
+            raise ValueError
+        offset = int(raw[len(_CURSOR_PREFIX):])
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Cursor inválido: {cursor}")
+    if offset < 0:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return offset
+
+
+def page_offset(offset: int = 0, after: Optional[str] = None) -> int:
+    """Offset efectivo: el cursor `after` tiene prioridad sobre `offset`"""
+    if after:
+        return decode_cursor(after)
+    if offset < 0:
+        raise ValueError("offset no puede ser negativo")
+    return offset
+
+
+class RankedPage(Generic[T]):
+    """Entradas de una página del ranking + datos para la paginación"""
+
+    def __init__(self, items: List[T], total: int, offset: int, context: Any = None):
+        self.items = items
+        self.total = total
+        self.offset = offset
+        # Lo que devolvió el loader junto a las entradas (mapas para materializar, metadata, ...)
+        self.context = context
+
+    @property
+    def has_next(self) -> bool:
+        return self.offset + len(self.items) < self.total
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        return encode_cursor(self.offset + len(self.items)) if self.has_next else None
+
+
+def paginate(items: Iterable[T], key: Callable[[T], Any], offset: int, limit: int) -> RankedPage[T]:
+    """Página de un ranking en memoria con top-k de (offset + limit) entradas"""
+    items = list(items)
+    window = top_k(items, offset + max(limit, 0), key)
+    return RankedPage(window[offset:], total=len(items), offset=offset)
+
+
+_rankings = TTLCache(max_entries=config.RANKING_CACHE_MAX_ENTRIES, name="rankings")
+
+
+async def ranked_page(
+    cache_key: Hashable,
+    load: Callable[[], Awaitable[Tuple[List[T], Any]]],
+    key: Callable[[T], Any],
+    offset: int,
+    limit: int,
+) -> RankedPage[T]:
+    """
+    Página [offset, offset + limit) del ranking descendente por `key`.
+    `load` devuelve (entradas, contexto). Sin ranking en caché, la primera página
+    se resuelve con top-k; las siguientes usan el ranking completo cacheado.
+    """
+    limit = max(limit, 0)
+    cached = _rankings.get_fresh(cache_key)
+    if cached is None and offset == 0:
+        entries, context = await load()
+        return RankedPage(top_k(entries, limit, key), total=len(entries), offset=0, context=context)
+
+    async def build() -> Tuple[List[T], Any]:
+        entries, context = await load()
+        return sorted(entries, key=key, reverse=True), context
+
+    if cached is None:
+        cached = await _rankings.get_or_load(cache_key, build, ttl=config.RANKING_CACHE_TTL)
+    ranking, context = cached
+    return RankedPage(ranking[offset:offset + limit], total=len(ranking), offset=offset, context=context)
+
+
+def invalidate_rankings() -> None:
+    _rankings.clear()
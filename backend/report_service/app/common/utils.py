@@ -102,3 +102,41 @@ def extract_data_from_response(response_data, possible_keys: list = None):
     # Si nada funciona, devolver lista vacía
     logger.warning(f"⚠️ No se pudo extraer datos de la respuesta: {type(response_data)}")
     return []
+
+def extract_pagination_info(response_data) -> Optional[dict]:
+    """
+    Extrae los metadatos de paginación de una respuesta paginada
+    Args:
+        response_data: Respuesta del API (dict paginado o list)
+    Returns:
+        dict con 'total', 'total_pages', 'page' y 'limit' (cada uno puede ser None)
+        o None si la respuesta no trae información de paginación (array directo)
+    """
+    if not isinstance(response_data, dict):
+        return None
+
+    # Los metadatos pueden venir en la raíz o anidados (ej: {"data": [...], "pagination": {...}})
+    sources = [response_data]
+    for key in ('pagination', 'meta', 'pageInfo'):
+        if isinstance(response_data.get(key), dict):
+            sources.append(response_data[key])
+
+    def first_int(*keys):
+        for source in sources:
+            for key in keys:
+                value = source.get(key)
+                if value is not None and not isinstance(value, bool):
+                    parsed = safe_int(value, default=-1)
+                    if parsed >= 0:
+                        return parsed
+        return None
+
+    info = {
+        'total': first_int('total', 'totalItems', 'total_items', 'totalCount', 'total_count', 'count'),
+        'total_pages': first_int('totalPages', 'total_pages', 'pages', 'lastPage', 'last_page'),
+        'page': first_int('page', 'currentPage', 'current_page'),
+        'limit': first_int('limit', 'pageSize', 'page_size', 'perPage', 'per_page'),
+    }
+    if info['total'] is None and info['total_pages'] is None and info['page'] is None:
+        return None
+    return info
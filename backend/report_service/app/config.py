@@ -0,0 +1,171 @@
+# app/config.py
+"""
+⚙️ CONFIGURACIÓN DEL REPORT SERVICE
+Valores leídos desde variables de entorno (con defaults para desarrollo local)
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# ======================= REST API (upstream) =======================
+
+# URL base del REST service (incluye el prefijo /api)
+REST_API_URL = os.getenv("REST_API_URL", "http://127.0.0.1:3000/api").rstrip("/")
+
+# Token de servicio interno para comunicación entre microservicios
+SERVICE_TOKEN = os.getenv("SERVICE_TOKEN", "internal-service-graphql-reports-2024")
+SERVICE_NAME = os.getenv("SERVICE_NAME", "report-service")
+
+# Pool de conexiones compartido (keep-alive)
+UPSTREAM_MAX_CONNECTIONS = _env_int("UPSTREAM_MAX_CONNECTIONS", 100)
+UPSTREAM_MAX_KEEPALIVE_CONNECTIONS = _env_int("UPSTREAM_MAX_KEEPALIVE_CONNECTIONS", 20)
+UPSTREAM_KEEPALIVE_EXPIRY = _env_float("UPSTREAM_KEEPALIVE_EXPIRY", 30.0)
+
+# HTTP/2 es opcional: requiere el paquete `h2` (pip install httpx[http2])
+UPSTREAM_HTTP2 = _env_bool("UPSTREAM_HTTP2", False)
+
+# Agrupar GETs idénticos concurrentes en una sola llamada (singleflight)
+UPSTREAM_SINGLEFLIGHT = _env_bool("UPSTREAM_SINGLEFLIGHT", True)
+
+# Timeouts (segundos)
+UPSTREAM_CONNECT_TIMEOUT = _env_float("UPSTREAM_CONNECT_TIMEOUT", 5.0)
+UPSTREAM_POOL_TIMEOUT = _env_float("UPSTREAM_POOL_TIMEOUT", 10.0)
+UPSTREAM_DEFAULT_TIMEOUT = _env_float("UPSTREAM_DEFAULT_TIMEOUT", 30.0)
+
+# Timeouts de lectura por endpoint (se aplica el prefijo más largo que coincida)
+UPSTREAM_ENDPOINT_TIMEOUTS = {
+    "/sellers/by-user": 10.0,
+    "/statistics": 10.0,
+    "/orders/products": 10.0,
+}
+
+# Paginación de listados: el REST API valida limit <= 100
+UPSTREAM_PAGE_SIZE = _env_int("UPSTREAM_PAGE_SIZE", 100)
+UPSTREAM_PAGE_CONCURRENCY = _env_int("UPSTREAM_PAGE_CONCURRENCY", 4)
+UPSTREAM_MAX_PAGES = _env_int("UPSTREAM_MAX_PAGES", 10000)
+# Endpoints que devuelven {items, total, page, limit} en lugar de un array directo
+UPSTREAM_PAGINATED_ENDPOINTS = {
+    path.strip()
+    for path in os.getenv("UPSTREAM_PAGINATED_ENDPOINTS", "/products,/orders").split(",")
+    if path.strip()
+}
+
+# Deadline común para los datasets que carga cada reporte (segundos)
+REPORT_DATASETS_TIMEOUT = _env_float("REPORT_DATASETS_TIMEOUT", 25.0)
+
+# Caché de datasets de referencia (cambian poco): TTL en segundos por dataset
+REFERENCE_CACHE_ENABLED = _env_bool("REFERENCE_CACHE_ENABLED", True)
+REFERENCE_CACHE_TTLS = {
+    "categories": _env_float("REFERENCE_TTL_CATEGORIES", 300.0),
+    "payment_methods": _env_float("REFERENCE_TTL_PAYMENT_METHODS", 600.0),
+    "sellers": _env_float("REFERENCE_TTL_SELLERS", 120.0),
+    "subcategories": _env_float("REFERENCE_TTL_SUBCATEGORIES", 300.0),
+}
+# Ventana extra en la que se sirve el valor vencido mientras se refresca en segundo plano
+REFERENCE_CACHE_STALE_TTL = _env_float("REFERENCE_CACHE_STALE_TTL", 600.0)
+REFERENCE_CACHE_MAX_ENTRIES = _env_int("REFERENCE_CACHE_MAX_ENTRIES", 32)
+# Guardar los listados en caché como filas compactas (__slots__ + strings internados)
+COMPACT_ROWS = _env_bool("COMPACT_ROWS", True)
+
+# Índice de ratings de productos (top_rated_products_report)
+RATINGS_REFRESH_SECONDS = _env_float("RATINGS_REFRESH_SECONDS", 60.0)
+RATINGS_FETCH_CONCURRENCY = _env_int("RATINGS_FETCH_CONCURRENCY", 8)
+# Listado con product_order.rating; si no trae ratings se consulta producto por producto
+RATINGS_BULK_ENDPOINT = os.getenv("RATINGS_BULK_ENDPOINT", "/product-orders")
+
+# Caché UUID (user_id) -> id_seller: la relación no cambia, los 404 se recuerdan poco tiempo
+SELLER_ID_CACHE_MAX_ENTRIES = _env_int("SELLER_ID_CACHE_MAX_ENTRIES", 10000)
+SELLER_ID_CACHE_TTL = _env_float("SELLER_ID_CACHE_TTL", 86400.0)
+SELLER_ID_NEGATIVE_TTL = _env_float("SELLER_ID_NEGATIVE_TTL", 60.0)
+# A partir de cuántos UUID sin caché conviene descargar /sellers completo
+SELLER_ID_BATCH_THRESHOLD = _env_int("SELLER_ID_BATCH_THRESHOLD", 3)
+SELLER_ID_LOOKUP_CONCURRENCY = _env_int("SELLER_ID_LOOKUP_CONCURRENCY", 8)
+
+# Rollup diario de ventas: días abiertos (se recalculan) contando hoy; los anteriores quedan sellados
+ROLLUP_OPEN_DAYS = _env_int("ROLLUP_OPEN_DAYS", 1)
+ROLLUP_REFRESH_SECONDS = _env_float("ROLLUP_REFRESH_SECONDS", 30.0)
+# Reconstrucción completa periódica para cambios tardíos en días cerrados (0 = nunca)
+ROLLUP_REBUILD_SECONDS = _env_float("ROLLUP_REBUILD_SECONDS", 21600.0)
+
+# Rankings paginados (top sellers, best products): caché del ranking completo
+RANKING_CACHE_TTL = _env_float("RANKING_CACHE_TTL", 60.0)
+RANKING_CACHE_MAX_ENTRIES = _env_int("RANKING_CACHE_MAX_ENTRIES", 64)
+
+# Listados all_* / *_connection: tamaño de página por defecto y máximo
+LIST_PAGE_SIZE = _env_int("LIST_PAGE_SIZE", 50)
+LIST_MAX_PAGE_SIZE = _env_int("LIST_MAX_PAGE_SIZE", 500)
+# Filtros que el REST API aplica por query param (el resto se filtra con índices locales)
+UPSTREAM_FILTER_PUSHDOWN = _env_bool("UPSTREAM_FILTER_PUSHDOWN", True)
+UPSTREAM_FILTER_PARAMS = {
+    "/products": {"id_category", "id_sub_category", "id_seller", "min_price", "max_price", "search"},
+}
+
+# Réplica local de /orders y /product-orders (app/common/replica.py)
+SYNC_ENABLED = _env_bool("SYNC_ENABLED", True)
+SYNC_INTERVAL_SECONDS = _env_float("SYNC_INTERVAL_SECONDS", 15.0)
+# Resync completo periódico: el id no revela cambios de estado ni bajas (0 = nunca)
+SYNC_FULL_RESYNC_SECONDS = _env_float("SYNC_FULL_RESYNC_SECONDS", 600.0)
+# Con más atraso que esto los listados se vuelven a descargar en cada request
+SYNC_MAX_LAG_SECONDS = _env_float("SYNC_MAX_LAG_SECONDS", 120.0)
+# Query param con el mayor id ya replicado (el API devuelve solo ids mayores)
+SYNC_WATERMARK_PARAM = os.getenv("SYNC_WATERMARK_PARAM", "since_id")
+# Si el API ignora la marca de agua cada sincronización es completa: se espacian a este intervalo
+SYNC_FULL_ONLY_SECONDS = _env_float("SYNC_FULL_ONLY_SECONDS", 300.0)
+
+# Ingesta de eventos (POST /events): clave compartida con n8n y los demás servicios
+INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
+EVENTS_MAX_BATCH = _env_int("EVENTS_MAX_BATCH", 1000)
+# Eventos ya procesados que se recuerdan para descartar reenvíos
+EVENTS_DEDUP_TTL = _env_float("EVENTS_DEDUP_TTL", 86400.0)
+EVENTS_DEDUP_MAX_ENTRIES = _env_int("EVENTS_DEDUP_MAX_ENTRIES", 100000)
+
+# Caché compartida L2 entre réplicas (app/common/shared_cache.py): "" = solo L1, "redis" o "memory"
+CACHE_L2_BACKEND = os.getenv("CACHE_L2_BACKEND", "")
+# El mismo Redis que usa realtime_service
+CACHE_L2_URL = os.getenv("CACHE_L2_URL", os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0"))
+CACHE_L2_PASSWORD = os.getenv("REDIS_PASSWORD")
+CACHE_L2_PREFIX = os.getenv("CACHE_L2_PREFIX", "report-service")
+# Una operación de L2 más lenta que esto se trata como miss (segundos)
+CACHE_L2_TIMEOUT = _env_float("CACHE_L2_TIMEOUT", 0.5)
+# Entradas serializadas de al menos este tamaño se guardan comprimidas (zlib)
+CACHE_L2_COMPRESS_MIN_BYTES = _env_int("CACHE_L2_COMPRESS_MIN_BYTES", 1024)
+
+# Kernels de agregación en un pool de procesos (app/common/offload.py)
+# auto = según el tamaño; inline = siempre en el event loop; process = siempre en el pool
+REPORT_OFFLOAD_MODE = os.getenv("REPORT_OFFLOAD_MODE", "auto").strip().lower()
+# Filas a partir de las cuales un kernel va al pool en modo auto
+REPORT_OFFLOAD_MIN_ROWS = _env_int("REPORT_OFFLOAD_MIN_ROWS", 50000)
+REPORT_OFFLOAD_WORKERS = _env_int("REPORT_OFFLOAD_WORKERS", 2)
+
+# Snapshots mapeados entre workers de uvicorn (app/common/snapshots.py): "" = cada worker con sus datos
+# Conviene un tmpfs o disco local; todos los workers del contenedor deben ver el mismo directorio
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "").strip()
+# Cada cuánto los workers buscan una generación nueva y el publicador revisa réplicas e inbox de eventos
+SNAPSHOT_POLL_SECONDS = _env_float("SNAPSHOT_POLL_SECONDS", 1.0)
+# Cada cuánto el publicador vuelve a descargar /products y /clients
+SNAPSHOT_REFRESH_SECONDS = _env_float("SNAPSHOT_REFRESH_SECONDS", 30.0)
+# Generaciones que quedan en disco (las anteriores se borran; quien las tiene mapeadas las sigue leyendo)
+SNAPSHOT_KEEP_GENERATIONS = _env_int("SNAPSHOT_KEEP_GENERATIONS", 2)
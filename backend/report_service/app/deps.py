@@ -0,0 +1,75 @@
+# app/deps.py
+"""
+🧩 DEPENDENCIAS COMPARTIDAS
+Contexto GraphQL por request: DataLoaders de relaciones, snapshot de listados
+y contador de llamadas al REST API de la operación en curso.
+"""
+from typing import Any, Dict, Optional
+from strawberry.extensions import SchemaExtension
+from strawberry.fastapi import BaseContext
+
+from app.common.dataloaders import EntityLoaders
+from app.common.datasource import DatasetSnapshot, release_snapshot, use_snapshot
+from app.common.http_client import UpstreamCallCounter, track_upstream_calls, untrack_upstream_calls
+
+
+class ReportContext(BaseContext):
+    """Contexto de una operación GraphQL (se crea uno nuevo por request)"""
+
+    def __init__(self):
+        super().__init__()
+        self.loaders = EntityLoaders()
+        self.snapshot = DatasetSnapshot()
+        self.upstream_calls = UpstreamCallCounter()
+
+
+async def get_context() -> ReportContext:
+    """context_getter del GraphQLRouter"""
+    return ReportContext()
+
+
+class UpstreamCallsExtension(SchemaExtension):
+    """
+    Activa el contador de llamadas upstream del contexto durante la ejecución
+    y lo publica en `extensions.upstream_calls` de la respuesta.
+    """
+
+    def on_execute(self):
+        counter = self._counter()
+        token = track_upstream_calls(counter) if counter is not None else None
+        try:
+            yield
+        finally:
+            if token is not None:
+                untrack_upstream_calls(token)
+
+    def get_results(self) -> Dict[str, Any]:
+        counter = self._counter()
+        return {"upstream_calls": counter.as_dict()} if counter is not None else {}
+
+    def _counter(self) -> Optional[UpstreamCallCounter]:
+        return getattr(self.execution_context.context, "upstream_calls", None)
+
+
+class DatasetSnapshotExtension(SchemaExtension):
+    """
+    Activa el snapshot de listados del contexto: todos los reportes y resolvers
+    de la operación comparten cada descarga. Publica aciertos/fallos en
+    `extensions.dataset_snapshot`.
+    """
+
+    def on_execute(self):
+        snapshot = self._snapshot()
+        token = use_snapshot(snapshot) if snapshot is not None else None
+        try:
+            yield
+        finally:
+            if token is not None:
+                release_snapshot(token)
+
+    def get_results(self) -> Dict[str, Any]:
+        snapshot = self._snapshot()
+        return {"dataset_snapshot": snapshot.as_dict()} if snapshot is not None else {}
+
+    def _snapshot(self) -> Optional[DatasetSnapshot]:
+        return getattr(self.execution_context.context, "snapshot", None)
@@ -0,0 +1,250 @@
+# app/events.py
+"""
+📨 INGESTA DE EVENTOS
+POST /events recibe los eventos que publica el payment service y enruta n8n
+(`{event, data, timestamp}`: uno solo, una lista o `{"events": [...]}`),
+autenticados con INTERNAL_API_KEY (X-Internal-Api-Key o Authorization: Bearer).
+- Cada evento de orden se aplica como un parche a la réplica local de /orders
+  (app/common/replica.py), con el mismo cambio de estado que hace n8n en el
+  REST API; un lote produce una sola copia del listado.
+- El OrderStore se deriva del anterior leyendo solo las órdenes cambiadas y el
+  rollup recalcula solo los días de esas órdenes: nada se vuelve a descargar.
+- Los eventos repetidos (mismo id, misma transacción o mismo contenido) se
+  descartan: reenviar un lote es idempotente.
+- Si la orden todavía no está en la réplica se adelanta la sincronización.
+- Las sincronizaciones de la réplica (completas o incrementales) pasan por el
+  mismo camino (apply_replica_changes): un cambio que llega por el REST API y
+  no por un evento también actualiza el rollup y los rankings.
+- Con snapshots entre workers (app/common/snapshots.py) solo el publicador tiene
+  la réplica: los demás workers le reenvían el lote por el inbox del directorio
+  y ven el cambio en la siguiente generación.
+"""
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import hmac
+import logging
+
+import orjson
+from fastapi import APIRouter, HTTPException, Request
+
+from app import config
+from app.common.cache import TTLCache
+from app.common import snapshots
+from app.common.replica import get_replica, on_replica_change, request_sync
+from app.common.rows import OrderRow, is_row
+from app.common.topk import invalidate_rankings
+from app.reports.order_store import order_store_patched
+from app.reports.rollup import expire_rollup, update_rollup
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Columnas de /orders que un evento puede traer (más las líneas anidadas)
+_ORDER_FIELDS = frozenset(OrderRow.__slots__) | {"productOrders"}
+# Mínimo para agregar a la réplica una orden que todavía no está
+_NEW_ORDER_FIELDS = frozenset({"order_date", "status", "total_amount"})
+# Clave natural de los eventos de pago (un reenvío trae la misma)
+_NATURAL_KEYS = {
+    "payment.success": "transactionId",
+    "payment.failed": "transactionId",
+    "payment.refunded": "refundId",
+}
+
+
+def _present(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def _order_fields(data: dict) -> Dict[str, Any]:
+    """Columnas de la orden incluidas en el evento (en `data` o en `data.order`)"""
+    source = data.get("order") if isinstance(data.get("order"), dict) else data
+    return {key: value for key, value in source.items() if key in _ORDER_FIELDS}
+
+
+# Evento -> parche de la orden (mismos cambios que aplican los workflows de n8n)
+ORDER_EVENTS: Dict[str, Callable[[dict], Dict[str, Any]]] = {
+    "payment.success": lambda data: _present(
+        {"status": "paid", "payment_status": "paid", "transaction_id": data.get("transactionId")}
+    ),
+    "payment.failed": lambda data: _present(
+        {"status": "payment_failed", "payment_status": "failed", "payment_error": data.get("errorMessage")}
+    ),
+    "order.created": _order_fields,
+    "order.updated": _order_fields,
+    "order.cancelled": lambda data: {**_order_fields(data), "status": "cancelled"},
+    "delivery.completed": lambda data: {"status": "delivered"},
+}
+
+
+def _order_id(data: dict) -> Optional[int]:
+    for key in ("orderId", "id_order", "order_id"):
+        value = data.get(key)
+        if isinstance(value, str) and value.isdigit():
+            value = int(value)
+        if type(value) is int:
+            return value
+    order = data.get("order")
+    return _order_id(order) if isinstance(order, dict) else None
+
+
+def event_key(envelope: dict) -> str:
+    """Identidad del evento para descartar reenvíos"""
+    for key in ("id", "event_id", "eventId"):
+        if envelope.get(key) is not None:
+            return f"id:{envelope[key]}"
+    event = envelope["event"]
+    data = envelope.get("data")
+    natural = _NATURAL_KEYS.get(event)
+    if natural and isinstance(data, dict) and data.get(natural):
+        return f"{event}:{data[natural]}"
+    return "sha1:" + hashlib.sha1(orjson.dumps(envelope, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+_seen = TTLCache(max_entries=config.EVENTS_DEDUP_MAX_ENTRIES, name="events")
+_totals: Counter = Counter()
+
+
+def _apply_order_patches(patches: Dict[int, Dict[str, Any]]) -> int:
+    """Aplica los parches a la réplica y a los agregados; devuelve las órdenes cambiadas"""
+    orders, lines = get_replica("orders"), get_replica("product_orders")
+    if not orders.ready:
+        # Sin réplica cada reporte descarga las órdenes: basta con refrescar el rollup
+        expire_rollup()
+        invalidate_rankings()
+        return 0
+
+    rows: List[dict] = []
+    line_rows: List[dict] = []
+    unknown = 0
+    for order_id, patch in patches.items():
+        current = orders.get(order_id)
+        if current is not None:
+            rows.append({**current, **patch})
+        elif _NEW_ORDER_FIELDS <= patch.keys():
+            rows.append({"id_order": order_id, **patch})
+        else:
+            unknown += 1
+            continue
+        for line in patch.get("productOrders") or ():
+            if is_row(line) and line.get("id_product_order") is not None:
+                line_rows.append({"id_order": order_id, **line})
+
+    previous, previous_lines = orders.rows, lines.rows
+    positions = orders.upsert(rows)
+    line_positions = lines.upsert(line_rows) if line_rows and lines.ready else []
+    if positions:
+        order_store_patched(previous, orders.rows, positions)
+    if positions or line_positions:
+        # Las órdenes con líneas nuevas también cambian sus días del rollup
+        touched = dict.fromkeys(positions)
+        for line in line_rows:
+            position = orders.position(line["id_order"])
+            if position is not None:
+                touched[position] = None
+        update_rollup(previous, orders.rows, list(touched), (previous_lines, lines.rows) if line_positions else None)
+        invalidate_rankings()
+    if unknown:
+        logger.info(f"📨 {unknown} eventos de órdenes que la réplica aún no tiene: se adelanta la sincronización")
+        request_sync()
+    return len(positions)
+
+
+def apply_replica_changes(name: str, previous: List[dict], rows: List[dict], positions: List[int]) -> None:
+    """
+    Lleva el OrderStore, el rollup y los rankings al listado que dejó una
+    sincronización de la réplica. Al rollup se le pasan solo las filas que
+    cambiaron (por identidad: replace_all conserva las iguales), en su posición
+    nueva y en la anterior; las que solo se corrieron por una baja no cuentan.
+    """
+    invalidate_rankings()
+    kept = {id(row) for row in rows}
+    removed = [position for position, row in enumerate(previous) if id(row) not in kept]
+    if name == "orders":
+        known = {id(row) for row in previous}
+        order_store_patched(previous, rows, positions)
+        added = [position for position in positions if position < len(rows) and id(rows[position]) not in known]
+        update_rollup(previous, rows, sorted({*added, *removed}))
+        return
+
+    # product_orders: se recalculan los días de las órdenes de las líneas que cambiaron o desaparecieron
+    owners = {rows[position].get("id_order") for position in positions if is_row(rows[position])}
+    owners.update(previous[position].get("id_order") for position in removed if is_row(previous[position]))
+    orders = get_replica("orders")
+    touched = [position for position in map(orders.position, owners) if position is not None]
+    update_rollup(orders.rows, orders.rows, touched, (previous, rows))
+
+
+on_replica_change(apply_replica_changes)
+
+
+def apply_events(envelopes: List[Any]) -> Dict[str, int]:
+    """Procesa un lote de eventos; devuelve los contadores del lote"""
+    result = Counter(received=len(envelopes))
+    patches: Dict[int, Dict[str, Any]] = {}
+    keys: Dict[str, None] = {}
+    for envelope in envelopes:
+        if not isinstance(envelope, dict) or not isinstance(envelope.get("event"), str):
+            result["invalid"] += 1
+            continue
+        key = event_key(envelope)
+        if key in keys or _seen.get_fresh(key):
+            result["duplicates"] += 1
+            continue
+        handler = ORDER_EVENTS.get(envelope["event"])
+        data = envelope.get("data") if isinstance(envelope.get("data"), dict) else envelope
+        order_id = _order_id(data) if handler is not None else None
+        if handler is None:
+            result["ignored"] += 1
+        elif order_id is None:
+            result["invalid"] += 1
+            continue
+        else:
+            # Varios eventos de la misma orden en el lote se combinan en orden de llegada
+            patches.setdefault(order_id, {}).update(handler(data))
+            result["accepted"] += 1
+        keys[key] = None
+
+    result["orders_changed"] = _apply_order_patches(patches) if patches else 0
+    for key in keys:
+        _seen.set(key, True, ttl=config.EVENTS_DEDUP_TTL)
+    _totals.update(result)
+    return dict(result)
+
+
+def _authorized(request: Request) -> bool:
+    token = request.headers.get("x-internal-api-key")
+    authorization = request.headers.get("authorization", "")
+    if not token and authorization.startswith("Bearer "):
+        token = authorization[len("Bearer "):]
+    return bool(token) and hmac.compare_digest(token.encode(), config.INTERNAL_API_KEY.encode())
+
+
+@router.post("/events")
+async def ingest_events(request: Request) -> Dict[str, int]:
+    """Eventos de órdenes, pagos y entregas (uno o un lote)"""
+    if not config.INTERNAL_API_KEY:
+        logger.error("❌ INTERNAL_API_KEY no está configurada: no se aceptan eventos")
+        raise HTTPException(status_code=503, detail="Configuración de autenticación interna faltante")
+    if not _authorized(request):
+        raise HTTPException(status_code=401, detail="API key interna inválida")
+    try:
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="JSON inválido")
+
+    if isinstance(body, dict) and isinstance(body.get("events"), list):
+        body = body["events"]
+    envelopes = body if isinstance(body, list) else [body]
+    if len(envelopes) > config.EVENTS_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"Máximo {config.EVENTS_MAX_BATCH} eventos por lote")
+    if snapshots.enabled() and not snapshots.is_publisher():
+        # La réplica está en el worker que publica los snapshots: él deduplica y aplica
+        snapshots.forward_events(envelopes)
+        return {"received": len(envelopes), "forwarded": len(envelopes)}
+    return apply_events(envelopes)
+
+
+def event_stats() -> Dict[str, Any]:
+    return {"seen": len(_seen), **_totals}
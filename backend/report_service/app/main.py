@@ -1,10 +1,41 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from strawberry.fastapi import GraphQLRouter
 from app.schema import schema  # tu schema global
+from app.deps import get_context
+from app.common.http_client import start_upstream_client, close_upstream_client
+from app.common.decoding import decode_metrics
+from app.common.replica import replica_stats
+from app.common.snapshots import snapshot_stats
+from app.common.shared_cache import shared_cache_stats, start_shared_cache, stop_shared_cache
+from app.common.offload import offload_stats, start_offload, stop_offload
+from app.events import event_stats, router as events_router
+from app.snapshot_publisher import start_snapshots, stop_snapshots
 import uvicorn
 
-app = FastAPI(title="Report Service (GraphQL)", version="1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Un único pool de conexiones hacia el REST API para todo el proceso
+    await start_upstream_client()
+    # Caché L2 compartida entre réplicas (si CACHE_L2_BACKEND está configurado)
+    await start_shared_cache()
+    # Workers para los kernels de agregación pesados
+    start_offload()
+    # Réplica local de órdenes y product-orders, sincronizada en segundo plano; con
+    # SNAPSHOT_DIR la sincroniza un solo worker y los demás mapean sus snapshots
+    start_snapshots()
+    try:
+        yield
+    finally:
+        await stop_snapshots()
+        await stop_shared_cache()
+        await stop_offload()
+        await close_upstream_client()
+
+
+app = FastAPI(title="Report Service (GraphQL)", version="1.0", lifespan=lifespan)
 
 # Configuración CORS
 app.add_middleware(
@@ -23,8 +54,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-graphql_app = GraphQLRouter(schema)
+graphql_app = GraphQLRouter(schema, context_getter=get_context)
 app.include_router(graphql_app, prefix="/graphql")
+# Eventos de órdenes, pagos y entregas (n8n / payment service)
+app.include_router(events_router)
 
 @app.get("/")
 def home():
@@ -32,7 +65,20 @@ def home():
 
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
+    # decoding: registros decodificados / descartados por entidad desde el arranque
+    # sync: filas, marca de agua y atraso de cada réplica; events: eventos ingeridos
+    # shared_cache: backend L2, aciertos e invalidaciones entre réplicas
+    # offload: kernels corridos en el loop / en el pool de procesos
+    # snapshots: rol del worker (publicador / lector), generación mapeada y su antigüedad
+    return {
+        "status": "healthy",
+        "decoding": decode_metrics.as_dict(),
+        "sync": replica_stats(),
+        "events": event_stats(),
+        "shared_cache": shared_cache_stats(),
+        "offload": offload_stats(),
+        "snapshots": snapshot_stats(),
+    }
 
 if __name__ == "__main__":
     print("🚀 Iniciando servidor GraphQL en http://127.0.0.1:4000")
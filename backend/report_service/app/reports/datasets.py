@@ -0,0 +1,100 @@
+# app/reports/datasets.py
+"""
+📦 DATASETS DE LOS REPORTES
+Cada reporte declara los listados del REST API que necesita y load_datasets los
+descarga en paralelo con un deadline común: la latencia pasa a ser la del más
+lento y no la suma de todos. Un dataset que falla o no llega a tiempo queda
+registrado como faltante en la metadata del reporte.
+Los datasets de referencia llegan además indexados por id (ver datasets.index()).
+"""
+from typing import Any, Dict, Hashable, List
+import asyncio
+import logging
+
+from app import config
+from app.common.datasource import load_rows
+from app.common.reference_data import REFERENCE_DATASETS, ReferenceDataset, load_reference
+from app.reports.schema import ReportMetadata
+
+logger = logging.getLogger(__name__)
+
+
+# Nombre del dataset -> endpoint del REST API
+DATASETS: Dict[str, str] = {
+    "categories": "/categories",
+    "clients": "/clients",
+    "deliveries": "/deliveries",
+    "orders": "/orders",
+    "payment_methods": "/payment-methods",
+    "product_orders": "/product-orders",
+    "products": "/products",
+    "sellers": "/sellers",
+}
+
+
+class ReportDatasets:
+    """Filas descargadas por dataset y lista de los que no se pudieron obtener"""
+
+    def __init__(self, rows: Dict[str, List[dict]], missing: List[str], indexes: Dict[str, Dict[Hashable, dict]] = None):
+        self._rows = rows
+        self._indexes = indexes or {}
+        self.missing = missing
+
+    def __getitem__(self, name: str) -> List[dict]:
+        # Un dataset faltante se comporta como vacío; el reporte lo avisa en metadata
+        return self._rows.get(name, [])
+
+    def index(self, name: str) -> Dict[Hashable, dict]:
+        """Índice id -> registro de un dataset de referencia (vacío si faltó)"""
+        return self._indexes.get(name, {})
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.missing)
+
+    def metadata(self, also_missing: List[str] = ()) -> ReportMetadata:
+        """Metadata del reporte; `also_missing` suma faltantes de otras fuentes (ej: el rollup)"""
+        missing = list(dict.fromkeys([*self.missing, *also_missing]))
+        return ReportMetadata(partial=bool(missing), missing_datasets=missing)
+
+
+async def _download(name: str) -> Any:
+    if name in REFERENCE_DATASETS:
+        # Caché del proceso: filas + índice ya construido
+        return await load_reference(name)
+    return await load_rows(DATASETS[name], data_keys=[name, "data"])
+
+
+async def load_datasets(*names: str, timeout: float = config.REPORT_DATASETS_TIMEOUT) -> ReportDatasets:
+    """
+    Descarga en paralelo los datasets pedidos.
+    Los que lanzan error o superan `timeout` segundos se cancelan y se marcan como faltantes.
+    """
+    unknown = [name for name in names if name not in DATASETS]
+    if unknown:
+        raise ValueError(f"Datasets desconocidos: {', '.join(unknown)}")
+
+    tasks = {name: asyncio.ensure_future(_download(name)) for name in dict.fromkeys(names)}
+    if not tasks:
+        return ReportDatasets({}, [])
+
+    _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+    rows: Dict[str, List[dict]] = {}
+    indexes: Dict[str, Dict[Hashable, dict]] = {}
+    missing: List[str] = []
+    for name, task in tasks.items():
+        if task in pending:
+            logger.warning(f"⏱️ Dataset '{name}' no llegó antes del deadline ({timeout}s)")
+            missing.append(name)
+        elif task.exception() is not None:
+            logger.error(f"❌ Error obteniendo dataset '{name}': {task.exception()}")
+            missing.append(name)
+        elif isinstance(task.result(), ReferenceDataset):
+            rows[name] = task.result().rows
+            indexes[name] = task.result().by_id
+        else:
+            rows[name] = task.result()
+    return ReportDatasets(rows, missing, indexes)
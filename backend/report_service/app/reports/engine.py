@@ -0,0 +1,503 @@
+# app/reports/engine.py
+"""
+⚙️ MOTOR DE REPORTES EN UNA SOLA PASADA
+Cada reporte del dashboard de admin es un acumulador registrado que declara qué
+datasets usa y si consume los buckets del rollup diario y/o las órdenes.
+run_reports() ejecuta cualquier subconjunto:
+1. Descarga una sola vez la unión de datasets (y el rollup si alguno lo usa).
+2. Recorre una sola vez los días del rollup en el rango unión; cada acumulador
+   toma lo suyo de cada bucket.
+3. Selecciona una sola vez las órdenes del rango unión con el índice por fecha;
+   cada acumulador aplica su sub-filtro sobre esas columnas.
+Los reportes sueltos (get_sales_report, ...) pasan por este mismo motor, así que
+el resultado dentro de report_bundle es idéntico al del resolver individual.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+import asyncio
+import logging
+
+import numpy as np
+
+from app.common.offload import run_kernel
+from app.common.topk import RankedPage, paginate
+from app.reports.datasets import ReportDatasets, load_datasets
+from app.reports.order_store import (
+    COMPLETED_STATUSES,
+    DASHBOARD_EXCLUDED_STATUSES,
+    OrderStore,
+    activity_entries,
+    cents_to_float,
+    order_store_for,
+    period_key,
+)
+from app.reports.rollup import DayRollup, RollupCube, get_rollup
+from app.reports.schema import (
+    CategorySalesItem,
+    CategorySalesReport,
+    ClientActivityItem,
+    ClientsReport,
+    DashboardStats,
+    FinancialReport,
+    PaymentMethodItem,
+    RankingPageInfo,
+    ReportMetadata,
+    SalesReport,
+    SalesReportItem,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ReportRequest:
+    """Parámetros comunes a los reportes de una ejecución"""
+
+    def __init__(
+        self,
+        start_date: date,
+        end_date: date,
+        period: str = "daily",
+        top_limit: int = 10,
+        today: Optional[date] = None,
+        offset: int = 0,
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.period = period
+        self.top_limit = top_limit
+        # Offset de las listas rankeadas (top_clients)
+        self.offset = offset
+        self.today = today or date.today()
+
+
+class OrderBatch:
+    """Órdenes del rango unión: posiciones + columnas reunidas una sola vez"""
+
+    def __init__(self, store: OrderStore, positions: np.ndarray):
+        self.store = store
+        self.positions = positions
+        self.day = store.day[positions]
+        self.status = store.status[positions]
+
+    def rows(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        statuses: Optional[Iterable[str]] = None,
+        exclude: Iterable[str] = (),
+    ) -> np.ndarray:
+        """Posiciones del lote con fecha en [start, end] y estado permitido"""
+        mask = np.ones(len(self.positions), dtype=bool)
+        if start is not None:
+            mask &= self.day >= np.datetime64(start, "D")
+        if end is not None:
+            mask &= self.day <= np.datetime64(end, "D")
+        if statuses is not None:
+            mask &= np.isin(self.status, self.store.status_codes(statuses))
+        excluded = self.store.status_codes(exclude)
+        if excluded:
+            mask &= ~np.isin(self.status, excluded)
+        return self.positions[mask]
+
+
+def page_info(page: RankedPage) -> RankingPageInfo:
+    return RankingPageInfo(
+        total_count=page.total,
+        offset=page.offset,
+        has_next_page=page.has_next,
+        end_cursor=page.next_cursor
+    )
+
+
+class BundleData:
+    """Datos compartidos por todos los acumuladores de una ejecución"""
+
+    def __init__(self, datasets: ReportDatasets, rollup_missing: List[str]):
+        self.datasets = datasets
+        self.rollup_missing = rollup_missing
+
+    def metadata(self, accumulator: "ReportAccumulator") -> ReportMetadata:
+        """Faltantes que afectan a ese reporte (no los de los demás)"""
+        missing = [name for name in self.datasets.missing if name in accumulator.datasets]
+        if accumulator.uses_rollup:
+            missing += self.rollup_missing
+        missing = list(dict.fromkeys(missing))
+        return ReportMetadata(partial=bool(missing), missing_datasets=missing)
+
+
+class ReportAccumulator:
+    """Base de los acumuladores: un reporte, alimentado por el motor"""
+
+    name: str = ""
+    # Datasets de load_datasets que necesita el reporte
+    datasets: Tuple[str, ...] = ()
+    uses_rollup: bool = False
+    uses_orders: bool = False
+
+    def __init__(self, request: ReportRequest):
+        self.request = request
+
+    def date_range(self) -> Tuple[Optional[date], Optional[date]]:
+        """Rango de fechas que consume (None = sin límite)"""
+        return self.request.start_date, self.request.end_date
+
+    def add_day(self, day: date, bucket: DayRollup) -> None:
+        pass
+
+    async def add_orders(self, batch: OrderBatch) -> None:
+        """Async: los kernels pesados pueden correr en el pool de procesos (run_kernel)"""
+        pass
+
+    def finish(self, data: BundleData) -> Any:
+        raise NotImplementedError
+
+
+ACCUMULATORS: Dict[str, Type[ReportAccumulator]] = {}
+
+
+def register_accumulator(cls: Type[ReportAccumulator]) -> Type[ReportAccumulator]:
+    ACCUMULATORS[cls.name] = cls
+    return cls
+
+
+def _in_range(day: date, start: Optional[date], end: Optional[date]) -> bool:
+    return (start is None or day >= start) and (end is None or day <= end)
+
+
+def _union_range(accumulators: List[ReportAccumulator]) -> Tuple[Optional[date], Optional[date]]:
+    ranges = [accumulator.date_range() for accumulator in accumulators]
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    return (
+        None if None in starts else min(starts),
+        None if None in ends else max(ends),
+    )
+
+
+# ======================= ACUMULADORES =======================
+
+@register_accumulator
+class SalesAccumulator(ReportAccumulator):
+    """Reporte de ventas por período (rollup, total_amount de la orden)"""
+
+    name = "sales_report"
+    uses_rollup = True
+
+    def __init__(self, request: ReportRequest):
+        super().__init__(request)
+        self.total_cents = 0
+        self.total_orders = 0
+        self.periods: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+
+    def add_day(self, day: date, bucket: DayRollup) -> None:
+        if not _in_range(day, *self.date_range()):
+            return
+        for (_, status), (cents, count) in bucket.orders.items():
+            if status in COMPLETED_STATUSES:
+                self.total_cents += cents
+                self.total_orders += count
+                totals = self.periods[period_key(day, self.request.period)]
+                totals[0] += cents
+                totals[1] += count
+
+    def finish(self, data: BundleData) -> SalesReport:
+        total_revenue = cents_to_float(self.total_cents)
+        return SalesReport(
+            start_date=self.request.start_date,
+            end_date=self.request.end_date,
+            total_revenue=total_revenue,
+            total_orders=self.total_orders,
+            average_order_value=total_revenue / self.total_orders if self.total_orders > 0 else 0.0,
+            sales_by_period=[
+                SalesReportItem(
+                    period=key,
+                    total_sales=cents_to_float(cents),
+                    total_orders=count,
+                    average_order_value=cents_to_float(cents) / count if count > 0 else 0.0
+                )
+                for key, (cents, count) in sorted(self.periods.items())
+            ],
+            metadata=data.metadata(self)
+        )
+
+
+@register_accumulator
+class FinancialAccumulator(ReportAccumulator):
+    """Reporte financiero por método de pago (rollup)"""
+
+    name = "financial_report"
+    datasets = ("payment_methods",)
+    uses_rollup = True
+
+    def __init__(self, request: ReportRequest):
+        super().__init__(request)
+        self.total_cents = 0
+        self.total_orders = 0
+        self.methods: Dict[Any, List[int]] = defaultdict(lambda: [0, 0])
+
+    def add_day(self, day: date, bucket: DayRollup) -> None:
+        if not _in_range(day, *self.date_range()):
+            return
+        for (pm_id, status), (cents, count) in bucket.orders.items():
+            if status in COMPLETED_STATUSES:
+                self.total_cents += cents
+                self.total_orders += count
+                # Sin método de pago (None) también suma: va a "Desconocido"
+                totals = self.methods[pm_id]
+                totals[0] += cents
+                totals[1] += count
+
+    def finish(self, data: BundleData) -> FinancialReport:
+        payment_info = data.datasets.index("payment_methods")
+        total_revenue = cents_to_float(self.total_cents)
+
+        # Agrupar por nombre del método (varios ids pueden compartir nombre)
+        payment_stats = defaultdict(lambda: {"count": 0, "cents": 0})
+        for pm_id, (cents, count) in self.methods.items():
+            pm_name = payment_info.get(pm_id, {}).get("method_name", "Desconocido")
+            payment_stats[pm_name]["count"] += count
+            payment_stats[pm_name]["cents"] += cents
+
+        payment_items = [
+            PaymentMethodItem(
+                method_name=method,
+                total_transactions=stats["count"],
+                total_amount=cents_to_float(stats["cents"]),
+                percentage=(stats["cents"] / self.total_cents * 100) if self.total_cents > 0 else 0.0
+            )
+            for method, stats in payment_stats.items()
+        ]
+        payment_items.sort(key=lambda x: x.total_amount, reverse=True)
+
+        return FinancialReport(
+            period_start=self.request.start_date,
+            period_end=self.request.end_date,
+            total_revenue=total_revenue,
+            total_orders=self.total_orders,
+            payment_methods=payment_items,
+            average_transaction=total_revenue / self.total_orders if self.total_orders > 0 else 0.0,
+            metadata=data.metadata(self)
+        )
+
+
+@register_accumulator
+class CategorySalesAccumulator(ReportAccumulator):
+    """Ventas por categoría (rollup, subtotal de product_order)"""
+
+    name = "category_sales_report"
+    datasets = ("categories",)
+    uses_rollup = True
+
+    def __init__(self, request: ReportRequest):
+        super().__init__(request)
+        self.cents: Dict[Any, int] = defaultdict(int)
+        self.orders: Dict[Any, int] = defaultdict(int)
+        self.products: Dict[Any, set] = defaultdict(set)
+
+    def add_day(self, day: date, bucket: DayRollup) -> None:
+        if not _in_range(day, *self.date_range()):
+            return
+        for (_, category_id, _, status), (cents, _) in bucket.lines.items():
+            if status in COMPLETED_STATUSES and category_id:
+                self.cents[category_id] += cents
+        for (category_id, status), count in bucket.category_orders.items():
+            if status in COMPLETED_STATUSES and category_id:
+                self.orders[category_id] += count
+        for (category_id, status), product_ids in bucket.category_products.items():
+            if status in COMPLETED_STATUSES:
+                self.products[category_id] |= product_ids
+
+    def finish(self, data: BundleData) -> CategorySalesReport:
+        category_info = data.datasets.index("categories")
+        category_items = []
+        for cat_id, cents in self.cents.items():
+            if cat_id in category_info:
+                category_items.append(CategorySalesItem(
+                    category_id=cat_id,
+                    category_name=category_info[cat_id].get("category_name", "Sin nombre"),
+                    total_sales=cents_to_float(cents),
+                    total_orders=self.orders[cat_id],
+                    products_count=len(self.products[cat_id])
+                ))
+        category_items.sort(key=lambda x: x.total_sales, reverse=True)
+
+        return CategorySalesReport(
+            period_start=self.request.start_date,
+            period_end=self.request.end_date,
+            categories=category_items,
+            metadata=data.metadata(self)
+        )
+
+
+@register_accumulator
+class ClientsAccumulator(ReportAccumulator):
+    """Actividad de clientes (órdenes completadas, entregadas o pagadas del rango)"""
+
+    name = "clients_report"
+    datasets = ("clients", "orders")
+    uses_orders = True
+
+    def __init__(self, request: ReportRequest):
+        super().__init__(request)
+        self.activity: List[Tuple[Any, int, int, Optional[datetime]]] = []
+
+    async def add_orders(self, batch: OrderBatch) -> None:
+        rows = batch.rows(*self.date_range(), statuses=COMPLETED_STATUSES)
+        self.activity = activity_entries(await run_kernel(batch.store.client_activity_call(rows), len(rows)))
+
+    def finish(self, data: BundleData) -> ClientsReport:
+        start_date, end_date = self.date_range()
+        clients = data.datasets["clients"]
+
+        # Clientes nuevos en el período
+        new_clients = 0
+        client_info = {}
+        for client in clients:
+            try:
+                created_at = datetime.fromisoformat(client["created_at"].replace("Z", "")).date()
+                if start_date <= created_at <= end_date:
+                    new_clients += 1
+            except (KeyError, TypeError, ValueError, AttributeError):
+                pass
+            try:
+                client_info[client["id_client"]] = client
+            except (KeyError, TypeError):
+                continue
+
+        # Top por gasto total con heap: solo se materializa la página pedida
+        page = paginate(
+            (entry for entry in self.activity if entry[0] in client_info),
+            key=lambda entry: entry[1],
+            offset=self.request.offset,
+            limit=self.request.top_limit,
+        )
+        top_clients = []
+        for client_id, cents, orders_count, last_order in page.items:
+            client = client_info[client_id]
+            top_clients.append(ClientActivityItem(
+                client_id=client_id,
+                client_name=client.get("client_name", "Desconocido"),
+                client_email=client.get("client_email", ""),
+                total_orders=orders_count,
+                total_spent=cents_to_float(cents),
+                last_order_date=last_order
+            ))
+
+        return ClientsReport(
+            period_start=start_date,
+            period_end=end_date,
+            total_clients=len(clients),
+            new_clients=new_clients,
+            active_clients=len(self.activity),
+            top_clients=top_clients,
+            top_clients_page_info=page_info(page),
+            metadata=data.metadata(self)
+        )
+
+
+@register_accumulator
+class DashboardAccumulator(ReportAccumulator):
+    """Estadísticas generales: hoy y mes en curso (sin canceladas / expiradas)"""
+
+    name = "dashboard_stats"
+    datasets = ("orders", "clients", "sellers", "products", "deliveries")
+    uses_orders = True
+
+    def __init__(self, request: ReportRequest):
+        super().__init__(request)
+        self.today = (0, 0)
+        self.month = (0, 0)
+
+    def date_range(self) -> Tuple[Optional[date], Optional[date]]:
+        today = self.request.today
+        # Desde el inicio del mes y sin límite superior
+        return date(today.year, today.month, 1), None
+
+    async def add_orders(self, batch: OrderBatch) -> None:
+        today = self.request.today
+        month_start, _ = self.date_range()
+        store = batch.store
+        self.today = store.totals(batch.rows(today, today, exclude=DASHBOARD_EXCLUDED_STATUSES))
+        self.month = store.totals(batch.rows(month_start, None, exclude=DASHBOARD_EXCLUDED_STATUSES))
+
+    def finish(self, data: BundleData) -> DashboardStats:
+        products = data.datasets["products"]
+
+        # Deliveries pendientes
+        pending_deliveries = 0
+        for d in data.datasets["deliveries"]:
+            try:
+                if d.get("status") not in ["Entregado", "Cancelado"]:
+                    pending_deliveries += 1
+            except (KeyError, TypeError, AttributeError):
+                continue
+
+        # Productos con bajo stock
+        low_stock = 0
+        for p in products:
+            try:
+                if p.get("stock", 0) <= 10:
+                    low_stock += 1
+            except (KeyError, TypeError, AttributeError):
+                continue
+
+        return DashboardStats(
+            today_sales=cents_to_float(self.today[0]),
+            today_orders=self.today[1],
+            total_active_clients=len(data.datasets["clients"]),
+            total_active_sellers=len(data.datasets["sellers"]),
+            total_products=len(products),
+            pending_deliveries=pending_deliveries,
+            low_stock_products=low_stock,
+            month_revenue=cents_to_float(self.month[0]),
+            month_orders=self.month[1],
+            metadata=data.metadata(self)
+        )
+
+
+# ======================= MOTOR =======================
+
+async def _no_rollup() -> Tuple[Optional[RollupCube], List[str]]:
+    return None, []
+
+
+async def run_reports(names: Iterable[str], request: ReportRequest) -> Dict[str, Any]:
+    """
+    Calcula los reportes pedidos (nombres de ACCUMULATORS) compartiendo descargas
+    y recorridos. Devuelve {nombre: reporte}.
+    """
+    names = list(dict.fromkeys(names))
+    unknown = [name for name in names if name not in ACCUMULATORS]
+    if unknown:
+        raise ValueError(f"Reportes desconocidos: {', '.join(unknown)}")
+    accumulators = [ACCUMULATORS[name](request) for name in names]
+    if not accumulators:
+        return {}
+
+    rollup_accumulators = [acc for acc in accumulators if acc.uses_rollup]
+    order_accumulators = [acc for acc in accumulators if acc.uses_orders]
+    dataset_names = dict.fromkeys(name for acc in accumulators for name in acc.datasets)
+
+    # Descargas compartidas: unión de datasets y rollup en paralelo
+    (rollup, rollup_missing), datasets = await asyncio.gather(
+        get_rollup() if rollup_accumulators else _no_rollup(),
+        load_datasets(*dataset_names),
+    )
+
+    # Una pasada por los días del rollup
+    if rollup_accumulators:
+        start, end = _union_range(rollup_accumulators)
+        for day, bucket in rollup.days_between(start or date.min, end or date.max):
+            for accumulator in rollup_accumulators:
+                accumulator.add_day(day, bucket)
+
+    # Una selección de órdenes con el índice por fecha
+    if order_accumulators:
+        store = order_store_for(datasets["orders"])
+        batch = OrderBatch(store, store.by_date.positions(*_union_range(order_accumulators)))
+        for accumulator in order_accumulators:
+            await accumulator.add_orders(batch)
+
+    data = BundleData(datasets, rollup_missing)
+    return {accumulator.name: accumulator.finish(data) for accumulator in accumulators}
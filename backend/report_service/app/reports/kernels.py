@@ -0,0 +1,200 @@
+# app/reports/kernels.py
+"""
+🔢 KERNELS DE AGREGACIÓN
+Funciones puras sobre arreglos NumPy (columnas de OrderStore / LineStore y
+posiciones seleccionadas) que devuelven arreglos: no tocan filas ni objetos de
+la app, así que corren igual en el event loop o en un worker del pool de
+procesos con las columnas en memoria compartida (app/common/offload.py).
+Este módulo solo importa NumPy: es lo único que carga un worker.
+Los grupos se devuelven en el orden en que aparece por primera vez cada clave,
+el mismo que tenían los dicts que se llenaban fila por fila.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+MISSING_ID = -1
+
+
+def group_sum(inverse: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """Suma exacta en int64 por grupo (bincount acumula en float64)"""
+    totals = np.zeros(size, dtype=np.int64)
+    np.add.at(totals, inverse, values)
+    return totals
+
+
+def _packed_key(columns: Tuple[np.ndarray, ...]) -> np.ndarray:
+    """Una clave int64 por fila que combina las columnas (None si no entra en 62 bits)"""
+    key = np.zeros(len(columns[0]), dtype=np.int64)
+    span = 1
+    for column in columns:
+        low = int(column.min())
+        width = int(column.max()) - low + 1
+        span *= width
+        if span >= 1 << 62:
+            return None
+        key = key * width + (column - low)
+    return key
+
+
+def group_rows(*columns: np.ndarray) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Agrupa filas por varias columnas enteras: (columnas de cada grupo, grupo de
+    cada fila). Los grupos quedan numerados por primera aparición.
+    """
+    size = len(columns[0])
+    if size == 0:
+        return [column[:0] for column in columns], np.empty(0, dtype=np.intp)
+    key = _packed_key(columns)
+    if key is not None:
+        # np.unique ordena de forma estable con return_index: first es la primera aparición
+        _, first, sorted_group = np.unique(key, return_index=True, return_inverse=True)
+    else:
+        order = np.lexsort(columns[::-1])
+        change = np.zeros(size, dtype=bool)
+        change[0] = True
+        for column in columns:
+            ordered = column[order]
+            change[1:] |= ordered[1:] != ordered[:-1]
+        # lexsort es estable: el inicio de cada tramo es la primera aparición del grupo
+        first = order[change]
+        sorted_group = np.empty(size, dtype=np.intp)
+        sorted_group[order] = np.cumsum(change) - 1
+    rank = np.empty(len(first), dtype=np.intp)
+    rank[np.argsort(first, kind="stable")] = np.arange(len(first))
+    first = np.sort(first)
+    return [column[first] for column in columns], rank[sorted_group.reshape(-1)]
+
+
+def _by_day(table: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Ordena una tabla de grupos por día sin perder el orden de aparición dentro de cada día"""
+    order = np.argsort(table["day"], kind="stable")
+    return {name: column[order] for name, column in table.items()}
+
+
+def _last_positions(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(ids distintos ordenados, posición de la última fila con cada id)"""
+    unique, from_end = np.unique(ids[::-1], return_index=True)
+    return unique, len(ids) - 1 - from_end
+
+
+def _lookup(keys: np.ndarray, values: np.ndarray, wanted: np.ndarray) -> np.ndarray:
+    """values[i] donde keys[i] == wanted (keys ordenadas y sin repetir); MISSING_ID si no está"""
+    if len(keys) == 0:
+        return np.full(len(wanted), MISSING_ID, dtype=np.int64)
+    at = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+    return np.where(keys[at] == wanted, values[at], MISSING_ID)
+
+
+def daily_rollup(
+    selected: np.ndarray,
+    order_id: np.ndarray,
+    order_day: np.ndarray,
+    order_status: np.ndarray,
+    order_cents: np.ndarray,
+    order_pm: np.ndarray,
+    line_order: np.ndarray,
+    line_product: np.ndarray,
+    line_cents: np.ndarray,
+    line_valid: np.ndarray,
+    product_id: np.ndarray,
+    product_seller: np.ndarray,
+    product_category: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Buckets del rollup (app/reports/rollup.py) de las órdenes `selected`:
+    - orders_*: (día, método de pago, estado) -> centavos de total_amount, órdenes
+    - lines_*: (día, vendedor, categoría, método de pago, estado) -> centavos de subtotal, unidades
+    - seller_orders_* / category_orders_*: órdenes distintas por (día, vendedor|categoría, estado)
+    - category_products_*: productos distintos por (día, categoría, estado)
+    Cada tabla viene ordenada por día (y por aparición dentro del día). Días como
+    int64 (días desde 1970), estados como código del store y MISSING_ID donde el
+    cálculo por filas usaba None. Si un id de orden o de producto se repite vale
+    la última fila, igual que al llenar un dict.
+    """
+    day = order_day[selected].view(np.int64)
+    status = order_status[selected].astype(np.int64)
+    pm = order_pm[selected]
+    tables: Dict[str, Dict[str, np.ndarray]] = {}
+    (group_day, group_pm, group_status), inverse = group_rows(day, pm, status)
+    tables["orders"] = {
+        "day": group_day, "pm": group_pm, "status": group_status,
+        "cents": group_sum(inverse, order_cents[selected], len(group_day)),
+        "count": np.bincount(inverse, minlength=len(group_day)),
+    }
+
+    # Cada línea toma día, método de pago y estado de su orden
+    ids = order_id[selected]
+    known = np.flatnonzero(ids != MISSING_ID)
+    unique_orders, last = _last_positions(ids[known])
+    owner_of = known[last]
+    lines = np.flatnonzero(line_valid & np.isin(line_order, unique_orders))
+    owner = owner_of[np.searchsorted(unique_orders, line_order[lines])]
+    line_day, line_pm, line_status = day[owner], pm[owner], status[owner]
+
+    products = line_product[lines]
+    listed = np.flatnonzero(product_id != MISSING_ID)
+    unique_products, last = _last_positions(product_id[listed])
+    seller = _lookup(unique_products, product_seller[listed][last], products)
+    category = _lookup(unique_products, product_category[listed][last], products)
+
+    keys, inverse = group_rows(line_day, seller, category, line_pm, line_status)
+    tables["lines"] = {
+        "day": keys[0], "seller": keys[1], "category": keys[2], "pm": keys[3], "status": keys[4],
+        "cents": group_sum(inverse, line_cents[lines], len(keys[0])),
+        "units": np.bincount(inverse, minlength=len(keys[0])),
+    }
+
+    # La categoría 0 no cuenta productos (el cálculo por filas pedía un id verdadero)
+    with_category = (category != MISSING_ID) & (category != 0)
+    keys, _ = group_rows(
+        line_day[with_category], category[with_category], line_status[with_category], products[with_category]
+    )
+    tables["category_products"] = {"day": keys[0], "category": keys[1], "status": keys[2], "product": keys[3]}
+
+    for name, column in (("seller_orders", seller), ("category_orders", category)):
+        # Pares (orden, vendedor|categoría) distintos, contados por (día, clave, estado)
+        (pair_owner, pair_key), _ = group_rows(owner, column)
+        keys, inverse = group_rows(day[pair_owner], pair_key, status[pair_owner])
+        tables[name] = {
+            "day": keys[0], "key": keys[1], "status": keys[2],
+            "count": np.bincount(inverse, minlength=len(keys[0])),
+        }
+    return {f"{name}_{column}": values for name, table in tables.items() for column, values in _by_day(table).items()}
+
+
+def client_activity(rows: np.ndarray, id_client: np.ndarray, amount_cents: np.ndarray, ordered_at: np.ndarray) -> Dict[str, np.ndarray]:
+    """Por cliente de las posiciones: centavos, órdenes y última fecha (int64 ms)"""
+    rows = rows[id_client[rows] != MISSING_ID]
+    clients, inverse = np.unique(id_client[rows], return_inverse=True)
+    last = np.full(len(clients), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(last, inverse, ordered_at[rows].view(np.int64))
+    return {
+        "clients": clients,
+        "cents": group_sum(inverse, amount_cents[rows], len(clients)),
+        "counts": np.bincount(inverse, minlength=len(clients)),
+        "last": last,
+    }
+
+
+def product_sales(
+    order_ids: np.ndarray,
+    line_order: np.ndarray,
+    line_product: np.ndarray,
+    line_subtotal: np.ndarray,
+    line_price: np.ndarray,
+    line_valid: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Por producto, de las líneas válidas de esas órdenes: líneas, centavos de
+    subtotal y de price_unit, en el orden en que cada producto aparece primero.
+    """
+    rows = np.flatnonzero(line_valid & np.isin(line_order, order_ids))
+    products, first, inverse = np.unique(line_product[rows], return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    return {
+        "products": products[order],
+        "counts": np.bincount(inverse, minlength=len(products))[order],
+        "subtotals": group_sum(inverse, line_subtotal[rows], len(products))[order],
+        "prices": group_sum(inverse, line_price[rows], len(products))[order],
+    }
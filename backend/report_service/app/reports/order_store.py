@@ -0,0 +1,518 @@
+# app/reports/order_store.py
+"""
+🧮 ALMACÉN COLUMNAR DE ÓRDENES
+Las órdenes del REST API se decodifican UNA vez a columnas NumPy tipadas:
+fechas datetime64, estado como código entero pequeño, montos en centavos (int64)
+e ids de cliente / método de pago / delivery (-1 si faltan).
+Un índice ordenado por fecha y particionado por estado (OrderDateIndex) resuelve
+los filtros "rango de fechas + estado" con búsqueda binaria; los kernels reciben
+las posiciones seleccionadas y agrupan con np.unique + sumas enteras exactas.
+Las líneas de las órdenes (/product-orders) tienen su propio almacén (LineStore).
+Todo el dinero circula en centavos int64 y se pasa a float solo al armar la
+respuesta GraphQL (cents_to_float).
+Las agregaciones pesadas son kernels de app/reports/kernels.py: los métodos
+*_call devuelven la llamada para correrla en el pool de procesos (run_kernel).
+Con snapshots (app/common/snapshots.py) los almacenes se publican como columnas
+.npy (snapshot()) y los demás workers los arman sobre los archivos mapeados
+(from_snapshot()), sin decodificar filas.
+"""
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import warnings
+
+import numpy as np
+
+from app.common.offload import KernelCall
+from app.common.rows import is_row
+from app.common.snapshots import SnapshotRows
+from app.reports import kernels
+from app.reports.kernels import MISSING_ID, group_sum as _group_sum
+
+logger = logging.getLogger(__name__)
+
+# Estados que cuentan como venta en los reportes ("paid": pago confirmado, ver report_status)
+COMPLETED_STATUSES = ("completed", "delivered", "paid")
+# Estados que el dashboard no cuenta
+DASHBOARD_EXCLUDED_STATUSES = ("cancelled", "expired")
+# Estados cerrados en los que un payment_status "paid" no convierte la orden en venta
+_CLOSED_STATUSES = frozenset({*COMPLETED_STATUSES, *DASHBOARD_EXCLUDED_STATUSES, "payment_failed", "payment_rejected"})
+
+
+def report_status(row: dict) -> str:
+    """
+    Estado de la orden para los reportes, en minúsculas. Una orden aún abierta
+    con el pago confirmado (payment_status "paid": pago con tarjeta, evento
+    payment.success) cuenta como "paid", es decir, como venta.
+    """
+    status = str(row.get("status") or "").lower()
+    if row.get("payment_status") == "paid" and status not in _CLOSED_STATUSES:
+        return "paid"
+    return status
+
+
+def parse_datetimes(values: List) -> np.ndarray:
+    """ISO-8601 -> datetime64[ms] (NaT si no se puede parsear). Hora local del string, sin zona."""
+    cleaned = [value[:-1] if isinstance(value, str) and value.endswith("Z") else value for value in values]
+    try:
+        with warnings.catch_warnings():
+            # Un offset (+05:00) haría que NumPy convierta a UTC: mejor ir fila por fila
+            warnings.simplefilter("error")
+            return np.array(cleaned, dtype="datetime64[ms]")
+    except (ValueError, TypeError, UserWarning, DeprecationWarning):
+        pass
+
+    parsed = np.full(len(cleaned), np.datetime64("NaT", "ms"))
+    for i, value in enumerate(cleaned):
+        try:
+            moment = datetime.fromisoformat(str(value).replace("Z", ""))
+        except (TypeError, ValueError):
+            continue
+        parsed[i] = np.datetime64(moment.replace(tzinfo=None), "ms")
+    return parsed
+
+
+def _parse_amounts(values: List) -> Tuple[np.ndarray, np.ndarray]:
+    """Montos ("12.50", 12.5, None) -> (centavos int64, máscara de válidos). None cuenta como 0"""
+    valid = np.ones(len(values), dtype=bool)
+    try:
+        amounts = np.array([0 if value is None else value for value in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        amounts = np.zeros(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                amounts[i] = 0 if value is None else float(value)
+            except (TypeError, ValueError):
+                valid[i] = False
+    finite = np.isfinite(amounts)
+    amounts[~finite] = 0
+    valid &= finite
+    # Montos con 2 decimales: el redondeo al centavo es exacto
+    return np.rint(amounts * 100).astype(np.int64), valid
+
+
+def _parse_cents(values: List) -> np.ndarray:
+    return _parse_amounts(values)[0]
+
+
+def parse_ids(values: List) -> np.ndarray:
+    """Ids (int, string numérica, None) -> int64 con MISSING_ID donde falta o no es un id"""
+    try:
+        return np.array([MISSING_ID if value is None else value for value in values], dtype=np.int64)
+    except (TypeError, ValueError):
+        ids = np.full(len(values), MISSING_ID, dtype=np.int64)
+        for i, value in enumerate(values):
+            try:
+                ids[i] = int(value)
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+
+def period_key(day: date, period: str) -> str:
+    """Clave del período (daily, weekly, monthly, yearly) de un día"""
+    if period == "daily":
+        return day.isoformat()
+    if period == "weekly":
+        return f"{day.year}-W{day.isocalendar()[1]}"
+    if period == "monthly":
+        return f"{day.year}-{day.month:02d}"
+    return str(day.year)
+
+
+class OrderStore:
+    """Columnas de órdenes + kernels vectorizados de los reportes"""
+
+    def __init__(
+        self,
+        id_order: np.ndarray,
+        ordered_at: np.ndarray,
+        status: np.ndarray,
+        amount_cents: np.ndarray,
+        id_client: np.ndarray,
+        id_payment_method: np.ndarray,
+        id_delivery: np.ndarray,
+        status_names: List[str],
+        day: Optional[np.ndarray] = None,
+    ):
+        self.id_order = id_order
+        self.ordered_at = ordered_at
+        self.day = ordered_at.astype("datetime64[D]") if day is None else day
+        self.status = status
+        self.amount_cents = amount_cents
+        self.id_client = id_client
+        self.id_payment_method = id_payment_method
+        self.id_delivery = id_delivery
+        # código -> nombre del estado (en minúsculas)
+        self.status_names = status_names
+        self._by_date: Optional[OrderDateIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.id_order)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "OrderStore":
+        rows = [row for row in rows if is_row(row)]
+        vocabulary: Dict[str, int] = {}
+        codes = [
+            vocabulary.setdefault(report_status(row), len(vocabulary))
+            for row in rows
+        ]
+        status_dtype = np.int8 if len(vocabulary) <= np.iinfo(np.int8).max else np.int16
+        return cls(
+            id_order=parse_ids([row.get("id_order") for row in rows]),
+            ordered_at=parse_datetimes([row.get("order_date") for row in rows]),
+            status=np.array(codes, dtype=status_dtype),
+            amount_cents=_parse_cents([row.get("total_amount") for row in rows]),
+            id_client=parse_ids([row.get("id_client") for row in rows]),
+            id_payment_method=parse_ids([row.get("id_payment_method") for row in rows]),
+            id_delivery=parse_ids([row.get("id_delivery") for row in rows]),
+            status_names=list(vocabulary),
+        )
+
+    def patched(self, rows: List[dict], positions: Iterable[int]) -> "OrderStore":
+        """
+        Store de `rows`, un listado igual al de este store salvo en `positions`
+        (filas reemplazadas o agregadas al final): solo esas filas se vuelven a
+        leer; el resto de las columnas se copia.
+        """
+        positions = np.fromiter(positions, dtype=np.intp)
+        changes = OrderStore.from_rows([rows[position] for position in positions.tolist()])
+        names = list(self.status_names)
+        vocabulary = {name: code for code, name in enumerate(names)}
+        codes = [vocabulary.setdefault(name, len(vocabulary)) for name in changes.status_names]
+        names.extend(list(vocabulary)[len(names):])
+        status_dtype = np.int8 if len(names) <= np.iinfo(np.int8).max else np.int16
+
+        def column(current: np.ndarray, values: np.ndarray, dtype=None) -> np.ndarray:
+            result = np.empty(len(rows), dtype=dtype or current.dtype)
+            result[:len(current)] = current
+            result[positions] = values
+            return result
+
+        return OrderStore(
+            id_order=column(self.id_order, changes.id_order),
+            ordered_at=column(self.ordered_at, changes.ordered_at),
+            status=column(self.status, np.array(codes, dtype=np.int16)[changes.status], status_dtype),
+            amount_cents=column(self.amount_cents, changes.amount_cents),
+            id_client=column(self.id_client, changes.id_client),
+            id_payment_method=column(self.id_payment_method, changes.id_payment_method),
+            id_delivery=column(self.id_delivery, changes.id_delivery),
+            status_names=names,
+        )
+
+    # ------------------------------------------------------------ snapshots
+
+    COLUMNS = ("id_order", "ordered_at", "day", "status", "amount_cents", "id_client", "id_payment_method", "id_delivery")
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        """(columnas, metadatos) para publicar el store junto con su índice por fecha"""
+        columns = {name: getattr(self, name) for name in self.COLUMNS}
+        columns["by_date_positions"] = self.by_date.positions_sorted
+        columns["by_date_days"] = self.by_date.days_sorted
+        return columns, {"status_names": self.status_names}
+
+    @classmethod
+    def from_snapshot(cls, columns: Dict[str, np.ndarray], meta: dict) -> "OrderStore":
+        store = cls(**{name: columns[name] for name in cls.COLUMNS}, status_names=meta["status_names"])
+        store._by_date = OrderDateIndex(store, columns["by_date_positions"], columns["by_date_days"])
+        return store
+
+    # ------------------------------------------------------------ selección
+
+    @property
+    def by_date(self) -> "OrderDateIndex":
+        """Índice por fecha (se construye la primera vez que se usa)"""
+        if self._by_date is None:
+            self._by_date = OrderDateIndex(self)
+        return self._by_date
+
+    def status_codes(self, statuses: Iterable[str]) -> List[int]:
+        statuses = set(statuses)
+        return [code for code, name in enumerate(self.status_names) if name in statuses]
+
+    def completed_between(self, start: date, end: date) -> np.ndarray:
+        """Posiciones de órdenes completadas, entregadas o pagadas con fecha en [start, end]"""
+        return self.by_date.positions(start, end, statuses=COMPLETED_STATUSES)
+
+    # ------------------------------------------------------------ kernels
+    # `rows` son posiciones (np.ndarray de enteros) devueltas por el índice
+
+    def totals(self, rows: np.ndarray) -> Tuple[int, int]:
+        """(centavos, cantidad de órdenes) de las posiciones"""
+        return int(self.amount_cents[rows].sum()), len(rows)
+
+    def sales_by_period(self, rows: np.ndarray, period: str) -> List[Tuple[str, int, int]]:
+        """[(clave del período, centavos, órdenes)] ordenado por clave"""
+        days, inverse = np.unique(self.day[rows], return_inverse=True)
+        day_cents = _group_sum(inverse, self.amount_cents[rows], len(days))
+        day_counts = np.bincount(inverse, minlength=len(days))
+
+        buckets: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for day, cents, count in zip(days.tolist(), day_cents.tolist(), day_counts.tolist()):
+            bucket = buckets[period_key(day, period)]
+            bucket[0] += cents
+            bucket[1] += count
+        return [(key, cents, count) for key, (cents, count) in sorted(buckets.items())]
+
+    def group_by(self, keys: np.ndarray, rows: np.ndarray) -> List[Tuple[int, int, int]]:
+        """[(clave, centavos, órdenes)] agrupando las posiciones por una columna de ids (MISSING_ID es su propio grupo)"""
+        unique, inverse = np.unique(keys[rows], return_inverse=True)
+        cents = _group_sum(inverse, self.amount_cents[rows], len(unique))
+        counts = np.bincount(inverse, minlength=len(unique))
+        return list(zip(unique.tolist(), cents.tolist(), counts.tolist()))
+
+    def client_activity(self, rows: np.ndarray) -> List[Tuple[int, int, int, Optional[datetime]]]:
+        """[(id_client, centavos, órdenes, última orden)]"""
+        return activity_entries(self.client_activity_call(rows).inline())
+
+    def client_activity_call(self, rows: np.ndarray) -> KernelCall:
+        """client_activity como llamada al kernel (ver activity_entries)"""
+        columns = {"id_client": self.id_client, "amount_cents": self.amount_cents, "ordered_at": self.ordered_at}
+        return KernelCall(kernels.client_activity, ((self, columns),), {"rows": rows})
+
+    def ids(self, column: np.ndarray, rows: np.ndarray) -> set:
+        """Ids distintos (sin -1) de una columna en las posiciones"""
+        values = column[rows]
+        return set(values[values != MISSING_ID].tolist())
+
+
+class OrderDateIndex:
+    """
+    Posiciones de las órdenes ordenadas por (estado, fecha): cada estado ocupa un
+    tramo contiguo y dentro de él las fechas están ordenadas, así un rango de
+    fechas se resuelve con dos búsquedas binarias por estado (O(log n + k)).
+    Las órdenes sin fecha válida no entran al índice.
+    """
+
+    def __init__(
+        self,
+        store: OrderStore,
+        positions_sorted: Optional[np.ndarray] = None,
+        days_sorted: Optional[np.ndarray] = None,
+    ):
+        if positions_sorted is None:
+            valid = np.flatnonzero(~np.isnat(store.day))
+            # lexsort ordena por la última clave primero: estado y luego fecha
+            positions_sorted = valid[np.lexsort((store.day[valid], store.status[valid]))]
+            days_sorted = store.day[positions_sorted]
+        self.positions_sorted = positions_sorted
+        self.days_sorted = days_sorted
+        statuses_sorted = store.status[self.positions_sorted]
+        codes = np.arange(len(store.status_names), dtype=statuses_sorted.dtype)
+        # Tramo [inicio, fin) de cada código de estado
+        self._starts = np.searchsorted(statuses_sorted, codes, side="left").tolist()
+        self._ends = np.searchsorted(statuses_sorted, codes, side="right").tolist()
+        self._store = store
+
+    def select(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        statuses: Optional[Iterable[str]] = None,
+        exclude: Iterable[str] = (),
+    ) -> List[np.ndarray]:
+        """
+        Posiciones con fecha en [start, end] (None = sin límite) por estado.
+        Devuelve una vista (sin copia) por cada estado seleccionado.
+        """
+        store = self._store
+        codes = range(len(store.status_names)) if statuses is None else store.status_codes(statuses)
+        excluded = set(store.status_codes(exclude))
+        lo_day = None if start is None else np.datetime64(start, "D")
+        hi_day = None if end is None else np.datetime64(end, "D")
+
+        views = []
+        for code in codes:
+            if code in excluded:
+                continue
+            begin, finish = self._starts[code], self._ends[code]
+            if begin == finish:
+                continue
+            days = self.days_sorted[begin:finish]
+            lo = 0 if lo_day is None else int(np.searchsorted(days, lo_day, side="left"))
+            hi = len(days) if hi_day is None else int(np.searchsorted(days, hi_day, side="right"))
+            if lo < hi:
+                views.append(self.positions_sorted[begin + lo:begin + hi])
+        return views
+
+    def positions(self, start: Optional[date] = None, end: Optional[date] = None, **filters) -> np.ndarray:
+        """Igual que select() pero en un solo arreglo (copia solo las k posiciones)"""
+        views = self.select(start, end, **filters)
+        if not views:
+            return np.empty(0, dtype=np.intp)
+        return views[0] if len(views) == 1 else np.concatenate(views)
+
+    def count(self, start: Optional[date] = None, end: Optional[date] = None, **filters) -> int:
+        return sum(len(view) for view in self.select(start, end, **filters))
+
+
+class LineStore:
+    """Columnas de /product-orders (líneas de las órdenes) con montos en centavos"""
+
+    def __init__(
+        self,
+        id_order: np.ndarray,
+        id_product: np.ndarray,
+        subtotal_cents: np.ndarray,
+        price_cents: np.ndarray,
+        valid: np.ndarray,
+    ):
+        self.id_order = id_order
+        self.id_product = id_product
+        self.subtotal_cents = subtotal_cents
+        self.price_cents = price_cents
+        # Líneas con orden, producto y montos utilizables
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return len(self.id_order)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "LineStore":
+        rows = [row for row in rows if is_row(row)]
+        id_order = parse_ids([row.get("id_order") for row in rows])
+        id_product = parse_ids([row.get("id_product") for row in rows])
+        subtotal_cents, subtotal_ok = _parse_amounts([row.get("subtotal") for row in rows])
+        price_cents, price_ok = _parse_amounts([row.get("price_unit") for row in rows])
+        valid = subtotal_ok & price_ok & (id_order != MISSING_ID) & (id_product != MISSING_ID)
+        return cls(id_order, id_product, subtotal_cents, price_cents, valid)
+
+    COLUMNS = ("id_order", "id_product", "subtotal_cents", "price_cents", "valid")
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        return {name: getattr(self, name) for name in self.COLUMNS}, {}
+
+    @classmethod
+    def from_snapshot(cls, columns: Dict[str, np.ndarray], meta: dict) -> "LineStore":
+        return cls(**{name: columns[name] for name in cls.COLUMNS})
+
+    def product_sales(self, order_ids: Iterable[int]) -> List[Tuple[int, int, int, int]]:
+        """
+        [(id_product, líneas, centavos de subtotal, centavos de price_unit sumados)]
+        de las líneas válidas de esas órdenes, en el orden en que cada producto
+        aparece por primera vez en el listado.
+        """
+        return product_sales_entries(self.product_sales_call(order_ids).inline())
+
+    def product_sales_call(self, order_ids: Iterable[int]) -> KernelCall:
+        """product_sales como llamada al kernel (ver product_sales_entries)"""
+        order_ids = np.fromiter(order_ids, dtype=np.int64) if not isinstance(order_ids, np.ndarray) else order_ids
+        columns = {
+            "line_order": self.id_order,
+            "line_product": self.id_product,
+            "line_subtotal": self.subtotal_cents,
+            "line_price": self.price_cents,
+            "line_valid": self.valid,
+        }
+        return KernelCall(kernels.product_sales, ((self, columns),), {"order_ids": order_ids})
+
+
+class ProductStore:
+    """Columnas de /products que usan los agregados: id, vendedor y categoría (-1 si faltan)"""
+
+    COLUMNS = ("id_product", "id_seller", "id_category")
+
+    def __init__(self, id_product: np.ndarray, id_seller: np.ndarray, id_category: np.ndarray):
+        self.id_product = id_product
+        self.id_seller = id_seller
+        self.id_category = id_category
+
+    def __len__(self) -> int:
+        return len(self.id_product)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "ProductStore":
+        rows = [row for row in rows if is_row(row) and "id_product" in row]
+        return cls(
+            id_product=parse_ids([row["id_product"] for row in rows]),
+            id_seller=parse_ids([row.get("id_seller") for row in rows]),
+            id_category=parse_ids([row.get("id_category") for row in rows]),
+        )
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        return {name: getattr(self, name) for name in self.COLUMNS}, {}
+
+    @classmethod
+    def from_snapshot(cls, columns: Dict[str, np.ndarray], meta: dict) -> "ProductStore":
+        return cls(**{name: columns[name] for name in cls.COLUMNS})
+
+
+def activity_entries(result: Dict[str, np.ndarray]) -> List[Tuple[int, int, int, Optional[datetime]]]:
+    """Resultado de kernels.client_activity -> [(id_client, centavos, órdenes, última orden)]"""
+    last_dates = result["last"].astype("datetime64[ms]").astype(object)
+    return list(zip(result["clients"].tolist(), result["cents"].tolist(), result["counts"].tolist(), last_dates))
+
+
+def product_sales_entries(result: Dict[str, np.ndarray]) -> List[Tuple[int, int, int, int]]:
+    """Resultado de kernels.product_sales -> [(id_product, líneas, centavos de subtotal, de price_unit)]"""
+    return list(zip(
+        result["products"].tolist(), result["counts"].tolist(), result["subtotals"].tolist(), result["prices"].tolist()
+    ))
+
+
+# Memo de los últimos listados decodificados (el mismo listado llega a varios reportes)
+_STORE_MEMO_SIZE = 8
+_stores: "OrderedDict[Tuple[int, type], Tuple[list, object]]" = OrderedDict()
+
+
+def _store_for(rows: List[dict], store_type):
+    key = (id(rows), store_type)
+    cached = _stores.get(key)
+    # Se guarda la lista junto al store para que id(rows) no pueda reutilizarse
+    if cached is not None and cached[0] is rows:
+        _stores.move_to_end(key)
+        return cached[1]
+    if isinstance(rows, SnapshotRows) and rows.meta.get("store") == store_type.__name__:
+        # Listado de un snapshot: las columnas ya están en los archivos mapeados
+        store = store_type.from_snapshot(rows.columns, rows.meta)
+    else:
+        store = store_type.from_rows(rows)
+    _remember(rows, store)
+    return store
+
+
+def _remember(rows: List[dict], store) -> None:
+    _stores[(id(rows), type(store))] = (rows, store)
+    while len(_stores) > _STORE_MEMO_SIZE:
+        _stores.popitem(last=False)
+
+
+def order_store_for(rows: List[dict]) -> OrderStore:
+    """OrderStore de un listado de órdenes, decodificado una sola vez por listado"""
+    return _store_for(rows, OrderStore)
+
+
+def order_store_patched(previous: List[dict], rows: List[dict], positions: List[int]) -> None:
+    """
+    Deja en el memo el OrderStore de `rows` derivado del de `previous` (el mismo
+    listado salvo `positions`, p.ej. una réplica tras aplicar eventos). Si el de
+    `previous` no está en el memo no hace nada: se construirá al usarse.
+    """
+    cached = _stores.get((id(previous), OrderStore))
+    if cached is None or cached[0] is not previous:
+        return
+    store = cached[1]
+    # Las posiciones del store coinciden con las del listado solo si todas son filas
+    if len(store) != len(previous) or len(rows) < len(previous) or not all(is_row(rows[p]) for p in positions):
+        return
+    _remember(rows, store.patched(rows, positions))
+
+
+def line_store_for(rows: List[dict]) -> LineStore:
+    """LineStore de un listado de product-orders, decodificado una sola vez por listado"""
+    return _store_for(rows, LineStore)
+
+
+def product_store_for(rows: List[dict]) -> ProductStore:
+    """ProductStore de un listado de productos, decodificado una sola vez por listado"""
+    return _store_for(rows, ProductStore)
+
+
+# Listado -> almacén que se publica con él en los snapshots
+SNAPSHOT_STORES = {"orders": order_store_for, "product_orders": line_store_for, "products": product_store_for}
+
+
+def cents_to_float(cents: int) -> float:
+    return cents / 100
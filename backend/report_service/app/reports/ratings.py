@@ -0,0 +1,261 @@
+# app/reports/ratings.py
+"""
+⭐ AGREGADOS DE VALORACIONES POR PRODUCTO
+Índice en memoria con (suma, cantidad) de ratings y unidades vendidas por producto.
+- Vía masiva: las reseñas viven en product_order.rating, así que una sola descarga
+  de /product-orders alimenta todo el índice. Al refrescar solo se aplican las
+  filas que cambiaron (delta), sin reconstruir.
+- Fallback: si el listado no trae ratings, se consulta /orders/products/{id}/reviews
+  con concurrencia acotada y solo para productos nuevos o vencidos.
+- Unidades vendidas: líneas de órdenes que cuentan como venta (COMPLETED_STATUSES,
+  como el resto de los reportes), en los dos modos.
+El top-k se sirve desde el índice con un heap (O(n log k), app/common/topk.py).
+"""
+from typing import AbstractSet, Dict, Hashable, Iterator, List, Optional, Tuple
+import asyncio
+import contextvars
+import logging
+import time
+
+import httpx
+import numpy as np
+
+from app import config
+from app.common.datasource import load_rows
+from app.common.http_client import get_upstream_client
+from app.common.rows import is_row
+from app.common.topk import top_k
+from app.common.utils import extract_data_from_response
+from app.reports.order_store import COMPLETED_STATUSES, order_store_for
+
+logger = logging.getLogger(__name__)
+
+
+class RatingAggregate:
+    __slots__ = ("rating_sum", "rating_count", "units_sold")
+
+    def __init__(self):
+        self.rating_sum = 0
+        self.rating_count = 0
+        self.units_sold = 0
+
+    @property
+    def average(self) -> float:
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
+
+
+def _valid_rating(value) -> Optional[int]:
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        return None
+    return rating if rating > 0 else None
+
+
+class RatingIndex:
+    """Agregados de rating por producto, compartidos por todo el proceso"""
+
+    def __init__(self):
+        self._by_product: Dict[Hashable, RatingAggregate] = {}
+        # id_product_order -> (id_product, rating, vendida) ya aplicado al índice
+        self._applied: Dict[Hashable, Tuple[Hashable, Optional[int], bool]] = {}
+        # Fallback: momento de la última consulta de reseñas por producto
+        self._product_fetched_at: Dict[Hashable, float] = {}
+        self.refreshed_at: Optional[float] = None
+        self.mode: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._background: Optional[asyncio.Task] = None
+
+    @property
+    def warm(self) -> bool:
+        return self.refreshed_at is not None
+
+    def is_stale(self) -> bool:
+        return not self.warm or time.monotonic() - self.refreshed_at >= config.RATINGS_REFRESH_SECONDS
+
+    def get(self, product_id: Hashable) -> Optional[RatingAggregate]:
+        return self._by_product.get(product_id)
+
+    # ------------------------------------------------------------ vía masiva
+
+    def _aggregate(self, product_id: Hashable) -> RatingAggregate:
+        aggregate = self._by_product.get(product_id)
+        if aggregate is None:
+            aggregate = self._by_product[product_id] = RatingAggregate()
+        return aggregate
+
+    def _retract(self, product_id: Hashable, rating: Optional[int], sold: bool) -> None:
+        aggregate = self._by_product.get(product_id)
+        if aggregate is None:
+            return
+        aggregate.units_sold -= sold
+        if rating is not None:
+            aggregate.rating_sum -= rating
+            aggregate.rating_count -= 1
+
+    def apply_product_orders(self, rows: List[dict], sold_orders: AbstractSet[Hashable]) -> int:
+        """
+        Aplica el listado de product_order como delta sobre el índice; devuelve
+        filas cambiadas. Solo las líneas de `sold_orders` suman unidades vendidas.
+        """
+        changed = 0
+        seen = set()
+        for row in rows:
+            try:
+                row_id = row["id_product_order"]
+                product_id = row["id_product"]
+            except (KeyError, TypeError):
+                continue
+            seen.add(row_id)
+            current = (product_id, _valid_rating(row.get("rating")), row.get("id_order") in sold_orders)
+            previous = self._applied.get(row_id)
+            if previous == current:
+                continue
+            if previous is not None:
+                self._retract(*previous)
+            aggregate = self._aggregate(product_id)
+            aggregate.units_sold += current[2]
+            if current[1] is not None:
+                aggregate.rating_sum += current[1]
+                aggregate.rating_count += 1
+            self._applied[row_id] = current
+            changed += 1
+
+        # Filas que ya no existen en el REST API
+        for row_id in [row_id for row_id in self._applied if row_id not in seen]:
+            self._retract(*self._applied.pop(row_id))
+            changed += 1
+        return changed
+
+    # ------------------------------------------------------------ fallback
+
+    def replace_units_sold(self, rows: List[dict], sold_orders: AbstractSet[Hashable]) -> None:
+        """Unidades vendidas por producto recontadas desde el listado de product_order"""
+        for aggregate in self._by_product.values():
+            aggregate.units_sold = 0
+        for row in rows:
+            if is_row(row) and row.get("id_order") in sold_orders and row.get("id_product") is not None:
+                self._aggregate(row["id_product"]).units_sold += 1
+
+    def replace_product_reviews(self, product_id: Hashable, reviews: List[dict]) -> None:
+        aggregate = self._aggregate(product_id)
+        ratings = [rating for rating in (_valid_rating(r.get("rating")) for r in reviews if isinstance(r, dict)) if rating]
+        aggregate.rating_sum = sum(ratings)
+        aggregate.rating_count = len(ratings)
+        self._product_fetched_at[product_id] = time.monotonic()
+
+    def products_to_refetch(self, product_ids: List[Hashable]) -> List[Hashable]:
+        now = time.monotonic()
+        return [
+            product_id for product_id in product_ids
+            if now - self._product_fetched_at.get(product_id, float("-inf")) >= config.RATINGS_REFRESH_SECONDS
+        ]
+
+    # ------------------------------------------------------------ consulta
+
+    @staticmethod
+    def rank_key(item: Tuple[Hashable, RatingAggregate]) -> Tuple[float, int]:
+        """Mejor rating promedio; desempata el número de reseñas"""
+        return round(item[1].average, 2), item[1].rating_count
+
+    def candidates(self, product_ids: Optional[List[Hashable]] = None) -> Iterator[Tuple[Hashable, RatingAggregate]]:
+        """(producto, agregado) con al menos una reseña; con `product_ids`, en ese orden"""
+        if product_ids is None:
+            pairs = self._by_product.items()
+        else:
+            pairs = ((product_id, self._by_product.get(product_id)) for product_id in product_ids)
+        return (
+            (product_id, aggregate)
+            for product_id, aggregate in pairs
+            if aggregate is not None and aggregate.rating_count > 0
+        )
+
+    def top(self, k: int, product_ids: Optional[List[Hashable]] = None) -> List[Tuple[Hashable, RatingAggregate]]:
+        """
+        Los k productos con mejor rating promedio (desempata el número de reseñas).
+        Con `product_ids` solo se consideran esos productos y, a igualdad, gana el que aparece antes.
+        """
+        return top_k(self.candidates(product_ids), k, key=self.rank_key)
+
+    def clear(self) -> None:
+        self._by_product.clear()
+        self._applied.clear()
+        self._product_fetched_at.clear()
+        self.refreshed_at = None
+        self.mode = None
+
+
+_index = RatingIndex()
+
+
+async def _fetch_reviews(product_id: Hashable, semaphore: asyncio.Semaphore) -> Optional[List[dict]]:
+    async with semaphore:
+        try:
+            data = await get_upstream_client().get_json(f"/orders/products/{product_id}/reviews")
+            return extract_data_from_response(data, ["reviews", "data"]) if data else []
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Reseñas de producto {product_id} no disponibles: {e}")
+            return None
+
+
+async def _refresh_per_product(index: RatingIndex, product_ids: List[Hashable]) -> None:
+    pending = index.products_to_refetch(product_ids)
+    semaphore = asyncio.Semaphore(max(config.RATINGS_FETCH_CONCURRENCY, 1))
+    results = await asyncio.gather(*(_fetch_reviews(product_id, semaphore) for product_id in pending))
+    for product_id, reviews in zip(pending, results):
+        if reviews is not None:
+            index.replace_product_reviews(product_id, reviews)
+    logger.info(f"⭐ Reseñas consultadas por producto: {len(pending)} de {len(product_ids)}")
+
+
+def _sold_orders(orders: List[dict]) -> AbstractSet[Hashable]:
+    """Ids de las órdenes que cuentan como venta (estado de los reportes, ver order_store)"""
+    store = order_store_for(orders)
+    sold = np.isin(store.status, store.status_codes(COMPLETED_STATUSES))
+    return frozenset(store.id_order[sold].tolist())
+
+
+async def _refresh(index: RatingIndex, product_ids: List[Hashable]) -> None:
+    async with index._lock:
+        if not index.is_stale():
+            return
+        try:
+            rows, orders = await asyncio.gather(
+                load_rows(config.RATINGS_BULK_ENDPOINT, data_keys=["product_orders", "productOrders", "data"]),
+                load_rows("/orders", data_keys=["orders", "data"]),
+            )
+            sold_orders = _sold_orders(orders)
+            if any(is_row(row) and "rating" in row for row in rows):
+                changed = index.apply_product_orders(rows, sold_orders)
+                index.mode = "bulk"
+                logger.info(f"⭐ Índice de ratings actualizado: {changed} filas cambiadas")
+            else:
+                await _refresh_per_product(index, product_ids)
+                index.replace_units_sold(rows, sold_orders)
+                index.mode = "per_product"
+            index.refreshed_at = time.monotonic()
+            index.last_error = None
+        except httpx.HTTPError as e:
+            index.last_error = str(e)
+            logger.error(f"❌ Error refrescando índice de ratings: {e}")
+
+
+async def get_rating_index(product_ids: List[Hashable]) -> RatingIndex:
+    """
+    Índice de ratings listo para consultar. La primera vez se construye esperando;
+    después, si está vencido, se sirve el actual y se refresca en segundo plano.
+    """
+    index = _index
+    if not index.warm:
+        await _refresh(index, product_ids)
+    elif index.is_stale() and (index._background is None or index._background.done()):
+        index._background = asyncio.get_running_loop().create_task(
+            _refresh(index, product_ids), context=contextvars.Context()
+        )
+    return index
+
+
+def invalidate_ratings() -> None:
+    """Descarta el índice (la próxima consulta lo reconstruye)"""
+    _index.clear()
@@ -3,8 +3,12 @@
 Resolvers GraphQL para los reportes
 """
 import strawberry
-from typing import Optional
+from strawberry.types import Info
+from typing import List, Optional
 from datetime import date, timedelta
+from app.common.lookahead import selected_field_names
+from app.common.topk import page_offset
+from app.reports.engine import ACCUMULATORS, ReportRequest, run_reports
 from app.reports.schema import (
     SalesReport,
     TopSellersReport,
@@ -16,7 +20,9 @@ from app.reports.schema import (
     DeliveryPerformanceReport,
     FinancialReport,
     DashboardStats,
+    ReportBundle,
     SellerDashboardStats,
+    SellerIdMapping,
     DateRangeInput,
     ReportPeriod
 )
@@ -32,7 +38,8 @@ from app.reports.service import (
     get_financial_report,
     get_dashboard_stats,
     get_seller_dashboard_stats,
-    get_seller_best_products
+    get_seller_best_products,
+    resolve_seller_ids
 )
 
 @strawberry.type
@@ -63,10 +70,13 @@ class ReportQueries:
     async def top_sellers_report(
         self,
         date_range: Optional[DateRangeInput] = None,
-        limit: int = 10
+        limit: int = 10,
+        offset: int = 0,
+        after: Optional[str] = None
     ) -> TopSellersReport:
         """
         Reporte de mejores vendedores por ventas totales.
+        Paginado con `offset` o con el cursor `after` (page_info.end_cursor).
         """
         if date_range:
             start_date = date_range.start_date
@@ -75,16 +85,19 @@ class ReportQueries:
             end_date = date.today()
             start_date = end_date - timedelta(days=30)
         
-        return await get_top_sellers_report(start_date, end_date, limit)
+        return await get_top_sellers_report(start_date, end_date, limit, page_offset(offset, after))
     
     @strawberry.field
     async def best_products_report(
         self,
         date_range: Optional[DateRangeInput] = None,
-        limit: int = 20
+        limit: int = 20,
+        offset: int = 0,
+        after: Optional[str] = None
     ) -> BestProductsReport:
         """
         Reporte de productos más vendidos ordenados por unidades vendidas.
+        Paginado con `offset` o con el cursor `after` (page_info.end_cursor).
         """
         if date_range:
             start_date = date_range.start_date
@@ -93,18 +106,20 @@ class ReportQueries:
             end_date = date.today()
             start_date = end_date - timedelta(days=30)
         
-        return await get_best_products_report(start_date, end_date, limit)
+        return await get_best_products_report(start_date, end_date, limit, page_offset(offset, after))
     
     @strawberry.field
     async def top_rated_products_report(
         self,
-        limit: int = 20
+        limit: int = 20,
+        offset: int = 0,
+        after: Optional[str] = None
     ) -> TopRatedProductsReport:
         """
         Reporte de productos mejor valorados basado en las reseñas de los clientes.
-        Ordena por rating promedio y número de reseñas.
+        Ordena por rating promedio y número de reseñas. Paginado con `offset` o `after`.
         """
-        return await get_top_rated_products_report(limit)
+        return await get_top_rated_products_report(limit, page_offset(offset, after))
     
     @strawberry.field
     async def category_sales_report(
@@ -127,10 +142,13 @@ class ReportQueries:
     async def clients_report(
         self,
         date_range: Optional[DateRangeInput] = None,
-        top_limit: int = 10
+        top_limit: int = 10,
+        offset: int = 0,
+        after: Optional[str] = None
     ) -> ClientsReport:
         """
         Reporte de actividad y comportamiento de clientes.
+        top_clients se pagina con `offset` o con el cursor `after`.
         """
         if date_range:
             start_date = date_range.start_date
@@ -139,7 +157,7 @@ class ReportQueries:
             end_date = date.today()
             start_date = end_date - timedelta(days=30)
         
-        return await get_clients_report(start_date, end_date, top_limit)
+        return await get_clients_report(start_date, end_date, top_limit, page_offset(offset, after))
     
     @strawberry.field
     async def inventory_report(
@@ -192,6 +210,31 @@ class ReportQueries:
         """
         return await get_dashboard_stats()
     
+    @strawberry.field
+    async def report_bundle(
+        self,
+        info: Info,
+        date_range: Optional[DateRangeInput] = None,
+        period: ReportPeriod = ReportPeriod.DAILY,
+        top_limit: int = 10
+    ) -> ReportBundle:
+        """
+        Dashboard de admin en una sola consulta: dashboard_stats, sales_report,
+        financial_report, clients_report y category_sales_report.
+        Solo se calculan los reportes pedidos, compartiendo descargas y recorridos.
+        """
+        if date_range:
+            start_date = date_range.start_date
+            end_date = date_range.end_date
+        else:
+            end_date = date.today()
+            start_date = end_date - timedelta(days=30)
+        
+        # Lookahead: reportes presentes en el selection set
+        requested = [name for name in ACCUMULATORS if name in selected_field_names(info)]
+        request = ReportRequest(start_date, end_date, period=period.value, top_limit=top_limit)
+        return ReportBundle(**await run_reports(requested, request))
+    
     @strawberry.field
     async def seller_dashboard_stats(self, seller_id: str) -> SellerDashboardStats:
         """
@@ -201,6 +244,19 @@ class ReportQueries:
         """
         return await get_seller_dashboard_stats(seller_id)
     
+    @strawberry.field
+    async def seller_ids(self, seller_identifiers: List[str]) -> List[SellerIdMapping]:
+        """
+        Resuelve varios vendedores a la vez (vistas de administración), en el
+        orden recibido. Acepta UUID (user_id) e id_seller numérico; los UUID
+        desconocidos se resuelven con una sola descarga de /sellers.
+        """
+        resolved = await resolve_seller_ids(seller_identifiers)
+        return [
+            SellerIdMapping(seller_identifier=identifier, seller_id=resolved.get(identifier))
+            for identifier in seller_identifiers
+        ]
+    
     @strawberry.field
     async def seller_best_products(
         self,
@@ -0,0 +1,369 @@
+# app/reports/rollup.py
+"""
+🧊 CUBO DE AGREGADOS DIARIOS (ROLLUP)
+Ventas pre-agregadas por día y por (vendedor, categoría, método de pago, estado):
+ingresos en centavos, cantidad de órdenes y unidades. Los reportes de ventas,
+vendedores, categorías y finanzas suman los buckets del rango pedido en lugar
+de recorrer todas las órdenes y product-orders en cada request.
+- Los días cerrados son inmutables: una vez sellados no se recalculan.
+- Solo los días abiertos (hoy, ver ROLLUP_OPEN_DAYS) se recomputan, como mucho
+  cada ROLLUP_REFRESH_SECONDS y sin descargar nada mientras el cubo esté fresco.
+- Cada ROLLUP_REBUILD_SECONDS se reconstruye completo para absorber cambios
+  tardíos de estado en días ya cerrados (0 = nunca).
+- La agregación es un kernel NumPy (kernels.daily_rollup): un refresco grande
+  (el primero, las reconstrucciones) corre en el pool de procesos y el loop
+  sigue atendiendo; aquí solo se pasan los grupos a los buckets.
+"""
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from app import config
+from app.common.offload import KernelCall, run_kernel
+from app.reports import kernels
+from app.reports.datasets import load_datasets
+from app.reports.order_store import MISSING_ID, OrderStore, line_store_for, order_store_for, product_store_for
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_DATASETS = ("orders", "product_orders", "products")
+
+
+class DayRollup:
+    """Agregados de un día"""
+
+    __slots__ = ("orders", "lines", "seller_orders", "category_orders", "category_products")
+
+    def __init__(self):
+        # (método de pago, estado) -> [centavos de total_amount, órdenes]
+        self.orders: Dict[Tuple[Hashable, str], List[int]] = defaultdict(lambda: [0, 0])
+        # (vendedor, categoría, método de pago, estado) -> [centavos de subtotal, unidades]
+        self.lines: Dict[Tuple[Hashable, Hashable, Hashable, str], List[int]] = defaultdict(lambda: [0, 0])
+        # Órdenes distintas por (vendedor, estado) y (categoría, estado): una orden cae en un solo día
+        self.seller_orders: Counter = Counter()
+        self.category_orders: Counter = Counter()
+        # Productos distintos vendidos por (categoría, estado)
+        self.category_products: Dict[Tuple[Hashable, str], Set[Hashable]] = defaultdict(set)
+
+
+class RollupCube:
+    """Buckets diarios ordenados por fecha + consultas por rango"""
+
+    def __init__(self):
+        self._days: Dict[date, DayRollup] = {}
+        self._sorted_days: List[date] = []
+        # Días anteriores a esta fecha están sellados
+        self.sealed_before: date = date.min
+        self.refreshed_at: Optional[float] = None
+        self.built_at: Optional[float] = None
+        self._source: Optional[Tuple[list, list, list]] = None
+        self._lock = asyncio.Lock()
+        # Cambios de órdenes llegados mientras un refresco espera al kernel: se aplican al terminar
+        self._refreshing = False
+        self._pending: List[tuple] = []
+        # Sube con clear(): un refresco que empezó antes descarta su resultado
+        self._epoch = 0
+
+    @property
+    def warm(self) -> bool:
+        return self.refreshed_at is not None
+
+    def is_stale(self) -> bool:
+        return not self.warm or time.monotonic() - self.refreshed_at >= config.ROLLUP_REFRESH_SECONDS
+
+    def needs_rebuild(self) -> bool:
+        return (
+            config.ROLLUP_REBUILD_SECONDS > 0
+            and self.built_at is not None
+            and time.monotonic() - self.built_at >= config.ROLLUP_REBUILD_SECONDS
+        )
+
+    def clear(self) -> None:
+        self._days.clear()
+        self._sorted_days.clear()
+        self.sealed_before = date.min
+        self.refreshed_at = None
+        self.built_at = None
+        self._source = None
+        self._pending.clear()
+        self._epoch += 1
+
+    # ------------------------------------------------------------ construcción
+
+    async def refresh(self, orders: List[dict], product_orders: List[dict], products: List[dict], today: date) -> int:
+        """
+        Recalcula los días no sellados a partir de los listados y sella los que ya cerraron.
+        Devuelve la cantidad de días recalculados.
+        """
+        source = (orders, product_orders, products)
+        if self._source is not None and all(a is b for a, b in zip(self._source, source)):
+            # Mismos listados que la última vez: nada nuevo que agregar
+            self.refreshed_at = time.monotonic()
+            return 0
+
+        started_at = time.monotonic()
+        store = order_store_for(orders)
+        call, size = _rollup_call(store, product_orders, products, self.sealed_before)
+        epoch = self._epoch
+        self._refreshing = True
+        try:
+            groups = await run_kernel(call, size)
+            days: Dict[date, DayRollup] = {}
+            for count, (day, bucket) in enumerate(_day_buckets(store, groups), start=1):
+                days[day] = bucket
+                if count % _DAYS_PER_YIELD == 0:
+                    # Un historial largo son muchos buckets: se arma por tramos sin bloquear el loop
+                    await asyncio.sleep(0)
+        except BaseException:
+            self._pending.clear()
+            raise
+        finally:
+            self._refreshing = False
+        if epoch != self._epoch:
+            # clear() durante el cálculo: el resultado parcial no sirve para el cubo vacío
+            return 0
+
+        if self.sealed_before == date.min:
+            self.built_at = started_at
+        rebuilt = self._replace_days(days, self.sealed_before)
+        self.sealed_before = today - timedelta(days=max(config.ROLLUP_OPEN_DAYS, 1) - 1)
+        self._source = source
+        self.refreshed_at = time.monotonic()
+
+        pending, self._pending = self._pending, []
+        for changes in pending:
+            if not self.apply_order_changes(*changes):
+                self.refreshed_at = None
+                break
+        return rebuilt
+
+    def apply_order_changes(
+        self,
+        previous: List[dict],
+        orders: List[dict],
+        positions: List[int],
+        lines: Optional[Tuple[List[dict], List[dict]]] = None,
+    ) -> bool:
+        """
+        Pasa el cubo de `previous` (listado de la última actualización) a `orders`,
+        igual salvo en `positions` (ver Replica.upsert): solo se recalculan los días
+        de esas órdenes, antes y después del cambio, aunque estén sellados. Una
+        posición puede existir solo en uno de los dos listados (altas, bajas).
+        `lines`: (product-orders anterior, nuevo) si también cambiaron.
+        Devuelve False si el cubo no sale de esos listados (hay que refrescarlo).
+        """
+        if self._source is None or self._source[0] is not previous:
+            return False
+        _, product_orders, products = self._source
+        if lines is not None:
+            if lines[0] is not product_orders:
+                return False
+            product_orders = lines[1]
+        old_store, store = order_store_for(previous), order_store_for(orders)
+        if len(old_store) != len(previous) or len(store) != len(orders):
+            return False
+        positions = np.asarray(positions, dtype=np.int64)
+        days: Set[date] = set(old_store.day[positions[positions < len(old_store)]].tolist())
+        days.update(store.day[positions[positions < len(store)]].tolist())
+        days.discard(None)
+        for day in sorted(days):
+            self._rebuild_days(store, product_orders, products, day, day)
+        self._source = (orders, product_orders, products)
+        return True
+
+    def _rebuild_days(
+        self,
+        store: OrderStore,
+        product_orders: List[dict],
+        products: List[dict],
+        start: date,
+        end: Optional[date] = None,
+    ) -> int:
+        """Recalcula en el loop los días en [start, end] (None = sin límite) a partir de los listados"""
+        call, _ = _rollup_call(store, product_orders, products, start, end)
+        return self._replace_days(dict(_day_buckets(store, call.inline())), start, end)
+
+    def _replace_days(self, days: Dict[date, DayRollup], start: date, end: Optional[date] = None) -> int:
+        """Reemplaza todos los días en [start, end] (incluye los que quedaron sin órdenes)"""
+        for day in [day for day in self._days if day >= start and (end is None or day <= end)]:
+            del self._days[day]
+        self._days.update(days)
+        self._sorted_days = sorted(self._days)
+        return len(days)
+
+    # ------------------------------------------------------------ consultas
+
+    def days_between(self, start: date, end: date) -> Iterator[Tuple[date, DayRollup]]:
+        lo = bisect_left(self._sorted_days, start)
+        hi = bisect_right(self._sorted_days, end)
+        for day in self._sorted_days[lo:hi]:
+            yield day, self._days[day]
+
+    def sales_by_seller(self, start: date, end: date, statuses: Iterable[str]) -> Dict[Hashable, List[int]]:
+        """vendedor -> [centavos de subtotal, órdenes distintas, unidades]"""
+        statuses = set(statuses)
+        sellers: Dict[Hashable, List[int]] = defaultdict(lambda: [0, 0, 0])
+        for _, bucket in self.days_between(start, end):
+            for (seller_id, _, _, status), (day_cents, units) in bucket.lines.items():
+                if status in statuses and seller_id:
+                    totals = sellers[seller_id]
+                    totals[0] += day_cents
+                    totals[2] += units
+            for (seller_id, status), count in bucket.seller_orders.items():
+                if status in statuses and seller_id:
+                    sellers[seller_id][1] += count
+        return sellers
+
+
+# Tablas de kernels.daily_rollup: (columnas de la clave, columnas del valor)
+_GROUP_TABLES = {
+    "orders": (("pm", "status"), ("cents", "count")),
+    "lines": (("seller", "category", "pm", "status"), ("cents", "units")),
+    "seller_orders": (("key", "status"), ("count",)),
+    "category_orders": (("key", "status"), ("count",)),
+    "category_products": (("category", "status"), ("product",)),
+}
+# Ids que el cálculo por filas guardaba como None cuando faltaban
+_OPTIONAL_COLUMNS = {"pm", "seller", "category", "key"}
+_DAYS_PER_YIELD = 16
+
+
+def _day_buckets(store: OrderStore, groups: Dict[str, np.ndarray]) -> Iterator[Tuple[date, DayRollup]]:
+    """DayRollup de cada día a partir de las tablas de kernels.daily_rollup (ordenadas por día)"""
+    names = store.status_names
+    days = np.unique(groups["orders_day"])
+    bounds = {
+        table: (
+            np.searchsorted(groups[f"{table}_day"], days, side="left").tolist(),
+            np.searchsorted(groups[f"{table}_day"], days, side="right").tolist(),
+        )
+        for table in _GROUP_TABLES
+    }
+
+    def column(table: str, name: str, begin: int, end: int) -> list:
+        values = groups[f"{table}_{name}"][begin:end].tolist()
+        if name == "status":
+            return [names[code] for code in values]
+        if name in _OPTIONAL_COLUMNS and table != "category_products":
+            return [None if value == MISSING_ID else value for value in values]
+        return values
+
+    for i, day in enumerate(days.astype("datetime64[D]").tolist()):
+        bucket = DayRollup()
+        for table, (key_columns, value_columns) in _GROUP_TABLES.items():
+            begin, end = bounds[table][0][i], bounds[table][1][i]
+            if begin == end:
+                continue
+            keys = zip(*(column(table, name, begin, end) for name in key_columns))
+            values = [column(table, name, begin, end) for name in value_columns]
+            if table == "category_products":
+                for key, product_id in zip(keys, values[0]):
+                    bucket.category_products[key].add(product_id)
+            else:
+                # dict.update también en los Counter (su update suma)
+                values = map(list, zip(*values)) if len(values) > 1 else values[0]
+                dict.update(getattr(bucket, table), zip(keys, values))
+        yield day, bucket
+
+
+def _rollup_call(
+    store: OrderStore,
+    product_orders: List[dict],
+    products: List[dict],
+    start: date,
+    end: Optional[date] = None,
+) -> Tuple[KernelCall, int]:
+    """Llamada a kernels.daily_rollup para los días en [start, end] y filas que recorre"""
+    # Órdenes de esos días (el índice ya deja fuera las fechas inválidas)
+    selected = store.by_date.positions(start, end)
+    lines = line_store_for(product_orders)
+    catalog = product_store_for(products)
+    order_columns = {
+        "order_id": store.id_order,
+        "order_day": store.day,
+        "order_status": store.status,
+        "order_cents": store.amount_cents,
+        "order_pm": store.id_payment_method,
+    }
+    line_columns = {
+        "line_order": lines.id_order,
+        "line_product": lines.id_product,
+        "line_cents": lines.subtotal_cents,
+        "line_valid": lines.valid,
+    }
+    arrays = {
+        "selected": selected,
+        "product_id": catalog.id_product,
+        "product_seller": catalog.id_seller,
+        "product_category": catalog.id_category,
+    }
+    call = KernelCall(kernels.daily_rollup, ((store, order_columns), (lines, line_columns)), arrays)
+    return call, len(selected) + len(lines)
+
+
+_cube = RollupCube()
+
+
+async def get_rollup() -> Tuple[RollupCube, List[str]]:
+    """
+    Cubo listo para consultar y datasets que faltaron en el último refresco.
+    Si un dataset falta no se toca el cubo: sellar un día con datos incompletos
+    lo dejaría mal para siempre.
+    """
+    cube = _cube
+    if not cube.is_stale() and not cube.needs_rebuild():
+        return cube, []
+
+    async with cube._lock:
+        if not cube.is_stale() and not cube.needs_rebuild():
+            return cube, []
+        datasets = await load_datasets(*ROLLUP_DATASETS)
+        if datasets.partial:
+            logger.warning(f"⚠️ Rollup sin refrescar, faltan: {', '.join(datasets.missing)}")
+            return cube, list(datasets.missing)
+
+        if cube.needs_rebuild():
+            logger.info("🧊 Reconstrucción completa del rollup")
+            cube.clear()
+        started = time.perf_counter()
+        rebuilt = await cube.refresh(datasets["orders"], datasets["product_orders"], datasets["products"], date.today())
+        if rebuilt:
+            logger.info(f"🧊 Rollup: {rebuilt} días recalculados en {(time.perf_counter() - started) * 1000:.1f} ms")
+        return cube, []
+
+
+def update_rollup(
+    previous: List[dict],
+    orders: List[dict],
+    positions: List[int],
+    lines: Optional[Tuple[List[dict], List[dict]]] = None,
+) -> None:
+    """
+    Aplica al cubo cambios de órdenes ya conocidos (eventos): recalcula solo los
+    días tocados sin descargar nada. Si el cubo no sale del listado anterior se
+    marca para refrescar en la próxima consulta.
+    """
+    if not _cube.warm:
+        return
+    if _cube._refreshing:
+        # El refresco en curso parte de listados anteriores: se aplica cuando termine
+        _cube._pending.append((previous, orders, positions, lines))
+        return
+    if not _cube.apply_order_changes(previous, orders, positions, lines):
+        expire_rollup()
+
+
+def expire_rollup() -> None:
+    """Marca el cubo como vencido: la próxima consulta recalcula los días abiertos"""
+    _cube.refreshed_at = None
+
+
+def invalidate_rollup() -> None:
+    """Descarta el cubo completo (el próximo reporte lo reconstruye)"""
+    _cube.clear()
@@ -7,6 +7,20 @@ from typing import List, Optional
 from datetime import datetime, date
 from enum import Enum
 
+@strawberry.type
+class ReportMetadata:
+    """Estado de los datos con los que se generó el reporte"""
+    partial: bool  # True si faltó algún dataset (error o deadline)
+    missing_datasets: List[str]
+
+@strawberry.type
+class RankingPageInfo:
+    """Paginación de una lista rankeada (usar end_cursor como `after` de la siguiente página)"""
+    total_count: int
+    offset: int
+    has_next_page: bool
+    end_cursor: Optional[str] = None
+
 @strawberry.type
 class SalesReportItem:
     """Reporte de ventas individual"""
@@ -24,6 +38,7 @@ class SalesReport:
     total_orders: int
     average_order_value: float
     sales_by_period: List[SalesReportItem]
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class TopSellerItem:
@@ -41,6 +56,8 @@ class TopSellersReport:
     period_start: date
     period_end: date
     top_sellers: List[TopSellerItem]
+    page_info: Optional[RankingPageInfo] = None
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class ProductSalesItem:
@@ -58,6 +75,8 @@ class BestProductsReport:
     period_start: date
     period_end: date
     best_products: List[ProductSalesItem]
+    page_info: Optional[RankingPageInfo] = None
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class TopRatedProductItem:
@@ -73,6 +92,8 @@ class TopRatedProductItem:
 class TopRatedProductsReport:
     """Reporte de productos mejor valorados"""
     top_products: List[TopRatedProductItem]
+    page_info: Optional[RankingPageInfo] = None
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class CategorySalesItem:
@@ -89,6 +110,7 @@ class CategorySalesReport:
     period_start: date
     period_end: date
     categories: List[CategorySalesItem]
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class ClientActivityItem:
@@ -109,6 +131,8 @@ class ClientsReport:
     new_clients: int
     active_clients: int
     top_clients: List[ClientActivityItem]
+    top_clients_page_info: Optional[RankingPageInfo] = None
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class LowStockItem:
@@ -127,6 +151,7 @@ class InventoryReport:
     out_of_stock: int
     low_stock: int
     critical_products: List[LowStockItem]
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class DeliveryStatusItem:
@@ -135,6 +160,15 @@ class DeliveryStatusItem:
     count: int
     percentage: float
 
+@strawberry.type
+class DeliveryCityItem:
+    """Tiempos de entrega de una ciudad (deliveries entregados)"""
+    city: str
+    completed: int
+    average_delivery_time_hours: float
+    p50_delivery_time_hours: float
+    p95_delivery_time_hours: float
+
 @strawberry.type
 class DeliveryPerformanceReport:
     """Reporte de performance de deliveries"""
@@ -144,8 +178,12 @@ class DeliveryPerformanceReport:
     completed: int
     pending: int
     cancelled: int
-    average_delivery_time_hours: float
+    average_delivery_time_hours: float  # estimated_time - order_date, solo entregados
     status_breakdown: List[DeliveryStatusItem]
+    p50_delivery_time_hours: float = 0.0
+    p95_delivery_time_hours: float = 0.0
+    delivery_time_by_city: List[DeliveryCityItem] = strawberry.field(default_factory=list)
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class PaymentMethodItem:
@@ -164,6 +202,7 @@ class FinancialReport:
     total_orders: int
     payment_methods: List[PaymentMethodItem]
     average_transaction: float
+    metadata: Optional[ReportMetadata] = None
 
 @strawberry.type
 class DashboardStats:
@@ -177,6 +216,16 @@ class DashboardStats:
     low_stock_products: int
     month_revenue: float
     month_orders: int
+    metadata: Optional[ReportMetadata] = None
+
+@strawberry.type
+class ReportBundle:
+    """Reportes del dashboard de admin calculados juntos (solo los campos pedidos)"""
+    dashboard_stats: Optional[DashboardStats] = None
+    sales_report: Optional[SalesReport] = None
+    financial_report: Optional[FinancialReport] = None
+    clients_report: Optional[ClientsReport] = None
+    category_sales_report: Optional[CategorySalesReport] = None
 
 @strawberry.type
 @strawberry.type
@@ -192,6 +241,12 @@ class SellerDashboardStats:
     total_revenue: float  # Ingresos totales históricos
     total_orders: int  # Pedidos totales históricos
     pending_orders: int = 0  # Pedidos pendientes de procesar
+
+@strawberry.type
+class SellerIdMapping:
+    """Identificador de vendedor (UUID o id numérico) y su id_seller"""
+    seller_identifier: str
+    seller_id: Optional[int] = None  # None si no hay vendedor con ese user_id
     
 @strawberry.input
 class DateRangeInput:
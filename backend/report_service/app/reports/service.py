@@ -2,21 +2,35 @@
 """
 Lógica de negocio para generar reportes
 """
+import logging
 import httpx
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Any
+import numpy as np
+from datetime import date
+from typing import List, Dict, Any, Tuple
 from collections import defaultdict
+from app.common.http_client import get_upstream_client
+from app.common.seller_ids import lookup_seller_id, lookup_seller_ids
+from app.common.datasource import load_rows
+from app.common.joins import hash_index
+from app.common.offload import run_kernel
+from app.common.topk import paginate, ranked_page
+from app.reports.datasets import load_datasets
+from app.reports.ratings import RatingIndex, get_rating_index
+from app.reports.order_store import (
+    COMPLETED_STATUSES, MISSING_ID, cents_to_float, line_store_for, order_store_for, parse_datetimes,
+    product_sales_entries,
+)
+from app.reports.rollup import get_rollup
+from app.reports.engine import ReportRequest, page_info, run_reports
 
-BASE_URL = "http://127.0.0.1:3000/api"
-REST_API_URL = "http://127.0.0.1:3000/api"  # URL del REST service
-# Token de servicio interno para comunicación entre microservicios
-SERVICE_TOKEN = "internal-service-graphql-reports-2024"
+logger = logging.getLogger(__name__)
 
 async def resolve_seller_id(seller_identifier: str) -> int:
     """
     Resuelve un seller_identifier (UUID o int) a id_seller numérico.
     Si ya es un número, lo devuelve directamente.
-    Si es UUID, consulta el nuevo endpoint /sellers/by-user/:userId.
+    Si es UUID, consulta el nuevo endpoint /sellers/by-user/:userId
+    (una sola vez: el resultado queda en app/common/seller_ids.py).
     """
     # Intentar convertir directamente a int
     try:
@@ -26,546 +40,181 @@ async def resolve_seller_id(seller_identifier: str) -> int:
     except (ValueError, TypeError):
         pass
     
-    # Es un UUID, hacer lookup usando el nuevo endpoint
+    # Es un UUID: caché UUID -> id_seller (solo consulta /sellers/by-user si no lo conoce)
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            headers = {
-                "X-Service-Token": SERVICE_TOKEN,
-                "X-Internal-Service": "report-service"
-            }
-            
-            # Usar el nuevo endpoint by-user
-            url = f"{BASE_URL}/sellers/by-user/{seller_identifier}"
-            print(f"🔍 [resolve_seller_id] Calling: {url}")
-            
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            print(f"✅ [resolve_seller_id] Response: {data}")
-            
-            # Extraer id_seller
-            if isinstance(data, dict) and "id_seller" in data:
-                seller_id = int(data["id_seller"])
-                print(f"✅ [resolve_seller_id] Resolved UUID {seller_identifier} to id_seller={seller_id}")
-                return seller_id
-            else:
-                print(f"❌ [resolve_seller_id] Invalid response format: {data}")
-                raise ValueError(f"Invalid response format from /sellers/by-user")
-                
+        seller_id = await lookup_seller_id(seller_identifier)
     except httpx.HTTPStatusError as e:
-        if e.response.status_code == 404:
-            print(f"❌ [resolve_seller_id] Seller not found for user_id={seller_identifier}")
-            raise ValueError(f"No seller found with user_id={seller_identifier}")
         print(f"❌ [resolve_seller_id] HTTP error {e.response.status_code}: {e}")
         raise ValueError(f"HTTP error resolving seller: {e}")
     except Exception as e:
         print(f"❌ [resolve_seller_id] Unexpected error: {str(e)}")
         raise ValueError(f"Could not resolve seller_id from identifier: {seller_identifier}")
+    
+    if seller_id is None:
+        logger.warning(f"❌ [resolve_seller_id] Seller not found for user_id={seller_identifier}")
+        raise ValueError(f"No seller found with user_id={seller_identifier}")
+    
+    logger.debug(f"✅ [resolve_seller_id] Resolved UUID {seller_identifier} to id_seller={seller_id}")
+    return seller_id
+
+async def resolve_seller_ids(seller_identifiers: List[str]) -> Dict[str, int]:
+    """
+    Versión por lotes de resolve_seller_id (vistas de administración).
+    Los UUID desconocidos se resuelven con una sola descarga de /sellers.
+    Los identificadores sin vendedor no aparecen en el resultado.
+    """
+    resolved: Dict[str, int] = {}
+    uuids = []
+    for identifier in seller_identifiers:
+        try:
+            resolved[identifier] = int(identifier)
+        except (ValueError, TypeError):
+            uuids.append(identifier)
+    
+    for identifier, seller_id in (await lookup_seller_ids(uuids)).items():
+        if seller_id is not None:
+            resolved[identifier] = seller_id
+    return resolved
 
 async def fetch_data(endpoint: str, params: Dict[str, Any] = None) -> Any:
-    """Función auxiliar para obtener datos del REST API"""
+    """
+    Función auxiliar para obtener datos del REST API.
+    Los listados paginados (/products, /orders) se descargan completos:
+    las páginas restantes se piden en paralelo (ver app/common/pagination.py).
+    """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Headers con token de servicio interno
-            headers = {
-                "X-Service-Token": SERVICE_TOKEN,
-                "X-Internal-Service": "report-service"
-            }
-            
-            # Para productos, necesitamos obtener todos sin paginación
-            # Límite máximo permitido por la validación del REST API es 100
-            if endpoint == "/products" and params is None:
-                params = {"limit": 100}
-            
-            response = await client.get(
-                f"{BASE_URL}{endpoint}", 
-                params=params,
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # DEBUG: Ver qué devuelve el endpoint
-            print(f"DEBUG fetch_data - Endpoint: {endpoint}")
-            print(f"DEBUG fetch_data - Response type: {type(data)}")
-            print(f"DEBUG fetch_data - Response keys: {data.keys() if isinstance(data, dict) else 'not a dict'}")
-            
-            # Si el endpoint es /products y devuelve un objeto con paginación,
-            # extraer solo el array de productos
-            if endpoint == "/products" and isinstance(data, dict) and "products" in data:
-                products_array = data["products"]
-                print(f"DEBUG fetch_data - Extracted products count: {len(products_array)}")
-                return products_array
-            
-            return data
+        # El cliente compartido ya inyecta el token de servicio interno
+        data = await load_rows(endpoint, params)
+        logger.debug(f"fetch_data - Endpoint: {endpoint} - {len(data)} registros")
+        return data
     except httpx.HTTPError as e:
         print(f"Error fetching {endpoint}: {e}")
-        return [] if endpoint.startswith("/") else {}
+        return []
 
 # ======================= REPORTES DE VENTAS =======================
 
 async def get_sales_report(start_date: date, end_date: date, period: str = "daily"):
     """
-    Genera reporte de ventas por período
+    Genera reporte de ventas por período (desde el rollup diario)
     """
-    from app.reports.schema import SalesReport, SalesReportItem
-    
-    # Obtener todas las órdenes
-    orders = await fetch_data("/orders")
-    
-    # Validar que sea lista
-    if not isinstance(orders, list):
-        orders = []
-    
-    # Filtrar por rango de fechas y estado (solo completadas/entregadas)
-    filtered_orders = []
-    for order in orders:
-        try:
-            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
-            order_status = order.get("status", "").lower()
-            # Solo contar órdenes completadas o entregadas
-            if start_date <= order_date <= end_date and order_status in ["completed", "delivered"]:
-                filtered_orders.append(order)
-        except (KeyError, ValueError, TypeError):
-            continue
-    
-    # Calcular totales
-    total_revenue = sum(float(order["total_amount"]) for order in filtered_orders)
-    total_orders = len(filtered_orders)
-    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0.0
-    
-    # Agrupar por período
-    sales_by_period = defaultdict(lambda: {"total": 0.0, "count": 0})
-    
-    for order in filtered_orders:
-        order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
-        
-        if period == "daily":
-            key = order_date.isoformat()
-        elif period == "weekly":
-            key = f"{order_date.year}-W{order_date.isocalendar()[1]}"
-        elif period == "monthly":
-            key = f"{order_date.year}-{order_date.month:02d}"
-        else:  # yearly
-            key = str(order_date.year)
-        
-        sales_by_period[key]["total"] += float(order["total_amount"])
-        sales_by_period[key]["count"] += 1
-    
-    # Convertir a lista de items
-    sales_items = [
-        SalesReportItem(
-            period=period_key,
-            total_sales=data["total"],
-            total_orders=data["count"],
-            average_order_value=data["total"] / data["count"] if data["count"] > 0 else 0.0
-        )
-        for period_key, data in sorted(sales_by_period.items())
-    ]
-    
-    return SalesReport(
-        start_date=start_date,
-        end_date=end_date,
-        total_revenue=total_revenue,
-        total_orders=total_orders,
-        average_order_value=avg_order_value,
-        sales_by_period=sales_items
-    )
+    reports = await run_reports(["sales_report"], ReportRequest(start_date, end_date, period=period))
+    return reports["sales_report"]
 
-async def get_top_sellers_report(start_date: date, end_date: date, limit: int = 10):
+async def get_top_sellers_report(start_date: date, end_date: date, limit: int = 10, offset: int = 0):
     """
-    Reporte de mejores vendedores
+    Reporte de mejores vendedores (paginado; solo se materializa la página pedida)
     """
     from app.reports.schema import TopSellersReport, TopSellerItem
     
-    # Obtener órdenes y productos
-    orders = await fetch_data("/orders")
-    product_orders = await fetch_data("/product-orders")
-    products = await fetch_data("/products")
-    sellers = await fetch_data("/sellers")
-    
-    # Validar que sean listas
-    if not isinstance(orders, list):
-        orders = []
-    if not isinstance(product_orders, list):
-        product_orders = []
-    if not isinstance(products, list):
-        products = []
-    if not isinstance(sellers, list):
-        sellers = []
-    
-    # Filtrar órdenes por fecha y estado (solo completadas/entregadas)
-    filtered_orders = []
-    for order in orders:
-        try:
-            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
-            order_status = order.get("status", "").lower()
-            # Solo contar órdenes completadas o entregadas
-            if start_date <= order_date <= end_date and order_status in ["completed", "delivered"]:
-                filtered_orders.append(order)
-        except (KeyError, ValueError, TypeError):
-            continue
-    
-    order_ids = set()
-    for o in filtered_orders:
-        try:
-            order_ids.add(o["id_order"])
-        except (KeyError, TypeError):
-            continue
-    
-    # Agrupar por vendedor
-    seller_stats = defaultdict(lambda: {"sales": 0.0, "orders": set(), "products_sold": 0})
-    
-    # Mapear productos a vendedores
-    product_to_seller = {}
-    for p in products:
-        try:
-            product_to_seller[p["id_product"]] = p["id_seller"]
-        except (KeyError, TypeError):
-            continue
-    
-    seller_info = {}
-    for s in sellers:
-        try:
-            seller_info[s["id_seller"]] = s
-        except (KeyError, TypeError):
-            continue
+    async def load_ranking():
+        # Ventas por vendedor desde el rollup diario + datos de vendedores (caché)
+        rollup, rollup_missing = await get_rollup()
+        datasets = await load_datasets("sellers")
+        seller_info = datasets.index("sellers")
+        seller_stats = rollup.sales_by_seller(start_date, end_date, COMPLETED_STATUSES)
+        entries = [
+            (seller_id, cents, orders_count, units)
+            for seller_id, (cents, orders_count, units) in seller_stats.items()
+            if seller_id in seller_info
+        ]
+        return entries, (seller_info, datasets.metadata(rollup_missing))
+    
+    # Ordenar por ventas totales (top-k con heap, ranking completo en caché para otras páginas)
+    page = await ranked_page(
+        ("top_sellers", start_date, end_date), load_ranking, key=lambda entry: entry[1], offset=offset, limit=limit
+    )
+    seller_info, metadata = page.context
     
-    for po in product_orders:
+    top_sellers = []
+    for seller_id, cents, orders_count, units in page.items:
+        seller = seller_info[seller_id]
         try:
-            if po["id_order"] in order_ids:
-                seller_id = product_to_seller.get(po["id_product"])
-                if seller_id:
-                    seller_stats[seller_id]["sales"] += float(po.get("subtotal", 0))
-                    seller_stats[seller_id]["orders"].add(po["id_order"])
-                    seller_stats[seller_id]["products_sold"] += 1
-        except (KeyError, TypeError, ValueError):
+            top_sellers.append(TopSellerItem(
+                seller_id=seller_id,
+                seller_name=seller.get("seller_name", "Unknown"),
+                business_name=seller.get("bussines_name", "N/A"),
+                total_sales=cents_to_float(cents),
+                total_orders=orders_count,
+                products_sold=units
+            ))
+        except (KeyError, TypeError, AttributeError):
             continue
     
-    # Convertir a lista y ordenar
-    top_sellers = []
-    for seller_id, stats in seller_stats.items():
-        if seller_id in seller_info:
-            seller = seller_info[seller_id]
-            try:
-                top_sellers.append(TopSellerItem(
-                    seller_id=seller_id,
-                    seller_name=seller.get("seller_name", "Unknown"),
-                    business_name=seller.get("bussines_name", "N/A"),
-                    total_sales=stats["sales"],
-                    total_orders=len(stats["orders"]),
-                    products_sold=stats["products_sold"]
-                ))
-            except (KeyError, TypeError):
-                continue
-    
-    # Ordenar por ventas totales
-    top_sellers.sort(key=lambda x: x.total_sales, reverse=True)
-    
     return TopSellersReport(
         period_start=start_date,
         period_end=end_date,
-        top_sellers=top_sellers[:limit]
+        top_sellers=top_sellers,
+        page_info=page_info(page),
+        metadata=metadata
     )
 
-async def get_best_products_report(start_date: date, end_date: date, limit: int = 20):
+async def get_best_products_report(start_date: date, end_date: date, limit: int = 20, offset: int = 0):
     """
-    Reporte de productos más vendidos
+    Reporte de productos más vendidos (paginado; solo se materializa la página pedida)
     """
     from app.reports.schema import BestProductsReport, ProductSalesItem
     
-    # Obtener datos necesarios
-    orders = await fetch_data("/orders")
-    product_orders = await fetch_data("/product-orders")
-    products = await fetch_data("/products")
-    categories = await fetch_data("/categories")
-    
-    # Validar que sean listas
-    if not isinstance(orders, list):
-        orders = []
-    if not isinstance(product_orders, list):
-        product_orders = []
-    if not isinstance(products, list):
-        products = []
-    if not isinstance(categories, list):
-        categories = []
-    
-    # Filtrar órdenes por fecha y estado (solo completadas/entregadas)
-    filtered_orders = []
-    for order in orders:
-        try:
-            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
-            order_status = order.get("status", "").lower()
-            # Solo contar órdenes completadas o entregadas
-            if start_date <= order_date <= end_date and order_status in ["completed", "delivered"]:
-                filtered_orders.append(order)
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Crear set de order_ids de forma segura
-    order_ids = set()
-    for o in filtered_orders:
-        try:
-            order_ids.add(o["id_order"])
-        except (KeyError, TypeError):
-            continue
-    
-    # Agrupar por producto
-    product_stats = defaultdict(lambda: {"units": 0, "revenue": 0.0, "prices": []})
-    
-    for po in product_orders:
-        try:
-            if po["id_order"] in order_ids:
-                product_stats[po["id_product"]]["units"] += 1
-                product_stats[po["id_product"]]["revenue"] += float(po["subtotal"])
-                product_stats[po["id_product"]]["prices"].append(float(po["price_unit"]))
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Mapear productos y categorías de forma segura
-    product_info = {}
-    for p in products:
-        try:
-            product_info[p["id_product"]] = p
-        except (KeyError, TypeError):
-            continue
+    async def load_ranking():
+        # Obtener datos necesarios (en paralelo)
+        datasets = await load_datasets("orders", "product_orders", "products", "categories")
+        store = order_store_for(datasets["orders"])
+        
+        # Órdenes completadas, entregadas o pagadas dentro del rango (índice por fecha)
+        order_ids = store.id_order[store.completed_between(start_date, end_date)]
+        
+        # Agrupar por producto: (id, unidades, centavos de subtotal, centavos de price_unit)
+        lines = line_store_for(datasets["product_orders"])
+        product_stats = product_sales_entries(await run_kernel(lines.product_sales_call(order_ids), len(lines)))
+        
+        products_by_id = hash_index(datasets["products"], "id_product")
+        entries = [stats for stats in product_stats if stats[0] in products_by_id]
+        return entries, (products_by_id, datasets.index("categories"), datasets.metadata())
     
-    category_info = {}
-    for c in categories:
-        try:
-            category_info[c["id_category"]] = c["category_name"]
-        except (KeyError, TypeError):
-            continue
+    # Ordenar por unidades vendidas (top-k con heap, ranking completo en caché para otras páginas)
+    page = await ranked_page(
+        ("best_products", start_date, end_date), load_ranking, key=lambda entry: entry[1], offset=offset, limit=limit
+    )
+    products_by_id, category_info, metadata = page.context
     
-    # Crear lista de productos
     best_products = []
-    for product_id, stats in product_stats.items():
+    for product_id, units, revenue_cents, price_cents in page.items:
         try:
-            if product_id in product_info:
-                product = product_info[product_id]
-                best_products.append(ProductSalesItem(
-                    product_id=product_id,
-                    product_name=product.get("product_name", "Desconocido"),
-                    category_name=category_info.get(product.get("id_category"), "Sin categoría"),
-                    units_sold=stats["units"],
-                    total_revenue=stats["revenue"],
-                    average_price=sum(stats["prices"]) / len(stats["prices"]) if stats["prices"] else 0.0
-                ))
-        except (KeyError, TypeError, ZeroDivisionError):
+            product = products_by_id.get(product_id)
+            best_products.append(ProductSalesItem(
+                product_id=product_id,
+                product_name=product.get("product_name", "Desconocido"),
+                category_name=category_info.get(product.get("id_category"), {}).get("category_name", "Sin categoría"),
+                units_sold=units,
+                total_revenue=cents_to_float(revenue_cents),
+                average_price=cents_to_float(price_cents) / units if units else 0.0
+            ))
+        except (KeyError, TypeError, ZeroDivisionError, AttributeError):
             continue
     
-    # Ordenar por unidades vendidas
-    best_products.sort(key=lambda x: x.units_sold, reverse=True)
-    
     return BestProductsReport(
         period_start=start_date,
         period_end=end_date,
-        best_products=best_products[:limit]
+        best_products=best_products,
+        page_info=page_info(page),
+        metadata=metadata
     )
 
 async def get_category_sales_report(start_date: date, end_date: date):
     """
-    Reporte de ventas por categoría
+    Reporte de ventas por categoría (desde el rollup diario)
     """
-    from app.reports.schema import CategorySalesReport, CategorySalesItem
-    
-    orders = await fetch_data("/orders")
-    product_orders = await fetch_data("/product-orders")
-    products = await fetch_data("/products")
-    categories = await fetch_data("/categories")
-    
-    # DEBUG: Imprimir órdenes recibidas
-    print(f"\n=== DEBUG CATEGORY SALES ===")
-    print(f"Total órdenes recibidas: {len(orders) if isinstance(orders, list) else 0}")
-    print(f"Rango de fechas solicitado: {start_date} a {end_date}")
-    
-    # Validar que sean listas
-    if not isinstance(orders, list):
-        orders = []
-    if not isinstance(product_orders, list):
-        product_orders = []
-    if not isinstance(products, list):
-        products = []
-    if not isinstance(categories, list):
-        categories = []
-    
-    # Filtrar órdenes por fecha y estado (solo completadas/entregadas)
-    filtered_orders = []
-    for order in orders:
-        try:
-            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
-            order_status = order.get("status", "").lower()
-            
-            # DEBUG: Imprimir cada orden
-            print(f"Orden #{order.get('id_order')}: fecha={order_date}, estado='{order_status}', monto={order.get('total_amount')}")
-            
-            # Solo contar órdenes completadas o entregadas
-            if start_date <= order_date <= end_date and order_status in ["completed", "delivered"]:
-                filtered_orders.append(order)
-                print(f"  ✓ INCLUIDA en reporte")
-            else:
-                if not (start_date <= order_date <= end_date):
-                    print(f"  ✗ Fuera de rango de fechas")
-                elif order_status not in ["completed", "delivered"]:
-                    print(f"  ✗ Estado no válido: '{order_status}'")
-        except (KeyError, TypeError, ValueError) as e:
-            print(f"  ✗ Error procesando orden: {e}")
-            continue
-    
-    print(f"Total órdenes filtradas: {len(filtered_orders)}")
-    print(f"=========================\n")
-    
-    # Crear set de order_ids de forma segura
-    order_ids = set()
-    for o in filtered_orders:
-        try:
-            order_ids.add(o["id_order"])
-        except (KeyError, TypeError):
-            continue
-    
-    # Mapear productos a categorías de forma segura
-    product_to_category = {}
-    for p in products:
-        try:
-            product_to_category[p["id_product"]] = p["id_category"]
-        except (KeyError, TypeError):
-            continue
-    
-    category_info = {}
-    for c in categories:
-        try:
-            category_info[c["id_category"]] = c
-        except (KeyError, TypeError):
-            continue
-    
-    # Agrupar por categoría
-    category_stats = defaultdict(lambda: {"sales": 0.0, "orders": set(), "products": set()})
-    
-    for po in product_orders:
-        try:
-            if po["id_order"] in order_ids:
-                category_id = product_to_category.get(po["id_product"])
-                if category_id:
-                    category_stats[category_id]["sales"] += float(po["subtotal"])
-                    category_stats[category_id]["orders"].add(po["id_order"])
-                    category_stats[category_id]["products"].add(po["id_product"])
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Crear lista
-    category_items = []
-    for cat_id, stats in category_stats.items():
-        try:
-            if cat_id in category_info:
-                category_items.append(CategorySalesItem(
-                    category_id=cat_id,
-                    category_name=category_info[cat_id].get("category_name", "Sin nombre"),
-                    total_sales=stats["sales"],
-                    total_orders=len(stats["orders"]),
-                    products_count=len(stats["products"])
-                ))
-        except (KeyError, TypeError):
-            continue
-    
-    # Ordenar por ventas
-    category_items.sort(key=lambda x: x.total_sales, reverse=True)
-    
-    return CategorySalesReport(
-        period_start=start_date,
-        period_end=end_date,
-        categories=category_items
-    )
+    reports = await run_reports(["category_sales_report"], ReportRequest(start_date, end_date))
+    return reports["category_sales_report"]
 
 # REPORTE DE CLIENTES
 
-async def get_clients_report(start_date: date, end_date: date, top_limit: int = 10):
+async def get_clients_report(start_date: date, end_date: date, top_limit: int = 10, offset: int = 0):
     """
     Reporte de actividad de clientes
     """
-    from app.reports.schema import ClientsReport, ClientActivityItem
-    
-    clients = await fetch_data("/clients")
-    orders = await fetch_data("/orders")
-    
-    # Validar que sean listas
-    if not isinstance(clients, list):
-        clients = []
-    if not isinstance(orders, list):
-        orders = []
-    
-    # Filtrar órdenes por fecha y estado (solo completadas/entregadas)
-    filtered_orders = []
-    for order in orders:
-        try:
-            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
-            order_status = order.get("status", "").lower()
-            # Solo contar órdenes completadas o entregadas
-            if start_date <= order_date <= end_date and order_status in ["completed", "delivered"]:
-                filtered_orders.append(order)
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Clientes nuevos en el período
-    new_clients = 0
-    for client in clients:
-        try:
-            created_at = datetime.fromisoformat(client["created_at"].replace("Z", "")).date()
-            if start_date <= created_at <= end_date:
-                new_clients += 1
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Agrupar actividad por cliente
-    client_activity = defaultdict(lambda: {"orders": 0, "spent": 0.0, "last_order": None})
-    
-    for order in filtered_orders:
-        try:
-            client_id = order["id_client"]
-            client_activity[client_id]["orders"] += 1
-            client_activity[client_id]["spent"] += float(order["total_amount"])
-            order_date = datetime.fromisoformat(order["order_date"].replace("Z", ""))
-            if not client_activity[client_id]["last_order"] or order_date > client_activity[client_id]["last_order"]:
-                client_activity[client_id]["last_order"] = order_date
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Mapear info de clientes de forma segura
-    client_info = {}
-    for c in clients:
-        try:
-            client_info[c["id_client"]] = c
-        except (KeyError, TypeError):
-            continue
-    
-    # Crear lista de top clientes
-    top_clients = []
-    for client_id, activity in client_activity.items():
-        try:
-            if client_id in client_info:
-                client = client_info[client_id]
-                top_clients.append(ClientActivityItem(
-                    client_id=client_id,
-                    client_name=client.get("client_name", "Desconocido"),
-                    client_email=client.get("client_email", ""),
-                    total_orders=activity["orders"],
-                    total_spent=activity["spent"],
-                    last_order_date=activity["last_order"]
-                ))
-        except (KeyError, TypeError):
-            continue
-    
-    # Ordenar por gasto total
-    top_clients.sort(key=lambda x: x.total_spent, reverse=True)
-    
-    return ClientsReport(
-        period_start=start_date,
-        period_end=end_date,
-        total_clients=len(clients),
-        new_clients=new_clients,
-        active_clients=len(client_activity),
-        top_clients=top_clients[:top_limit]
-    )
+    request = ReportRequest(start_date, end_date, top_limit=top_limit, offset=offset)
+    reports = await run_reports(["clients_report"], request)
+    return reports["clients_report"]
 
 # ======================= REPORTES DE INVENTARIO =======================
 
@@ -575,22 +224,9 @@ async def get_inventory_report(min_stock_threshold: int = 10):
     """
     from app.reports.schema import InventoryReport, LowStockItem
     
-    products = await fetch_data("/products")
-    sellers = await fetch_data("/sellers")
-    
-    # Validar que sean listas
-    if not isinstance(products, list):
-        products = []
-    if not isinstance(sellers, list):
-        sellers = []
-    
-    # Mapear sellers de forma segura
-    seller_info = {}
-    for s in sellers:
-        try:
-            seller_info[s["id_seller"]] = s["seller_name"]
-        except (KeyError, TypeError):
-            continue
+    datasets = await load_datasets("products", "sellers")
+    products = datasets["products"]
+    seller_info = datasets.index("sellers")
     
     out_of_stock = 0
     low_stock = 0
@@ -613,7 +249,7 @@ async def get_inventory_report(min_stock_threshold: int = 10):
                 critical_items.append(LowStockItem(
                     product_id=product.get("id_product", 0),
                     product_name=product.get("product_name", "Desconocido"),
-                    seller_name=seller_info.get(product.get("id_seller"), "Desconocido"),
+                    seller_name=seller_info.get(product.get("id_seller"), {}).get("seller_name", "Desconocido"),
                     current_stock=stock,
                     min_stock_threshold=min_stock_threshold,
                     status=status
@@ -628,71 +264,63 @@ async def get_inventory_report(min_stock_threshold: int = 10):
         total_products=len(products),
         out_of_stock=out_of_stock,
         low_stock=low_stock,
-        critical_products=critical_items
+        critical_products=critical_items,
+        metadata=datasets.metadata()
     )
 
 # ======================= REPORTES DE DELIVERY =======================
 
+def _duration_stats(hours: np.ndarray) -> Tuple[float, float, float]:
+    """(promedio, p50, p95) en horas; ceros si no hay datos"""
+    if len(hours) == 0:
+        return 0.0, 0.0, 0.0
+    p50, p95 = np.percentile(hours, [50, 95])
+    return float(hours.mean()), float(p50), float(p95)
+
 async def get_delivery_performance_report(start_date: date, end_date: date):
     """
-    Reporte de performance de entregas
+    Reporte de performance de entregas.
+    El tiempo de entrega es estimated_time del delivery menos order_date de su orden.
     """
-    from app.reports.schema import DeliveryPerformanceReport, DeliveryStatusItem
-    
-    deliveries = await fetch_data("/deliveries")
-    orders = await fetch_data("/orders")
-    
-    # Validar que sean listas
-    if not isinstance(deliveries, list):
-        deliveries = []
-    if not isinstance(orders, list):
-        orders = []
-    
-    # Filtrar órdenes por fecha y estado (solo completadas/entregadas)
-    filtered_order_ids = set()
-    for order in orders:
-        try:
-            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
-            order_status = order.get("status", "").lower()
-            # Solo contar órdenes completadas o entregadas
-            if start_date <= order_date <= end_date and order_status in ["completed", "delivered"]:
-                filtered_order_ids.add(order["id_order"])
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Filtrar deliveries relacionados
-    filtered_deliveries = []
-    for delivery in deliveries:
-        try:
-            # Buscar orden asociada
-            for order in orders:
-                try:
-                    if order.get("id_delivery") == delivery["id_delivery"] and order["id_order"] in filtered_order_ids:
-                        filtered_deliveries.append(delivery)
-                        break
-                except (KeyError, TypeError):
-                    continue
-        except (KeyError, TypeError):
-            continue
+    from app.reports.schema import DeliveryCityItem, DeliveryPerformanceReport, DeliveryStatusItem
+    
+    datasets = await load_datasets("deliveries", "orders")
+    store = order_store_for(datasets["orders"])
+    # Índice hash id_delivery -> delivery (uno por listado, compartido en el request)
+    deliveries_by_id = hash_index(datasets["deliveries"], "id_delivery")
+    
+    # Órdenes completadas, entregadas o pagadas dentro del rango (índice por fecha)
+    rows = store.completed_between(start_date, end_date)
+    rows = rows[(store.id_order[rows] != MISSING_ID) & (store.id_delivery[rows] != MISSING_ID)]
+    
+    # Orden más temprana de cada delivery (un delivery se cuenta una sola vez)
+    order = np.lexsort((store.ordered_at[rows], store.id_delivery[rows]))
+    delivery_ids, first = np.unique(store.id_delivery[rows][order], return_index=True)
+    first_order_at = dict(zip(delivery_ids.tolist(), store.ordered_at[rows][order][first]))
+    
+    # Join orden -> delivery, en el orden del listado de deliveries
+    joined = sorted(
+        (position, delivery, first_order_at[delivery_id])
+        for delivery_id, position, delivery in deliveries_by_id.join(first_order_at)
+    )
     
     # Contar por estado
     status_count = defaultdict(int)
     completed = 0
     pending = 0
     cancelled = 0
-    total_delivery_time = 0
-    completed_count = 0
+    completed_deliveries = []
+    completed_ordered_at = []
     
-    for delivery in filtered_deliveries:
+    for _, delivery, moment in joined:
         try:
             status = delivery["status"]
             status_count[status] += 1
             
             if status == "Entregado":
                 completed += 1
-                # Calcular tiempo de entrega (estimado - actual)
-                # Simplificado: asumimos que el tiempo está en horas
-                completed_count += 1
+                completed_deliveries.append(delivery)
+                completed_ordered_at.append(moment)
             elif status == "Cancelado":
                 cancelled += 1
             else:
@@ -700,7 +328,28 @@ async def get_delivery_performance_report(start_date: date, end_date: date):
         except (KeyError, TypeError):
             continue
     
-    total = len(filtered_deliveries)
+    total = len(joined)
+    
+    # Tiempo de entrega (horas) de los deliveries entregados; se descartan fechas inválidas o negativas
+    estimated = parse_datetimes([d.get("estimated_time") for d in completed_deliveries])
+    hours = (estimated - np.array(completed_ordered_at, dtype="datetime64[ms]")) / np.timedelta64(1, "h")
+    valid = ~np.isnan(hours) & (hours >= 0)
+    average_hours, p50_hours, p95_hours = _duration_stats(hours[valid])
+    
+    # Desglose por ciudad
+    cities = np.array([str(d.get("city") or "Sin ciudad") for d in completed_deliveries], dtype=object)
+    city_items = []
+    for city in sorted(set(cities.tolist())):
+        city_hours = hours[valid & (cities == city)]
+        city_average, city_p50, city_p95 = _duration_stats(city_hours)
+        city_items.append(DeliveryCityItem(
+            city=city,
+            completed=int(np.count_nonzero(cities == city)),
+            average_delivery_time_hours=city_average,
+            p50_delivery_time_hours=city_p50,
+            p95_delivery_time_hours=city_p95
+        ))
+    city_items.sort(key=lambda x: x.completed, reverse=True)
     
     # Crear breakdown de estados
     status_items = [
@@ -719,92 +368,22 @@ async def get_delivery_performance_report(start_date: date, end_date: date):
         completed=completed,
         pending=pending,
         cancelled=cancelled,
-        average_delivery_time_hours=24.0,  # Valor placeholder (necesitas calcular real)
-        status_breakdown=status_items
+        average_delivery_time_hours=average_hours,
+        p50_delivery_time_hours=p50_hours,
+        p95_delivery_time_hours=p95_hours,
+        status_breakdown=status_items,
+        delivery_time_by_city=city_items,
+        metadata=datasets.metadata()
     )
 
 # REPORTE FINANCIERO
 
 async def get_financial_report(start_date: date, end_date: date):
     """
-    Reporte financiero con métodos de pago
+    Reporte financiero con métodos de pago (desde el rollup diario)
     """
-    from app.reports.schema import FinancialReport, PaymentMethodItem
-    
-    orders = await fetch_data("/orders")
-    payment_methods = await fetch_data("/payment-methods")
-    
-    # Validar que sean listas
-    if not isinstance(orders, list):
-        orders = []
-    if not isinstance(payment_methods, list):
-        payment_methods = []
-    
-    # Filtrar órdenes por fecha y estado (solo completadas/entregadas)
-    filtered_orders = []
-    for order in orders:
-        try:
-            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
-            order_status = order.get("status", "").lower()
-            # Solo contar órdenes completadas o entregadas
-            if start_date <= order_date <= end_date and order_status in ["completed", "delivered"]:
-                filtered_orders.append(order)
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Calcular totales de forma segura
-    total_revenue = 0.0
-    for o in filtered_orders:
-        try:
-            total_revenue += float(o["total_amount"])
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    total_orders = len(filtered_orders)
-    avg_transaction = total_revenue / total_orders if total_orders > 0 else 0.0
-    
-    # Agrupar por método de pago
-    payment_stats = defaultdict(lambda: {"count": 0, "amount": 0.0})
-    
-    # Mapear payment methods de forma segura
-    payment_info = {}
-    for pm in payment_methods:
-        try:
-            payment_info[pm["id_payment_method"]] = pm["method_name"]
-        except (KeyError, TypeError):
-            continue
-    
-    for order in filtered_orders:
-        try:
-            pm_id = order["id_payment_method"]
-            pm_name = payment_info.get(pm_id, "Desconocido")
-            payment_stats[pm_name]["count"] += 1
-            payment_stats[pm_name]["amount"] += float(order["total_amount"])
-        except (KeyError, TypeError, ValueError):
-            continue
-    
-    # Crear items
-    payment_items = [
-        PaymentMethodItem(
-            method_name=method,
-            total_transactions=stats["count"],
-            total_amount=stats["amount"],
-            percentage=(stats["amount"] / total_revenue * 100) if total_revenue > 0 else 0.0
-        )
-        for method, stats in payment_stats.items()
-    ]
-    
-    # Ordenar por monto
-    payment_items.sort(key=lambda x: x.total_amount, reverse=True)
-    
-    return FinancialReport(
-        period_start=start_date,
-        period_end=end_date,
-        total_revenue=total_revenue,
-        total_orders=total_orders,
-        payment_methods=payment_items,
-        average_transaction=avg_transaction
-    )
+    reports = await run_reports(["financial_report"], ReportRequest(start_date, end_date))
+    return reports["financial_report"]
 
 # DASHBOARD STATS
 
@@ -812,152 +391,58 @@ async def get_dashboard_stats():
     """
     Estadísticas generales para el dashboard
     """
-    from app.reports.schema import DashboardStats
-    
     today = date.today()
-    month_start = date(today.year, today.month, 1)
-    
-    # Obtener datos
-    orders = await fetch_data("/orders")
-    clients = await fetch_data("/clients")
-    sellers = await fetch_data("/sellers")
-    products = await fetch_data("/products")
-    deliveries = await fetch_data("/deliveries")
-    
-    # DEBUG: Imprimir lo que viene de productos
-    print(f"DEBUG - Productos recibidos: {products}")
-    print(f"DEBUG - Tipo de productos: {type(products)}")
-    if isinstance(products, list):
-        print(f"DEBUG - Cantidad de productos: {len(products)}")
-        if len(products) > 0:
-            print(f"DEBUG - Primer producto: {products[0]}")
-    
-    # Validar que los datos sean listas
-    if not isinstance(orders, list):
-        orders = []
-    if not isinstance(clients, list):
-        clients = []
-    if not isinstance(sellers, list):
-        sellers = []
-    if not isinstance(products, list):
-        products = []
-    if not isinstance(deliveries, list):
-        deliveries = []
-    
-    # Calcular stats de hoy (TODAS las órdenes, sin importar status)
-    today_orders = []
-    for o in orders:
-        try:
-            order_date = datetime.fromisoformat(o["order_date"].replace("Z", "")).date()
-            # Contar todas las órdenes del día, excepto las canceladas
-            order_status = o.get("status", "").lower()
-            if order_date == today and order_status not in ["cancelled", "expired"]:
-                today_orders.append(o)
-        except (KeyError, ValueError, TypeError):
-            continue
-    
-    today_sales = sum(float(o.get("total_amount", 0)) for o in today_orders)
-    
-    # Calcular stats del mes (TODAS las órdenes, sin importar status)
-    month_orders = []
-    for o in orders:
-        try:
-            order_date = datetime.fromisoformat(o["order_date"].replace("Z", "")).date()
-            # Contar todas las órdenes del mes, excepto las canceladas
-            order_status = o.get("status", "").lower()
-            if order_date >= month_start and order_status not in ["cancelled", "expired"]:
-                month_orders.append(o)
-        except (KeyError, ValueError, TypeError):
-            continue
-    
-    month_revenue = sum(float(o.get("total_amount", 0)) for o in month_orders)
-    
-    # Deliveries pendientes
-    pending_deliveries = 0
-    for d in deliveries:
-        try:
-            if d.get("status") not in ["Entregado", "Cancelado"]:
-                pending_deliveries += 1
-        except (KeyError, TypeError):
-            continue
-    
-    # Productos con bajo stock
-    low_stock = 0
-    for p in products:
-        try:
-            if p.get("stock", 0) <= 10:
-                low_stock += 1
-        except (KeyError, TypeError):
-            continue
-    
-    return DashboardStats(
-        today_sales=today_sales,
-        today_orders=len(today_orders),
-        total_active_clients=len(clients),
-        total_active_sellers=len(sellers),
-        total_products=len(products),
-        pending_deliveries=pending_deliveries,
-        low_stock_products=low_stock,
-        month_revenue=month_revenue,
-        month_orders=len(month_orders)
-    )
+    reports = await run_reports(["dashboard_stats"], ReportRequest(today, today, today=today))
+    return reports["dashboard_stats"]
 
 # ======================= PRODUCTOS MEJOR VALORADOS =======================
 
-async def get_top_rated_products_report(limit: int = 20):
+async def get_top_rated_products_report(limit: int = 20, offset: int = 0):
     """
-    Genera reporte de productos mejor valorados basado en reseñas
+    Genera reporte de productos mejor valorados basado en reseñas.
+    Los ratings salen del índice agregado de app/reports/ratings.py.
     """
     from app.reports.schema import TopRatedProductsReport, TopRatedProductItem
     
-    # Obtener todos los productos
-    products = await fetch_data("/products")
-    if not isinstance(products, list):
-        products = []
-    
-    # Obtener categorías para nombres
-    categories = await fetch_data("/categories")
-    if not isinstance(categories, list):
-        categories = []
-    category_map = {c["id_category"]: c["category_name"] for c in categories}
+    # Obtener productos y categorías (para nombres) en paralelo
+    datasets = await load_datasets("products", "categories")
+    products = datasets["products"]
+    category_info = datasets.index("categories")
     
-    # Para cada producto, obtener sus reseñas
-    product_ratings = []
-    for product in products:
+    product_info = {}
+    for p in products:
         try:
-            product_id = product["id_product"]
-            # Obtener reseñas del producto
-            reviews = await fetch_data(f"/orders/products/{product_id}/reviews")
-            
-            if not isinstance(reviews, list) or len(reviews) == 0:
-                continue
-            
-            # Calcular promedio de rating
-            ratings = [r.get("rating", 0) for r in reviews if r.get("rating")]
-            if not ratings:
-                continue
-                
-            avg_rating = sum(ratings) / len(ratings)
-            
-            product_ratings.append(TopRatedProductItem(
-                product_id=product_id,
-                product_name=product.get("product_name", "Sin nombre"),
-                category_name=category_map.get(product.get("id_category"), "Sin categoría"),
-                average_rating=round(avg_rating, 2),
-                total_reviews=len(reviews),
-                units_sold=0  # Podríamos calcularlo desde product_order si es necesario
-            ))
-        except (KeyError, TypeError, ValueError) as e:
+            product_info[p["id_product"]] = p
+        except (KeyError, TypeError):
             continue
     
-    # Ordenar por rating promedio (descendente) y luego por número de reseñas
-    product_ratings.sort(key=lambda x: (x.average_rating, x.total_reviews), reverse=True)
+    # Índice de (suma, cantidad) de ratings por producto
+    ratings = await get_rating_index(list(product_info))
     
-    # Limitar resultados
-    top_products = product_ratings[:limit]
+    # Top-k con heap sobre el índice (desempata el orden del listado de productos)
+    page = paginate(ratings.candidates(list(product_info)), RatingIndex.rank_key, offset, limit)
+    
+    top_products = []
+    for product_id, aggregate in page.items:
+        product = product_info[product_id]
+        top_products.append(TopRatedProductItem(
+            product_id=product_id,
+            product_name=product.get("product_name", "Sin nombre"),
+            category_name=category_info.get(product.get("id_category"), {}).get("category_name", "Sin categoría"),
+            average_rating=round(aggregate.average, 2),
+            total_reviews=aggregate.rating_count,
+            units_sold=aggregate.units_sold
+        ))
+    
+    metadata = datasets.metadata()
+    if not ratings.warm:
+        metadata.partial = True
+        metadata.missing_datasets.append("reviews")
     
     return TopRatedProductsReport(
-        top_products=top_products
+        top_products=top_products,
+        page_info=page_info(page),
+        metadata=metadata
     )
 
 # ======================= ESTADÍSTICAS DEL VENDEDOR =======================
@@ -981,39 +466,31 @@ async def get_seller_dashboard_stats(seller_identifier: str):
     # Usar endpoint optimizado que hace la query SQL directamente
     try:
         http_start = time.time()
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            headers = {
-                "X-Service-Token": SERVICE_TOKEN,
-                "X-Internal-Service": "report-service"
-            }
-            
-            url = f"{BASE_URL}/statistics/seller/{seller_id}/dashboard"
-            print(f"📡 [REPORT_SERVICE] Calling: {url}")
-            
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            http_time = (time.time() - http_start) * 1000
-            print(f"⏱️ [REPORT_SERVICE] HTTP call took: {http_time:.2f}ms")
-            print(f"✅ [REPORT_SERVICE] Received data: {data}")
-            
-            stats = SellerDashboardStats(
-                seller_id=seller_id,
-                today_sales=float(data.get("today_sales", 0)),
-                today_orders=int(data.get("today_orders", 0)),
-                month_revenue=float(data.get("month_revenue", 0)),
-                month_orders=int(data.get("month_orders", 0)),
-                total_products=int(data.get("total_products", 0)),
-                low_stock_products=int(data.get("low_stock_products", 0)),
-                total_revenue=float(data.get("total_revenue", 0)),
-                total_orders=int(data.get("total_orders", 0)),
-                pending_orders=int(data.get("pending_orders", 0))
-            )
-            
-            total_time = (time.time() - request_start) * 1000
-            print(f"⏱️ [REPORT_SERVICE] TOTAL TIME for seller {seller_id}: {total_time:.2f}ms (HTTP: {http_time:.2f}ms)")
-            return stats
+        path = f"/statistics/seller/{seller_id}/dashboard"
+        print(f"📡 [REPORT_SERVICE] Calling: {path}")
+        
+        data = await get_upstream_client().get_json(path)
+        
+        http_time = (time.time() - http_start) * 1000
+        print(f"⏱️ [REPORT_SERVICE] HTTP call took: {http_time:.2f}ms")
+        print(f"✅ [REPORT_SERVICE] Received data: {data}")
+        
+        stats = SellerDashboardStats(
+            seller_id=seller_id,
+            today_sales=float(data.get("today_sales", 0)),
+            today_orders=int(data.get("today_orders", 0)),
+            month_revenue=float(data.get("month_revenue", 0)),
+            month_orders=int(data.get("month_orders", 0)),
+            total_products=int(data.get("total_products", 0)),
+            low_stock_products=int(data.get("low_stock_products", 0)),
+            total_revenue=float(data.get("total_revenue", 0)),
+            total_orders=int(data.get("total_orders", 0)),
+            pending_orders=int(data.get("pending_orders", 0))
+        )
+        
+        total_time = (time.time() - request_start) * 1000
+        print(f"⏱️ [REPORT_SERVICE] TOTAL TIME for seller {seller_id}: {total_time:.2f}ms (HTTP: {http_time:.2f}ms)")
+        return stats
     except httpx.HTTPError as e:
         print(f"❌ [REPORT_SERVICE] Error fetching seller dashboard stats: {e}")
         # Fallback: retornar valores en cero
@@ -1046,60 +523,52 @@ async def get_seller_best_products(seller_identifier: str, start_date: date, end
     
     try:
         # Llamar al endpoint optimizado del REST service
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            headers = {
-                "X-Service-Token": "internal-service-graphql-reports-2024",
-                "X-Internal-Service": "report-service"
-            }
-            
-            params = {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat(),
-                "limit": limit
-            }
-            
-            url = f"{REST_API_URL}/statistics/seller/{seller_id}/best-products"
-            print(f"📡 [get_seller_best_products] Calling URL: {url}")
-            print(f"📡 [get_seller_best_products] Params: {params}")
-            
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            print(f"✅ [get_seller_best_products] Response received: {data}")
-            
-            if not data or not isinstance(data, dict):
-                print(f"❌ [get_seller_best_products] Invalid response type")
-                return BestProductsReport(
-                    period_start=start_date,
-                    period_end=end_date,
-                    best_products=[]
-                )
-            
-            # Convertir respuesta a objetos ProductSalesItem
-            best_products_data = data.get("best_products", [])
-            print(f"📦 [get_seller_best_products] best_products_data: {best_products_data}")
-            
-            best_products = [
-                ProductSalesItem(
-                    product_id=item["product_id"],
-                    product_name=item["product_name"],
-                    category_name=item["category_name"],
-                    units_sold=item["units_sold"],
-                    total_revenue=item["total_revenue"],
-                    average_price=item["average_price"]
-                )
-                for item in best_products_data
-            ]
-            
-            print(f"✅ [get_seller_best_products] Returning {len(best_products)} products")
-            
+        params = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "limit": limit
+        }
+        
+        path = f"/statistics/seller/{seller_id}/best-products"
+        print(f"📡 [get_seller_best_products] Calling URL: {path}")
+        print(f"📡 [get_seller_best_products] Params: {params}")
+        
+        data = await get_upstream_client().get_json(path, params=params)
+        
+        print(f"✅ [get_seller_best_products] Response received: {data}")
+        
+        if not data or not isinstance(data, dict):
+            print(f"❌ [get_seller_best_products] Invalid response type")
             return BestProductsReport(
                 period_start=start_date,
                 period_end=end_date,
-                best_products=best_products
+                best_products=[]
             )
         
+        # Convertir respuesta a objetos ProductSalesItem
+        best_products_data = data.get("best_products", [])
+        print(f"📦 [get_seller_best_products] best_products_data: {best_products_data}")
+        
+        best_products = [
+            ProductSalesItem(
+                product_id=item["product_id"],
+                product_name=item["product_name"],
+                category_name=item["category_name"],
+                units_sold=item["units_sold"],
+                total_revenue=item["total_revenue"],
+                average_price=item["average_price"]
+            )
+            for item in best_products_data
+        ]
+        
+        print(f"✅ [get_seller_best_products] Returning {len(best_products)} products")
+        
+        return BestProductsReport(
+            period_start=start_date,
+            period_end=end_date,
+            best_products=best_products
+        )
+        
     except Exception as e:
         print(f"❌ [get_seller_best_products] Error: {e}")
         import traceback
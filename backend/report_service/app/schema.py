@@ -16,6 +16,7 @@ from app.common.entities.product_carts.resolvers import ProductCartQueries
 from app.common.entities.product_orders.resolvers import ProductOrderQueries
 from app.common.entities.subcategory_products.resolvers import SubCategoryProductQueries
 from app.reports.resolvers import ReportQueries  
+from app.deps import DatasetSnapshotExtension, UpstreamCallsExtension
 
 # Combinar todas las queries (por herencia múltiple)
 @strawberry.type
@@ -41,5 +42,6 @@ class Query(
 # Configurar Strawberry para usar snake_case en lugar de camelCase
 schema = strawberry.Schema(
     query=Query,
-    config=StrawberryConfig(auto_camel_case=False)
+    config=StrawberryConfig(auto_camel_case=False),
+    extensions=[UpstreamCallsExtension, DatasetSnapshotExtension]
 )
\ No newline at end of file
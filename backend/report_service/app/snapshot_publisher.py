@@ -0,0 +1,239 @@
+# app/snapshot_publisher.py
+"""
+📤 PUBLICACIÓN DE SNAPSHOTS ENTRE WORKERS
+Con SNAPSHOT_DIR configurado cada worker corre una tarea que cada
+SNAPSHOT_POLL_SECONDS:
+- Si no publica: intenta tomar el lock del directorio (si el publicador murió,
+  otro worker toma su lugar) y mapea la generación nueva si la hay. Al cambiar
+  de generación compara los almacenes viejo y nuevo y pasa al rollup solo las
+  órdenes que cambiaron, igual que hacen los eventos en el publicador.
+- Si publica: sincroniza la réplica local (app/common/replica.py) como lo hacía
+  un worker único, aplica los eventos que los demás dejaron en el inbox, vuelve
+  a descargar /products y /clients cada SNAPSHOT_REFRESH_SECONDS y escribe una
+  generación cuando algún listado cambió (en un hilo: el loop sigue
+  atendiendo). Los listados sin cambios se enlazan de la generación anterior.
+Las columnas de cada almacén salen del mismo memo que usan los reportes
+(order_store_for, ...): el publicador no decodifica nada dos veces.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import contextvars
+import logging
+import time
+
+import httpx
+import numpy as np
+
+from app import config
+from app.common import snapshots
+from app.common.pagination import fetch_all_pages
+from app.common.replica import get_replica, start_sync, stop_sync
+from app.common.snapshots import SNAPSHOT_DATASETS, SnapshotDataset
+from app.common.topk import invalidate_rankings
+from app.events import apply_events
+from app.reports.order_store import SNAPSHOT_STORES, LineStore, OrderStore, line_store_for, order_store_for
+from app.reports.rollup import expire_rollup, update_rollup
+
+logger = logging.getLogger(__name__)
+
+# Listados que sincroniza la réplica; el resto se descarga completo cada SNAPSHOT_REFRESH_SECONDS
+_REPLICATED = ("orders", "product_orders")
+# Con más órdenes cambiadas entre generaciones se refrescan los días abiertos en lugar de recalcular día por día
+_MAX_CHANGED_ORDERS = 1000
+
+_task: Optional[asyncio.Task] = None
+# Listado publicado por dataset (identidad) y estado escrito en CURRENT
+_published: Dict[str, Any] = {}
+_state: Dict[str, Any] = {}
+# products / clients: (filas, epoch de la descarga)
+_downloaded: Dict[str, Tuple[List[dict], float]] = {}
+
+
+# ======================= Publicador =======================
+
+async def _download(name: str) -> Optional[Tuple[List[dict], float]]:
+    rows, downloaded_at = _downloaded.get(name, (None, 0.0))
+    if time.time() - downloaded_at < config.SNAPSHOT_REFRESH_SECONDS:
+        return rows, downloaded_at
+    try:
+        fresh = await fetch_all_pages(SNAPSHOT_DATASETS[name].path, data_keys=[name, "data"])
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Error descargando {name} para el snapshot: {e}")
+        return None if rows is None else (rows, downloaded_at)
+    # Sin cambios se conserva la lista anterior: la generación no se reescribe
+    _downloaded[name] = (rows if rows == fresh else fresh, time.time())
+    return _downloaded[name]
+
+
+def _dataset(name: str, rows: List[dict]) -> SnapshotDataset:
+    store_for = SNAPSHOT_STORES.get(name)
+    if store_for is None:
+        return SnapshotDataset(rows, {}, {})
+    store = store_for(rows)
+    columns, meta = store.snapshot()
+    return SnapshotDataset(rows, columns, {**meta, "store": type(store).__name__})
+
+
+async def _publish() -> None:
+    for batch in snapshots.take_forwarded_events():
+        result = apply_events(batch)
+        logger.info(f"📨 Eventos reenviados por otro worker: {result}")
+
+    sources: Dict[str, Tuple[List[dict], float]] = {}
+    # Los lectores sirven cada réplica con el mismo atraso máximo que este worker
+    max_lag: Dict[str, float] = {}
+    for name in _REPLICATED:
+        replica = get_replica(name)
+        if replica.ready:
+            sources[name] = (replica.rows, time.time() - replica.lag())
+            max_lag[name] = replica.max_lag()
+    for name in SNAPSHOT_DATASETS:
+        if name not in sources:
+            downloaded = await _download(name)
+            if downloaded is not None:
+                sources[name] = downloaded
+    if not sources:
+        return
+
+    synced_at = {name: synced for name, (_, synced) in sources.items()}
+    changed = [name for name, (rows, _) in sources.items() if rows is not _published.get(name)]
+    if not changed:
+        # Nada nuevo: solo se avisa que los datos siguen al día
+        if synced_at != _state.get("synced_at") or max_lag != _state.get("max_lag"):
+            snapshots.write_state(_state["generation"], synced_at, max_lag)
+            _state.update(synced_at=synced_at, max_lag=max_lag)
+        return
+
+    started = time.perf_counter()
+    datasets = {name: _dataset(name, rows) if name in changed else None for name, (rows, _) in sources.items()}
+    generation = await asyncio.to_thread(snapshots.write_generation, datasets, synced_at, max_lag)
+    _published.update({name: rows for name, (rows, _) in sources.items()})
+    _state.update(generation=generation, synced_at=synced_at, max_lag=max_lag)
+    logger.info(
+        f"📤 Snapshot {generation}: {', '.join(changed)} "
+        f"({(time.perf_counter() - started) * 1000:.0f} ms)"
+    )
+
+
+# ======================= Lectores =======================
+
+def _changed_columns(old: Any, new: Any, names: Tuple[str, ...]) -> np.ndarray:
+    """Posiciones (del store nuevo) donde alguna columna difiere o que no existían"""
+    common = min(len(old), len(new))
+    changed = np.zeros(len(new), dtype=bool)
+    changed[common:] = True
+    for name in names:
+        a, b = getattr(old, name)[:common], getattr(new, name)[:common]
+        if a.dtype.kind == "M":
+            # NaT != NaT: se comparan los enteros
+            a, b = a.view(np.int64), b.view(np.int64)
+        changed[:common] |= a != b
+    return np.flatnonzero(changed)
+
+
+def _changed_orders(old: OrderStore, new: OrderStore) -> np.ndarray:
+    positions = _changed_columns(old, new, ("id_order", "ordered_at", "amount_cents", "id_payment_method"))
+    common = min(len(old), len(new))
+    # Los códigos de estado dependen del vocabulario de cada store: se comparan los nombres
+    old_names, new_names = np.array(old.status_names, dtype=object), np.array(new.status_names, dtype=object)
+    status = np.flatnonzero(old_names[old.status[:common]] != new_names[new.status[:common]])
+    return np.union1d(positions, status)
+
+
+def _follow(previous: Optional[snapshots.Generation], current: snapshots.Generation) -> None:
+    """Lleva el rollup y los rankings de este worker a la generación nueva"""
+    invalidate_rankings()
+    old_orders = previous.rows("orders") if previous is not None else None
+    orders = current.rows("orders")
+    if old_orders is None or orders is None:
+        expire_rollup()
+        return
+    old_store, store = order_store_for(old_orders), order_store_for(orders)
+    if len(store) < len(old_store) or len(store) != len(orders):
+        # Bajas: las posiciones ya no coinciden entre generaciones
+        expire_rollup()
+        return
+    touched = set(_changed_orders(old_store, store).tolist())
+
+    old_lines, lines = previous.rows("product_orders"), current.rows("product_orders")
+    line_change = None
+    if old_lines is not None and lines is not None:
+        old_line_store, line_store = line_store_for(old_lines), line_store_for(lines)
+        if len(line_store) < len(old_line_store):
+            expire_rollup()
+            return
+        changed = _changed_columns(old_line_store, line_store, LineStore.COLUMNS)
+        # Las órdenes de las líneas cambiadas (con su orden anterior y la nueva)
+        owners = np.union1d(
+            line_store.id_order[changed], old_line_store.id_order[changed[changed < len(old_line_store)]]
+        )
+        touched.update(np.flatnonzero(np.isin(store.id_order, owners)).tolist())
+        line_change = (old_lines, lines)
+
+    if len(touched) > _MAX_CHANGED_ORDERS:
+        expire_rollup()
+    else:
+        # Aun sin cambios: el cubo pasa a apuntar a los listados de la generación nueva
+        update_rollup(old_orders, orders, sorted(touched), line_change)
+
+
+# ======================= Tarea de cada worker =======================
+
+async def _tick() -> None:
+    if not snapshots.is_publisher() and snapshots.try_become_publisher():
+        logger.info("📤 Este worker sincroniza la réplica y publica los snapshots")
+        snapshots.remove_temporary()
+        start_sync()
+    if snapshots.is_publisher():
+        await _publish()
+
+    previous = snapshots.current_generation()
+    current = snapshots.refresh_current()
+    if current is not None and current is not previous and not snapshots.is_publisher():
+        _follow(previous, current)
+
+
+async def _run() -> None:
+    while True:
+        try:
+            await _tick()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error en la tarea de snapshots: {e!r}")
+        await asyncio.sleep(max(config.SNAPSHOT_POLL_SECONDS, 0.05))
+
+
+def start_snapshots() -> None:
+    """
+    Arranca la tarea de snapshots (lifespan de la app). Mapea ya la generación
+    publicada, así un worker recién levantado sirve en caliente. Sin
+    SNAPSHOT_DIR cada worker sincroniza su propia réplica como antes.
+    """
+    global _task
+    if not snapshots.enabled():
+        if config.SNAPSHOT_DIR:
+            logger.warning("⚠️ SNAPSHOT_DIR requiere fcntl (Linux/macOS); cada worker usa su propia réplica")
+        start_sync()
+        return
+    if snapshots.try_become_publisher():
+        logger.info("📤 Este worker sincroniza la réplica y publica los snapshots")
+        snapshots.remove_temporary()
+        start_sync()
+    snapshots.refresh_current()
+    # Contexto vacío: la tarea no pertenece a ningún request
+    _task = asyncio.get_running_loop().create_task(_run(), context=contextvars.Context())
+
+
+async def stop_snapshots() -> None:
+    global _task
+    task, _task = _task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await stop_sync()
+    if snapshots.enabled():
+        snapshots.release_publisher()
@@ -0,0 +1,128 @@
+# benchmarks/bench_decoding.py
+"""
+⏱️ BENCHMARK: DECODIFICACIÓN DE /orders
+Compara el camino anterior (json estándar + parse_order fila por fila con
+safe_float / parse_iso_datetime dentro de try/except) con el actual
+(orjson sobre los bytes + RowDecoder, una sola validación compilada por listado).
+La última fila mide un query que pide solo `id_order` y `status` (proyección:
+las fechas y montos no se parsean).
+
+Uso (desde backend/report_service):
+    python -m benchmarks.bench_decoding
+    python -m benchmarks.bench_decoding --sizes 10000,100000 --repeat 5
+"""
+from datetime import datetime, timedelta
+import argparse
+import json
+import random
+import time
+
+from app.common.decoding import loads
+from app.common.entities.orders.schema import OrderType
+from app.common.entities.orders.service import _decoder
+from app.common.utils import parse_iso_datetime, safe_float
+
+STATUSES = ["completed", "delivered", "pending", "cancelled", "expired"]
+
+
+def make_payload(n: int, seed: int = 1) -> bytes:
+    rnd = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    rows = [
+        {
+            "id_order": i,
+            "order_date": (now - timedelta(minutes=rnd.randint(0, 365 * 24 * 60))).isoformat() + ".000Z",
+            "status": rnd.choice(STATUSES),
+            "total_amount": f"{rnd.uniform(1, 500):.2f}",
+            "delivery_type": "delivery",
+            "id_client": rnd.randint(1, 5000),
+            "id_cart": i,
+            "id_payment_method": rnd.randint(1, 3),
+            "id_delivery": i,
+            "payment_receipt_url": None,
+            "payment_verified_at": None,
+            "transaction_id": None,
+            "payment_status": "paid",
+            "payment_error": None,
+        }
+        for i in range(n)
+    ]
+    return json.dumps({"orders": rows}).encode()
+
+
+def legacy_parse_order(order: dict) -> OrderType:
+    """parse_order tal como estaba antes del RowDecoder"""
+    return OrderType(
+        id_order=order["id_order"],
+        order_date=parse_iso_datetime(order.get("order_date")),
+        status=order["status"],
+        total_amount=safe_float(order.get("total_amount")),
+        delivery_type=order["delivery_type"],
+        id_client=order["id_client"],
+        id_cart=order["id_cart"],
+        id_payment_method=order["id_payment_method"],
+        id_delivery=order.get("id_delivery"),
+        payment_receipt_url=order.get("payment_receipt_url"),
+        payment_verified_at=parse_iso_datetime(order.get("payment_verified_at")) if order.get("payment_verified_at") else None,
+        transaction_id=order.get("transaction_id"),
+        payment_status=order.get("payment_status"),
+        payment_error=order.get("payment_error"),
+    )
+
+
+def legacy(payload: bytes) -> list:
+    orders = []
+    for order in json.loads(payload.decode())["orders"]:
+        try:
+            orders.append(legacy_parse_order(order))
+        except KeyError:
+            continue
+        except Exception:
+            continue
+    return orders
+
+
+def bulk(payload: bytes) -> list:
+    return _decoder.decode(loads(payload)["orders"])
+
+
+def projected(payload: bytes) -> list:
+    return _decoder.decode(loads(payload)["orders"], fields={"id_order", "status"})
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(size: int, repeat: int) -> None:
+    payload = make_payload(size)
+    assert legacy(payload) == bulk(payload)
+
+    parse_old = best_of(repeat, lambda: json.loads(payload.decode()))
+    parse_new = best_of(repeat, loads, payload)
+    total_old = best_of(repeat, legacy, payload)
+    total_new = best_of(repeat, bulk, payload)
+    total_projected = best_of(repeat, projected, payload)
+    print(f"\n📦 {size:,} órdenes ({len(payload) / 1e6:.1f} MB)")
+    print(f"{'etapa':>22} {'antes':>10} {'ahora':>10} {'mejora':>8}")
+    print(f"{'JSON':>22} {parse_old * 1000:>8.1f}ms {parse_new * 1000:>8.1f}ms {parse_old / parse_new:>7.1f}x")
+    print(f"{'JSON + filas tipadas':>22} {total_old * 1000:>8.1f}ms {total_new * 1000:>8.1f}ms {total_old / total_new:>7.1f}x")
+    print(f"{'id_order + status':>22} {total_old * 1000:>8.1f}ms {total_projected * 1000:>8.1f}ms {total_old / total_projected:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="Cantidades de órdenes separadas por coma")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición (se toma la mejor)")
+    args = parser.parse_args()
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_listing.py
+"""
+⏱️ BENCHMARK: PÁGINA FILTRADA DE /orders
+Compara filtrar y ordenar en el cliente (decodificar el listado completo con
+get_all_orders y luego filtrar/ordenar/cortar) con orders_connection, que
+selecciona con los índices del listado y decodifica solo la página.
+La primera consulta construye los índices; las siguientes sobre el mismo
+listado (mismo snapshot o caché) los reutilizan.
+
+Uso (desde backend/report_service):
+    python -m benchmarks.bench_listing
+    python -m benchmarks.bench_listing --sizes 10000,100000 --page 50
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import random
+import time
+
+from app.common.entities.orders.schema import OrderFilter, OrderSort, OrderSortField
+from app.common.entities.orders.service import _decoder, _filter_orders, _SORT_PARSERS
+from app.common.listing import SortDirection, paginate_rows
+
+STATUSES = ["completed", "delivered", "pending", "cancelled", "expired"]
+
+
+def make_rows(n: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    return [
+        {
+            "id_order": i,
+            "order_date": (now - timedelta(minutes=rnd.randint(0, 365 * 24 * 60))).isoformat() + ".000Z",
+            "status": rnd.choice(STATUSES),
+            "total_amount": f"{rnd.uniform(1, 500):.2f}",
+            "delivery_type": "delivery",
+            "id_client": rnd.randint(1, 5000),
+            "id_cart": i,
+            "id_payment_method": rnd.randint(1, 3),
+            "id_delivery": i,
+            "payment_receipt_url": None,
+            "payment_verified_at": None,
+            "transaction_id": None,
+            "payment_status": "paid",
+            "payment_error": None,
+        }
+        for i in range(n)
+    ]
+
+
+def client_side(rows: list, start: date, end: date, size: int) -> list:
+    """Lo que hacía el frontend: todo el listado tipado y luego filtrar/ordenar/cortar"""
+    orders = _decoder.decode(rows)
+    selected = [o for o in orders if o.status == "completed" and start <= o.order_date.date() <= end]
+    selected.sort(key=lambda o: o.total_amount, reverse=True)
+    return selected[:size]
+
+
+def server_side(rows: list, start: date, end: date, size: int) -> list:
+    selected = _filter_orders(rows, OrderFilter(status=["completed"], date_from=start, date_to=end))
+    sort = OrderSort(field=OrderSortField.TOTAL_AMOUNT, direction=SortDirection.DESC)
+    return paginate_rows(_decoder, rows, selected, 0, size, sort, _SORT_PARSERS).nodes
+
+
+def timed(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def run(size: int, page: int) -> None:
+    rows = make_rows(size)
+    end = date.today()
+    start = end - timedelta(days=90)
+    expected = [o.id_order for o in client_side(rows, start, end, page)]
+    cold = timed(server_side, rows, start, end, page)
+    assert [o.id_order for o in server_side(rows, start, end, page)] == expected
+
+    old = min(timed(client_side, rows, start, end, page) for _ in range(3))
+    warm = min(timed(server_side, rows, start - timedelta(days=i), end, page) for i in range(1, 4))
+    print(f"\n📦 {size:,} órdenes, página de {page} (completadas, 90 días, por monto desc)")
+    print(f"{'camino':>28} {'tiempo':>10} {'mejora':>8}")
+    print(f"{'decodificar todo + filtrar':>28} {old * 1000:>8.1f}ms")
+    print(f"{'índices (primera consulta)':>28} {cold * 1000:>8.1f}ms {old / cold:>7.1f}x")
+    print(f"{'índices (ya construidos)':>28} {warm * 1000:>8.1f}ms {old / warm:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="Cantidades de órdenes separadas por coma")
+    parser.add_argument("--page", type=int, default=50, help="Filas por página")
+    args = parser.parse_args()
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        run(size, args.page)
+
+
+if __name__ == "__main__":
+    main()
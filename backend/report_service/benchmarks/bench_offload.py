@@ -0,0 +1,97 @@
+# benchmarks/bench_offload.py
+"""
+⏱️ BENCHMARK: ROLLUP EN EL LOOP VS EN EL POOL DE PROCESOS
+Reconstruye el rollup completo (RollupCube.refresh) con REPORT_OFFLOAD_MODE
+inline y process mientras una tarea mide cada cuánto vuelve a correr el event
+loop: la pausa máxima es lo que espera cualquier otro request durante el
+rebuild.
+
+Uso (desde backend/report_service):
+    python -m benchmarks.bench_offload
+    python -m benchmarks.bench_offload --sizes 100000,300000 --workers 2
+"""
+from datetime import date
+import argparse
+import asyncio
+import random
+import time
+
+from app import config
+from app.common import offload
+from app.reports.order_store import line_store_for, order_store_for
+from app.reports.rollup import RollupCube
+from benchmarks.bench_order_index import make_orders
+
+
+def make_dataset(n: int, lines_per_order: int = 3, products: int = 2000, seed: int = 2) -> tuple:
+    rnd = random.Random(seed)
+    orders = make_orders(n)
+    lines = [
+        {
+            "id_product_order": i,
+            "id_order": rnd.randrange(n),
+            "id_product": rnd.randint(1, products),
+            "subtotal": f"{rnd.uniform(1, 100):.2f}",
+            "price_unit": f"{rnd.uniform(1, 50):.2f}",
+        }
+        for i in range(n * lines_per_order)
+    ]
+    catalog = [
+        {"id_product": p, "id_seller": rnd.randint(1, 200), "id_category": rnd.randint(1, 30)}
+        for p in range(1, products + 1)
+    ]
+    return orders, lines, catalog
+
+
+async def measure_loop(stop: asyncio.Event, gaps: list) -> None:
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.005)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+
+async def rebuild(orders: list, lines: list, catalog: list, mode: str) -> tuple:
+    config.REPORT_OFFLOAD_MODE = mode
+    stop, gaps = asyncio.Event(), []
+    ticker = asyncio.create_task(measure_loop(stop, gaps))
+    await asyncio.sleep(0.02)
+    started = time.perf_counter()
+    await RollupCube().refresh(orders, lines, catalog, date.today())
+    total = time.perf_counter() - started
+    stop.set()
+    await ticker
+    return total, max(gaps)
+
+
+async def run(sizes: list, workers: int) -> None:
+    config.REPORT_OFFLOAD_WORKERS = workers
+    config.REPORT_OFFLOAD_MODE = "process"
+    offload.start_offload()
+    try:
+        for size in sizes:
+            orders, lines, catalog = make_dataset(size)
+            # Los stores se decodifican una vez (igual que en el servicio, fuera del rebuild)
+            order_store_for(orders).by_date
+            line_store_for(lines)
+            print(f"\n📦 {size:,} órdenes, {len(lines):,} líneas")
+            print(f"{'modo':>8} {'rebuild':>10} {'pausa máx. del loop':>20}")
+            # La primera pasada en process incluye publicar las columnas en memoria compartida
+            for mode in ("inline", "process", "process"):
+                total, stall = await rebuild(orders, lines, catalog, mode)
+                print(f"{mode:>8} {total * 1000:>8.0f}ms {stall * 1000:>18.0f}ms")
+    finally:
+        await offload.stop_offload()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000", help="Cantidades de órdenes separadas por coma")
+    parser.add_argument("--workers", type=int, default=2, help="Procesos del pool")
+    args = parser.parse_args()
+    asyncio.run(run([int(value) for value in args.sizes.split(",") if value.strip()], args.workers))
+
+
+if __name__ == "__main__":
+    main()
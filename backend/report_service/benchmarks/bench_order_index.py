@@ -0,0 +1,108 @@
+# benchmarks/bench_order_index.py
+"""
+⏱️ BENCHMARK: FILTRO DE ÓRDENES POR FECHA + ESTADO
+Compara el filtro lineal que usaban los reportes (parsear order_date y comparar
+fila por fila), la máscara NumPy sobre OrderStore y el índice ordenado por fecha
+(OrderDateIndex, búsqueda binaria por estado).
+
+Uso (desde backend/report_service):
+    python -m benchmarks.bench_order_index
+    python -m benchmarks.bench_order_index --sizes 100000,1000000 --repeat 5
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.reports.order_store import COMPLETED_STATUSES, OrderStore
+
+STATUSES = ["completed", "delivered", "pending", "cancelled", "expired", "payment_pending_verification"]
+
+
+def make_orders(n: int, days: int = 730, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    return [
+        {
+            "id_order": i,
+            "order_date": (now - timedelta(minutes=rnd.randint(0, days * 24 * 60))).isoformat() + ".000Z",
+            "status": rnd.choice(STATUSES),
+            "total_amount": f"{rnd.uniform(1, 500):.2f}",
+            "id_client": rnd.randint(1, 5000),
+            "id_payment_method": rnd.randint(1, 3),
+            "id_delivery": i,
+        }
+        for i in range(n)
+    ]
+
+
+def linear_filter(orders: list, start_date: date, end_date: date) -> list:
+    """El bloque que estaba copiado en los reportes"""
+    filtered_orders = []
+    for order in orders:
+        try:
+            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
+            order_status = order.get("status", "").lower()
+            if start_date <= order_date <= end_date and order_status in ["completed", "delivered"]:
+                filtered_orders.append(order)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return filtered_orders
+
+
+def mask_filter(store: OrderStore, start_date: date, end_date: date) -> np.ndarray:
+    """Máscara booleana sobre todas las filas (O(n) vectorizado)"""
+    mask = (store.day >= np.datetime64(start_date, "D")) & (store.day <= np.datetime64(end_date, "D"))
+    return np.flatnonzero(mask & np.isin(store.status, store.status_codes(COMPLETED_STATUSES)))
+
+
+def best_of(repeat: int, fn, *args, **kwargs) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(size: int, repeat: int) -> None:
+    orders = make_orders(size)
+
+    started = time.perf_counter()
+    store = OrderStore.from_rows(orders)
+    decode = time.perf_counter() - started
+    started = time.perf_counter()
+    index = store.by_date
+    build = time.perf_counter() - started
+
+    print(f"\n📦 {size:,} órdenes  (decodificar: {decode * 1000:.0f} ms, construir índice: {build * 1000:.0f} ms)")
+    print(f"{'rango':>10} {'filas':>9} {'lineal':>11} {'máscara':>11} {'índice':>11} {'vs lineal':>10}")
+    today = date.today()
+    for days in (1, 30, 365):
+        start_date = today - timedelta(days=days - 1)
+        expected = len(linear_filter(orders, start_date, today))
+        got = index.count(start_date, today, statuses=COMPLETED_STATUSES)
+        assert got == expected, (got, expected)
+
+        linear = best_of(max(1, repeat // 2), linear_filter, orders, start_date, today)
+        masked = best_of(repeat, mask_filter, store, start_date, today)
+        indexed = best_of(repeat, index.positions, start_date, today, statuses=COMPLETED_STATUSES)
+        print(
+            f"{days:>8} d {expected:>9,} {linear * 1000:>9.2f}ms {masked * 1000:>9.3f}ms "
+            f"{indexed * 1000:>9.3f}ms {linear / indexed:>9.0f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000", help="Cantidades de órdenes separadas por coma")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición (se toma la mejor)")
+    args = parser.parse_args()
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_row_memory.py
+"""
+⏱️ BENCHMARK: MEMORIA DE LISTADOS EN CACHÉ
+Memoria retenida por 100k registros de órdenes, productos y clientes tal como
+llegan del REST API (dicts decodificados con orjson) y como filas compactas
+(`app/common/rows.py`: __slots__ + strings internados).
+
+Uso (desde backend/report_service):
+    python -m benchmarks.bench_row_memory
+    python -m benchmarks.bench_row_memory --rows 250000
+"""
+from datetime import datetime, timedelta
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from app.common.decoding import loads
+from app.common.rows import compact_rows
+
+ORDER_STATUSES = ["completed", "delivered", "pending", "cancelled", "expired"]
+PRODUCT_STATUSES = ["active", "pending", "inactive"]
+
+
+def make_listings(n: int, seed: int = 1) -> dict:
+    rnd = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+
+    def moment() -> str:
+        return (now - timedelta(minutes=rnd.randint(0, 365 * 24 * 60))).isoformat() + ".000Z"
+
+    orders = [
+        {
+            "id_order": i, "order_date": moment(), "status": rnd.choice(ORDER_STATUSES),
+            "total_amount": f"{rnd.uniform(1, 500):.2f}", "delivery_type": rnd.choice(["delivery", "pickup"]),
+            "id_client": rnd.randint(1, 5000), "id_cart": i, "id_payment_method": rnd.randint(1, 3),
+            "id_delivery": i, "payment_receipt_url": None, "payment_verified_at": None,
+            "transaction_id": None, "payment_status": "paid", "payment_error": None,
+        }
+        for i in range(n)
+    ]
+    products = [
+        {
+            "id_product": i, "id_seller": rnd.randint(1, 500), "id_inventory": i, "id_category": rnd.randint(1, 20),
+            "id_sub_category": rnd.randint(1, 60), "product_name": f"Producto {i}", "description": None,
+            "price": f"{rnd.uniform(1, 200):.2f}", "stock": rnd.randint(0, 100), "image_url": None,
+            "status": rnd.choice(PRODUCT_STATUSES), "created_at": moment(),
+        }
+        for i in range(n)
+    ]
+    clients = [
+        {
+            "id_client": i, "client_name": f"Cliente {i}", "client_email": f"cliente{i}@correo.com",
+            "address": "Av. 4 de Noviembre", "phone": None, "document_type": rnd.choice(["cedula", "ruc"]),
+            "document_number": None, "birth_date": None, "avatar_url": None,
+            "additional_addresses": None, "created_at": moment(),
+        }
+        for i in range(n)
+    ]
+    return {"orders": orders, "products": products, "clients": clients}
+
+
+def retained(build) -> int:
+    """Bytes que siguen vivos tras construir el listado (se descartan los temporales)"""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Registros por listado")
+    args = parser.parse_args()
+
+    listings = make_listings(args.rows)
+    print(f"\n📦 {args.rows:,} registros por listado")
+    print(f"{'listado':>10} {'dicts':>10} {'compactas':>10} {'B/fila':>13} {'ahorro':>7} {'conversión':>11}")
+    for name, rows in listings.items():
+        payload = json.dumps(rows).encode()
+        as_dicts = retained(lambda: loads(payload))
+        as_compact = retained(lambda: compact_rows(name, loads(payload)))
+        decoded = loads(payload)
+        started = time.perf_counter()
+        compact_rows(name, decoded)
+        convert = time.perf_counter() - started
+        print(
+            f"{name:>10} {as_dicts / 1e6:>8.1f}MB {as_compact / 1e6:>8.1f}MB "
+            f"{as_dicts // args.rows:>5} -> {as_compact // args.rows:<5} {as_dicts / as_compact:>6.1f}x "
+            f"{convert * 1000:>9.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_snapshots.py
+"""
+⏱️ BENCHMARK: MEMORIA POR WORKER CON Y SIN SNAPSHOTS MAPEADOS
+Levanta K procesos que cargan las órdenes y product-orders como lo haría un
+worker de uvicorn:
+- filas: cada proceso tiene su propia réplica (filas dict) y decodifica sus
+  almacenes columnares (OrderStore + índice por fecha, LineStore).
+- snapshot: cada proceso mapea la generación publicada y arma los almacenes
+  sobre los archivos (app/common/snapshots.py), sin decodificar filas.
+Mide el PSS total (las páginas compartidas se reparten entre los procesos que
+las mapean) y la memoria privada por proceso desde /proc (solo Linux).
+
+Uso (desde backend/report_service):
+    python -m benchmarks.bench_snapshots
+    python -m benchmarks.bench_snapshots --orders 100000 --workers 1,2,4
+"""
+from datetime import date
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app import config
+
+MODES = ("filas", "snapshot")
+
+
+def memory(pid: int) -> dict:
+    """kB de /proc/<pid>/smaps_rollup: Pss y privado (Private_Clean + Private_Dirty)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {"pss": values["Pss"], "private": values["Private_Clean"] + values["Private_Dirty"]}
+
+
+def worker(directory: str, mode: str, ready, release) -> None:
+    config.SNAPSHOT_DIR = directory
+    from app.common import snapshots
+    from app.reports.order_store import LineStore, OrderStore, line_store_for, order_store_for
+
+    generation = snapshots.refresh_current()
+    orders, lines = generation.rows("orders"), generation.rows("product_orders")
+    if mode == "filas":
+        # Réplica propia: filas dict + almacenes decodificados en este proceso
+        orders, lines = list(orders), list(lines)
+        store, line_store = OrderStore.from_rows(orders), LineStore.from_rows(lines)
+    else:
+        store, line_store = order_store_for(orders), line_store_for(lines)
+    # Un reporte recorre las columnas: en modo snapshot las páginas se comparten
+    store.by_date.positions(date(2000, 1, 1), date.today())
+    int(store.amount_cents.sum()) + int(line_store.subtotal_cents.sum()) + int(np.count_nonzero(store.day))
+    ready.put(os.getpid())
+    release.wait()
+
+
+def publish(directory: str, orders: int) -> float:
+    from app.common import snapshots
+    from app.reports.order_store import line_store_for, order_store_for
+    from benchmarks.bench_offload import make_dataset
+
+    rows, lines, _ = make_dataset(orders)
+    datasets = {}
+    for name, listing, store in (("orders", rows, order_store_for(rows)), ("product_orders", lines, line_store_for(lines))):
+        columns, meta = store.snapshot()
+        datasets[name] = snapshots.SnapshotDataset(listing, columns, {**meta, "store": type(store).__name__})
+    started = time.perf_counter()
+    snapshots.write_generation(datasets, {name: time.time() for name in datasets})
+    return time.perf_counter() - started
+
+
+def measure(directory: str, mode: str, workers: int) -> list:
+    context = multiprocessing.get_context("spawn")
+    ready, release = context.Queue(), context.Event()
+    processes = [context.Process(target=worker, args=(directory, mode, ready, release)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    pids = [ready.get() for _ in processes]
+    usage = [memory(pid) for pid in pids]
+    release.set()
+    for process in processes:
+        process.join()
+    return usage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=100000, help="Órdenes (3 líneas por orden)")
+    parser.add_argument("--workers", default="1,2,4", help="Cantidades de workers separadas por coma")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="report-snapshots-") as directory:
+        config.SNAPSHOT_DIR = directory
+        elapsed = publish(directory, args.orders)
+        size = sum(
+            os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names
+        )
+        print(f"\n📦 {args.orders:,} órdenes: generación de {size / 2**20:.0f} MB escrita en {elapsed * 1000:.0f} ms")
+        print(f"{'modo':>9} {'workers':>8} {'PSS total':>11} {'privado/worker':>15}")
+        for workers in (int(value) for value in args.workers.split(",") if value.strip()):
+            for mode in MODES:
+                usage = measure(directory, mode, workers)
+                pss = sum(item["pss"] for item in usage) / 1024
+                private = sum(item["private"] for item in usage) / len(usage) / 1024
+                print(f"{mode:>9} {workers:>8} {pss:>9.0f}MB {private:>13.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
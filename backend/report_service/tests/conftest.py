@@ -0,0 +1,151 @@
+# tests/conftest.py
+"""
+Utilidades comunes de las pruebas: un REST API simulado (httpx.MockTransport)
+que cuenta las llamadas, un generador de datos del marketplace y el reinicio
+del estado de proceso (cachés, rollup, índices) entre pruebas.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import random
+
+import httpx
+import pytest
+
+from app import events
+from app.common import http_client
+from app.common.reference_data import invalidate_reference
+from app.common.replica import REPLICATED_DATASETS, _replicas
+from app.common.seller_ids import forget_seller_id
+from app.common.topk import invalidate_rankings
+from app.reports import order_store
+from app.reports.ratings import invalidate_ratings
+from app.reports.rollup import invalidate_rollup
+
+API_PREFIX = "/api"
+
+
+class FakeRestApi:
+    """
+    REST API en memoria: `listings` es ruta -> filas (GET devuelve la lista
+    completa); `routes` permite respuestas a medida por ruta. Guarda las rutas
+    pedidas en `calls` (sin el prefijo /api).
+    """
+
+    def __init__(self, listings: Dict[str, List[dict]], routes: Optional[Dict[str, Callable]] = None):
+        self.listings = listings
+        self.routes = routes or {}
+        self.calls: List[str] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path[len(API_PREFIX):]
+        self.calls.append(path)
+        for prefix, route in self.routes.items():
+            if path.startswith(prefix):
+                return route(request, path)
+        rows = self.listings.get(path)
+        if rows is None:
+            return httpx.Response(404, json={"message": "not found"})
+        return httpx.Response(200, json=rows)
+
+    def count(self, path: str) -> int:
+        return self.calls.count(path)
+
+
+@asynccontextmanager
+async def serving(api: FakeRestApi):
+    """Cliente upstream compartido apuntando al API simulado durante el bloque"""
+    await http_client.start_upstream_client(transport=httpx.MockTransport(api.handler))
+    try:
+        yield api
+    finally:
+        await http_client.close_upstream_client()
+
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat() + ".000Z"
+
+
+def make_marketplace(orders: int = 120, products: int = 20, clients: int = 15, seed: int = 7) -> Dict[str, List[dict]]:
+    """Listados coherentes entre sí, con fechas de los últimos 40 días (incluye hoy)"""
+    rnd = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    statuses = ["completed", "delivered", "pending", "cancelled", "Completed"]
+    data: Dict[str, List[Any]] = {
+        "/categories": [{"id_category": i, "category_name": f"Categoría {i}", "description": None, "photo": None} for i in range(1, 5)],
+        "/subcategories": [],
+        "/payment-methods": [
+            {"id_payment_method": i, "method_name": name, "details_payment": None}
+            for i, name in ((1, "Efectivo"), (2, "Transferencia"), (3, "Tarjeta"))
+        ],
+        "/sellers": [
+            {
+                "id_seller": i, "seller_name": f"Vendedor {i}", "seller_email": f"v{i}@example.com", "phone": "099",
+                "bussines_name": f"Negocio {i}", "location": "Manta", "created_at": "2024-01-01T00:00:00.000Z",
+                "user_id": f"user-{i}",
+            }
+            for i in range(1, 5)
+        ],
+        "/clients": [
+            {
+                "id_client": i, "client_name": f"Cliente {i}", "client_email": f"c{i}@example.com", "address": "Manta",
+                "phone": None, "document_type": None, "document_number": None, "birth_date": None, "avatar_url": None,
+                "additional_addresses": None, "created_at": _iso(now - timedelta(days=rnd.randint(0, 60))),
+            }
+            for i in range(1, clients + 1)
+        ],
+        "/products": [
+            {
+                "id_product": i, "id_seller": rnd.randint(1, 4), "id_inventory": 1, "id_category": rnd.randint(1, 4),
+                "id_sub_category": 1, "product_name": f"Producto {i}", "description": None,
+                "price": f"{rnd.randint(100, 5000) / 100:.2f}", "stock": rnd.randint(0, 30), "image_url": None,
+                "status": "active", "created_at": "2024-01-01T00:00:00.000Z",
+            }
+            for i in range(1, products + 1)
+        ],
+        "/orders": [],
+        "/product-orders": [],
+        "/deliveries": [],
+    }
+    line_id = 1
+    for order_id in range(1, orders + 1):
+        # La primera orden siempre es de hoy (dashboard)
+        ordered_at = now if order_id == 1 else now - timedelta(days=rnd.randint(0, 40), hours=rnd.randint(0, 23))
+        lines = []
+        for _ in range(rnd.randint(1, 3)):
+            product = rnd.choice(data["/products"])
+            lines.append({
+                "id_product_order": line_id, "id_order": order_id, "id_product": product["id_product"],
+                "price_unit": product["price"], "subtotal": product["price"], "created_at": _iso(ordered_at),
+                "rating": rnd.choice([None, 3, 4, 5]), "review_comment": None, "reviewed_at": None,
+            })
+            line_id += 1
+        data["/product-orders"].extend(lines)
+        data["/deliveries"].append({
+            "id_delivery": order_id, "id_product": lines[0]["id_product"], "delivery_address": "Calle 1",
+            "city": rnd.choice(["Manta", "Quito"]), "status": rnd.choice(["Entregado", "Pendiente"]),
+            "estimated_time": _iso(ordered_at + timedelta(hours=rnd.randint(1, 72))), "delivery_person": "Ana",
+            "delivery_cost": "2.50", "phone": "099",
+        })
+        data["/orders"].append({
+            "id_order": order_id, "order_date": _iso(ordered_at), "status": rnd.choice(statuses),
+            "total_amount": f"{sum(float(line['subtotal']) for line in lines):.2f}", "delivery_type": "delivery",
+            "id_client": rnd.randint(1, clients), "id_cart": 1, "id_payment_method": rnd.randint(1, 3),
+            "id_delivery": order_id, "payment_receipt_url": None, "payment_verified_at": None,
+        })
+    return data
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """Cada prueba parte sin cachés, rollup, índices ni réplicas del proceso"""
+    invalidate_rollup()
+    invalidate_rankings()
+    invalidate_reference()
+    invalidate_ratings()
+    forget_seller_id()
+    order_store._stores.clear()
+    events._seen.clear()
+    for name, spec in REPLICATED_DATASETS.items():
+        _replicas[name].__init__(spec)
+    yield
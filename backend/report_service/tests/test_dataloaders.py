@@ -0,0 +1,98 @@
+# tests/test_dataloaders.py
+"""
+Consultas anidadas: los resolvers de relaciones van por los DataLoaders del
+contexto, así una consulta hace una llamada al REST API por entidad sin
+importar cuántas órdenes devuelva.
+"""
+import asyncio
+import logging
+
+import httpx
+
+from app.common import http_client
+from app.common.decoding import decode_metrics
+from app.deps import ReportContext
+from app.schema import schema
+
+ORDERS = [
+    {
+        "id_order": i, "order_date": "2024-05-0%dT10:00:00.000Z" % i, "status": "completed",
+        "total_amount": "10.00", "delivery_type": "delivery", "id_client": 1 + i % 2, "id_cart": 1,
+        "id_payment_method": 1, "id_delivery": None, "payment_receipt_url": None, "payment_verified_at": None,
+    }
+    for i in range(1, 6)
+]
+PRODUCT_ORDERS = [
+    {
+        "id_product_order": 10 * order["id_order"] + j, "id_order": order["id_order"], "id_product": j,
+        "price_unit": "5.00", "subtotal": "5.00", "created_at": order["order_date"],
+        "rating": None, "review_comment": None, "reviewed_at": None,
+    }
+    for order in ORDERS
+    for j in (1, 2)
+]
+CLIENTS = [
+    {
+        "id_client": i, "client_name": f"Cliente {i}", "client_email": f"c{i}@example.com", "address": "Manta",
+        "phone": None, "document_type": None, "document_number": None, "birth_date": None, "avatar_url": None,
+        "additional_addresses": None, "created_at": "2024-01-01T00:00:00.000Z",
+    }
+    for i in (1, 2)
+]
+LISTINGS = {"/api/orders": ORDERS, "/api/product-orders": PRODUCT_ORDERS, "/api/clients": CLIENTS}
+
+QUERY = """
+{
+  all_orders {
+    id_order
+    client { client_name }
+    product_orders { id_product_order subtotal }
+  }
+}
+"""
+
+
+def _rest_api(request: httpx.Request) -> httpx.Response:
+    rows = LISTINGS.get(request.url.path)
+    if rows is None:
+        return httpx.Response(404)
+    return httpx.Response(200, json=rows)
+
+
+async def _execute(query: str):
+    await http_client.start_upstream_client(transport=httpx.MockTransport(_rest_api))
+    try:
+        return await schema.execute(query, context_value=ReportContext())
+    finally:
+        await http_client.close_upstream_client()
+
+
+def test_nested_query_makes_one_call_per_entity():
+    result = asyncio.run(_execute(QUERY))
+
+    assert result.errors is None
+    assert len(result.data["all_orders"]) == len(ORDERS)
+    first = result.data["all_orders"][0]
+    assert first["client"] == {"client_name": "Cliente 2"}
+    assert [line["id_product_order"] for line in first["product_orders"]] == [11, 12]
+
+    calls = result.extensions["upstream_calls"]
+    assert calls["total"] == 3
+    assert calls["by_path"] == {"/orders": 1, "/clients": 1, "/product-orders": 1}
+
+
+def test_invalid_related_rows_are_counted_and_logged_once_per_batch(caplog, monkeypatch):
+    broken = [dict(line, subtotal="n/a") if line["id_order"] == 1 else line for line in PRODUCT_ORDERS]
+    monkeypatch.setitem(LISTINGS, "/api/product-orders", broken)
+    before = decode_metrics.rejected["product_orders"]
+
+    with caplog.at_level(logging.WARNING, logger="app.common.decoding"):
+        result = asyncio.run(_execute(QUERY))
+
+    assert result.errors is None
+    lines = {order["id_order"]: order["product_orders"] for order in result.data["all_orders"]}
+    assert lines[1] == [] and len(lines[2]) == 2
+    assert decode_metrics.rejected["product_orders"] - before == 2
+    warnings = [record.getMessage() for record in caplog.records if "product_orders" in record.getMessage()]
+    assert len(warnings) == 1
+    assert "2 de 10 registros" in warnings[0] and "\n" not in warnings[0]
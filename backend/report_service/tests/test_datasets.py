@@ -0,0 +1,45 @@
+# tests/test_datasets.py
+"""
+DatasetSnapshot: los reportes de una misma operación GraphQL comparten las
+descargas; un dashboard que pide cuatro reportes descarga /orders una vez.
+"""
+from datetime import date, timedelta
+import asyncio
+
+from app.deps import ReportContext
+from app.schema import schema
+from tests.conftest import FakeRestApi, make_marketplace, serving
+
+END = date.today()
+START = END - timedelta(days=30)
+RANGE = f'date_range: {{ start_date: "{START}", end_date: "{END}" }}'
+
+QUERY = f"""
+{{
+  dashboard_stats {{ today_sales today_orders month_revenue pending_deliveries }}
+  sales_report({RANGE}, period: DAILY) {{ total_revenue total_orders }}
+  financial_report({RANGE}) {{ total_revenue payment_methods {{ method_name total_amount }} }}
+  clients_report({RANGE}) {{ active_clients top_clients {{ client_id total_spent }} }}
+}}
+"""
+
+
+def _execute(api: FakeRestApi):
+    async def scenario():
+        async with serving(api):
+            return await schema.execute(QUERY, context_value=ReportContext())
+
+    return asyncio.run(scenario())
+
+
+def test_dashboard_operation_downloads_orders_once():
+    api = FakeRestApi(make_marketplace())
+    result = _execute(api)
+
+    assert result.errors is None
+    # Los reportes leen el mismo listado: sus totales coinciden
+    assert result.data["sales_report"]["total_revenue"] == result.data["financial_report"]["total_revenue"]
+    calls = result.extensions["upstream_calls"]["by_path"]
+    assert calls["/orders"] == 1
+    assert all(count == 1 for count in calls.values()), calls
+    assert api.count("/orders") == 1
@@ -0,0 +1,108 @@
+# tests/test_events.py
+"""
+POST /events: autenticación con INTERNAL_API_KEY, reenvíos idempotentes y
+el efecto de payment.success en los reportes (la orden pagada suma ingresos).
+"""
+from datetime import date
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import config
+from app.common.replica import get_replica, sync_all
+from app.main import app
+from app.reports.order_store import OrderStore
+from app.reports.service import get_financial_report
+from tests.conftest import FakeRestApi, make_marketplace, serving
+
+API_KEY = "clave-de-prueba"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(config, "INTERNAL_API_KEY", API_KEY)
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", None)
+    # Sin `with`: no corre el lifespan (cliente upstream, sincronización en segundo plano)
+    return TestClient(app)
+
+
+def _today_revenue(api: FakeRestApi) -> float:
+    async def scenario():
+        async with serving(api):
+            return await get_financial_report(date.today(), date.today())
+
+    return asyncio.run(scenario()).total_revenue
+
+
+def _synced_api() -> FakeRestApi:
+    data = make_marketplace()
+    # La orden 1 es de hoy: queda pendiente de pago
+    data["/orders"][0]["status"] = "pending"
+    api = FakeRestApi(data)
+
+    async def sync():
+        async with serving(api):
+            await sync_all()
+
+    asyncio.run(sync())
+    assert get_replica("orders").ready
+    return api
+
+
+def test_requires_configured_key(client, monkeypatch):
+    monkeypatch.setattr(config, "INTERNAL_API_KEY", None)
+    response = client.post("/events", json={"event": "payment.success", "data": {"orderId": 1}})
+    assert response.status_code == 503
+
+
+def test_rejects_missing_or_wrong_key(client):
+    event = {"event": "payment.success", "data": {"orderId": 1}}
+    assert client.post("/events", json=event).status_code == 401
+    assert client.post("/events", json=event, headers={"X-Internal-Api-Key": "otra"}).status_code == 401
+    assert client.post("/events", json=event, headers={"Authorization": "Bearer otra"}).status_code == 401
+
+
+def test_resent_batch_is_counted_as_duplicates(client):
+    _synced_api()
+    batch = {"events": [
+        {"event": "payment.success", "data": {"orderId": 1, "transactionId": "tx-1"}},
+        {"event": "delivery.completed", "data": {"orderId": 2}, "id": "evt-2"},
+    ]}
+    headers = {"Authorization": f"Bearer {API_KEY}"}
+
+    first = client.post("/events", json=batch, headers=headers).json()
+    assert first["accepted"] == 2
+    again = client.post("/events", json=batch, headers=headers).json()
+    assert again["duplicates"] == 2
+    assert again.get("accepted", 0) == 0
+    assert again["orders_changed"] == 0
+
+
+def test_payment_success_adds_today_revenue(client):
+    api = _synced_api()
+    order = get_replica("orders").get(1)
+    before = _today_revenue(api)
+
+    response = client.post(
+        "/events",
+        json={"event": "payment.success", "data": {"orderId": 1, "transactionId": "tx-9"}},
+        headers={"X-Internal-Api-Key": API_KEY},
+    )
+    assert response.json()["orders_changed"] == 1
+    assert get_replica("orders").get(1)["payment_status"] == "paid"
+
+    after = _today_revenue(api)
+    assert round(after - before, 2) == round(float(order["total_amount"]), 2)
+
+
+def test_confirmed_payment_counts_as_sale_until_order_is_closed():
+    rows = [
+        {"id_order": 1, "order_date": "2024-05-01T10:00:00.000Z", "status": "confirmed", "payment_status": "paid", "total_amount": "10.00"},
+        {"id_order": 2, "order_date": "2024-05-01T10:00:00.000Z", "status": "paid", "total_amount": "5.00"},
+        {"id_order": 3, "order_date": "2024-05-01T10:00:00.000Z", "status": "cancelled", "payment_status": "paid", "total_amount": "7.00"},
+        {"id_order": 4, "order_date": "2024-05-01T10:00:00.000Z", "status": "confirmed", "payment_status": "pending", "total_amount": "3.00"},
+    ]
+    store = OrderStore.from_rows(rows)
+    selected = store.completed_between(date(2024, 5, 1), date(2024, 5, 1))
+    assert sorted(store.id_order[selected].tolist()) == [1, 2]
@@ -0,0 +1,79 @@
+# tests/test_financial_report.py
+"""
+Reporte financiero: el desglose por método de pago cubre todas las órdenes
+completadas (las que no tienen método o tienen uno desconocido van a
+"Desconocido"), igual que el cálculo por filas original.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+import asyncio
+
+import numpy as np
+
+from app.reports.order_store import MISSING_ID, OrderStore
+from app.reports.service import get_financial_report
+from tests.conftest import FakeRestApi, make_marketplace, serving
+
+
+def baseline_financial(orders, payment_methods, start_date, end_date):
+    """Cálculo por filas de la versión original de get_financial_report"""
+    filtered = []
+    for order in orders:
+        try:
+            order_date = datetime.fromisoformat(order["order_date"].replace("Z", "")).date()
+            if start_date <= order_date <= end_date and order.get("status", "").lower() in ["completed", "delivered"]:
+                filtered.append(order)
+        except (KeyError, TypeError, ValueError):
+            continue
+    total_revenue = sum(float(order["total_amount"]) for order in filtered)
+    names = {pm["id_payment_method"]: pm["method_name"] for pm in payment_methods}
+    stats = defaultdict(lambda: {"count": 0, "amount": 0.0})
+    for order in filtered:
+        name = names.get(order["id_payment_method"], "Desconocido")
+        stats[name]["count"] += 1
+        stats[name]["amount"] += float(order["total_amount"])
+    return total_revenue, len(filtered), {
+        name: (values["count"], round(values["amount"], 2), values["amount"] / total_revenue * 100)
+        for name, values in stats.items()
+    }
+
+
+def test_breakdown_matches_baseline_including_unknown_methods():
+    data = make_marketplace(orders=150)
+    # Órdenes sin método de pago y con un método que ya no existe
+    for order in data["/orders"][::7]:
+        order["id_payment_method"] = None
+    for order in data["/orders"][3::11]:
+        order["id_payment_method"] = 99
+    end = date.today()
+    start = end - timedelta(days=30)
+
+    async def scenario():
+        async with serving(FakeRestApi(data)):
+            return await get_financial_report(start, end)
+
+    report = asyncio.run(scenario())
+    total_revenue, total_orders, methods = baseline_financial(data["/orders"], data["/payment-methods"], start, end)
+
+    assert "Desconocido" in methods
+    assert report.total_orders == total_orders
+    assert round(report.total_revenue, 2) == round(total_revenue, 2)
+    assert sum(item.total_transactions for item in report.payment_methods) == report.total_orders
+    got = {
+        item.method_name: (item.total_transactions, round(item.total_amount, 2), item.percentage)
+        for item in report.payment_methods
+    }
+    assert got.keys() == methods.keys()
+    for name, (count, amount, percentage) in methods.items():
+        assert got[name][:2] == (count, amount)
+        assert abs(got[name][2] - percentage) < 1e-9
+
+
+def test_group_by_keeps_missing_ids_as_their_own_group():
+    store = OrderStore.from_rows([
+        {"id_order": 1, "order_date": "2024-05-01T10:00:00.000Z", "status": "completed", "total_amount": "10.00", "id_payment_method": 1},
+        {"id_order": 2, "order_date": "2024-05-01T11:00:00.000Z", "status": "completed", "total_amount": "2.50", "id_payment_method": None},
+        {"id_order": 3, "order_date": "2024-05-02T10:00:00.000Z", "status": "completed", "total_amount": "4.00", "id_payment_method": 1},
+    ])
+    groups = store.group_by(store.id_payment_method, np.arange(len(store)))
+    assert sorted(groups) == [(MISSING_ID, 250, 1), (1, 1400, 2)]
@@ -0,0 +1,97 @@
+# tests/test_offload.py
+"""
+run_kernel: el mismo KernelCall da el mismo resultado en el loop y en el pool
+de procesos (columnas por memoria compartida), y si el pool falla el kernel
+corre en el loop.
+"""
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+import asyncio
+
+import numpy as np
+import pytest
+
+from app import config
+from app.common import offload
+from app.reports.order_store import OrderStore
+from app.reports.rollup import _rollup_call
+from tests.conftest import make_marketplace
+
+
+@pytest.fixture
+def rollup_call():
+    data = make_marketplace(orders=300)
+    store = OrderStore.from_rows(data["/orders"])
+    call, size = _rollup_call(store, data["/product-orders"], data["/products"], date.today() - timedelta(days=40))
+    # El store es el dueño de las columnas publicadas: tiene que vivir durante la prueba
+    yield call, size, store
+
+
+def _assert_same(a, b):
+    assert a.keys() == b.keys()
+    for key in a:
+        np.testing.assert_array_equal(a[key], b[key], err_msg=key)
+
+
+def test_process_pool_matches_inline(monkeypatch, rollup_call):
+    call, size, _ = rollup_call
+    monkeypatch.setattr(config, "REPORT_OFFLOAD_WORKERS", 1)
+    expected = call.inline()
+
+    async def scenario():
+        monkeypatch.setattr(config, "REPORT_OFFLOAD_MODE", "process")
+        try:
+            before = dict(offload.stats)
+            pooled = await offload.run_kernel(call, size)
+            assert offload.stats["process"] == before["process"] + 1
+            monkeypatch.setattr(config, "REPORT_OFFLOAD_MODE", "inline")
+            inline = await offload.run_kernel(call, size)
+            assert offload.stats["inline"] == before["inline"] + 1
+            return pooled, inline
+        finally:
+            await offload.stop_offload()
+
+    pooled, inline = asyncio.run(scenario())
+    _assert_same(pooled, expected)
+    _assert_same(inline, expected)
+
+
+class _BrokenPool:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker muerto")
+
+    def shutdown(self, *args, **kwargs):
+        pass
+
+
+def test_broken_pool_falls_back_to_inline(monkeypatch, rollup_call):
+    call, size, _ = rollup_call
+    monkeypatch.setattr(config, "REPORT_OFFLOAD_MODE", "process")
+    monkeypatch.setattr(config, "REPORT_OFFLOAD_WORKERS", 1)
+    monkeypatch.setattr(offload, "_pool", _BrokenPool())
+    fallbacks = offload.stats["fallbacks"]
+
+    async def scenario():
+        try:
+            return await offload.run_kernel(call, size)
+        finally:
+            await offload.stop_offload()
+
+    _assert_same(asyncio.run(scenario()), call.inline())
+    assert offload.stats["fallbacks"] == fallbacks + 1
+    # El pool roto se descarta: el próximo kernel crea uno nuevo
+    assert offload._pool is None
+
+
+def test_auto_mode_offloads_only_large_kernels(monkeypatch):
+    monkeypatch.setattr(config, "REPORT_OFFLOAD_MODE", "auto")
+    monkeypatch.setattr(config, "REPORT_OFFLOAD_WORKERS", 2)
+    monkeypatch.setattr(config, "REPORT_OFFLOAD_MIN_ROWS", 1000)
+    assert offload.offload_mode(999) == "inline"
+    assert offload.offload_mode(1000) == "process"
+    monkeypatch.setattr(config, "REPORT_OFFLOAD_WORKERS", 0)
+    assert offload.offload_mode(10 ** 9) == "inline"
+
+
+def test_warm_up_loads_the_kernels():
+    offload._warm_up()
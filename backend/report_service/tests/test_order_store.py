@@ -0,0 +1,98 @@
+# tests/test_order_store.py
+"""
+OrderDateIndex: la búsqueda binaria por partición de estado devuelve las
+mismas posiciones que filtrar fila por fila (límites de fecha inclusivos,
+particiones vacías, estados excluidos).
+"""
+from datetime import date, datetime, timedelta
+import random
+
+import pytest
+
+from app.reports.order_store import COMPLETED_STATUSES, OrderStore, report_status
+
+STATUSES = ["completed", "Delivered", "pending", "cancelled", "expired", "confirmed"]
+FIRST_DAY = date(2024, 3, 1)
+
+
+def _orders(count: int = 400, seed: int = 3):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(1, count + 1):
+        day = FIRST_DAY + timedelta(days=rnd.randint(0, 20))
+        # Horas en los bordes del día: el límite superior incluye todo el día
+        moment = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rnd.choice([0, 1, 43200, 86399]))
+        rows.append({
+            "id_order": i, "order_date": moment.isoformat() + ".000Z", "status": rnd.choice(STATUSES),
+            "total_amount": "1.00", "payment_status": rnd.choice([None, "pending", "paid"]),
+        })
+    # Estado cuyas órdenes tienen todas la fecha inválida: su partición queda vacía
+    rows.append({"id_order": count + 1, "order_date": "sin fecha", "status": "refunded", "total_amount": "1.00"})
+    rows.append({"id_order": count + 2, "order_date": None, "status": "completed", "total_amount": "1.00"})
+    return rows
+
+
+def _brute_force(rows, start=None, end=None, statuses=None, exclude=()):
+    selected = []
+    for position, row in enumerate(rows):
+        try:
+            day = datetime.fromisoformat(str(row["order_date"]).replace("Z", "")).date()
+        except ValueError:
+            continue
+        status = report_status(row)
+        if start is not None and day < start or end is not None and day > end:
+            continue
+        if statuses is not None and status not in statuses or status in exclude:
+            continue
+        selected.append(position)
+    return selected
+
+
+ROWS = _orders()
+RANGES = [
+    (None, None),
+    (FIRST_DAY, FIRST_DAY),
+    (FIRST_DAY + timedelta(days=5), FIRST_DAY + timedelta(days=9)),
+    (FIRST_DAY + timedelta(days=7), None),
+    (None, FIRST_DAY + timedelta(days=3)),
+    (FIRST_DAY - timedelta(days=10), FIRST_DAY - timedelta(days=1)),
+    (FIRST_DAY + timedelta(days=21), FIRST_DAY + timedelta(days=40)),
+    (FIRST_DAY + timedelta(days=9), FIRST_DAY + timedelta(days=5)),
+]
+FILTERS = [
+    {},
+    {"statuses": COMPLETED_STATUSES},
+    {"statuses": ["pending"]},
+    {"statuses": ["delivered"]},
+    {"statuses": ["refunded"]},
+    {"statuses": ["no-existe"]},
+    {"statuses": []},
+    {"exclude": ("cancelled", "expired")},
+    {"statuses": ["pending", "cancelled"], "exclude": ["cancelled"]},
+]
+
+
+@pytest.mark.parametrize("start,end", RANGES)
+@pytest.mark.parametrize("filters", FILTERS)
+def test_positions_match_brute_force(start, end, filters):
+    index = OrderStore.from_rows(ROWS).by_date
+    expected = _brute_force(ROWS, start, end, **filters)
+
+    assert sorted(index.positions(start, end, **filters).tolist()) == expected
+    assert index.count(start, end, **filters) == len(expected)
+
+
+def test_partitions_are_sorted_by_day():
+    store = OrderStore.from_rows(ROWS)
+    for view in store.by_date.select():
+        days = store.day[view]
+        assert (days[1:] >= days[:-1]).all()
+        assert len(set(store.status[view].tolist())) == 1
+
+
+def test_completed_between_is_inclusive_on_both_ends():
+    store = OrderStore.from_rows(ROWS)
+    day = FIRST_DAY + timedelta(days=4)
+    expected = _brute_force(ROWS, day, day, statuses=COMPLETED_STATUSES)
+    assert expected
+    assert sorted(store.completed_between(day, day).tolist()) == expected
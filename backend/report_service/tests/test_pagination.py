@@ -0,0 +1,76 @@
+# tests/test_pagination.py
+"""
+Descarga paginada: iter_pages entrega las mismas filas que fetch_all_pages y,
+si el consumidor abandona el generador, no pide las páginas restantes (la
+sincronización incremental de la réplica lo usa para cortar en la primera
+página que ignora la marca de agua).
+"""
+import asyncio
+
+import httpx
+
+from app.common.pagination import fetch_all_pages, iter_pages
+from app.common.replica import get_replica
+from tests.conftest import FakeRestApi, make_marketplace, serving
+
+PAGE_SIZE = 10
+
+
+def _paginated(rows):
+    """Ruta que pagina `rows` con page/limit, recortando limit a PAGE_SIZE (ignora cualquier otro parámetro)"""
+    def route(request: httpx.Request, path: str) -> httpx.Response:
+        page = int(request.url.params.get("page", 1))
+        limit = min(int(request.url.params.get("limit", PAGE_SIZE)), PAGE_SIZE)
+        chunk = rows[(page - 1) * limit: page * limit]
+        return httpx.Response(200, json={"data": chunk, "pagination": {"total": len(rows), "page": page, "limit": limit}})
+
+    return route
+
+
+def test_iter_pages_yields_every_row_once():
+    orders = make_marketplace(orders=95)["/orders"]
+    api = FakeRestApi({}, {"/orders": _paginated(orders)})
+
+    async def scenario():
+        async with serving(api):
+            streamed = [row async for page in iter_pages("/orders", page_size=PAGE_SIZE) for row in page]
+            listed = await fetch_all_pages("/orders", page_size=PAGE_SIZE)
+        return streamed, listed
+
+    streamed, listed = asyncio.run(scenario())
+    assert [row["id_order"] for row in listed] == [row["id_order"] for row in orders]
+    assert sorted(row["id_order"] for row in streamed) == [row["id_order"] for row in orders]
+
+
+def test_abandoned_iteration_stops_requesting_pages():
+    orders = make_marketplace(orders=200)["/orders"]
+    api = FakeRestApi({}, {"/orders": _paginated(orders)})
+
+    async def scenario():
+        async with serving(api):
+            pages = iter_pages("/orders", page_size=PAGE_SIZE, max_concurrency=2)
+            async for _ in pages:
+                break
+            await pages.aclose()
+
+    asyncio.run(scenario())
+    # La primera página y como mucho las que ya estaban en vuelo, no las 20
+    assert api.count("/orders") <= 3
+
+
+def test_delta_sync_stops_at_first_page_ignoring_watermark():
+    orders = make_marketplace(orders=200)["/orders"]
+    api = FakeRestApi({}, {"/orders": _paginated(orders)})
+    replica = get_replica("orders")
+
+    async def scenario():
+        async with serving(api):
+            await replica.sync()
+            full = api.count("/orders")
+            rows, problem = await replica._download_delta()
+            assert rows == [] and problem is not None
+            return full, api.count("/orders") - full
+
+    full, delta = asyncio.run(scenario())
+    assert len(replica.rows) == 200
+    assert delta < full // 2
@@ -0,0 +1,76 @@
+# tests/test_ratings.py
+"""
+Índice de ratings: units_sold cuenta solo las líneas de órdenes que son venta
+(completadas, entregadas o pagadas) y da lo mismo con el listado masivo que
+con el fallback de reseñas por producto.
+"""
+from collections import Counter
+import asyncio
+
+import httpx
+
+from app.reports.ratings import RatingIndex, invalidate_ratings
+from app.reports.service import get_top_rated_products_report
+from tests.conftest import FakeRestApi, make_marketplace, serving
+
+SOLD = ("completed", "delivered")
+
+
+def _expected_units(data):
+    sold = {order["id_order"] for order in data["/orders"] if order["status"].lower() in SOLD}
+    return Counter(line["id_product"] for line in data["/product-orders"] if line["id_order"] in sold)
+
+
+def _reviews_route(lines):
+    def route(request: httpx.Request, path: str) -> httpx.Response:
+        product_id = int(path.split("/")[3])
+        reviews = [{"rating": line["rating"]} for line in lines if line["id_product"] == product_id and line["rating"]]
+        return httpx.Response(200, json=reviews)
+
+    return route
+
+
+def _report(api: FakeRestApi):
+    async def scenario():
+        async with serving(api):
+            return await get_top_rated_products_report(limit=100)
+
+    return asyncio.run(scenario())
+
+
+def test_units_sold_counts_only_sold_orders_in_both_modes():
+    data = make_marketplace(orders=200)
+    expected = _expected_units(data)
+    bulk = _report(FakeRestApi(data))
+    bulk_units = {item.product_id: item.units_sold for item in bulk.top_products}
+    assert bulk_units == {product_id: expected[product_id] for product_id in bulk_units}
+    # Hay líneas de órdenes pendientes o canceladas que no cuentan
+    lines = data["/product-orders"]
+    all_lines = Counter(line["id_product"] for line in lines)
+    assert sum(bulk_units.values()) < sum(all_lines[product_id] for product_id in bulk_units)
+
+    invalidate_ratings()
+    without_ratings = dict(data, **{"/product-orders": [{k: v for k, v in line.items() if k != "rating"} for line in lines]})
+    fallback = _report(FakeRestApi(without_ratings, {"/orders/products/": _reviews_route(lines)}))
+    fallback_units = {item.product_id: item.units_sold for item in fallback.top_products}
+    assert fallback_units == bulk_units
+    assert [item.product_id for item in fallback.top_products] == [item.product_id for item in bulk.top_products]
+
+
+def test_status_change_moves_units_on_the_next_delta():
+    index = RatingIndex()
+    lines = [
+        {"id_product_order": 1, "id_order": 10, "id_product": 5, "rating": 4},
+        {"id_product_order": 2, "id_order": 11, "id_product": 5, "rating": None},
+        {"id_product_order": 3, "id_order": 12, "id_product": 6, "rating": 5},
+    ]
+    index.apply_product_orders(lines, sold_orders={10})
+    assert (index.get(5).units_sold, index.get(6).units_sold) == (1, 0)
+
+    # La orden 11 se entrega y la 10 se cancela: solo cambian esas líneas
+    assert index.apply_product_orders(lines, sold_orders={11}) == 2
+    assert (index.get(5).units_sold, index.get(5).rating_count) == (1, 1)
+
+    # Una línea que desaparece resta su unidad vendida
+    index.apply_product_orders(lines[:1], sold_orders={10, 11})
+    assert (index.get(5).units_sold, index.get(6).units_sold) == (1, 0)
@@ -0,0 +1,145 @@
+# tests/test_replica.py
+"""
+Réplica local de /orders y /product-orders: merge por marca de agua, bajas en
+un resync completo, espaciado de las sincronizaciones cuando el API ignora la
+marca de agua y el paso de los cambios al rollup (apply_replica_changes).
+"""
+from datetime import date, timedelta
+import asyncio
+import time
+
+import httpx
+
+from app import config
+from app.common.replica import get_replica, replica_rows, sync_all
+from app.reports.service import get_financial_report
+from tests.conftest import FakeRestApi, make_marketplace, serving
+from tests.test_financial_report import baseline_financial
+
+
+def _order(order_id: int, status: str = "completed") -> dict:
+    return {"id_order": order_id, "order_date": "2024-05-01T10:00:00.000Z", "status": status, "total_amount": "10.00"}
+
+
+def _with_watermark(rows):
+    """/orders que respeta since_id (devuelve solo ids mayores)"""
+    def route(request: httpx.Request, path: str) -> httpx.Response:
+        since = request.url.params.get(config.SYNC_WATERMARK_PARAM)
+        selected = rows if since is None else [row for row in rows if row["id_order"] > int(since)]
+        return httpx.Response(200, json=selected)
+
+    return route
+
+
+def test_upsert_merges_new_and_changed_rows_past_the_watermark():
+    replica = get_replica("orders")
+    replica.replace_all([_order(1), _order(2), _order(3)])
+    kept = replica.rows[0]
+    assert replica.watermark == 3
+
+    positions = replica.upsert([_order(2, "cancelled"), _order(4), _order(1)])
+    assert sorted(positions) == [1, 3]
+    assert replica.watermark == 4
+    assert replica.rows[0] is kept
+    assert replica.get(2)["status"] == "cancelled"
+    assert replica.position(4) == 3
+
+
+def test_replace_all_drops_removed_rows_and_reports_shifted_positions():
+    replica = get_replica("orders")
+    replica.replace_all([_order(1), _order(2), _order(3), _order(4)])
+    before = replica.rows
+
+    moved = replica.replace_all([_order(1), _order(3), _order(4, "cancelled")])
+    assert moved == [1, 2]
+    assert replica.get(2) is None
+    assert replica.position(3) == 1
+    # La fila 3 no cambió: conserva el objeto, solo se corrió de lugar
+    assert replica.rows[1] is before[2]
+    assert replica.stats["deletes"] == 1
+    assert replica.replace_all([dict(row) for row in replica.rows]) == []
+
+
+def test_delta_sync_appends_rows_past_the_watermark():
+    rows = [_order(i) for i in range(1, 6)]
+    api = FakeRestApi({"/product-orders": []}, {"/orders": _with_watermark(rows)})
+    replica = get_replica("orders")
+
+    async def scenario():
+        async with serving(api):
+            await replica.sync()
+            rows.extend([_order(6), _order(7)])
+            await replica.sync()
+
+    asyncio.run(scenario())
+    assert [row["id_order"] for row in replica.rows] == list(range(1, 8))
+    assert replica.delta_supported
+    assert replica.stats["delta_syncs"] == 1
+    assert replica.stats["full_syncs"] == 1
+
+
+def test_ignored_watermark_backs_off_to_spaced_full_syncs(monkeypatch):
+    monkeypatch.setattr(config, "SYNC_FULL_ONLY_SECONDS", 300.0)
+    # El API ignora since_id: siempre devuelve el listado completo
+    api = FakeRestApi({"/orders": [_order(i) for i in range(1, 6)], "/product-orders": []})
+    replica = get_replica("orders")
+
+    async def scenario():
+        async with serving(api):
+            await replica.sync()
+            await replica.sync()
+            detected = api.count("/orders")
+            for _ in range(5):
+                await replica.sync()
+            skipped = api.count("/orders") - detected
+            await replica.sync(force=True)
+            return detected, skipped, api.count("/orders") - detected
+
+    detected, skipped, forced = asyncio.run(scenario())
+    # Carga inicial, la incremental que lo detecta y el resync completo
+    assert detected == 3
+    assert not replica.delta_supported and replica.stats["resyncs"] == 1
+    assert skipped == 0
+    assert forced == 1
+
+    # Se sigue sirviendo con el atraso propio de ese modo
+    replica.synced_at = replica.full_synced_at = time.monotonic() - (config.SYNC_MAX_LAG_SECONDS + 60)
+    assert replica_rows("/orders") is replica.rows
+    assert not replica.sync_due()
+    replica.synced_at = replica.full_synced_at = time.monotonic() - config.SYNC_FULL_ONLY_SECONDS
+    assert replica.sync_due()
+    replica.synced_at = time.monotonic() - replica.max_lag() - 1
+    assert replica_rows("/orders") is None
+
+
+def test_full_resync_changes_reach_sealed_rollup_days(monkeypatch):
+    monkeypatch.setattr(config, "SYNC_FULL_RESYNC_SECONDS", 1e-9)
+    data = make_marketplace(orders=150)
+    api = FakeRestApi(data)
+    end = date.today()
+    start = end - timedelta(days=30)
+    old = [
+        order for order in data["/orders"]
+        if start.isoformat() <= order["order_date"][:10] < (end - timedelta(days=5)).isoformat()
+    ]
+    pending = next(order for order in old if order["status"] == "pending")
+    completed = next(order for order in old if order["status"] == "completed")
+
+    async def scenario():
+        async with serving(api):
+            await sync_all()
+            first = await get_financial_report(start, end)
+            # Cambio de estado en un día ya cerrado y una baja, vistos solo por el resync
+            data["/orders"] = [
+                dict(order, status="completed") if order is pending else order
+                for order in data["/orders"]
+                if order is not completed
+            ]
+            await sync_all()
+            return first, await get_financial_report(start, end)
+
+    first, second = asyncio.run(scenario())
+    total_revenue, total_orders, _ = baseline_financial(data["/orders"], data["/payment-methods"], start, end)
+    assert second.total_orders == total_orders
+    assert round(second.total_revenue, 2) == round(total_revenue, 2) != round(first.total_revenue, 2)
+    assert get_replica("orders").get(completed["id_order"]) is None
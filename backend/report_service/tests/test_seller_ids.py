@@ -0,0 +1,60 @@
+# tests/test_seller_ids.py
+"""
+seller_ids: varios vendedores en una consulta se resuelven con una sola
+descarga de /sellers; solo los UUID que no aparecen se confirman uno a uno.
+"""
+import asyncio
+
+import httpx
+
+from app.common import http_client
+from app.deps import ReportContext
+from app.schema import schema
+
+SELLERS = [
+    {
+        "id_seller": i, "seller_name": f"Vendedor {i}", "seller_email": f"v{i}@example.com", "phone": "099",
+        "bussines_name": f"Negocio {i}", "location": "Manta", "created_at": "2024-01-01T00:00:00.000Z",
+        "user_id": f"user-{i}",
+    }
+    for i in range(1, 5)
+]
+
+QUERY = """
+{
+  seller_ids(seller_identifiers: ["user-3", "7", "user-1", "user-404", "user-2"]) {
+    seller_identifier
+    seller_id
+  }
+}
+"""
+
+
+def _rest_api(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/api/sellers":
+        return httpx.Response(200, json=SELLERS)
+    if request.url.path.startswith("/api/sellers/by-user/"):
+        return httpx.Response(404, json={"message": "not found"})
+    return httpx.Response(404)
+
+
+async def _execute(query: str):
+    await http_client.start_upstream_client(transport=httpx.MockTransport(_rest_api))
+    try:
+        return await schema.execute(query, context_value=ReportContext())
+    finally:
+        await http_client.close_upstream_client()
+
+
+def test_seller_ids_resolves_in_bulk():
+    result = asyncio.run(_execute(QUERY))
+
+    assert result.errors is None
+    assert result.data["seller_ids"] == [
+        {"seller_identifier": "user-3", "seller_id": 3},
+        {"seller_identifier": "7", "seller_id": 7},
+        {"seller_identifier": "user-1", "seller_id": 1},
+        {"seller_identifier": "user-404", "seller_id": None},
+        {"seller_identifier": "user-2", "seller_id": 2},
+    ]
+    assert result.extensions["upstream_calls"]["by_path"] == {"/sellers": 1, "/sellers/by-user/user-404": 1}
@@ -0,0 +1,121 @@
+# tests/test_shared_cache.py
+"""
+Nivel compartido (L2) con el backend en memoria: dos TTLCache con el mismo
+nombre hacen de dos réplicas del servicio.
+"""
+import asyncio
+
+import httpx
+
+from app.common import http_client, shared_cache
+from app.common.cache import TTLCache
+from app.common.replica import REPLICATED_DATASETS, Replica
+from app.common.shared_cache import CacheCodec, MemoryBackend, decode_rows, encode_rows
+
+ROWS_CODEC = CacheCodec(encode_rows, lambda key, data: decode_rows(data))
+
+
+def _replicas(name: str):
+    return TTLCache(name=name, codec=ROWS_CODEC), TTLCache(name=name, codec=ROWS_CODEC)
+
+
+async def _with_backend(scenario):
+    await shared_cache.start_shared_cache(MemoryBackend())
+    try:
+        return await scenario()
+    finally:
+        await shared_cache.stop_shared_cache()
+
+
+async def _settle():
+    # Escrituras e invalidaciones van en tareas de fondo
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_read_through_shares_loaded_value():
+    async def scenario():
+        first, second = _replicas("test-read-through")
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return [{"id_category": 1, "category_name": "Frutas"}]
+
+        loaded = await first.get_or_load("categories", loader, ttl=30)
+        shared = await second.get_or_load("categories", loader, ttl=30)
+        # Ya en el L1 de la segunda: no vuelve a L2
+        again = await second.get_or_load("categories", loader, ttl=30)
+        return loads, loaded, shared, again, second.stats
+
+    loads, loaded, shared, again, stats = asyncio.run(_with_backend(scenario))
+    assert len(loads) == 1
+    assert shared == loaded and again == loaded
+    assert stats["shared_hits"] == 1 and stats["hits"] == 1
+
+
+def test_entry_read_from_l2_expires_with_the_original():
+    async def scenario():
+        first, second = _replicas("test-ttl")
+
+        async def loader():
+            return [{"id": 1}]
+
+        await first.get_or_load("key", loader, ttl=0.6)
+        await asyncio.sleep(0.3)
+        await second.get_or_load("key", loader, ttl=0.6)
+        both_fresh = first.get_fresh("key") is not None and second.get_fresh("key") is not None
+        await asyncio.sleep(0.4)
+        # 0.7 s desde la carga original: vencida en las dos aunque la segunda la leyó hace 0.4 s
+        return both_fresh, first.get_fresh("key"), second.get_fresh("key")
+
+    both_fresh, first, second = asyncio.run(_with_backend(scenario))
+    assert both_fresh
+    assert first is None and second is None
+
+
+def test_invalidation_reaches_other_replica():
+    async def scenario():
+        first, second = _replicas("test-invalidate")
+        version = {"value": 1}
+
+        async def loader():
+            return [{"id": 1, "version": version["value"]}]
+
+        await first.get_or_load("key", loader, ttl=30)
+        await second.get_or_load("key", loader, ttl=30)
+        version["value"] = 2
+        first.invalidate("key")
+        await _settle()
+        dropped = second.peek("key") is None
+        reloaded = await second.get_or_load("key", loader, ttl=30)
+        return dropped, reloaded, second.stats["remote_invalidations"]
+
+    dropped, reloaded, remote = asyncio.run(_with_backend(scenario))
+    assert dropped
+    assert reloaded == [{"id": 1, "version": 2}]
+    assert remote == 1
+
+
+def test_replica_full_listing_is_shared_between_containers():
+    orders = [{"id_order": i, "status": "completed", "total_amount": "10.00"} for i in range(1, 4)]
+    calls = []
+
+    def rest_api(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, json=orders)
+
+    async def scenario():
+        await http_client.start_upstream_client(transport=httpx.MockTransport(rest_api))
+        try:
+            first, second = Replica(REPLICATED_DATASETS["orders"]), Replica(REPLICATED_DATASETS["orders"])
+            await first.sync()
+            await second.sync()
+            return first, second
+        finally:
+            await http_client.close_upstream_client()
+
+    first, second = asyncio.run(_with_backend(scenario))
+    assert calls == ["/api/orders"]
+    assert first.rows == second.rows == orders
+    assert second.stats["shared_loads"] == 1
@@ -0,0 +1,110 @@
+# tests/test_singleflight.py
+"""
+SingleFlight: los solicitantes concurrentes de una clave comparten una sola
+llamada; cancelar a uno no cancela a los demás y cancelar al último cancela la
+llamada compartida.
+"""
+import asyncio
+
+import pytest
+
+from app.common.singleflight import SingleFlight
+
+
+class _Upstream:
+    """Llamada lenta que se puede liberar desde la prueba y registra si la cancelaron"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def fetch(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"rows": self.calls}
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flights, upstream = SingleFlight(), _Upstream()
+        waiters = [asyncio.ensure_future(flights.do("orders", upstream.fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        return flights, upstream, await asyncio.gather(*waiters)
+
+    flights, upstream, results = asyncio.run(scenario())
+    assert upstream.calls == 1
+    assert [result for result, _ in results] == [{"rows": 1}] * 3
+    assert [coalesced for _, coalesced in results] == [False, True, True]
+    assert flights.in_flight() == 0
+
+
+def test_cancelling_one_caller_keeps_the_call_for_the_others():
+    async def scenario():
+        flights, upstream = SingleFlight(), _Upstream()
+        first = asyncio.ensure_future(flights.do("orders", upstream.fetch))
+        second = asyncio.ensure_future(flights.do("orders", upstream.fetch))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert not upstream.cancelled
+        assert flights.in_flight() == 1
+
+        upstream.release.set()
+        return flights, upstream, await second
+
+    flights, upstream, (result, coalesced) = asyncio.run(scenario())
+    assert result == {"rows": 1} and coalesced
+    assert not upstream.cancelled
+    assert flights.stats["cancelled"] == 0
+
+
+def test_last_cancelled_caller_cancels_the_call():
+    async def scenario():
+        flights, upstream = SingleFlight(), _Upstream()
+        waiters = [asyncio.ensure_future(flights.do("orders", upstream.fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        # Deja correr la cancelación de la llamada compartida y su liberación
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        # Un solicitante nuevo no se une a la llamada cancelada: empieza otra
+        upstream.release.set()
+        result = await flights.do("orders", upstream.fetch)
+        return flights, upstream, result
+
+    flights, upstream, (result, coalesced) = asyncio.run(scenario())
+    assert upstream.cancelled
+    assert flights.stats["cancelled"] == 1
+    assert upstream.calls == 2
+    assert result == {"rows": 2} and not coalesced
+    assert flights.in_flight() == 0
+
+
+def test_errors_reach_every_caller_and_release_the_key():
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream caído")
+
+    async def scenario():
+        flights = SingleFlight()
+        results = await asyncio.gather(
+            *(flights.do("orders", failing) for _ in range(3)), return_exceptions=True
+        )
+        return flights, results
+
+    flights, results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flights.stats["issued"] == 1
+    assert flights.in_flight() == 0
@@ -0,0 +1,97 @@
+# tests/test_snapshots.py
+"""
+Snapshots entre workers: un publicador escribe generaciones y un lector en
+otro proceso las mapea (filas y columnas del OrderStore sin decodificar), y
+los eventos que el lector reenvía llegan al publicador por el inbox.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from multiprocessing import get_context
+import time
+
+import pytest
+
+from app import config
+from app.common import snapshots
+from app.reports.order_store import order_store_for
+from app.snapshot_publisher import _dataset
+from tests.conftest import make_marketplace
+
+DATASETS = {"orders": "/orders", "product_orders": "/product-orders", "products": "/products", "clients": "/clients"}
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(snapshots, "_current", None)
+    monkeypatch.setattr(snapshots, "_current_state", None)
+    assert snapshots.try_become_publisher()
+    yield str(tmp_path)
+    snapshots.release_publisher()
+
+
+@pytest.fixture
+def reader():
+    # Otro proceso, como otro worker de uvicorn
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        yield pool
+
+
+def _publish(data, names=DATASETS):
+    datasets = {name: _dataset(name, data[DATASETS[name]]) if name in names else None for name in DATASETS}
+    return snapshots.write_generation(datasets, {name: time.time() for name in DATASETS})
+
+
+def _read(directory: str):
+    """Lado del lector: mapea la generación actual y calcula sobre el OrderStore mapeado"""
+    config.SNAPSHOT_DIR = directory
+    generation = snapshots.refresh_current()
+    orders = snapshots.snapshot_rows("/orders")
+    store = order_store_for(orders)
+    today = date.today()
+    return {
+        "generation": generation.name,
+        "publisher": snapshots.try_become_publisher(),
+        "rows": {name: list(snapshots.snapshot_rows(path)) for name, path in DATASETS.items()},
+        "totals": store.totals(store.completed_between(today - timedelta(days=30), today)),
+        "mapped": not store.id_order.flags.writeable,
+    }
+
+
+def _forward(directory: str, batches):
+    config.SNAPSHOT_DIR = directory
+    for batch in batches:
+        snapshots.forward_events(batch)
+
+
+def test_reader_maps_published_generations(snapshot_dir, reader):
+    data = make_marketplace()
+    assert _publish(data) == "gen-00000001"
+
+    seen = reader.submit(_read, snapshot_dir).result()
+    store = order_store_for(data["/orders"])
+    today = date.today()
+    assert seen["generation"] == "gen-00000001"
+    assert seen["publisher"] is False
+    assert seen["mapped"]
+    assert seen["rows"] == {name: data[path] for name, path in DATASETS.items()}
+    assert seen["totals"] == store.totals(store.completed_between(today - timedelta(days=30), today))
+
+    # Segunda generación: solo cambian las órdenes, el resto se enlaza de la anterior
+    data["/orders"] = [dict(order, status="cancelled") for order in data["/orders"]]
+    assert _publish(data, names=("orders",)) == "gen-00000002"
+    seen = reader.submit(_read, snapshot_dir).result()
+    assert seen["generation"] == "gen-00000002"
+    assert seen["totals"] == (0, 0)
+    assert seen["rows"]["products"] == data["/products"]
+
+
+def test_forwarded_events_reach_the_publisher_in_order(snapshot_dir, reader):
+    batches = [
+        [{"event": "payment.success", "data": {"orderId": 1, "transactionId": "tx-1"}}],
+        [{"event": "delivery.completed", "data": {"orderId": 2}}, {"event": "order.cancelled", "data": {"orderId": 3}}],
+    ]
+    reader.submit(_forward, snapshot_dir, batches).result()
+
+    assert snapshots.take_forwarded_events() == batches
+    assert snapshots.take_forwarded_events() == []